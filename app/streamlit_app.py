@@ -2,6 +2,7 @@
 
 import streamlit as st
 from business_tax_calculator.calculator.tax_calculator import BusinessTaxCalculator
+from business_tax_calculator.calculator.cache import CalculationCache
 
 # Constants
 STATE_OPTIONS = [
@@ -17,6 +18,9 @@ COUNTY_MAPPING = {
 }
 DEFAULT_COUNTIES = ["N/A"]
 
+# Shared across sessions: re-opened clients and untouched defaults hit the cache
+RESULT_CACHE = CalculationCache(maxsize=4096, ttl=3600)
+
 
 def set_page_config():
     st.set_page_config(page_title="Business Tax Calculator", layout="wide")
@@ -80,7 +84,7 @@ def get_sidebar_inputs():
 
 
 def calculate_tax(inputs: dict):
-    calc = BusinessTaxCalculator()
+    calc = BusinessTaxCalculator(cache=RESULT_CACHE)
     # Business info
     calc.business.set_name(inputs["business_name"])
     calc.business.set_entity_type(inputs["entity"])
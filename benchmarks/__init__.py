@@ -0,0 +1,4 @@
+"""
+Benchmarks package for the business tax calculator
+"""
+# This file makes the directory a Python package
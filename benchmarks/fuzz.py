@@ -0,0 +1,337 @@
+# benchmarks/fuzz.py
+"""
+Differential fuzzing of the calculation engines.
+
+Random but valid inputs are generated chunk by chunk and calculated by
+every engine:
+
+    full        calculate_business_liabilities, one Business per row
+    fast        calculator.fast_path.calculate_fast, one call per row
+    vectorized  calculator.vectorized.calculate_matrix over the chunk
+
+The vectorized results are the reference. A row mismatches when any
+result differs by more than a cent; each mismatching input is shrunk to
+a minimal reproducer (fields zeroed, rounded or reset to defaults while
+the mismatch persists). Part of every chunk sits on the edges: each
+federal and state bracket bound, the Social Security wage base, the
+Medicare threshold and the QBI income thresholds, a cent either side.
+
+Throughput per engine is reported, so a long run doubles as a soak test:
+
+    python -m benchmarks fuzz --rows 2000000 --seed 7
+
+The legacy TaxScenario implementation cannot take part: it survives only
+as a string literal in legacy/ and is not importable.
+"""
+
+import json
+import time
+from dataclasses import dataclass, field
+
+TOLERANCE = 0.01
+EDGE_FRACTION = 0.25
+EDGE_OFFSETS = (-1.0, -0.01, 0.0, 0.01, 0.5, 1.0)
+DEFAULT_CHUNK_SIZE = 10_000
+
+ENTITY_TYPES = ("Sole Proprietorship", "LLC", "S-Corp", "C-Corp")
+STATES = ("", "CA", "NY", "TX")
+
+
+def edge_incomes():
+    """Taxable incomes at which some rule changes."""
+    from business_tax_calculator.model.liabilities.tax_liability import (
+        TaxLiability,
+    )
+    from business_tax_calculator.utils.constants import MarginalTaxBrackets
+
+    liabilities = TaxLiability()
+    edges = {
+        float(liabilities.social_security_income_tax_liability.wage_base),
+        float(liabilities.medicare_income_tax_liability.threshold),
+    }
+    for brackets in (
+        MarginalTaxBrackets.FEDERAL.value,
+        MarginalTaxBrackets.STATE.value,
+    ):
+        for lower, upper, _ in brackets:
+            edges.update(float(b) for b in (lower, upper) if b != float("inf"))
+    return sorted(edges)
+
+
+def generate_columns(n, rng):
+    """
+    n random inputs in the rows_to_columns layout.
+
+    Args:
+        n (int): Rows to generate
+        rng (numpy.random.Generator): Source of randomness
+    """
+    import numpy as np
+
+    from business_tax_calculator.calculator.deduction_calculator import (
+        QBI_INCOME_THRESHOLDS,
+    )
+
+    statuses = np.array(sorted(QBI_INCOME_THRESHOLDS))
+    entity = np.array(ENTITY_TYPES)[rng.integers(0, len(ENTITY_TYPES), n)]
+    revenue = np.round(10 ** rng.uniform(0, 6.7, n), 2)
+    revenue[rng.random(n) < 0.02] = 0.0
+
+    def sometimes(high, p=0.5):
+        values = np.round(rng.uniform(0, high, n), 2)
+        values[rng.random(n) >= p] = 0.0
+        return values
+
+    salary = np.round(revenue * rng.uniform(0, 1, n), 2)
+    salary[entity != "S-Corp"] = 0.0
+    columns = {
+        "client_id": np.char.add("f", np.arange(n).astype(str)),
+        "name": np.full(n, ""),
+        "filing_status": statuses[rng.integers(0, len(statuses), n)],
+        "entity_type": entity,
+        "state": np.array(STATES)[rng.integers(0, len(STATES), n)],
+        "revenue": revenue,
+        # Up to 120% of revenue, so losses are covered too.
+        "expenses": np.round(revenue * rng.uniform(0, 1.2, n), 2),
+        "reasonable_salary": salary,
+        "retirement_contributions": sometimes(70_000),
+        "health_insurance_premiums": sometimes(25_000),
+        "home_office_deduction": sometimes(1_500),
+        "other_deductions": sometimes(20_000),
+        "local_tax_rate": np.round(sometimes(0.05, p=0.3), 4),
+        "estimated_tax_payments": sometimes(100_000),
+        "profit_distributions": sometimes(200_000, p=0.2),
+    }
+
+    # Edge rows: a C-Corp without deductions is taxed on its revenue, so
+    # revenue lands exactly on a bracket bound; an S-Corp paying no
+    # salary has preliminary taxable income equal to its revenue, which
+    # puts it on a QBI threshold.
+    edges = int(n * EDGE_FRACTION)
+    if edges:
+        index = rng.choice(n, edges, replace=False)
+        corp_edges = np.array(edge_incomes())
+        qbi_edges = np.array([float(QBI_INCOME_THRESHOLDS[s]) for s in statuses])
+        on_qbi = rng.random(edges) < 0.3
+        status_pick = rng.integers(0, len(statuses), edges)
+        base = np.where(
+            on_qbi,
+            qbi_edges[status_pick],
+            corp_edges[rng.integers(0, len(corp_edges), edges)],
+        )
+        offsets = np.array(EDGE_OFFSETS)[rng.integers(0, len(EDGE_OFFSETS), edges)]
+        for name in columns:
+            if columns[name].dtype.kind == "f":
+                columns[name][index] = 0.0
+        columns["entity_type"][index] = np.where(on_qbi, "S-Corp", "C-Corp")
+        columns["filing_status"][index] = np.where(
+            on_qbi, statuses[status_pick], columns["filing_status"][index]
+        )
+        columns["revenue"][index] = np.maximum(0.0, base + offsets)
+    return columns
+
+
+def row_inputs(columns, i):
+    """Row i of a chunk as a dict of plain Python values."""
+    return {name: values[i].item() for name, values in columns.items()}
+
+
+def _business(inputs):
+    from business_tax_calculator.model.business import Business
+
+    business = Business()
+    for name, value in inputs.items():
+        if name != "client_id":
+            setattr(business, name, value)
+    return business
+
+
+def full_engine(inputs):
+    from business_tax_calculator.calculator.tax_calculator import (
+        calculate_business_liabilities,
+    )
+
+    return calculate_business_liabilities(_business(inputs)).as_tuple()
+
+
+def fast_engine(inputs):
+    from business_tax_calculator.calculator.fast_path import calculate_fast
+
+    values = {k: v for k, v in inputs.items() if k not in ("client_id", "name")}
+    return calculate_fast(**values).as_tuple()
+
+
+SCALAR_ENGINES = {"full": full_engine, "fast": fast_engine}
+
+
+def reference_engine(inputs):
+    """The vectorized engine on a single row."""
+    import numpy as np
+
+    from business_tax_calculator.calculator.vectorized import calculate_matrix
+
+    columns = {name: np.array([value]) for name, value in inputs.items()}
+    return tuple(calculate_matrix(columns)[0].tolist())
+
+
+def differences(expected, actual, tolerance=TOLERANCE):
+    """Result keys whose values differ by more than ``tolerance``."""
+    from business_tax_calculator.calculator.tax_calculator import RESULT_KEYS
+
+    return [
+        key
+        for key, a, b in zip(RESULT_KEYS, expected, actual)
+        if not abs(a - b) <= tolerance
+    ]
+
+
+def _simplifications(inputs):
+    for name, value in inputs.items():
+        if isinstance(value, str):
+            default = "Single" if name == "filing_status" else ""
+            if name != "entity_type" and value != default:
+                yield {**inputs, name: default}
+        elif value != 0.0:
+            yield {**inputs, name: 0.0}
+            if value != round(value):
+                yield {**inputs, name: float(round(value))}
+            if abs(value) >= 10:
+                # Fewer significant figures, e.g. 123456.78 -> 123000.0
+                digits = len(str(int(abs(value)))) - 3
+                shorter = float(round(value, -digits)) if digits > 0 else None
+                if shorter is not None and shorter != value:
+                    yield {**inputs, name: shorter}
+
+
+def minimize(inputs, engine, reference=reference_engine, tolerance=TOLERANCE):
+    """
+    Shrink inputs while engine still disagrees with the reference.
+
+    Returns:
+        dict: The simplest inputs found that still mismatch
+    """
+
+    def mismatches(candidate):
+        return bool(differences(reference(candidate), engine(candidate), tolerance))
+
+    changed = True
+    while changed:
+        changed = False
+        for candidate in _simplifications(inputs):
+            if mismatches(candidate):
+                inputs = candidate
+                changed = True
+                break
+    return inputs
+
+
+def compact(inputs):
+    """Inputs without the fields left at their defaults."""
+    defaults = {"filing_status": "Single", "client_id": "", "name": "", "state": ""}
+    return {
+        name: value
+        for name, value in inputs.items()
+        if value != defaults.get(name, 0.0)
+    }
+
+
+@dataclass
+class FuzzReport:
+    rows: int = 0
+    elapsed: float = 0.0
+    engine_seconds: dict = field(default_factory=dict)
+    mismatches: dict = field(default_factory=dict)
+    reproducers: list = field(default_factory=list)
+
+    @property
+    def ok(self):
+        return not any(self.mismatches.values())
+
+    def throughput(self):
+        """Rows per second for each engine."""
+        return {
+            name: self.rows / seconds if seconds else 0.0
+            for name, seconds in self.engine_seconds.items()
+        }
+
+    def summary(self):
+        lines = [f"{self.rows:,} rows in {self.elapsed:.1f}s"]
+        for name, rate in self.throughput().items():
+            count = self.mismatches.get(name, 0)
+            lines.append(f"  {name:<12}{rate:>14,.0f} rows/s{count:>10,} mismatches")
+        for reproducer in self.reproducers:
+            lines.append("  reproducer: " + json.dumps(reproducer, sort_keys=True))
+        return "\n".join(lines)
+
+
+def run_fuzz(
+    rows,
+    seed=0,
+    chunk_size=DEFAULT_CHUNK_SIZE,
+    engines=None,
+    max_reproducers=5,
+    tolerance=TOLERANCE,
+    echo=None,
+):
+    """
+    Differentially test the scalar engines against the vectorized one.
+
+    Args:
+        rows (int): Inputs to generate
+        seed (int): Random seed; the same seed generates the same inputs
+        chunk_size (int): Rows generated and vectorized at a time
+        engines (dict): Name to ``fn(inputs) -> RESULT_KEYS tuple``,
+            defaults to SCALAR_ENGINES
+        max_reproducers (int): Mismatches to minimize and keep
+        tolerance (float): Largest difference treated as equal
+        echo (callable): Called with a progress line after every chunk
+
+    Returns:
+        FuzzReport
+    """
+    import numpy as np
+
+    from business_tax_calculator.calculator.vectorized import calculate_matrix
+
+    engines = SCALAR_ENGINES if engines is None else engines
+    rng = np.random.default_rng(seed)
+    report = FuzzReport()
+    report.engine_seconds = {"vectorized": 0.0, **{name: 0.0 for name in engines}}
+    report.mismatches = {name: 0 for name in engines}
+    clock = time.perf_counter
+    start = clock()
+    while report.rows < rows:
+        n = min(chunk_size, rows - report.rows)
+        columns = generate_columns(n, rng)
+        began = clock()
+        expected = calculate_matrix(columns).tolist()
+        report.engine_seconds["vectorized"] += clock() - began
+        inputs = [row_inputs(columns, i) for i in range(n)]
+        for name, engine in engines.items():
+            began = clock()
+            actual = [engine(row) for row in inputs]
+            report.engine_seconds[name] += clock() - began
+            for row, want, got in zip(inputs, expected, actual):
+                if not differences(want, got, tolerance):
+                    continue
+                report.mismatches[name] += 1
+                if len(report.reproducers) < max_reproducers:
+                    small = minimize(row, engine, tolerance=tolerance)
+                    report.reproducers.append(
+                        {
+                            "engine": name,
+                            "inputs": compact(small),
+                            "differs": differences(
+                                reference_engine(small), engine(small), tolerance
+                            ),
+                        }
+                    )
+        report.rows += n
+        if echo is not None:
+            echo(
+                f"{report.rows:,} rows, "
+                f"{sum(report.mismatches.values()):,} mismatches, "
+                f"{report.rows / (clock() - start):,.0f} rows/s"
+            )
+    report.elapsed = clock() - start
+    return report
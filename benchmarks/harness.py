@@ -0,0 +1,336 @@
+# benchmarks/harness.py
+"""
+Benchmark runner: registry, timing helpers, JSON results and comparison.
+
+Usage:
+    python -m benchmarks run [--quick] [--only NAME ...] [--output FILE]
+                             [--compare BASELINE] [--threshold FRACTION]
+    python -m benchmarks compare BASELINE CURRENT [--threshold FRACTION]
+    python -m benchmarks check-memory [--rss]
+    python -m benchmarks fuzz [--rows N] [--seed N]
+    python -m benchmarks list
+
+Every benchmark returns named metrics, each with a value, a unit and
+whether lower or higher is better. Results are written as JSON together
+with machine metadata; compare flags metrics that got worse than the
+baseline by more than the threshold and exits non-zero if any did.
+"""
+
+import argparse
+import datetime
+import json
+import os
+import platform
+import subprocess
+import sys
+import time
+
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+SRC = os.path.join(ROOT, "src")
+if SRC not in sys.path:
+    sys.path.insert(0, SRC)
+
+DEFAULT_OUTPUT = "benchmark-results.json"
+DEFAULT_BASELINE = os.path.join(os.path.dirname(__file__), "baseline.json")
+DEFAULT_THRESHOLD = 0.15
+
+BENCHMARKS = {}
+
+
+def benchmark(name):
+    """Register ``fn(quick)`` returning a dict of metric name to metric()."""
+
+    def register(fn):
+        BENCHMARKS[name] = fn
+        return fn
+
+    return register
+
+
+def metric(value, unit, better="lower"):
+    if better not in ("lower", "higher"):
+        raise ValueError("better must be 'lower' or 'higher'")
+    return {"value": float(value), "unit": unit, "better": better}
+
+
+def sample_latencies(fn, samples, warmup=200):
+    """Call fn repeatedly and return the sorted per-call times in seconds."""
+    for _ in range(warmup):
+        fn()
+    clock = time.perf_counter_ns
+    timings = []
+    for _ in range(samples):
+        start = clock()
+        fn()
+        timings.append(clock() - start)
+    timings.sort()
+    return [t / 1e9 for t in timings]
+
+
+def percentile(sorted_values, q):
+    if not sorted_values:
+        return 0.0
+    return sorted_values[min(len(sorted_values) - 1, int(q * len(sorted_values)))]
+
+
+def best_time(fn, repeat=3, min_time=0.2):
+    """
+    Fastest timed call, in seconds.
+
+    fn is called at least ``repeat`` times and until ``min_time`` seconds
+    were spent, so short benchmarks get enough runs to shed noise.
+    """
+    best = float("inf")
+    spent = 0.0
+    runs = 0
+    while runs < repeat or spent < min_time:
+        start = time.perf_counter()
+        fn()
+        elapsed = time.perf_counter() - start
+        best = min(best, elapsed)
+        spent += elapsed
+        runs += 1
+    return best
+
+
+def _git_commit():
+    try:
+        result = subprocess.run(
+            ["git", "rev-parse", "HEAD"],
+            cwd=ROOT,
+            capture_output=True,
+            text=True,
+            check=True,
+        )
+    except (OSError, subprocess.CalledProcessError):
+        return None
+    return result.stdout.strip()
+
+
+def machine_metadata():
+    """Describe the interpreter, machine and code the results came from."""
+    from business_tax_calculator.utils.rules import rules_version
+
+    try:
+        import numpy
+
+        numpy_version = numpy.__version__
+    except ImportError:
+        numpy_version = None
+    return {
+        "timestamp": datetime.datetime.now(datetime.timezone.utc).isoformat(),
+        "python": platform.python_version(),
+        "implementation": platform.python_implementation(),
+        "platform": platform.platform(),
+        "machine": platform.machine(),
+        "processor": platform.processor(),
+        "cpu_count": os.cpu_count(),
+        "numpy": numpy_version,
+        "git_commit": _git_commit(),
+        "rules_version": rules_version(),
+    }
+
+
+def run_benchmarks(names=None, quick=False, echo=None):
+    """
+    Run registered benchmarks.
+
+    Args:
+        names (list): Benchmarks to run, defaults to all
+        quick (bool): Use the smaller problem sizes
+        echo (callable): Called with a line per finished metric
+
+    Returns:
+        dict: {"metadata": ..., "quick": bool, "metrics": {name: metric}}
+    """
+    from benchmarks import suite  # noqa: F401  registers the benchmarks
+
+    unknown = set(names or ()) - set(BENCHMARKS)
+    if unknown:
+        raise ValueError(f"Unknown benchmarks: {', '.join(sorted(unknown))}")
+    metrics = {}
+    for name in names or BENCHMARKS:
+        for key, value in BENCHMARKS[name](quick).items():
+            metrics[f"{name}.{key}"] = value
+            if echo is not None:
+                echo(f"{name}.{key}: {value['value']:.6g} {value['unit']}")
+    return {"metadata": machine_metadata(), "quick": quick, "metrics": metrics}
+
+
+def write_results(path, results):
+    with open(path, "w") as handle:
+        json.dump(results, handle, indent=2, sort_keys=True)
+        handle.write("\n")
+
+
+def load_results(path):
+    with open(path) as handle:
+        return json.load(handle)
+
+
+def compare(baseline, current, threshold=DEFAULT_THRESHOLD):
+    """
+    Compare two result documents metric by metric.
+
+    Args:
+        baseline (dict): Stored results
+        current (dict): New results
+        threshold (float): Allowed relative slowdown, e.g. 0.15 for 15%
+
+    Returns:
+        list: (name, baseline value, current value, relative change, status)
+        rows, where status is "regression", "improvement", "ok", "new" or
+        "missing". Relative change is positive when the metric got worse.
+    """
+    old, new = baseline["metrics"], current["metrics"]
+    rows = []
+    for name in sorted(set(old) | set(new)):
+        if name not in old:
+            rows.append((name, None, new[name]["value"], None, "new"))
+            continue
+        if name not in new:
+            rows.append((name, old[name]["value"], None, None, "missing"))
+            continue
+        before, after = old[name]["value"], new[name]["value"]
+        if before == 0:
+            change = 0.0 if after == 0 else float("inf")
+        else:
+            change = (after - before) / abs(before)
+        if new[name]["better"] == "higher":
+            change = -change
+        if change > threshold:
+            status = "regression"
+        elif change < -threshold:
+            status = "improvement"
+        else:
+            status = "ok"
+        rows.append((name, before, after, change, status))
+    return rows
+
+
+def _metadata_warnings(baseline, current):
+    keys = ("machine", "processor", "cpu_count", "python", "implementation")
+    old, new = baseline.get("metadata", {}), current.get("metadata", {})
+    warnings = [
+        f"{key} differs: {old.get(key)!r} vs {new.get(key)!r}"
+        for key in keys
+        if old.get(key) != new.get(key)
+    ]
+    if baseline.get("quick") != current.get("quick"):
+        warnings.append("one run used --quick and the other did not")
+    return warnings
+
+
+def report(baseline, current, threshold, out=print):
+    """Print a comparison table; returns the number of regressions."""
+    for warning in _metadata_warnings(baseline, current):
+        out(f"warning: {warning}")
+    regressions = 0
+    for name, before, after, change, status in compare(baseline, current, threshold):
+        if status == "regression":
+            regressions += 1
+        delta = "" if change is None else f"{change:+.1%}"
+        before = "-" if before is None else f"{before:.6g}"
+        after = "-" if after is None else f"{after:.6g}"
+        out(f"{status:<12} {name:<48} {before:>12} {after:>12} {delta:>9}")
+    out(f"{regressions} regression(s) beyond {threshold:.0%}")
+    return regressions
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(
+        prog="python -m benchmarks",
+        description="Business tax calculator benchmark suite.",
+    )
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    run = sub.add_parser("run", help="Run benchmarks and write JSON results")
+    run.add_argument("--quick", action="store_true", help="Smaller problem sizes")
+    run.add_argument("--only", nargs="+", metavar="NAME", help="Benchmarks to run")
+    run.add_argument("--output", default=DEFAULT_OUTPUT, help="Results JSON path")
+    run.add_argument(
+        "--compare",
+        nargs="?",
+        const=DEFAULT_BASELINE,
+        metavar="BASELINE",
+        help="Compare against a baseline (default benchmarks/baseline.json)",
+    )
+    run.add_argument("--threshold", type=float, default=DEFAULT_THRESHOLD)
+
+    cmp = sub.add_parser("compare", help="Compare two results files")
+    cmp.add_argument("baseline")
+    cmp.add_argument("current")
+    cmp.add_argument("--threshold", type=float, default=DEFAULT_THRESHOLD)
+
+    memory = sub.add_parser(
+        "check-memory", help="Check memory footprints against their budgets"
+    )
+    memory.add_argument(
+        "--rss",
+        action="store_true",
+        help="Also run the budgeted full-size batches for peak RSS (slow)",
+    )
+
+    fuzz = sub.add_parser(
+        "fuzz", help="Differentially test the engines on random inputs"
+    )
+    fuzz.add_argument("--rows", type=int, default=1_000_000)
+    fuzz.add_argument("--seed", type=int, default=0)
+    fuzz.add_argument("--chunk-size", type=int, default=10_000)
+    fuzz.add_argument("--max-reproducers", type=int, default=5)
+    fuzz.add_argument("--output", help="Also write the report as JSON")
+
+    sub.add_parser("list", help="List benchmark names")
+    return parser
+
+
+def _fuzz(args):
+    from benchmarks.fuzz import run_fuzz
+
+    report = run_fuzz(
+        args.rows,
+        seed=args.seed,
+        chunk_size=args.chunk_size,
+        max_reproducers=args.max_reproducers,
+        echo=print,
+    )
+    print(report.summary())
+    if args.output:
+        write_results(
+            args.output,
+            {
+                "metadata": machine_metadata(),
+                "seed": args.seed,
+                "rows": report.rows,
+                "throughput": report.throughput(),
+                "mismatches": report.mismatches,
+                "reproducers": report.reproducers,
+            },
+        )
+    return 0 if report.ok else 1
+
+
+def main(argv=None):
+    args = build_parser().parse_args(argv)
+    if args.command == "list":
+        from benchmarks import suite  # noqa: F401
+
+        for name in BENCHMARKS:
+            print(name)
+        return 0
+    if args.command == "fuzz":
+        return _fuzz(args)
+    if args.command == "check-memory":
+        from benchmarks.memory import check_memory
+
+        return check_memory(args.rss)
+    if args.command == "compare":
+        baseline, current = load_results(args.baseline), load_results(args.current)
+        return 1 if report(baseline, current, args.threshold) else 0
+
+    results = run_benchmarks(args.only, args.quick, echo=print)
+    write_results(args.output, results)
+    print(f"Wrote {len(results['metrics'])} metrics to {args.output}")
+    if args.compare:
+        return 1 if report(load_results(args.compare), results, args.threshold) else 0
+    return 0
@@ -0,0 +1,195 @@
+# benchmarks/memory.py
+"""
+Memory footprints and their checked-in budgets.
+
+Per-object figures are bytes still allocated per object after building
+many of them, as traced by tracemalloc. Batch figures are the traced peak
+of a run_batch call, divided by the rows held at once: the chunk size in
+streaming mode, every row in in-memory mode (one chunk for the whole
+file). Peak RSS of full-size runs is measured in a fresh subprocess.
+
+memory_budgets.json holds the upper bounds; tests/test_memory_budgets.py
+fails when a footprint grows past its budget.
+"""
+
+import gc
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import tracemalloc
+
+from benchmarks.harness import SRC
+
+BUDGETS_PATH = os.path.join(os.path.dirname(__file__), "memory_budgets.json")
+
+
+def retained_bytes(build, n=2000):
+    """Average bytes still allocated per object after build(i) for n objects."""
+    gc.collect()
+    tracemalloc.start()
+    try:
+        kept = [build(i) for i in range(n)]
+        gc.collect()
+        current, _ = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    # The list holding the objects is not part of their footprint.
+    return (current - sys.getsizeof(kept)) / n
+
+
+def object_footprints(n=2000):
+    """Bytes per Business, BusinessInput, TaxResult and result matrix row."""
+    import numpy as np
+
+    from business_tax_calculator.calculator.tax_calculator import RESULT_KEYS
+    from business_tax_calculator.model.business import Business
+    from business_tax_calculator.model.business_input import BusinessInput
+    from business_tax_calculator.model.tax_result import TaxResult
+
+    def business(i):
+        b = Business()
+        b.set_entity_type("LLC")
+        b.set_revenue(100_000.0 + i)
+        b.set_expenses(20_000.0 + i)
+        return b
+
+    def record(i):
+        return BusinessInput(
+            entity_type="LLC", revenue=100_000.0 + i, expenses=20_000.0 + i
+        )
+
+    def result(i):
+        return TaxResult(*(float(i + k) for k in range(len(RESULT_KEYS))))
+
+    matrix = retained_bytes(lambda i: np.zeros((n, len(RESULT_KEYS))), 1) / n
+    return {
+        "business_bytes": retained_bytes(business, n),
+        "business_input_bytes": retained_bytes(record, n),
+        "tax_result_bytes": retained_bytes(result, n),
+        "result_row_bytes": matrix,
+    }
+
+
+def traced_batch_peak(source, chunk_size):
+    """Traced peak bytes of run_batch over ``source``."""
+    from business_tax_calculator.calculator.batch import run_batch
+
+    with tempfile.TemporaryDirectory() as tmp:
+        gc.collect()
+        tracemalloc.start()
+        try:
+            run_batch(source, os.path.join(tmp, "out.csv"), chunk_size=chunk_size)
+            _, peak = tracemalloc.get_traced_memory()
+        finally:
+            tracemalloc.stop()
+    return peak
+
+
+def batch_footprints(rows=4000, chunk_size=1000):
+    """Traced peak bytes per row held at once, streaming and in-memory."""
+    from benchmarks.suite import make_columns, write_input_csv
+
+    with tempfile.TemporaryDirectory() as tmp:
+        source = os.path.join(tmp, "in.csv")
+        write_input_csv(source, make_columns(rows))
+        streaming = traced_batch_peak(source, chunk_size)
+        in_memory = traced_batch_peak(source, rows)
+    return {
+        "streaming_peak_bytes_per_chunk_row": streaming / chunk_size,
+        "in_memory_peak_bytes_per_row": in_memory / rows,
+    }
+
+
+RSS_SCRIPT = """
+import json, sys
+from business_tax_calculator.calculator.batch import run_batch
+
+def status(field):
+    with open("/proc/self/status") as handle:
+        for line in handle:
+            if line.startswith(field + ":"):
+                return int(line.split()[1])
+
+baseline = status("VmRSS")
+run_batch(sys.argv[1], sys.argv[2], chunk_size=int(sys.argv[3]))
+json.dump({"peak_kb": status("VmHWM"), "baseline_kb": baseline}, sys.stdout)
+"""
+
+
+def batch_peak_rss(source, chunk_size):
+    """
+    Peak RSS of a fresh process running run_batch over ``source``.
+
+    Returns:
+        dict: peak_kb, and baseline_kb after imports (Linux only)
+    """
+    with tempfile.TemporaryDirectory() as tmp:
+        result = subprocess.run(
+            [
+                sys.executable,
+                "-c",
+                RSS_SCRIPT,
+                source,
+                os.path.join(tmp, "out.csv"),
+                str(chunk_size),
+            ],
+            capture_output=True,
+            text=True,
+            env=dict(os.environ, PYTHONPATH=SRC),
+            check=True,
+        )
+    return json.loads(result.stdout)
+
+
+def load_budgets(path=BUDGETS_PATH):
+    with open(path) as handle:
+        return json.load(handle)
+
+
+def check_budgets(measured, budgets):
+    """
+    Compare footprints against their budgets.
+
+    Returns:
+        list: "name: measured > budget" for every footprint over budget
+    """
+    return [
+        f"{name}: {measured[name]:,.0f} > {budget:,.0f}"
+        for name, budget in budgets.items()
+        if name in measured and measured[name] > budget
+    ]
+
+
+def rss_footprints(names):
+    """Peak RSS for budget names like ``streaming.100000.peak_rss_kb``."""
+    from benchmarks.suite import make_columns, write_input_csv
+    from business_tax_calculator.calculator.batch import DEFAULT_CHUNK_SIZE
+
+    measured = {}
+    with tempfile.TemporaryDirectory() as tmp:
+        for name in names:
+            mode, rows, _ = name.split(".")
+            rows = int(rows)
+            source = os.path.join(tmp, f"{rows}.csv")
+            if not os.path.exists(source):
+                write_input_csv(source, make_columns(rows))
+            chunk_size = DEFAULT_CHUNK_SIZE if mode == "streaming" else rows
+            measured[name] = batch_peak_rss(source, chunk_size)["peak_kb"]
+    return measured
+
+
+def check_memory(rss=False):
+    """Measure footprints, print them against budgets; 1 if any is over."""
+    budgets = load_budgets()
+    measured = object_footprints()
+    measured.update(batch_footprints())
+    if rss:
+        measured.update(rss_footprints(n for n in budgets if n.endswith("_rss_kb")))
+    for name, value in measured.items():
+        print(f"{name:<40}{value:>14,.0f}{budgets.get(name, float('nan')):>14,.0f}")
+    failures = check_budgets(measured, budgets)
+    for failure in failures:
+        print(f"over budget: {failure}")
+    return 1 if failures else 0
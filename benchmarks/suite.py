@@ -0,0 +1,420 @@
+# benchmarks/suite.py
+"""
+The benchmarks themselves.
+
+scalar      single-business latency: the interactive calculator, the
+            cached path behind the Streamlit app and the fast path
+brackets    marginal bracket evaluations per second, scalar and vectorized
+batch       batch engine rows per second from 1e3 to 1e7 rows, input
+            validation and rollups, plus end-to-end CSV and Parquet runs
+scenarios   time per scenario as the number of analysed scenarios grows
+startup     cold import time and peak RSS of a scalar-path process
+memory      bytes per business and per result row, traced peak per row
+            and peak RSS of streaming and in-memory batch runs
+export      rows per second and traced peak memory of CSV and .xlsx export
+reports     HTML report pages per second, in process and across a pool
+"""
+
+import csv
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+
+from benchmarks.harness import (
+    SRC,
+    benchmark,
+    best_time,
+    metric,
+    percentile,
+    sample_latencies,
+)
+
+ENTITY_TYPES = ("Sole Proprietorship", "LLC", "S-Corp", "C-Corp")
+FILING_STATUSES = ("Single", "Married Filing Jointly", "Head of Household")
+
+BATCH_SIZES = (1_000, 10_000, 100_000, 1_000_000, 10_000_000)
+QUICK_BATCH_SIZES = (1_000, 10_000, 100_000)
+SCENARIO_COUNTS = (10, 100, 1_000)
+QUICK_SCENARIO_COUNTS = (10, 100)
+MEMORY_SIZES = (100_000, 1_000_000)
+QUICK_MEMORY_SIZES = (10_000,)
+EXPORT_SIZES = (10_000, 100_000, 1_000_000)
+QUICK_EXPORT_SIZES = (10_000, 100_000)
+REPORT_PAGES = 20_000
+QUICK_REPORT_PAGES = 2_000
+
+
+def make_columns(n, seed=0):
+    """Random but realistic input columns in the rows_to_columns layout."""
+    import numpy as np
+
+    from business_tax_calculator.calculator.batch import (
+        INPUT_NUMERIC_COLUMNS,
+        INPUT_TEXT_COLUMNS,
+    )
+
+    rng = np.random.default_rng(seed)
+    revenue = np.round(rng.uniform(20_000, 2_000_000, n), 2)
+    expenses = np.round(revenue * rng.uniform(0.1, 0.9, n), 2)
+    # Within net revenue, so every row passes batch validation.
+    salary = np.minimum(np.round(rng.uniform(0, 150_000, n), 2), revenue - expenses)
+    columns = {
+        "client_id": np.char.add("c", np.arange(n).astype(str)),
+        "name": np.full(n, "Benchmark Co"),
+        "filing_status": np.array(FILING_STATUSES)[rng.integers(0, 3, n)],
+        "entity_type": np.array(ENTITY_TYPES)[rng.integers(0, 4, n)],
+        "state": np.full(n, "CA"),
+        "revenue": revenue,
+        "expenses": expenses,
+        "reasonable_salary": salary,
+        "retirement_contributions": np.round(rng.uniform(0, 20_000, n), 2),
+        "health_insurance_premiums": np.round(rng.uniform(0, 12_000, n), 2),
+        "home_office_deduction": np.round(rng.uniform(0, 1_500, n), 2),
+        "other_deductions": np.round(rng.uniform(0, 5_000, n), 2),
+        "local_tax_rate": np.zeros(n),
+        "estimated_tax_payments": np.round(rng.uniform(0, 50_000, n), 2),
+        "profit_distributions": np.zeros(n),
+    }
+    assert set(columns) == set(INPUT_TEXT_COLUMNS + INPUT_NUMERIC_COLUMNS)
+    return columns
+
+
+def write_input_csv(path, columns):
+    with open(path, "w", newline="") as handle:
+        writer = csv.writer(handle)
+        writer.writerow(list(columns))
+        writer.writerows(zip(*(values.tolist() for values in columns.values())))
+
+
+def make_business(i=0):
+    from business_tax_calculator.model.business import Business
+
+    business = Business()
+    business.set_name("Benchmark Co")
+    business.set_entity_type(ENTITY_TYPES[i % 4])
+    business.set_state("CA")
+    business.set_revenue(150_000.0 + 37 * i)
+    business.set_expenses(40_000.0)
+    business.set_retirement_contributions(6_000.0)
+    business.set_health_insurance_premiums(4_800.0)
+    if business.entity_type == "S-Corp":
+        business.set_reasonable_salary(60_000.0)
+    return business
+
+
+def latency_metrics(prefix, fn, samples, rounds=5):
+    """p50/p99 latency, each the best over several rounds of samples."""
+    p50 = p99 = float("inf")
+    for _ in range(rounds):
+        timings = sample_latencies(fn, samples // rounds)
+        p50 = min(p50, percentile(timings, 0.50))
+        p99 = min(p99, percentile(timings, 0.99))
+    return {
+        f"{prefix}.p50_us": metric(p50 * 1e6, "us"),
+        f"{prefix}.p99_us": metric(p99 * 1e6, "us"),
+    }
+
+
+@benchmark("scalar")
+def bench_scalar(quick):
+    from business_tax_calculator.calculator.cache import CalculationCache
+    from business_tax_calculator.calculator.fast_path import calculate_fast
+    from business_tax_calculator.calculator.tax_calculator import (
+        BusinessTaxCalculator,
+    )
+
+    samples = 2_000 if quick else 20_000
+    calculator = BusinessTaxCalculator()
+    calculator.business = make_business()
+    metrics = latency_metrics(
+        "calculate_liabilities", calculator.calculate_liabilities, samples
+    )
+
+    # The Streamlit app calculates through a shared CalculationCache.
+    cached = BusinessTaxCalculator(cache=CalculationCache(maxsize=16))
+    cached.business = make_business()
+    metrics.update(
+        latency_metrics(
+            "calculate_liabilities_cached", cached.calculate_liabilities, samples
+        )
+    )
+
+    def fast():
+        calculate_fast(
+            "LLC",
+            150_000.0,
+            40_000.0,
+            retirement_contributions=6_000.0,
+            health_insurance_premiums=4_800.0,
+        )
+
+    metrics.update(latency_metrics("calculate_fast", fast, samples))
+    return metrics
+
+
+@benchmark("brackets")
+def bench_brackets(quick):
+    import numpy as np
+
+    from business_tax_calculator.calculator.fast_path import CompiledBrackets
+    from business_tax_calculator.model.liabilities.liability import bracket_tax
+    from business_tax_calculator.utils.array_ops import SCALAR_OPS
+    from business_tax_calculator.utils.constants import MarginalTaxBrackets
+
+    brackets = MarginalTaxBrackets.FEDERAL.value
+    n = 20_000 if quick else 200_000
+    incomes = np.random.default_rng(1).uniform(0, 1_000_000, n)
+    scalar_incomes = incomes.tolist()
+    compiled = CompiledBrackets(brackets)
+
+    def scalar():
+        for income in scalar_incomes:
+            bracket_tax(income, brackets, SCALAR_OPS)
+
+    def precompiled():
+        for income in scalar_incomes:
+            compiled.tax(income)
+
+    vector_incomes = np.tile(incomes, 10)
+    return {
+        "scalar.evals_per_s": metric(n / best_time(scalar), "1/s", "higher"),
+        "compiled.evals_per_s": metric(n / best_time(precompiled), "1/s", "higher"),
+        "vectorized.evals_per_s": metric(
+            len(vector_incomes)
+            / best_time(lambda: bracket_tax(vector_incomes, brackets, np)),
+            "1/s",
+            "higher",
+        ),
+    }
+
+
+@benchmark("batch")
+def bench_batch(quick):
+    from business_tax_calculator.calculator.batch import (
+        DEFAULT_CHUNK_SIZE,
+        calculate_chunk,
+        run_batch,
+    )
+    from business_tax_calculator.calculator.validation import validate_columns
+    from business_tax_calculator.report.rollup import Rollup
+    from business_tax_calculator.utils.rules import rules_version
+
+    version = rules_version()
+    # A few distinct chunks cycled through; building 1e7 rows of inputs
+    # would measure the generator rather than the engine.
+    pool = [make_columns(DEFAULT_CHUNK_SIZE, seed) for seed in range(4)]
+    metrics = {}
+    for n in QUICK_BATCH_SIZES if quick else BATCH_SIZES:
+
+        def run():
+            remaining, i = n, 0
+            while remaining:
+                size = min(remaining, DEFAULT_CHUNK_SIZE)
+                columns = pool[i % len(pool)]
+                if size < DEFAULT_CHUNK_SIZE:
+                    columns = {k: v[:size] for k, v in columns.items()}
+                calculate_chunk(columns, version=version)
+                remaining -= size
+                i += 1
+
+        elapsed = best_time(run, repeat=3 if n <= 1_000_000 else 1, min_time=0)
+        metrics[f"rows_per_s.{n}"] = metric(n / elapsed, "rows/s", "higher")
+
+    elapsed = best_time(lambda: validate_columns(pool[0]))
+    metrics["validate_rows_per_s"] = metric(
+        DEFAULT_CHUNK_SIZE / elapsed, "rows/s", "higher"
+    )
+    # Aggregation alone; s_corp_savings would add a second calculation.
+    results = calculate_chunk(pool[0], version=version)
+    rollup = Rollup(metrics=("total_tax", "effective_tax_rate"))
+    elapsed = best_time(lambda: rollup.write(pool[0], results))
+    metrics["rollup_rows_per_s"] = metric(
+        DEFAULT_CHUNK_SIZE / elapsed, "rows/s", "higher"
+    )
+
+    n = 10_000 if quick else 100_000
+    with tempfile.TemporaryDirectory() as tmp:
+        source = os.path.join(tmp, "in.csv")
+        write_input_csv(source, make_columns(n, seed=9))
+        target = os.path.join(tmp, "out.csv")
+        elapsed = best_time(lambda: run_batch(source, target), min_time=0)
+        metrics[f"csv_rows_per_s.{n}"] = metric(n / elapsed, "rows/s", "higher")
+        try:
+            import pyarrow as pa
+            import pyarrow.parquet as pq
+        except ImportError:
+            return metrics
+        source = os.path.join(tmp, "in.parquet")
+        pq.write_table(pa.table(make_columns(n, seed=9)), source)
+        target = os.path.join(tmp, "out.parquet")
+        elapsed = best_time(lambda: run_batch(source, target), min_time=0)
+        metrics[f"parquet_rows_per_s.{n}"] = metric(n / elapsed, "rows/s", "higher")
+    return metrics
+
+
+@benchmark("scenarios")
+def bench_scenarios(quick):
+    """
+    Full-path calculation of a growing list of scenarios.
+
+    This is the live counterpart of the legacy scenario analyzer, which
+    no longer runs: a flat time per scenario means linear scaling.
+    """
+    from business_tax_calculator.calculator.tax_calculator import (
+        calculate_business_liabilities,
+    )
+
+    metrics = {}
+    for n in QUICK_SCENARIO_COUNTS if quick else SCENARIO_COUNTS:
+
+        def analyse():
+            return [calculate_business_liabilities(make_business(i)) for i in range(n)]
+
+        metrics[f"per_scenario_us.{n}"] = metric(best_time(analyse) / n * 1e6, "us")
+    return metrics
+
+
+STARTUP_SCRIPT = """
+import json, resource, sys, time
+start = time.perf_counter()
+from business_tax_calculator import Business, calculate_business_liabilities
+business = Business()
+business.set_entity_type("LLC")
+business.set_revenue(120000)
+calculate_business_liabilities(business)
+seconds = time.perf_counter() - start
+# ru_maxrss can include the parent's pages from before exec on Linux;
+# VmHWM belongs to this process image only.
+try:
+    with open("/proc/self/status") as status:
+        peak = next(int(l.split()[1]) for l in status if l.startswith("VmHWM:"))
+except (OSError, StopIteration):
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+json.dump({"seconds": seconds, "maxrss_kb": peak}, sys.stdout)
+"""
+
+
+@benchmark("startup")
+def bench_startup(quick):
+    env = dict(os.environ, PYTHONPATH=SRC)
+    runs = []
+    for _ in range(3 if quick else 10):
+        result = subprocess.run(
+            [sys.executable, "-c", STARTUP_SCRIPT],
+            capture_output=True,
+            text=True,
+            env=env,
+            check=True,
+        )
+        runs.append(json.loads(result.stdout))
+    return {
+        "import_and_calculate_ms": metric(
+            min(run["seconds"] for run in runs) * 1e3, "ms"
+        ),
+        "peak_rss_kb": metric(min(run["maxrss_kb"] for run in runs), "KiB"),
+    }
+
+
+@benchmark("memory")
+def bench_memory(quick):
+    from benchmarks import memory
+    from business_tax_calculator.calculator.batch import (
+        DEFAULT_CHUNK_SIZE,
+        calculate_chunk,
+    )
+
+    columns = make_columns(DEFAULT_CHUNK_SIZE)
+    calculate_chunk(columns)
+    tracemalloc.start()
+    try:
+        calculate_chunk(columns)
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    metrics = {
+        "batch_chunk_peak_bytes_per_row": metric(peak / DEFAULT_CHUNK_SIZE, "B"),
+    }
+    footprints = memory.object_footprints()
+    footprints.update(memory.batch_footprints())
+    for name, value in footprints.items():
+        metrics[name] = metric(value, "B")
+
+    with tempfile.TemporaryDirectory() as tmp:
+        for n in QUICK_MEMORY_SIZES if quick else MEMORY_SIZES:
+            source = os.path.join(tmp, f"{n}.csv")
+            write_input_csv(source, make_columns(n))
+            for mode, chunk_size in (
+                ("streaming", DEFAULT_CHUNK_SIZE),
+                ("in_memory", n),
+            ):
+                rss = memory.batch_peak_rss(source, chunk_size)
+                metrics[f"{mode}.{n}.peak_rss_kb"] = metric(rss["peak_kb"], "KiB")
+            os.unlink(source)
+    return metrics
+
+
+@benchmark("export")
+def bench_export(quick):
+    """Export of calculated chunks; peak memory should not grow with rows."""
+    from business_tax_calculator.calculator.batch import (
+        CsvChunkWriter,
+        calculate_chunk,
+    )
+    from business_tax_calculator.report.export import XlsxChunkWriter
+
+    chunk = 10_000
+    pool = []
+    for seed in range(2):
+        columns = make_columns(chunk, seed)
+        pool.append((columns, calculate_chunk(columns)))
+    metrics = {}
+    with tempfile.TemporaryDirectory() as tmp:
+        for n in QUICK_EXPORT_SIZES if quick else EXPORT_SIZES:
+            for name, writer_class in (
+                ("csv", CsvChunkWriter),
+                ("xlsx", XlsxChunkWriter),
+            ):
+                path = os.path.join(tmp, f"out.{name}")
+                tracemalloc.start()
+                try:
+                    start = time.perf_counter()
+                    with writer_class(path) as writer:
+                        for i in range(n // chunk):
+                            writer.write(*pool[i % len(pool)])
+                    elapsed = time.perf_counter() - start
+                    _, peak = tracemalloc.get_traced_memory()
+                finally:
+                    tracemalloc.stop()
+                metrics[f"{name}_rows_per_s.{n}"] = metric(
+                    n / elapsed, "rows/s", "higher"
+                )
+                metrics[f"{name}_peak_bytes.{n}"] = metric(peak, "B")
+    return metrics
+
+
+@benchmark("reports")
+def bench_reports(quick):
+    """Per-client HTML pages rendered from a column store of results."""
+    from business_tax_calculator.calculator.batch import calculate_chunk
+    from business_tax_calculator.report.html import generate_reports
+    from business_tax_calculator.storage.column_store import ColumnStoreWriter
+
+    n = QUICK_REPORT_PAGES if quick else REPORT_PAGES
+    columns = make_columns(n)
+    metrics = {}
+    with tempfile.TemporaryDirectory() as tmp:
+        store = os.path.join(tmp, "results.store")
+        with ColumnStoreWriter(store) as writer:
+            writer.write(columns, calculate_chunk(columns))
+        for workers in (1, os.cpu_count() or 1):
+            summary = generate_reports(
+                store, os.path.join(tmp, f"pages-{workers}"), workers=workers
+            )
+            metrics[f"pages_per_s.workers_{workers}"] = metric(
+                summary.pages_per_second, "pages/s", "higher"
+            )
+    return metrics
@@ -0,0 +1,34 @@
+"""
+Business tax liability calculator.
+
+Public names are imported on first access so that importing the package
+stays cheap: the scalar calculation needs only the standard library, and
+numpy is loaded only by the batch features that use it.
+"""
+
+import importlib
+
+_TAX_CALCULATOR = "business_tax_calculator.calculator.tax_calculator"
+
+_EXPORTS = {
+    "Business": "business_tax_calculator.model.business",
+    "BusinessTaxCalculator": _TAX_CALCULATOR,
+    "CalculationCache": "business_tax_calculator.calculator.cache",
+    "calculate_business_liabilities": _TAX_CALCULATOR,
+    "run_batch": "business_tax_calculator.calculator.batch",
+}
+
+__all__ = sorted(_EXPORTS)
+
+
+def __getattr__(name):
+    module = _EXPORTS.get(name)
+    if module is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(importlib.import_module(module), name)
+    globals()[name] = value
+    return value
+
+
+def __dir__():
+    return sorted(set(globals()) | set(__all__))
@@ -0,0 +1,245 @@
+# calculator/arrow_io.py
+"""
+Apache Parquet and Arrow IPC (Feather) input and output for batch runs.
+
+Inputs are streamed a record batch at a time, reading only the input
+columns the calculation uses. Float64 columns without nulls are wrapped
+as numpy arrays over the Arrow buffers without copying; other numeric
+columns are cast and their nulls filled with 0.0, as the CSV reader does
+for blank cells. Dictionary-encoded text columns are decoded once per
+distinct value.
+
+Output files follow output_schema(): the input columns followed by one
+float64 column per RESULT_KEYS entry, under the same names the scalar
+calculation returns. Column names must be unique for Arrow readers, so
+profit_distributions, both an input and a result (with the same value),
+appears once, among the results. Each chunk becomes one Parquet row group or one IPC
+record batch, and the result columns are handed to Arrow without a copy.
+"""
+
+import numpy as np
+import pyarrow as pa
+import pyarrow.compute as pc
+import pyarrow.parquet as pq
+
+from business_tax_calculator.calculator.batch import (
+    CARRIED_NUMERIC_COLUMNS,
+    INPUT_NUMERIC_COLUMNS,
+    INPUT_TEXT_COLUMNS,
+    KEY_TEXT_FIELDS,
+    TEXT_DEFAULTS,
+)
+from business_tax_calculator.calculator.tax_calculator import RESULT_KEYS
+from business_tax_calculator.utils.rules import rules_version
+
+PARQUET = "parquet"
+ARROW = "arrow"
+
+SCHEMA_VERSION = "1"
+METADATA_PREFIX = "business_tax_calculator."
+
+ARROW_OUTPUT_COLUMNS = INPUT_TEXT_COLUMNS + CARRIED_NUMERIC_COLUMNS + RESULT_KEYS
+
+
+def output_schema(version=None):
+    """
+    The published schema of Parquet and Arrow batch output.
+
+    Args:
+        version (str): Rule version recorded in the schema metadata,
+            defaults to the current one
+
+    Returns:
+        pyarrow.Schema: Non-nullable columns in ARROW_OUTPUT_COLUMNS order,
+        text columns as string and every other column as float64
+    """
+    fields = [
+        pa.field(name, pa.string(), nullable=False) for name in INPUT_TEXT_COLUMNS
+    ]
+    fields += [
+        pa.field(name, pa.float64(), nullable=False)
+        for name in CARRIED_NUMERIC_COLUMNS + RESULT_KEYS
+    ]
+    metadata = {
+        METADATA_PREFIX + "schema_version": SCHEMA_VERSION,
+        METADATA_PREFIX + "rules_version": version or rules_version(),
+        METADATA_PREFIX + "result_columns": ",".join(RESULT_KEYS),
+    }
+    return pa.schema(fields, metadata=metadata)
+
+
+def _text_column(array, default):
+    if pa.types.is_dictionary(array.type) and len(array.dictionary) > len(array):
+        # A dictionary shared across batches can outgrow the batch itself.
+        array = array.dictionary_decode()
+    if pa.types.is_dictionary(array.type):
+        labels = _text_column(array.dictionary, default)
+        # One slot past the labels stands in for null entries.
+        labels = np.append(labels, default)
+        indices = array.indices.fill_null(len(labels) - 1)
+        return labels[indices.to_numpy(zero_copy_only=False)]
+    if not pa.types.is_string(array.type) and not pa.types.is_large_string(array.type):
+        array = pc.cast(array, pa.string())
+    values = array.fill_null(default).to_numpy(zero_copy_only=False).astype(str)
+    if default:
+        values[values == ""] = default
+    return values
+
+
+def _numeric_column(array):
+    if array.type == pa.float64() and array.null_count == 0:
+        return array.to_numpy(zero_copy_only=True)
+    array = pc.cast(array, pa.float64()).fill_null(0.0)
+    return array.to_numpy(zero_copy_only=False)
+
+
+def batch_to_columns(batch):
+    """
+    Convert a record batch into input columns.
+
+    Missing columns are filled like rows_to_columns fills missing fields.
+    """
+    n = batch.num_rows
+    names = set(batch.schema.names)
+    columns = {}
+    for field in INPUT_TEXT_COLUMNS:
+        default = TEXT_DEFAULTS.get(field, "")
+        if field in names:
+            columns[field] = _text_column(batch.column(field), default)
+        else:
+            columns[field] = np.full(n, default)
+    for field in INPUT_NUMERIC_COLUMNS:
+        if field in names:
+            columns[field] = _numeric_column(batch.column(field))
+        else:
+            columns[field] = np.zeros(n, dtype=np.float64)
+    return columns
+
+
+def _projection(schema):
+    return [
+        name
+        for name in INPUT_TEXT_COLUMNS + INPUT_NUMERIC_COLUMNS
+        if name in schema.names
+    ]
+
+
+def _read_parquet_batches(path, chunk_size, units=None):
+    columns = _projection(pq.read_schema(path))
+    text = [name for name in columns if name in KEY_TEXT_FIELDS]
+    # Low-cardinality text columns come back dictionary-encoded, as Parquet
+    # stores them, so each distinct value is decoded once per row group.
+    parquet = pq.ParquetFile(path, memory_map=True, read_dictionary=text)
+    yield from parquet.iter_batches(
+        batch_size=chunk_size, row_groups=units, columns=columns
+    )
+
+
+def _read_ipc_batches(path, chunk_size, units=None):
+    with pa.memory_map(path) as source:
+        try:
+            reader = pa.ipc.open_file(source)
+            if units is None:
+                units = range(reader.num_record_batches)
+            batches = (reader.get_batch(i) for i in units)
+        except pa.ArrowInvalid:
+            if units is not None:
+                raise ValueError(
+                    f"{path} is an Arrow stream; only Arrow files can be read "
+                    "in parts"
+                )
+            # Not the file (Feather v2) layout; try the streaming one.
+            source.seek(0)
+            batches = pa.ipc.open_stream(source)
+        for batch in batches:
+            batch = batch.select(_projection(batch.schema))
+            # Slicing is zero-copy; oversized batches are split into chunks.
+            for start in range(0, batch.num_rows, chunk_size):
+                yield batch.slice(start, chunk_size)
+
+
+def arrow_units(path, file_format):
+    """
+    Row counts of the units a Parquet or Arrow file can be read in.
+
+    Returns:
+        list: Rows per Parquet row group or Arrow record batch, or None
+        for an Arrow stream, which can only be read whole
+    """
+    if file_format == PARQUET:
+        metadata = pq.ParquetFile(path).metadata
+        return [metadata.row_group(i).num_rows for i in range(metadata.num_row_groups)]
+    with pa.memory_map(path) as source:
+        try:
+            reader = pa.ipc.open_file(source)
+        except pa.ArrowInvalid:
+            return None
+        return [reader.get_batch(i).num_rows for i in range(reader.num_record_batches)]
+
+
+def read_arrow_chunks(path, chunk_size, file_format, units=None):
+    """
+    Yield input columns for successive chunks of a Parquet or Arrow file.
+
+    Args:
+        path (str): Input file
+        chunk_size (int): Most rows per chunk
+        file_format (str): PARQUET or ARROW
+        units (list): Only read these row groups (Parquet) or record
+            batches (Arrow file), see arrow_units()
+    """
+    if file_format == PARQUET:
+        batches = _read_parquet_batches(path, chunk_size, units)
+    else:
+        batches = _read_ipc_batches(path, chunk_size, units)
+    for batch in batches:
+        yield batch_to_columns(batch)
+
+
+def columns_to_batch(columns, results, schema):
+    """Build an output record batch from input columns and a result matrix."""
+    arrays = [pa.array(columns[name], type=pa.string()) for name in INPUT_TEXT_COLUMNS]
+    arrays += [
+        pa.array(np.asarray(columns[name], dtype=np.float64))
+        for name in CARRIED_NUMERIC_COLUMNS
+    ]
+    # One transposing copy makes every result column contiguous, so each
+    # is wrapped by Arrow as is.
+    by_column = np.ascontiguousarray(results.T, dtype=np.float64)
+    arrays += [pa.array(values) for values in by_column]
+    return pa.RecordBatch.from_arrays(arrays, schema=schema)
+
+
+class ArrowChunkWriter:
+    """
+    Writes calculated chunks to a Parquet or Arrow IPC file.
+
+    Args:
+        path (str): Output file
+        file_format (str): PARQUET or ARROW
+        version (str): Rule version recorded in the schema metadata
+    """
+
+    def __init__(self, path, file_format, version=None):
+        self.schema = output_schema(version)
+        if file_format == PARQUET:
+            self._writer = pq.ParquetWriter(path, self.schema)
+        else:
+            self._writer = pa.ipc.new_file(path, self.schema)
+        self._format = file_format
+
+    def write(self, columns, results):
+        batch = columns_to_batch(columns, results, self.schema)
+        if self._format == PARQUET:
+            self._writer.write_batch(batch, row_group_size=max(1, batch.num_rows))
+        else:
+            self._writer.write_batch(batch)
+
+    def close(self):
+        self._writer.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
@@ -0,0 +1,502 @@
+# calculator/batch.py
+"""
+Batch calculation over portfolio files.
+
+Input rows are read in chunks into columns (one numpy array per field),
+optionally checked against the persistent result cache, computed and
+written back out in the original row order. Files are CSV unless their
+extension (or an explicit format) says Parquet or Arrow IPC, which are
+handled by calculator.arrow_io. Results can also go to a memory-mapped
+column store (storage.column_store) for lookups by client id, or to an
+Excel sheet (report.export).
+"""
+
+import csv
+import os
+import time
+from dataclasses import dataclass, field
+
+import numpy as np
+
+from business_tax_calculator.calculator.dedup import dedupe_columns
+from business_tax_calculator.calculator.diagnostics import Diagnostics
+from business_tax_calculator.calculator.hashing import row_keys
+from business_tax_calculator.calculator.tax_calculator import RESULT_KEYS
+from business_tax_calculator.calculator.vectorized import calculate_matrix
+from business_tax_calculator.model.business import (
+    CALCULATION_NUMERIC_FIELDS,
+    CALCULATION_TEXT_FIELDS,
+    Business,
+)
+from business_tax_calculator.utils import timing
+from business_tax_calculator.utils.optional import import_optional
+from business_tax_calculator.utils.rules import rules_version
+
+# Fields hashed to identify a calculation; client_id and name are carried
+# through to the output but never change the result.
+KEY_TEXT_FIELDS = ("filing_status",) + CALCULATION_TEXT_FIELDS
+KEY_NUMERIC_FIELDS = CALCULATION_NUMERIC_FIELDS
+
+INPUT_TEXT_COLUMNS = ("client_id", "name") + KEY_TEXT_FIELDS
+INPUT_NUMERIC_COLUMNS = KEY_NUMERIC_FIELDS
+OUTPUT_COLUMNS = INPUT_TEXT_COLUMNS + INPUT_NUMERIC_COLUMNS + RESULT_KEYS
+# Inputs carried into outputs that need unique column names, less those
+# also returned as results (with the same value).
+CARRIED_NUMERIC_COLUMNS = tuple(
+    name for name in INPUT_NUMERIC_COLUMNS if name not in RESULT_KEYS
+)
+
+DEFAULT_CHUNK_SIZE = 50_000
+
+TEXT_DEFAULTS = {"filing_status": "Single"}
+
+CSV = "csv"
+OUTPUT_ONLY_FORMATS = ("store", "xlsx")
+FILE_FORMATS = {
+    ".csv": CSV,
+    ".store": "store",
+    ".xlsx": "xlsx",
+    ".parquet": "parquet",
+    ".pq": "parquet",
+    ".arrow": "arrow",
+    ".feather": "arrow",
+    ".ipc": "arrow",
+}
+
+
+@dataclass
+class BatchSummary:
+    rows: int = 0
+    unique_rows: int = 0
+    cache_hits: int = 0
+    computed: int = 0
+    rejected: int = 0
+    elapsed: float = 0.0
+    diagnostics: Diagnostics = field(default_factory=Diagnostics)
+
+    @property
+    def dedup_ratio(self) -> float:
+        """Fraction of rows answered by another row with identical inputs."""
+        return 1 - self.unique_rows / self.rows if self.rows else 0.0
+
+    @property
+    def rows_per_second(self) -> float:
+        return self.rows / self.elapsed if self.elapsed else 0.0
+
+
+def rows_to_columns(rows):
+    """
+    Convert a list of input dicts into columns.
+
+    Missing or blank numeric values become 0.0 and values that are not
+    numbers NaN, for validation to reject; missing text values fall back
+    to TEXT_DEFAULTS or the empty string.
+    """
+    columns = {}
+    for name in INPUT_TEXT_COLUMNS:
+        default = TEXT_DEFAULTS.get(name, "")
+        columns[name] = np.array([row.get(name) or default for row in rows], dtype=str)
+    for name in INPUT_NUMERIC_COLUMNS:
+        try:
+            values = [float(row.get(name) or 0.0) for row in rows]
+        except (TypeError, ValueError):
+            values = [_number(row.get(name)) for row in rows]
+        columns[name] = np.array(values, dtype=np.float64)
+    return columns
+
+
+def _number(value):
+    try:
+        return float(value or 0.0)
+    except (TypeError, ValueError):
+        return float("nan")
+
+
+def column_length(columns):
+    return len(columns[INPUT_NUMERIC_COLUMNS[0]])
+
+
+def take_rows(columns, index):
+    """Select rows (by integer index or boolean mask) from every column."""
+    return {name: values[index] for name, values in columns.items()}
+
+
+def business_from_columns(columns, i):
+    """Build a Business from row i of a columnar chunk."""
+    business = Business()
+    business.set_name(str(columns["name"][i]))
+    for name in CALCULATION_TEXT_FIELDS + ("filing_status",):
+        setattr(business, name, str(columns[name][i]))
+    for name in CALCULATION_NUMERIC_FIELDS:
+        setattr(business, name, float(columns[name][i]))
+    return business
+
+
+def compute_columns(columns):
+    """
+    Calculate every row of a chunk in one vectorized pass.
+
+    Returns:
+        numpy.ndarray: float64 matrix of shape (rows, len(RESULT_KEYS))
+    """
+    return calculate_matrix(columns)
+
+
+def calculate_chunk(columns, cache=None, summary=None, version=None, dedupe=True):
+    """
+    Calculate a chunk, computing each distinct input once and consulting
+    and filling the persistent cache.
+
+    Args:
+        columns (dict): Input columns
+        cache (ResultCache): Optional on-disk result cache
+        summary (BatchSummary): Optional counters updated in place
+        version (str): Rule version tag, defaults to the current one
+        dedupe (bool): Compute identical rows only once
+
+    Returns:
+        numpy.ndarray: Result matrix in input row order
+    """
+    if version is None:
+        version = rules_version()
+    laps = timing.laps("chunk")
+    n = column_length(columns)
+    inverse = None
+    if dedupe:
+        first_index, inverse = dedupe_columns(
+            columns, KEY_TEXT_FIELDS, KEY_NUMERIC_FIELDS, version
+        )
+        columns = take_rows(columns, first_index)
+        laps.lap("dedupe")
+    unique = column_length(columns)
+
+    if cache is None:
+        results = compute_columns(columns)
+        laps.lap("calculate")
+        missing = unique
+    else:
+        key_hi, key_lo = row_keys(columns, KEY_TEXT_FIELDS, KEY_NUMERIC_FIELDS, version)
+        found, results = cache.lookup(key_hi, key_lo, version)
+        laps.lap("cache_lookup")
+        index = np.flatnonzero(~found)
+        if len(index):
+            computed = compute_columns(take_rows(columns, index))
+            results[index] = computed
+            laps.lap("calculate")
+            cache.store(key_hi[index], key_lo[index], version, computed)
+            laps.lap("cache_store")
+        missing = len(index)
+
+    if summary is not None:
+        summary.rows += n
+        summary.unique_rows += unique
+        summary.cache_hits += unique - missing
+        summary.computed += missing
+    return results if inverse is None else results[inverse]
+
+
+def read_csv_chunks(path, chunk_size=DEFAULT_CHUNK_SIZE):
+    """Yield input columns for successive chunks of a CSV file."""
+    with open(path, newline="") as handle:
+        reader = csv.DictReader(handle)
+        rows = []
+        for row in reader:
+            rows.append(row)
+            if len(rows) >= chunk_size:
+                yield rows_to_columns(rows)
+                rows = []
+        if rows:
+            yield rows_to_columns(rows)
+
+
+def write_csv_chunk(writer, columns, results):
+    """Append one calculated chunk to a csv.writer."""
+    data = [columns[name].tolist() for name in INPUT_TEXT_COLUMNS]
+    data += [columns[name].tolist() for name in INPUT_NUMERIC_COLUMNS]
+    data += results.T.tolist()
+    writer.writerows(zip(*data))
+
+
+class CsvChunkWriter:
+    """Writes calculated chunks to a CSV file with an OUTPUT_COLUMNS header."""
+
+    def __init__(self, path):
+        self._handle = open(path, "w", newline="")
+        self._writer = csv.writer(self._handle)
+        self._writer.writerow(OUTPUT_COLUMNS)
+
+    def write(self, columns, results):
+        write_csv_chunk(self._writer, columns, results)
+
+    def close(self):
+        self._handle.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+def failed_rows(results):
+    """Rows of a result matrix with a non-finite value, e.g. from NaN inputs."""
+    return int(np.count_nonzero(~np.isfinite(results).all(axis=1)))
+
+
+def estimate_rows(path, fmt=None):
+    """
+    Rows in an input file, for progress reporting.
+
+    Returns:
+        int: Exact for Parquet and Arrow files; for CSV, extrapolated from
+        the first MiB unless the file is smaller. None for Arrow streams.
+    """
+    fmt = file_format(path, fmt)
+    if fmt != CSV:
+        import_optional("pyarrow", "arrow")
+        from business_tax_calculator.calculator.arrow_io import arrow_units
+
+        units = arrow_units(path, fmt)
+        return None if units is None else sum(units)
+    size = os.path.getsize(path)
+    with open(path, "rb") as handle:
+        sample = handle.read(1 << 20)
+    lines = sample.count(b"\n") + (not sample.endswith(b"\n") and bool(sample))
+    if len(sample) < size:
+        lines = round(lines * size / len(sample))
+    return max(0, lines - 1)
+
+
+def file_format(path, explicit=None):
+    """
+    Format of a batch file: ``explicit`` if given, else from its extension.
+
+    Returns:
+        str: "csv", "parquet", "arrow", "store" or "xlsx"; unknown
+        extensions are CSV
+    """
+    if explicit is not None:
+        if explicit not in set(FILE_FORMATS.values()):
+            raise ValueError(f"Unknown file format: {explicit!r}")
+        return explicit
+    return FILE_FORMATS.get(os.path.splitext(path)[1].lower(), CSV)
+
+
+def read_chunks(path, chunk_size=DEFAULT_CHUNK_SIZE, fmt=None):
+    """Yield input columns for successive chunks of a CSV, Parquet or Arrow file."""
+    fmt = file_format(path, fmt)
+    if fmt == CSV:
+        return read_csv_chunks(path, chunk_size)
+    if fmt in OUTPUT_ONLY_FORMATS:
+        raise ValueError(f"{fmt} files are written by batch runs, not read")
+    import_optional("pyarrow", "arrow")
+    from business_tax_calculator.calculator.arrow_io import read_arrow_chunks
+
+    return read_arrow_chunks(path, chunk_size, fmt)
+
+
+def open_chunk_writer(path, fmt=None, version=None):
+    """
+    Open a writer for calculated chunks, chosen like file_format().
+
+    Returns:
+        CsvChunkWriter, ArrowChunkWriter, ColumnStoreWriter or
+        XlsxChunkWriter: Context manager with write(columns, results) and
+        close()
+    """
+    fmt = file_format(path, fmt)
+    if fmt == CSV:
+        return CsvChunkWriter(path)
+    if fmt == "store":
+        from business_tax_calculator.storage.column_store import ColumnStoreWriter
+
+        return ColumnStoreWriter(path, version)
+    if fmt == "xlsx":
+        from business_tax_calculator.report.export import XlsxChunkWriter
+
+        return XlsxChunkWriter(path)
+    import_optional("pyarrow", "arrow")
+    from business_tax_calculator.calculator.arrow_io import ArrowChunkWriter
+
+    return ArrowChunkWriter(path, fmt, version)
+
+
+def run_batch(
+    input_path,
+    output_path,
+    cache=None,
+    chunk_size=DEFAULT_CHUNK_SIZE,
+    dedupe=True,
+    input_format=None,
+    output_format=None,
+    progress=None,
+    validate=True,
+    rejected_path=None,
+    log_rows=False,
+    rollup=None,
+):
+    """
+    Calculate every row of a portfolio file into an output file.
+
+    Args:
+        input_path (str): CSV, Parquet or Arrow file with
+            INPUT_TEXT_COLUMNS/INPUT_NUMERIC_COLUMNS
+        output_path (str): Destination with OUTPUT_COLUMNS
+        cache (ResultCache): Optional on-disk cache to skip unchanged rows
+        chunk_size (int): Rows per chunk; duplicates are found within a chunk
+        dedupe (bool): Compute identical rows only once
+        input_format (str): "csv", "parquet" or "arrow", defaults to the
+            one implied by the input file extension
+        output_format (str): Same for the output file, or "store" for a
+            column store directory or "xlsx" for an Excel sheet
+        progress (BatchProgress): Optional progress reporter, told about
+            every chunk (see utils.progress); its rows_total defaults to
+            estimate_rows() of the input
+        validate (bool): Reject rows failing calculator.validation checks
+            instead of calculating them
+        rejected_path (str): CSV file for rejected rows with their error
+            codes, created only if a row is rejected
+        log_rows (bool): Log every row raising a warning, for debugging;
+            otherwise warnings are only counted in summary.diagnostics
+        rollup (Rollup): Given every calculated chunk, see report.rollup
+
+    Returns:
+        BatchSummary: Row, dedup, cache hit and timing counters, and the
+        run's diagnostics
+    """
+    summary = BatchSummary(diagnostics=Diagnostics(log_rows=log_rows))
+    version = rules_version()
+    start = time.perf_counter()
+    chunks = read_chunks(input_path, chunk_size, input_format)
+    if progress is not None:
+        if progress.rows_total is None:
+            progress.rows_total = estimate_rows(input_path, input_format)
+        progress.start()
+    rejected = None
+    if validate and rejected_path is not None:
+        from business_tax_calculator.calculator.validation import (
+            RejectedRowsWriter,
+        )
+
+        rejected = RejectedRowsWriter(rejected_path)
+    try:
+        with open_chunk_writer(output_path, output_format, version) as writer:
+            write_chunks(
+                chunks,
+                writer,
+                cache,
+                summary,
+                version,
+                dedupe,
+                progress,
+                validate=validate,
+                rejected=rejected,
+                rollup=rollup,
+            )
+    except BaseException as exc:
+        if progress is not None:
+            progress.error(exc)
+        raise
+    finally:
+        if rejected is not None:
+            rejected.close()
+    summary.elapsed = time.perf_counter() - start
+    if progress is not None:
+        progress.finish()
+    return summary
+
+
+def write_chunks(
+    chunks,
+    writer,
+    cache=None,
+    summary=None,
+    version=None,
+    dedupe=True,
+    progress=None,
+    after_chunk=None,
+    validate=True,
+    rejected=None,
+    first_row=0,
+    rollup=None,
+):
+    """
+    Calculate input chunks into a chunk writer.
+
+    Args:
+        chunks (iterable): Input columns per chunk
+        writer: Chunk writer, see open_chunk_writer()
+        progress (BatchProgress): Told about every chunk, if given
+        after_chunk (callable): Called after every chunk is written
+        validate (bool): Calculate only rows passing validate_columns(),
+            including the writer's text_widths if it has them
+        rejected (RejectedRowsWriter): Receives the rows that fail
+        first_row (int): Input rows before the first chunk, so rejected
+            rows are numbered as in the whole input
+        rollup (Rollup): Given every calculated chunk, if set
+
+    Warnings and rejections are counted in summary.diagnostics.
+    Other arguments are passed to calculate_chunk().
+    """
+    if validate:
+        from business_tax_calculator.calculator.validation import (
+            ERROR_NAMES,
+            VALID,
+            validate_columns,
+        )
+
+        text_widths = getattr(writer, "text_widths", None)
+    diagnostics = summary.diagnostics if summary is not None else None
+    laps = timing.laps("batch")
+    clock = time.perf_counter
+    mark = clock()
+    offset = first_row
+    for columns in chunks:
+        laps.lap("read")
+        read = clock()
+        n = column_length(columns)
+        rows = np.arange(offset + 1, offset + n + 1)
+        invalid = 0
+        if validate:
+            codes = validate_columns(columns, text_widths)
+            bad = np.flatnonzero(codes != VALID)
+            if len(bad):
+                invalid = len(bad)
+                if rejected is not None:
+                    rejected.write(rows[bad], take_rows(columns, bad), codes[bad])
+                if diagnostics is not None:
+                    ids = columns["client_id"][bad]
+                    for flag, name in ERROR_NAMES.items():
+                        flagged = (codes[bad] & flag) != 0
+                        diagnostics.add(name, rows[bad][flagged], ids[flagged])
+                valid = codes == VALID
+                columns = take_rows(columns, valid)
+                rows = rows[valid]
+                if summary is not None:
+                    summary.rejected += invalid
+            laps.lap("validate")
+        offset += n
+        failed = 0
+        if invalid < n:
+            results = calculate_chunk(columns, cache, summary, version, dedupe)
+            laps.lap("compute")
+            computed = clock()
+            writer.write(columns, results)
+            laps.lap("write")
+            if rollup is not None:
+                rollup.write(columns, results)
+                laps.lap("rollup")
+            failed = failed_rows(results)
+            if diagnostics is not None:
+                diagnostics.check(columns, results, rows)
+                laps.lap("diagnostics")
+        else:
+            computed = clock()
+        if progress is not None:
+            written = clock()
+            progress.chunk(
+                n, read - mark, computed - read, written - computed, invalid + failed
+            )
+            mark = written
+        if after_chunk is not None:
+            after_chunk()
@@ -0,0 +1,187 @@
+# calculator/cache.py
+"""
+Bounded, thread-safe LRU memoization in front of the headless calculation
+entry point.
+"""
+
+import hashlib
+import struct
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass, replace
+
+from business_tax_calculator.calculator.tax_calculator import (
+    calculate_business_liabilities,
+)
+from business_tax_calculator.model.business import (
+    CALCULATION_NUMERIC_FIELDS,
+    CALCULATION_TEXT_FIELDS,
+)
+from business_tax_calculator.model.tax_result import RESULT_KEYS, TaxResult
+from business_tax_calculator.utils.rules import on_rules_changed, rules_version
+
+# A cached TaxResult is one bytes object of float64s, its store time
+# followed by the results; fourteen float objects and a record cost
+# several times as much.
+_PACKED_ENTRY = struct.Struct(f"{1 + len(RESULT_KEYS)}d")
+
+
+def calculation_values(business, filing_status=None):
+    """
+    Canonical tuple of every input that influences the calculation.
+
+    Numbers are normalized to float so 100000 and 100000.0 share a key.
+    """
+    if filing_status is None:
+        filing_status = business.filing_status
+    return (
+        (str(filing_status),)
+        + tuple(str(getattr(business, f)) for f in CALCULATION_TEXT_FIELDS)
+        + tuple(float(getattr(business, f)) for f in CALCULATION_NUMERIC_FIELDS)
+    )
+
+
+def calculation_key(values, version=None):
+    """
+    Hash canonical input values together with the rule-table version.
+
+    Args:
+        values (tuple): Output of calculation_values
+        version (str): Rule version tag, defaults to the current one
+
+    Returns:
+        int: 128-bit digest identifying the calculation
+    """
+    if version is None:
+        version = rules_version()
+    payload = repr((version, values)).encode()
+    digest = hashlib.blake2b(payload, digest_size=16).digest()
+    return int.from_bytes(digest, "little")
+
+
+@dataclass(frozen=True)
+class CacheStats:
+    hits: int
+    misses: int
+    evictions: int
+    expirations: int
+    size: int
+    maxsize: int
+
+    @property
+    def hit_rate(self) -> float:
+        lookups = self.hits + self.misses
+        return self.hits / lookups if lookups else 0.0
+
+
+class CalculationCache:
+    """
+    LRU cache of calculation results keyed on the canonical input hash and
+    the rule-table version.
+
+    Entries older than ``ttl`` seconds are treated as misses. The cache
+    clears itself when utils.rules.notify_rules_changed() is called.
+
+    A cached TaxResult is an int key and one packed bytes value, about
+    300 bytes with the OrderedDict's own bookkeeping.
+    """
+
+    def __init__(
+        self, maxsize=1024, ttl=None, calculate=calculate_business_liabilities
+    ):
+        if maxsize <= 0:
+            raise ValueError("maxsize must be positive")
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._calculate = calculate
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self._hits = 0
+        self._misses = 0
+        self._evictions = 0
+        self._expirations = 0
+        on_rules_changed(self._on_rules_changed)
+
+    def calculate(self, business, filing_status=None):
+        """
+        Return cached results for the business, computing them on a miss.
+
+        The returned result is a fresh copy whose 'business' entry is the
+        caller's business object.
+        """
+        key = calculation_key(calculation_values(business, filing_status))
+        results = self.get(key)
+        if results is None:
+            results = self._calculate(business, filing_status)
+            self.put(key, results)
+        if isinstance(results, TaxResult):
+            return replace(results, business=business)
+        results = dict(results)
+        results["business"] = business
+        return results
+
+    def get(self, key):
+        """Look up a key, refreshing its LRU position on a hit."""
+        now = time.monotonic()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self._misses += 1
+                return None
+            if isinstance(entry, bytes):
+                stored_at = _PACKED_ENTRY.unpack_from(entry)[0]
+            else:
+                stored_at, results = entry
+            if self.ttl is not None and now - stored_at > self.ttl:
+                del self._entries[key]
+                self._expirations += 1
+                self._misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self._hits += 1
+        if isinstance(entry, bytes):
+            return TaxResult(*_PACKED_ENTRY.unpack(entry)[1:])
+        return results
+
+    def put(self, key, results):
+        """
+        Store results, evicting the least recently used entries.
+
+        TaxResults are stored packed with their store time and without
+        their business, a fraction of the size of the equivalent dict.
+        """
+        if isinstance(results, TaxResult):
+            entry = _PACKED_ENTRY.pack(time.monotonic(), *results.as_tuple())
+        else:
+            results = {k: v for k, v in results.items() if k != "business"}
+            entry = (time.monotonic(), results)
+        with self._lock:
+            self._entries[key] = entry
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+                self._evictions += 1
+
+    def invalidate(self):
+        """Drop every cached entry, e.g. after the rule table changed."""
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self) -> CacheStats:
+        with self._lock:
+            return CacheStats(
+                hits=self._hits,
+                misses=self._misses,
+                evictions=self._evictions,
+                expirations=self._expirations,
+                size=len(self._entries),
+                maxsize=self.maxsize,
+            )
+
+    def __len__(self):
+        with self._lock:
+            return len(self._entries)
+
+    def _on_rules_changed(self, version):
+        self.invalidate()
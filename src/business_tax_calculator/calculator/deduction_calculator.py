@@ -1,23 +1,21 @@
 from business_tax_calculator.model.business import Business
-from business_tax_calculator.model.deduction.base_deduction import BaseDeduction
-from typing import List
 
 """
 Deduction calculator module for total and categorized deductions.
 """
 
+# 2023 income thresholds (these should be updated annually)
+QBI_INCOME_THRESHOLDS = {
+    "Single": 170_050,
+    "Married Filing Jointly": 340_100,
+    "Head of Household": 170_050
+}
+
 def calculate_total_deductions(business: Business) -> float:
     """
     Calculates the total deductions including SE tax adjustments and other business deductions.
     """
-    total = 0.0
-
-    deductions: List[BaseDeduction] = business.tax_return.deduction_registry.get_available_deductions()
-
-    for deduction in deductions:
-        total += deduction.value
-
-    return total
+    return business.tax_return.deduction_registry.calculate(business)
     
 def calculate_qbi_deduction(business, taxable_income, filing_status):
     """
@@ -28,15 +26,8 @@ def calculate_qbi_deduction(business, taxable_income, filing_status):
     
     qualified_income = max(0.0, business.get_net_income())
     
-    # 2023 income thresholds (these should be updated annually)
-    thresholds = {
-        "Single": 170_050,
-        "Married Filing Jointly": 340_100,
-        "Head of Household": 170_050
-    }
-    
     # Basic 20% deduction for incomes below threshold
-    if taxable_income <= thresholds.get(filing_status, 0):
+    if taxable_income <= QBI_INCOME_THRESHOLDS.get(filing_status, 0):
         return min(qualified_income * 0.20, taxable_income * 0.20)
     
     # More complex calculation needed for higher incomes
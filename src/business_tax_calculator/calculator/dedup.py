@@ -0,0 +1,60 @@
+# calculator/dedup.py
+"""
+Input deduplication for batch calculation.
+
+Rows with identical calculation inputs are grouped by a vectorized row
+hash so each distinct input is computed once and the results are fanned
+back out to the original row order.
+"""
+
+import numpy as np
+
+from business_tax_calculator.calculator.hashing import hash_rows
+
+
+def _same_values(left, right):
+    if left.dtype.kind == "f":
+        return (left == right) | (np.isnan(left) & np.isnan(right))
+    return left == right
+
+
+def _groups_are_exact(columns, fields, first_index, inverse):
+    for field in fields:
+        values = np.asarray(columns[field])
+        if not _same_values(values[first_index][inverse], values).all():
+            return False
+    return True
+
+
+def _exact_groups(columns, text_fields, numeric_fields):
+    """Collision-free grouping on the raw values, used as a fallback."""
+    fields = text_fields + numeric_fields
+    record = np.rec.fromarrays(
+        [np.asarray(columns[field]) for field in fields], names=list(fields)
+    )
+    _, first_index, inverse = np.unique(record, return_index=True, return_inverse=True)
+    return first_index, inverse.reshape(-1)
+
+
+def dedupe_columns(columns, text_fields, numeric_fields, version=""):
+    """
+    Group identical rows.
+
+    Args:
+        columns (dict): Input columns
+        text_fields (tuple): String columns that identify a calculation
+        numeric_fields (tuple): Numeric columns that identify a calculation
+        version (str): Rule version tag mixed into the hash
+
+    Returns:
+        tuple: (first_index, inverse) where first_index selects one
+        representative row per distinct input and ``unique_values[inverse]``
+        restores the original row order
+    """
+    hashes = hash_rows(columns, text_fields, numeric_fields, version)
+    _, first_index, inverse = np.unique(hashes, return_index=True, return_inverse=True)
+    inverse = inverse.reshape(-1)
+    fields = text_fields + numeric_fields
+    if not _groups_are_exact(columns, fields, first_index, inverse):
+        first_index, inverse = _exact_groups(columns, text_fields, numeric_fields)
+    return first_index, inverse
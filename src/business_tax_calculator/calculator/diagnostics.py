@@ -0,0 +1,157 @@
+# calculator/diagnostics.py
+"""
+Aggregated warnings of batch runs.
+
+A batch run does not log a line per questionable row: on a grid of
+millions of scenarios the formatting and I/O would cost more than the tax
+math. Diagnostics counts rows per category instead, keeps the first few
+row numbers and client ids of each as examples, and is reported once when
+the run ends:
+
+    summary = run_batch("clients.csv", "results.csv")
+    for line in summary.diagnostics.lines():
+        print(line)
+
+Categories are the WARNINGS below, raised by rows that were calculated,
+and the names of the validation checks (calculator.validation) that
+rejected rows failed. Collectors of parallel workers or job shards
+combine with merge(), or travel as plain dicts via as_dict() and
+from_dict().
+
+Logging every flagged row is a debugging option (log_rows=True, or
+batch --log-rows): one logger.warning per row and category.
+"""
+
+import logging
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+SAMPLE_SIZE = 5
+
+WARNINGS = {
+    "negative_net_revenue": "expenses exceed revenue",
+    "s_corp_without_salary": (
+        "S-Corp with positive net revenue pays no salary, which might "
+        "trigger IRS scrutiny"
+    ),
+    "non_finite_result": "a result is NaN or infinite",
+}
+
+
+def warning_masks(columns, results):
+    """
+    Rows of a calculated chunk raising each warning.
+
+    Args:
+        columns (dict): Input columns of the chunk
+        results (numpy.ndarray): Its result matrix, one row per input row
+
+    Returns:
+        dict: Boolean mask per WARNINGS category
+    """
+    net_revenue = columns["revenue"] - columns["expenses"]
+    return {
+        "negative_net_revenue": net_revenue < 0,
+        "s_corp_without_salary": (columns["entity_type"] == "S-Corp")
+        & (net_revenue > 0)
+        & (columns["reasonable_salary"] == 0),
+        "non_finite_result": ~np.isfinite(results).all(axis=1),
+    }
+
+
+class Diagnostics:
+    """
+    Row counts and example rows per warning category.
+
+    Args:
+        sample_size (int): Example rows kept per category
+        log_rows (bool): Also log every flagged row (for debugging)
+    """
+
+    def __init__(self, sample_size=SAMPLE_SIZE, log_rows=False):
+        self.sample_size = sample_size
+        self.log_rows = log_rows
+        self.counts = {}
+        self.samples = {}
+
+    def __bool__(self):
+        return bool(self.counts)
+
+    def add(self, category, rows, client_ids):
+        """
+        Count flagged rows of a chunk.
+
+        Args:
+            category (str): Warning or validation check name
+            rows (numpy.ndarray): 1-based input row numbers of the rows
+            client_ids (numpy.ndarray): Their client ids
+        """
+        if not len(rows):
+            return
+        self.counts[category] = self.counts.get(category, 0) + len(rows)
+        sample = self.samples.setdefault(category, [])
+        room = self.sample_size - len(sample)
+        if room > 0:
+            sample.extend(zip(rows[:room].tolist(), client_ids[:room].tolist()))
+        if self.log_rows:
+            message = WARNINGS.get(category, category)
+            for row, client_id in zip(rows.tolist(), client_ids.tolist()):
+                logger.warning("row %d (%s): %s", row, client_id, message)
+
+    def check(self, columns, results, rows):
+        """
+        Count the warnings of a calculated chunk.
+
+        Args:
+            columns (dict): Input columns of the chunk
+            results (numpy.ndarray): Its result matrix
+            rows (numpy.ndarray): 1-based input row number of each row
+        """
+        for category, mask in warning_masks(columns, results).items():
+            if mask.any():
+                self.add(category, rows[mask], columns["client_id"][mask])
+
+    def merge(self, other):
+        """Add another collector's counts and, room permitting, examples."""
+        for category, count in other.counts.items():
+            self.counts[category] = self.counts.get(category, 0) + count
+            sample = self.samples.setdefault(category, [])
+            room = self.sample_size - len(sample)
+            sample.extend(other.samples.get(category, [])[: max(room, 0)])
+        return self
+
+    def as_dict(self):
+        return {
+            category: {
+                "rows": count,
+                "examples": [list(example) for example in self.samples[category]],
+            }
+            for category, count in sorted(self.counts.items())
+        }
+
+    @classmethod
+    def from_dict(cls, data, sample_size=SAMPLE_SIZE):
+        diagnostics = cls(sample_size)
+        for category, entry in data.items():
+            diagnostics.counts[category] = entry["rows"]
+            diagnostics.samples[category] = [
+                tuple(example) for example in entry["examples"]
+            ][:sample_size]
+        return diagnostics
+
+    def lines(self):
+        """One summary line per category, most frequent first."""
+        lines = []
+        for category, count in sorted(self.counts.items(), key=lambda kv: -kv[1]):
+            examples = ", ".join(
+                f"row {row} ({client_id})" if client_id else f"row {row}"
+                for row, client_id in self.samples[category]
+            )
+            more = ", ..." if count > len(self.samples[category]) else ""
+            description = WARNINGS.get(category, category.replace("_", " "))
+            lines.append(
+                f"{category}: {count:,} rows ({description}); e.g. {examples}{more}"
+            )
+        return lines
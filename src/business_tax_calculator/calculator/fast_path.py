@@ -0,0 +1,158 @@
+# calculator/fast_path.py
+"""
+Scalar fast path for latency-sensitive single calculations.
+
+calculate_business_liabilities() builds a Business with its TaxReturn,
+TaxLiability and DeductionRegistry, plus fresh liability objects, on
+every call. The fast path instead evaluates the precompiled deduction
+pipeline and shared, stateless liability objects on plain values, looks
+marginal brackets up in precompiled tables and returns a slotted
+TaxResult. Results are identical to the full path.
+"""
+
+from bisect import bisect_left
+
+from business_tax_calculator.calculator.deduction_calculator import (
+    QBI_INCOME_THRESHOLDS,
+)
+from business_tax_calculator.model.deduction.deduction_registry import (
+    DeductionRegistry,
+)
+from business_tax_calculator.model.liabilities.tax_liability import TaxLiability
+from business_tax_calculator.model.tax_result import TaxResult
+from business_tax_calculator.utils.array_ops import SCALAR_OPS
+from business_tax_calculator.utils.constants import MarginalTaxBrackets
+from business_tax_calculator.utils.rules import on_rules_changed
+
+QBI_RATE = 0.20
+
+_liabilities = TaxLiability()
+_local = _liabilities.local_income_tax_liability
+_medicare = _liabilities.medicare_income_tax_liability
+_social_security = _liabilities.social_security_income_tax_liability
+
+
+class CompiledBrackets:
+    """
+    Marginal brackets with the tax of every full bracket below each one
+    summed up front, so the tax on an income is one lookup and one
+    multiply-add. Sums are accumulated in bracket order, which makes the
+    result bit-identical to liability.bracket_tax.
+    """
+
+    __slots__ = ("uppers", "lowers", "rates", "bases")
+
+    def __init__(self, brackets):
+        self.uppers = [upper for _, upper, _ in brackets]
+        self.lowers = [lower for lower, _, _ in brackets]
+        self.rates = [rate for _, _, rate in brackets]
+        self.bases = []
+        tax = 0.0
+        for lower, upper, rate in brackets:
+            self.bases.append(tax)
+            tax = tax + (upper - lower + 1) * rate
+
+    def tax(self, taxable_income):
+        k = bisect_left(self.uppers, taxable_income)
+        return self.bases[k] + max(0, taxable_income - self.lowers[k]) * self.rates[k]
+
+
+_federal = CompiledBrackets(MarginalTaxBrackets.FEDERAL.value)
+_state = CompiledBrackets(MarginalTaxBrackets.STATE.value)
+
+
+def _recompile(version):
+    global _federal, _state
+    _federal = CompiledBrackets(MarginalTaxBrackets.FEDERAL.value)
+    _state = CompiledBrackets(MarginalTaxBrackets.STATE.value)
+
+
+on_rules_changed(_recompile)
+
+
+def calculate_fast(
+    entity_type,
+    revenue=0.0,
+    expenses=0.0,
+    *,
+    filing_status="Single",
+    state="",
+    reasonable_salary=0.0,
+    retirement_contributions=0.0,
+    health_insurance_premiums=0.0,
+    home_office_deduction=0.0,
+    other_deductions=0.0,
+    local_tax_rate=0.0,
+    estimated_tax_payments=0.0,
+    profit_distributions=0.0,
+):
+    """
+    Calculate one business without building model objects.
+
+    Args:
+        entity_type (str): Business entity type
+        revenue (float): Total revenue
+        expenses (float): Total expenses
+        filing_status (str): Filing status used for the QBI threshold
+        Remaining keyword arguments mirror the Business fields.
+
+    Returns:
+        TaxResult: The same values calculate_business_liabilities returns
+    """
+    values = {
+        "entity_type": entity_type,
+        "state": state,
+        "revenue": revenue,
+        "expenses": expenses,
+        "reasonable_salary": reasonable_salary,
+        "retirement_contributions": retirement_contributions,
+        "health_insurance_premiums": health_insurance_premiums,
+        "home_office_deduction": home_office_deduction,
+        "other_deductions": other_deductions,
+        "local_tax_rate": local_tax_rate,
+        "estimated_tax_payments": estimated_tax_payments,
+        "profit_distributions": profit_distributions,
+    }
+    DeductionRegistry.default_pipeline().evaluate(values, SCALAR_OPS)
+    net_income = values["net_income"]
+    total_deductions = values["total_deductions"]
+
+    prelim_taxable = max(0.0, net_income - total_deductions)
+    qbi = 0.0
+    if values["pass_through"]:
+        qualified = max(0.0, net_income)
+        if prelim_taxable <= QBI_INCOME_THRESHOLDS.get(filing_status, 0):
+            qbi = min(qualified * QBI_RATE, prelim_taxable * QBI_RATE)
+        else:
+            qbi = round(qualified * QBI_RATE, 2)
+    taxable_income = max(0.0, net_income - total_deductions - qbi)
+
+    federal = _federal.tax(taxable_income)
+    state_tax = _state.tax(taxable_income)
+    local = _local.evaluate(taxable_income, SCALAR_OPS)
+    medicare = _medicare.evaluate(taxable_income, SCALAR_OPS)
+    social_security = _social_security.evaluate(taxable_income, SCALAR_OPS)
+    # Same summation order as TaxLiability.calculate.
+    income_tax = federal + state_tax + local
+    total_tax = federal + state_tax + local + medicare + social_security
+    for liability in _liabilities.plugin_liabilities:
+        tax = liability.evaluate(taxable_income, SCALAR_OPS)
+        income_tax = income_tax + tax
+        total_tax = total_tax + tax
+
+    return TaxResult(
+        taxable_income,
+        income_tax,
+        medicare + social_security,
+        social_security,
+        medicare,
+        state_tax,
+        local,
+        total_tax,
+        estimated_tax_payments,
+        max(0, total_tax - estimated_tax_payments),
+        total_deductions,
+        qbi,
+        profit_distributions,
+        (total_tax / net_income) * 100.0 if net_income > 0 else 0.0,
+    )
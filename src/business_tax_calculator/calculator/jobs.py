@@ -0,0 +1,754 @@
+# calculator/jobs.py
+"""
+Resumable batch jobs split into shards.
+
+A job is a directory on a (possibly shared) filesystem:
+
+    manifest.json           inputs, shards, rule version, output format
+    claims/<shard>.claim    held while a worker calculates the shard
+    done/<shard>.json       written once the shard's output is in place
+    shards/<shard>.<ext>    one output file per shard
+    rejected/<shard>.csv    rows of the shard that failed validation
+    rollups/<shard>.json    partial rollup of the shard, if the job keeps one
+
+Shards follow the input's own boundaries: byte ranges of whole CSV
+records, runs of Parquet row groups or of Arrow record batches, about
+shard_rows rows each. Planning reads the Parquet and Arrow metadata and
+scans CSV files once; it never calculates.
+
+A shard's output is written under a temporary name and renamed into place
+before its done marker is written, so a shard is either complete or
+recalculated from scratch; a run that dies at 90% keeps the 90%.
+
+Workers need no coordinator. Each creates a shard's claim file with an
+exclusive create, which only one of them can win, and touches it after
+every chunk. A claim whose owner stopped touching it for lease_seconds,
+or whose owner process on this host has exited, is stale and can be taken
+over, so several machines running the same job directory split the
+shards between them and pick up each other's abandoned work.
+
+    summary = run_job(["clients.csv"], "nightly.job", shard_rows=500_000)
+    summary = run_job(["clients.csv"], "nightly.job", resume=True)
+"""
+
+import csv
+import glob
+import json
+import os
+import shutil
+import socket
+import time
+from dataclasses import dataclass, field
+
+from business_tax_calculator.calculator.batch import (
+    CSV,
+    DEFAULT_CHUNK_SIZE,
+    OUTPUT_ONLY_FORMATS,
+    BatchSummary,
+    file_format,
+    open_chunk_writer,
+    rows_to_columns,
+    write_chunks,
+)
+from business_tax_calculator.calculator.diagnostics import Diagnostics
+from business_tax_calculator.calculator.validation import RejectedRowsWriter
+from business_tax_calculator.report.rollup import Rollup
+from business_tax_calculator.utils.optional import import_optional
+from business_tax_calculator.utils.rules import rules_version
+
+FORMAT_NAME = "business-tax-batch-job"
+FORMAT_VERSION = 1
+MANIFEST = "manifest.json"
+
+DEFAULT_SHARD_ROWS = 500_000
+DEFAULT_LEASE_SECONDS = 600
+
+OUTPUT_EXTENSIONS = {
+    "csv": ".csv",
+    "parquet": ".parquet",
+    "arrow": ".arrow",
+    "store": ".store",
+    "xlsx": ".xlsx",
+}
+
+
+class JobError(Exception):
+    """A job directory cannot be run as asked."""
+
+
+def _fingerprint(path):
+    stat = os.stat(path)
+    return {"size": stat.st_size, "mtime_ns": stat.st_mtime_ns}
+
+
+def _csv_ranges(path, shard_rows):
+    """Byte ranges of about shard_rows whole records, after the header."""
+    ranges = []
+    with open(path, "rb") as handle:
+        offset = 0
+
+        def lines():
+            nonlocal offset
+            for line in handle:
+                offset += len(line)
+                yield line.decode("utf-8")
+
+        # csv pulls lines only as it needs them, so after each record the
+        # offset is where the next record starts, quoted newlines included.
+        reader = csv.reader(lines())
+        next(reader, None)
+        start, rows = offset, 0
+        for _ in reader:
+            rows += 1
+            if rows == shard_rows:
+                ranges.append(([start, offset], rows))
+                start, rows = offset, 0
+        if rows:
+            ranges.append(([start, offset], rows))
+    return ranges
+
+
+def _unit_ranges(units, shard_rows):
+    """Runs of consecutive units holding about shard_rows rows each."""
+    ranges = []
+    first, rows = 0, 0
+    for index, count in enumerate(units):
+        rows += count
+        if rows >= shard_rows:
+            ranges.append(([first, index + 1], rows))
+            first, rows = index + 1, 0
+    if rows:
+        ranges.append(([first, len(units)], rows))
+    return ranges
+
+
+def plan_shards(path, shard_rows=DEFAULT_SHARD_ROWS, fmt=None):
+    """
+    Split one input file into shards.
+
+    Returns:
+        list: (range, rows) per shard; a range is [start, stop) in bytes
+        for CSV and in row groups or record batches otherwise, or None
+        for an Arrow stream, which is a single shard
+    """
+    fmt = file_format(path, fmt)
+    if fmt == CSV:
+        return _csv_ranges(path, shard_rows)
+    if fmt in OUTPUT_ONLY_FORMATS:
+        raise ValueError(f"{fmt} files are written by batch runs, not read")
+    import_optional("pyarrow", "arrow")
+    from business_tax_calculator.calculator.arrow_io import arrow_units
+
+    units = arrow_units(path, fmt)
+    if units is None:
+        return [(None, None)]
+    return _unit_ranges(units, shard_rows)
+
+
+def _csv_range_chunks(path, byte_range, chunk_size):
+    start, stop = byte_range
+    with open(path, newline="") as handle:
+        header = next(csv.reader(handle), [])
+    with open(path, "rb") as handle:
+        handle.seek(start)
+
+        def lines():
+            position = start
+            for line in handle:
+                if position >= stop:
+                    return
+                position += len(line)
+                yield line.decode("utf-8")
+
+        rows = []
+        for row in csv.DictReader(lines(), fieldnames=header):
+            rows.append(row)
+            if len(rows) >= chunk_size:
+                yield rows_to_columns(rows)
+                rows = []
+        if rows:
+            yield rows_to_columns(rows)
+
+
+def read_shard_chunks(shard, chunk_size=DEFAULT_CHUNK_SIZE):
+    """Yield input columns for successive chunks of one planned shard."""
+    fmt = shard["input_format"]
+    if fmt == CSV:
+        return _csv_range_chunks(shard["input"], shard["range"], chunk_size)
+    from business_tax_calculator.calculator.arrow_io import read_arrow_chunks
+
+    units = None if shard["range"] is None else range(*shard["range"])
+    return read_arrow_chunks(shard["input"], chunk_size, fmt, units)
+
+
+def _write_json(path, document):
+    partial = f"{path}.{socket.gethostname()}.{os.getpid()}.partial"
+    with open(partial, "w") as handle:
+        json.dump(document, handle, indent=2)
+        handle.write("\n")
+    os.replace(partial, path)
+
+
+def create_job(
+    directory,
+    inputs,
+    shard_rows=DEFAULT_SHARD_ROWS,
+    input_format=None,
+    output_format=None,
+    rollup=None,
+):
+    """
+    Plan a job and publish its manifest, unless one is already there.
+
+    Publishing is a hard link of a finished file, which fails if another
+    machine got there first; that machine's manifest is returned then.
+
+    Args:
+        directory (str): Job directory, created if needed
+        inputs (list): Input files, split into shards in order
+        shard_rows (int): Rows per shard
+        input_format (str): Format of every input, defaults to each
+            file's extension
+        output_format (str): Format of the shard outputs, defaults to
+            the format of the first input
+        rollup (Rollup): Shape of the rollup every shard keeps, if any
+
+    Returns:
+        dict: The job manifest
+    """
+    for name in ("claims", "done", "shards"):
+        os.makedirs(os.path.join(directory, name), exist_ok=True)
+    manifest_path = os.path.join(directory, MANIFEST)
+    if os.path.exists(manifest_path):
+        return load_manifest(directory)
+    if output_format is None:
+        output_format = file_format(inputs[0], input_format)
+    extension = OUTPUT_EXTENSIONS[output_format]
+    sources, shards = [], []
+    for path in inputs:
+        path = os.path.abspath(path)
+        fmt = file_format(path, input_format)
+        sources.append({"path": path, "format": fmt, **_fingerprint(path)})
+        for byte_or_unit_range, rows in plan_shards(path, shard_rows, fmt):
+            shard_id = f"shard-{len(shards):05d}"
+            shards.append(
+                {
+                    "id": shard_id,
+                    "input": path,
+                    "input_format": fmt,
+                    "range": byte_or_unit_range,
+                    "rows": rows,
+                    "output": os.path.join("shards", shard_id + extension),
+                }
+            )
+    manifest = {
+        "format": FORMAT_NAME,
+        "format_version": FORMAT_VERSION,
+        "created_at": time.time(),
+        "rules_version": rules_version(),
+        "output_format": output_format,
+        "shard_rows": shard_rows,
+        "rollup": rollup.spec() if rollup is not None else None,
+        "inputs": sources,
+        "shards": shards,
+    }
+    partial = f"{manifest_path}.{socket.gethostname()}.{os.getpid()}.planned"
+    _write_json(partial, manifest)
+    try:
+        os.link(partial, manifest_path)
+    except FileExistsError:
+        manifest = load_manifest(directory)
+    finally:
+        os.remove(partial)
+    return manifest
+
+
+def load_manifest(directory):
+    """
+    Read and check a job manifest.
+
+    Raises:
+        JobError: If the directory holds no job or a job of another format
+    """
+    path = os.path.join(directory, MANIFEST)
+    try:
+        with open(path) as handle:
+            manifest = json.load(handle)
+    except FileNotFoundError:
+        raise JobError(f"{directory} holds no batch job") from None
+    if (
+        manifest.get("format") != FORMAT_NAME
+        or manifest.get("format_version") != FORMAT_VERSION
+    ):
+        raise JobError(f"{directory} is not a version {FORMAT_VERSION} batch job")
+    return manifest
+
+
+def check_manifest(manifest):
+    """
+    Refuse to continue a job whose rules or inputs have changed.
+
+    Finished shards were calculated under the manifest's rule version from
+    the inputs as they were; mixing in shards calculated otherwise would
+    silently make the job's results inconsistent.
+
+    Raises:
+        JobError: Naming what changed
+    """
+    if manifest["rules_version"] != rules_version():
+        raise JobError(
+            f"Rate tables changed since the job was planned (rules version "
+            f"{manifest['rules_version']}, now {rules_version()}); start a new job"
+        )
+    for source in manifest["inputs"]:
+        try:
+            current = _fingerprint(source["path"])
+        except FileNotFoundError:
+            raise JobError(f"Input {source['path']} is missing") from None
+        if current != {"size": source["size"], "mtime_ns": source["mtime_ns"]}:
+            raise JobError(
+                f"Input {source['path']} changed since the job was planned; "
+                "start a new job"
+            )
+
+
+def _owner():
+    return f"{socket.gethostname()}:{os.getpid()}"
+
+
+def _process_gone(owner):
+    host, _, pid = owner.rpartition(":")
+    if host != socket.gethostname() or not pid.isdigit():
+        return False
+    try:
+        os.kill(int(pid), 0)
+    except ProcessLookupError:
+        return True
+    except PermissionError:
+        return False
+    return False
+
+
+class ShardClaim:
+    """
+    Exclusive claim on one shard, kept alive by touching its file.
+
+    Args:
+        path (str): Claim file
+    """
+
+    def __init__(self, path):
+        self.path = path
+
+    @classmethod
+    def acquire(cls, path, lease_seconds=DEFAULT_LEASE_SECONDS):
+        """
+        Claim a shard, taking over a stale claim.
+
+        Returns:
+            ShardClaim: The claim, or None if another live worker holds it
+        """
+        for _ in range(2):
+            try:
+                fd = os.open(path, os.O_CREAT | os.O_EXCL | os.O_WRONLY)
+            except FileExistsError:
+                stale = cls._stale(path, lease_seconds)
+                if stale is None:
+                    return None
+                # Renaming is atomic: of several workers seeing the same
+                # stale claim, one moves it away and the others miss it.
+                moved = f"{path}.{socket.gethostname()}.{os.getpid()}.stale"
+                try:
+                    os.rename(path, moved)
+                except FileNotFoundError:
+                    return None
+                if cls._read(moved) != stale:
+                    # Between the check and the rename another worker took
+                    # the stale claim over, or its owner renewed it: what
+                    # was moved is a live claim, so put it back.
+                    try:
+                        os.link(moved, path)
+                    except FileExistsError:
+                        pass
+                    os.remove(moved)
+                    return None
+                os.remove(moved)
+                continue
+            with os.fdopen(fd, "w") as handle:
+                json.dump({"owner": _owner(), "claimed_at": time.time()}, handle)
+            return cls(path)
+        return None
+
+    @staticmethod
+    def _read(path):
+        """(owner, claimed_at, mtime_ns) of a claim file, None if unreadable."""
+        try:
+            mtime_ns = os.stat(path).st_mtime_ns
+            with open(path) as handle:
+                claim = json.load(handle)
+        except (FileNotFoundError, ValueError):
+            # Vanished, or caught between create and write.
+            return None
+        return claim.get("owner", ""), claim.get("claimed_at"), mtime_ns
+
+    @classmethod
+    def _stale(cls, path, lease_seconds):
+        """The claim as _read() saw it if it is stale, otherwise None."""
+        claim = cls._read(path)
+        if claim is None:
+            return None
+        owner, _, mtime_ns = claim
+        age = time.time() - mtime_ns / 1e9
+        if age > lease_seconds or _process_gone(owner):
+            return claim
+        return None
+
+    def touch(self):
+        os.utime(self.path)
+
+    def release(self):
+        try:
+            os.remove(self.path)
+        except FileNotFoundError:
+            pass
+
+
+def _remove(path):
+    if os.path.isdir(path):
+        shutil.rmtree(path)
+    elif os.path.exists(path):
+        os.remove(path)
+
+
+def run_shard(
+    directory,
+    manifest,
+    shard,
+    claim=None,
+    cache=None,
+    chunk_size=DEFAULT_CHUNK_SIZE,
+    dedupe=True,
+    progress=None,
+    validate=True,
+    log_rows=False,
+):
+    """
+    Calculate one shard into its output and mark it done.
+
+    Rows failing validation go to rejected/<shard id>.csv, numbered as
+    rows of the shard's input file.
+
+    Returns:
+        BatchSummary: Counters and diagnostics of the shard
+    """
+    summary = BatchSummary(diagnostics=Diagnostics(log_rows=log_rows))
+    version = manifest["rules_version"]
+    fmt = manifest["output_format"]
+    output = os.path.join(directory, shard["output"])
+    # Holding the claim, any partial output of the shard is abandoned work.
+    for abandoned in glob.glob(glob.escape(output) + ".*.partial"):
+        _remove(abandoned)
+    rejected_path = _rejected_path(directory, shard)
+    os.makedirs(os.path.dirname(rejected_path), exist_ok=True)
+    os.makedirs(os.path.dirname(_rollup_path(directory, shard)), exist_ok=True)
+    for abandoned in glob.glob(glob.escape(rejected_path) + ".*.partial"):
+        _remove(abandoned)
+    suffix = f".{socket.gethostname()}.{os.getpid()}.partial"
+    partial = output + suffix
+    start = time.perf_counter()
+    chunks = read_shard_chunks(shard, chunk_size)
+    rejected = RejectedRowsWriter(rejected_path + suffix) if validate else None
+    rollup = Rollup(**manifest["rollup"]) if manifest.get("rollup") else None
+    first_row = 0
+    for other in manifest["shards"]:
+        if other["id"] == shard["id"]:
+            break
+        if other["input"] == shard["input"]:
+            first_row += other["rows"] or 0
+    try:
+        with open_chunk_writer(partial, fmt, version) as writer:
+            write_chunks(
+                chunks,
+                writer,
+                cache,
+                summary,
+                version,
+                dedupe,
+                progress,
+                after_chunk=claim.touch if claim is not None else None,
+                validate=validate,
+                rejected=rejected,
+                first_row=first_row,
+                rollup=rollup,
+            )
+    finally:
+        if rejected is not None:
+            rejected.close()
+    # A worker that lost its claim may have left a whole earlier output.
+    _remove(output)
+    os.replace(partial, output)
+    _remove(rejected_path)
+    if rejected is not None and rejected.rows:
+        os.replace(rejected.path, rejected_path)
+    if rollup is not None:
+        _write_json(_rollup_path(directory, shard), rollup.as_dict())
+    summary.elapsed = time.perf_counter() - start
+    marker = {
+        "shard": shard["id"],
+        "rows": summary.rows,
+        "rejected": summary.rejected,
+        "diagnostics": summary.diagnostics.as_dict(),
+        "output": shard["output"],
+        "owner": _owner(),
+        "finished_at": time.time(),
+        "elapsed": summary.elapsed,
+    }
+    _write_json(os.path.join(directory, "done", shard["id"] + ".json"), marker)
+    return summary
+
+
+def _done_path(directory, shard):
+    return os.path.join(directory, "done", shard["id"] + ".json")
+
+
+def _rejected_path(directory, shard):
+    return os.path.join(directory, "rejected", shard["id"] + ".csv")
+
+
+def _rollup_path(directory, shard):
+    return os.path.join(directory, "rollups", shard["id"] + ".json")
+
+
+def _claim_path(directory, shard):
+    return os.path.join(directory, "claims", shard["id"] + ".claim")
+
+
+@dataclass
+class JobSummary:
+    shards: int = 0
+    completed: int = 0
+    already_done: int = 0
+    busy: int = 0
+    batch: BatchSummary = field(default_factory=BatchSummary)
+
+    @property
+    def finished(self) -> bool:
+        """Every shard of the job is done, here or elsewhere."""
+        return self.completed + self.already_done == self.shards
+
+
+def run_job(
+    inputs,
+    directory,
+    cache=None,
+    chunk_size=DEFAULT_CHUNK_SIZE,
+    shard_rows=DEFAULT_SHARD_ROWS,
+    resume=False,
+    dedupe=True,
+    input_format=None,
+    output_format=None,
+    lease_seconds=DEFAULT_LEASE_SECONDS,
+    echo=None,
+    progress=None,
+    validate=True,
+    log_rows=False,
+    rollup=None,
+):
+    """
+    Work through a job's shards until none is left to claim.
+
+    Args:
+        inputs (list): Input files, used only to plan a new job
+        directory (str): Job directory
+        cache (ResultCache): Optional on-disk result cache
+        chunk_size (int): Rows calculated at a time
+        shard_rows (int): Rows per shard of a new job
+        resume (bool): Continue the job already in the directory, skipping
+            finished shards; without it an existing job is an error
+        dedupe (bool): Compute identical rows of a chunk only once
+        input_format (str): Format of the inputs of a new job
+        output_format (str): Format of the shard outputs of a new job
+        lease_seconds (float): Idle time after which a claim is stale
+        echo (callable): Called with a line per finished shard
+        progress (BatchProgress): Optional progress reporter, told about
+            every chunk and shard; its rows_total defaults to the rows of
+            the shards not yet done
+        validate (bool): Reject rows failing calculator.validation checks
+            into rejected/<shard>.csv instead of calculating them
+        log_rows (bool): Log every row raising a warning, for debugging
+        rollup (Rollup): An empty rollup whose shape a new job records in
+            its manifest, so every worker keeps a partial rollup per
+            shard; the partials of all finished shards are merged into
+            it when the run ends (see job_rollup)
+
+    Returns:
+        JobSummary: Shards done by this run, found done and held elsewhere
+
+    Raises:
+        JobError: If the job exists without resume, or its rules or
+            inputs changed
+    """
+    if not resume and os.path.exists(os.path.join(directory, MANIFEST)):
+        raise JobError(
+            f"{directory} already holds a job; pass resume=True (--resume) to "
+            "continue it"
+        )
+    manifest = create_job(
+        directory, inputs, shard_rows, input_format, output_format, rollup
+    )
+    check_manifest(manifest)
+    if rollup is not None and manifest.get("rollup") != rollup.spec():
+        raise JobError(
+            f"{directory} was created without this rollup; run job rollup on "
+            "it or start a new job"
+        )
+    summary = JobSummary(shards=len(manifest["shards"]))
+    start = time.perf_counter()
+    if progress is not None:
+        if progress.rows_total is None:
+            remaining = [
+                shard["rows"]
+                for shard in manifest["shards"]
+                if not os.path.exists(_done_path(directory, shard))
+            ]
+            if None not in remaining:
+                progress.rows_total = sum(remaining)
+        progress.start()
+    try:
+        _work_shards(
+            directory,
+            manifest,
+            summary,
+            cache,
+            chunk_size,
+            dedupe,
+            lease_seconds,
+            echo,
+            progress,
+            validate,
+            log_rows,
+        )
+    except BaseException as exc:
+        if progress is not None:
+            progress.error(exc)
+        raise
+    summary.batch.elapsed = time.perf_counter() - start
+    if rollup is not None:
+        rollup.merge(job_rollup(directory))
+    if progress is not None:
+        progress.finish()
+    return summary
+
+
+def _work_shards(
+    directory,
+    manifest,
+    summary,
+    cache,
+    chunk_size,
+    dedupe,
+    lease_seconds,
+    echo,
+    progress,
+    validate,
+    log_rows,
+):
+    for shard in manifest["shards"]:
+        if os.path.exists(_done_path(directory, shard)):
+            summary.already_done += 1
+            continue
+        claim = ShardClaim.acquire(_claim_path(directory, shard), lease_seconds)
+        if claim is None:
+            summary.busy += 1
+            continue
+        try:
+            # Finished by another worker between the check and the claim.
+            if os.path.exists(_done_path(directory, shard)):
+                summary.already_done += 1
+                continue
+            shard_summary = run_shard(
+                directory,
+                manifest,
+                shard,
+                claim,
+                cache,
+                chunk_size,
+                dedupe,
+                progress,
+                validate,
+                log_rows,
+            )
+        finally:
+            claim.release()
+        summary.completed += 1
+        if progress is not None:
+            progress.shard(shard["id"], shard_summary.rows)
+        for name in ("rows", "unique_rows", "cache_hits", "computed", "rejected"):
+            total = getattr(summary.batch, name) + getattr(shard_summary, name)
+            setattr(summary.batch, name, total)
+        summary.batch.diagnostics.merge(shard_summary.diagnostics)
+        if echo is not None:
+            echo(
+                f"{shard['id']}: {shard_summary.rows:,} rows in "
+                f"{shard_summary.elapsed:.1f}s "
+                f"({summary.completed + summary.already_done}/{summary.shards} done)"
+            )
+
+
+def job_rollup(directory):
+    """
+    Merge the rollups of a job's finished shards.
+
+    Returns:
+        Rollup: Covering every finished shard; the whole input once the
+        job is finished
+
+    Raises:
+        JobError: If the job keeps no rollup
+    """
+    manifest = load_manifest(directory)
+    if not manifest.get("rollup"):
+        raise JobError(f"{directory} keeps no rollup; create it with one")
+    rollup = Rollup(**manifest["rollup"])
+    for shard in manifest["shards"]:
+        if os.path.exists(_done_path(directory, shard)):
+            with open(_rollup_path(directory, shard)) as handle:
+                rollup.merge(Rollup.from_dict(json.load(handle)))
+    return rollup
+
+
+def job_status(directory):
+    """
+    Progress of a job from its done markers and claims.
+
+    Returns:
+        dict: Shard counts by state, rows done and total, rows rejected,
+        diagnostics merged over shards (Diagnostics.as_dict()), and the
+        outputs and rejected-row files of finished shards in shard order
+    """
+    manifest = load_manifest(directory)
+    status = {"shards": len(manifest["shards"]), "done": 0, "claimed": 0}
+    status["rows_done"] = 0
+    status["rejected"] = 0
+    status["outputs"] = []
+    status["rejected_files"] = []
+    diagnostics = Diagnostics()
+    for shard in manifest["shards"]:
+        done = _done_path(directory, shard)
+        if os.path.exists(done):
+            with open(done) as handle:
+                marker = json.load(handle)
+            status["rows_done"] += marker["rows"]
+            status["rejected"] += marker.get("rejected", 0)
+            diagnostics.merge(Diagnostics.from_dict(marker.get("diagnostics", {})))
+            status["done"] += 1
+            status["outputs"].append(os.path.join(directory, shard["output"]))
+            if marker.get("rejected"):
+                status["rejected_files"].append(_rejected_path(directory, shard))
+        elif os.path.exists(_claim_path(directory, shard)):
+            status["claimed"] += 1
+    status["diagnostics"] = diagnostics.as_dict()
+    status["pending"] = status["shards"] - status["done"] - status["claimed"]
+    status["rows"] = sum(shard["rows"] or 0 for shard in manifest["shards"])
+    status["rules_version"] = manifest["rules_version"]
+    return status
@@ -1,4 +1,6 @@
 from business_tax_calculator.model.business import Business
+from business_tax_calculator.model.tax_result import TaxResult
+from business_tax_calculator.model.tax_result import RESULT_KEYS  # noqa: F401
 
 from business_tax_calculator.calculator.deduction_calculator import (
     calculate_total_deductions,
@@ -7,10 +9,10 @@ from business_tax_calculator.calculator.deduction_calculator import (
 
 from business_tax_calculator.calculator.income_calculator import (
     calculate_taxable_income,
-    calculate_self_employment_tax,
     calculate_effective_tax_rate,
 )
 
+from business_tax_calculator.utils import timing
 from business_tax_calculator.utils.helpers import (
     validate_number_input,
     validate_yes_no_input,
@@ -20,13 +22,94 @@ from business_tax_calculator.utils.helpers import (
 )
 
 
+def calculate_business_liabilities(business, filing_status=None):
+    """
+    Headless calculation entry point: compute every liability for a
+    fully populated Business without any console interaction.
+
+    Args:
+        business (Business): The business to calculate
+        filing_status (str): Filing status, defaults to business.filing_status
+
+    Returns:
+        TaxResult: Calculation results keyed by RESULT_KEYS plus 'business'
+    """
+    if filing_status is None:
+        filing_status = business.filing_status
+    laps = timing.laps("calculate")
+    # 1. Preliminary SE tax for deduction
+    # 2. Total deductions
+    # The deduction pipeline derives the preliminary SE tax from taxable
+    # compensation and evaluates every deduction in one pass.
+    total_deductions = calculate_total_deductions(business)
+    laps.lap("deductions")
+    
+    # 3. Taxable income before QBI
+    prelim_taxable = calculate_taxable_income(
+        business, total_deductions
+    )
+    laps.lap("prelim_taxable_income")
+    # 4. QBI deduction
+    qbi_deduction = calculate_qbi_deduction(
+        business, prelim_taxable, filing_status
+    )
+    laps.lap("qbi")
+    # 5. Final taxable income
+    taxable_income = calculate_taxable_income(
+        business, total_deductions, qbi_deduction
+    )
+    laps.lap("taxable_income")
+
+    tax_liability = business.tax_return.tax_liability
+
+    # 6. Federal income tax
+    # 7. Final SE tax
+    # 8. State income tax
+    # 9. Local income tax
+    tax_liability.calculate(taxable_income)
+    laps.lap("liabilities")
+
+    # 10. Total tax liability
+    total_tax = tax_liability.value
+    
+    # 11. Remaining tax owed
+    tax_owed = max(0, total_tax - getattr(business, 'estimated_tax_payments', 0))
+    # 12. Effective tax rate
+    effective_rate = calculate_effective_tax_rate(
+        total_tax, business.get_net_income()
+    )
+    # Profit distributions
+    profit_dist = business.get_profit_distributions()
+
+    result = TaxResult(
+        taxable_income=taxable_income,
+        income_tax=tax_liability.income_tax(),
+        self_employment_tax=tax_liability.self_employment_tax(),
+        social_security_tax=tax_liability.social_security_income_tax_liability.value,
+        medicare_tax=tax_liability.medicare_income_tax_liability.value,
+        state_tax=tax_liability.state_income_tax_liability.value,
+        local_tax=tax_liability.local_income_tax_liability.value,
+        total_tax=total_tax,
+        estimated_payments=getattr(business, 'estimated_tax_payments', 0),
+        tax_owed=tax_owed,
+        total_deductions=total_deductions,
+        qbi_deduction=qbi_deduction,
+        profit_distributions=profit_dist,
+        effective_tax_rate=effective_rate,
+        business=business,
+    )
+    laps.lap("assembly")
+    return result
+
+
 class BusinessTaxCalculator:
     """
     Main calculator class that handles the tax calculation workflow.
     """
 
-    def __init__(self):
+    def __init__(self, cache=None):
         self.business = Business()
+        self.cache = cache
         self.valid_entity_types = [
             "Sole Proprietorship",
             "LLC",
@@ -183,65 +266,10 @@ class BusinessTaxCalculator:
         )
 
     def calculate_liabilities(self):
-
         """Calculate tax liability based on collected information."""
-        # 1. Preliminary SE tax for deduction
-        prelim_se_tax, ss_tax, med_tax = calculate_self_employment_tax(
-            self.business, self.business.get_net_income()
-        )
-        # 2. Total deductions
-        total_deductions = calculate_total_deductions(self.business)
-        
-        # 3. Taxable income before QBI
-        prelim_taxable = calculate_taxable_income(
-            self.business, total_deductions
-        )
-        # 4. QBI deduction
-        qbi_deduction = calculate_qbi_deduction(
-            self.business, prelim_taxable, self.filing_status
-        )
-        # 5. Final taxable income
-        taxable_income = calculate_taxable_income(
-            self.business, total_deductions, qbi_deduction
-        )
-
-        tax_liability = self.business.tax_return.tax_liability
-
-        # 6. Federal income tax
-        # 7. Final SE tax
-        # 8. State income tax
-        # 9. Local income tax
-        tax_liability.calculate(taxable_income)
-
-        # 10. Total tax liability
-        total_tax = tax_liability.value
-        
-        # 11. Remaining tax owed
-        tax_owed = max(0, total_tax - getattr(self.business, 'estimated_tax_payments', 0))
-        # 12. Effective tax rate
-        effective_rate = calculate_effective_tax_rate(
-            total_tax, self.business.get_net_income()
-        )
-        # Profit distributions
-        profit_dist = self.business.get_profit_distributions()
-
-        return {
-            'business': self.business,
-            'taxable_income': taxable_income,
-            'income_tax': tax_liability.income_tax(),
-            'self_employment_tax': tax_liability.self_employment_tax(),
-            'social_security_tax': tax_liability.social_security_income_tax_liability.value,
-            'medicare_tax': tax_liability.medicare_income_tax_liability.value,
-            'state_tax': tax_liability.state_income_tax_liability.value,
-            'local_tax': tax_liability.local_income_tax_liability.value,
-            'total_tax': total_tax,
-            'estimated_payments': getattr(self.business, 'estimated_tax_payments', 0),
-            'tax_owed': tax_owed,
-            'total_deductions': total_deductions,
-            'qbi_deduction': qbi_deduction,
-            'profit_distributions': profit_dist,
-            'effective_tax_rate': effective_rate,
-        }
+        if self.cache is not None:
+            return self.cache.calculate(self.business, self.filing_status)
+        return calculate_business_liabilities(self.business, self.filing_status)
 
     def display_results(self, results):
         """Display tax calculation results."""
@@ -0,0 +1,152 @@
+# calculator/validation.py
+"""
+Vectorized validation of batch input columns.
+
+validate_columns() checks a whole chunk at once and returns one error
+code per row instead of raising on the first bad one, so a negative
+expense rejects its own row and the rest of the run carries on. Codes are
+bit flags, combined when a row fails several checks:
+
+    NOT_A_NUMBER              an amount is NaN, infinite or not a number
+    NEGATIVE_AMOUNT           an amount is below zero
+    SALARY_ABOVE_NET_REVENUE  an S-Corp pays more salary than revenue less
+                              expenses
+    UNKNOWN_ENTITY_TYPE       not one of utils.constants.ENTITY_TYPES
+    UNKNOWN_STATE             not blank and not a USPS state code
+    UNKNOWN_FILING_STATUS     not a filing status with QBI thresholds
+    TEXT_TOO_LONG             a text value is wider than the output keeps,
+                              checked when given text_widths (column stores)
+
+Batch runs calculate the rows whose code is VALID and send the others,
+with their inputs, row number and code, to a RejectedRowsWriter.
+"""
+
+import csv
+
+import numpy as np
+
+from business_tax_calculator.calculator.batch import (
+    INPUT_NUMERIC_COLUMNS,
+    INPUT_TEXT_COLUMNS,
+)
+from business_tax_calculator.calculator.deduction_calculator import (
+    QBI_INCOME_THRESHOLDS,
+)
+from business_tax_calculator.utils.constants import ENTITY_TYPES, STATE_CODES
+
+VALID = 0
+NOT_A_NUMBER = 1
+NEGATIVE_AMOUNT = 2
+SALARY_ABOVE_NET_REVENUE = 4
+UNKNOWN_ENTITY_TYPE = 8
+UNKNOWN_STATE = 16
+UNKNOWN_FILING_STATUS = 32
+TEXT_TOO_LONG = 64
+
+ERROR_NAMES = {
+    NOT_A_NUMBER: "not_a_number",
+    NEGATIVE_AMOUNT: "negative_amount",
+    SALARY_ABOVE_NET_REVENUE: "salary_above_net_revenue",
+    UNKNOWN_ENTITY_TYPE: "unknown_entity_type",
+    UNKNOWN_STATE: "unknown_state",
+    UNKNOWN_FILING_STATUS: "unknown_filing_status",
+    TEXT_TOO_LONG: "text_too_long",
+}
+
+REJECTED_COLUMNS = (
+    ("row",) + INPUT_TEXT_COLUMNS + INPUT_NUMERIC_COLUMNS + ("error_code", "errors")
+)
+
+_STATES = np.array(("",) + STATE_CODES)
+_ENTITY_TYPES = np.array(ENTITY_TYPES)
+_FILING_STATUSES = np.array(sorted(QBI_INCOME_THRESHOLDS))
+
+
+def validate_columns(columns, text_widths=None):
+    """
+    Check every row of a chunk.
+
+    Args:
+        columns (dict): Input columns as rows_to_columns returns them
+        text_widths (dict): Maximum UTF-8 bytes per value of text columns,
+            e.g. a ColumnStoreWriter's; unchecked if not given
+
+    Returns:
+        numpy.ndarray: uint8 error code per row, VALID (0) for good rows
+    """
+    n = len(columns[INPUT_NUMERIC_COLUMNS[0]])
+    codes = np.zeros(n, dtype=np.uint8)
+    for name in INPUT_NUMERIC_COLUMNS:
+        values = columns[name]
+        codes[~np.isfinite(values)] |= NOT_A_NUMBER
+        codes[values < 0] |= NEGATIVE_AMOUNT
+    net_revenue = columns["revenue"] - columns["expenses"]
+    s_corp = columns["entity_type"] == "S-Corp"
+    codes[
+        s_corp & (columns["reasonable_salary"] > net_revenue)
+    ] |= SALARY_ABOVE_NET_REVENUE
+    codes[~np.isin(columns["entity_type"], _ENTITY_TYPES)] |= UNKNOWN_ENTITY_TYPE
+    codes[~np.isin(columns["state"], _STATES)] |= UNKNOWN_STATE
+    codes[~np.isin(columns["filing_status"], _FILING_STATUSES)] |= UNKNOWN_FILING_STATUS
+    for name, width in (text_widths or {}).items():
+        encoded = np.char.encode(np.asarray(columns[name], dtype=str), "utf-8")
+        if encoded.dtype.itemsize > width:
+            codes[np.char.str_len(encoded) > width] |= TEXT_TOO_LONG
+    return codes
+
+
+def describe(code):
+    """Names of the checks an error code failed, joined by '|'."""
+    return "|".join(name for flag, name in ERROR_NAMES.items() if code & flag)
+
+
+class RejectedRowsWriter:
+    """
+    CSV side output of rejected rows: row number, inputs and error code.
+
+    The file is created with the first rejected row, so a clean run
+    leaves nothing behind.
+
+    Args:
+        path (str): Destination file
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self.rows = 0
+        self._handle = None
+        self._writer = None
+
+    def write(self, row_numbers, columns, codes):
+        """
+        Append rejected rows.
+
+        Args:
+            row_numbers (numpy.ndarray): 1-based input row of each
+            columns (dict): Their input columns
+            codes (numpy.ndarray): Their error codes
+        """
+        if not len(codes):
+            return
+        if self._handle is None:
+            self._handle = open(self.path, "w", newline="")
+            self._writer = csv.writer(self._handle)
+            self._writer.writerow(REJECTED_COLUMNS)
+        data = [row_numbers.tolist()]
+        data += [columns[name].tolist() for name in INPUT_TEXT_COLUMNS]
+        data += [columns[name].tolist() for name in INPUT_NUMERIC_COLUMNS]
+        codes = codes.tolist()
+        data += [codes, [describe(code) for code in codes]]
+        self._writer.writerows(zip(*data))
+        self.rows += len(codes)
+
+    def close(self):
+        if self._handle is not None:
+            self._handle.close()
+            self._handle = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
@@ -0,0 +1,135 @@
+# calculator/vectorized.py
+"""
+Vectorized calculation over input columns.
+
+Runs the same deduction pipeline and liability expressions as the
+per-business calculation, evaluated with numpy over whole columns, so a
+chunk of rows is calculated without building a Business per row.
+"""
+
+import numpy as np
+
+from business_tax_calculator.calculator.deduction_calculator import (
+    QBI_INCOME_THRESHOLDS,
+)
+from business_tax_calculator.calculator.tax_calculator import RESULT_KEYS
+from business_tax_calculator.model.business_input import BusinessInput
+from business_tax_calculator.model.deduction.deduction_registry import (
+    DeductionRegistry,
+)
+from business_tax_calculator.model.liabilities.tax_liability import TaxLiability
+from business_tax_calculator.model.tax_result import TaxResult
+
+QBI_RATE = 0.20
+
+_tax_liability = TaxLiability()
+
+
+def round_cents(values):
+    """
+    Round to cents exactly like the builtin round(value, 2).
+
+    np.round scales by 100 first, which can disagree with round() on values
+    within float error of a half cent; those few are redone with round().
+    """
+    rounded = np.round(values, 2)
+    scaled = values * 100.0
+    ambiguous = np.flatnonzero(np.abs(scaled - np.floor(scaled) - 0.5) < 1e-6)
+    for i in ambiguous.tolist():
+        rounded[i] = round(float(values[i]), 2)
+    return rounded
+
+
+def qbi_deduction(values, prelim_taxable):
+    """Vectorized calculate_qbi_deduction over pipeline values."""
+    filing_status = values["filing_status"]
+    thresholds = np.zeros(len(prelim_taxable), dtype=np.float64)
+    for status, threshold in QBI_INCOME_THRESHOLDS.items():
+        thresholds[filing_status == status] = threshold
+    qualified = np.maximum(0.0, values["net_income"])
+    below = np.minimum(qualified * QBI_RATE, prelim_taxable * QBI_RATE)
+    above = round_cents(qualified * QBI_RATE)
+    return np.where(
+        values["pass_through"],
+        np.where(prelim_taxable <= thresholds, below, above),
+        0.0,
+    )
+
+
+def calculate_columns(columns):
+    """
+    Calculate every row of a chunk of input columns.
+
+    Args:
+        columns (dict): filing_status, CALCULATION_TEXT_FIELDS and
+            CALCULATION_NUMERIC_FIELDS as numpy arrays
+
+    Returns:
+        dict: float64 arrays keyed by RESULT_KEYS
+    """
+    values = DeductionRegistry.default_pipeline().evaluate(dict(columns), np)
+    net_income = values["net_income"]
+    total_deductions = np.broadcast_to(
+        np.asarray(values["total_deductions"], dtype=np.float64), net_income.shape
+    )
+
+    prelim_taxable = np.maximum(0.0, net_income - total_deductions)
+    qbi = qbi_deduction(values, prelim_taxable)
+    taxable_income = np.maximum(0.0, net_income - total_deductions - qbi)
+
+    federal = _tax_liability.federal_income_tax_liability.evaluate(taxable_income, np)
+    state = _tax_liability.state_income_tax_liability.evaluate(taxable_income, np)
+    local = _tax_liability.local_income_tax_liability.evaluate(taxable_income, np)
+    medicare = _tax_liability.medicare_income_tax_liability.evaluate(taxable_income, np)
+    social_security = _tax_liability.social_security_income_tax_liability.evaluate(
+        taxable_income, np
+    )
+    # Same summation order as TaxLiability.calculate.
+    income_tax = federal + state + local
+    total_tax = federal + state + local + medicare + social_security
+    for liability in _tax_liability.plugin_liabilities:
+        tax = liability.evaluate(taxable_income, np)
+        income_tax = income_tax + tax
+        total_tax = total_tax + tax
+
+    estimated = np.asarray(columns["estimated_tax_payments"], dtype=np.float64)
+    effective = np.zeros_like(total_tax)
+    np.divide(total_tax, net_income, out=effective, where=net_income > 0)
+
+    return {
+        "taxable_income": taxable_income,
+        "income_tax": income_tax,
+        "self_employment_tax": medicare + social_security,
+        "social_security_tax": social_security,
+        "medicare_tax": medicare,
+        "state_tax": state,
+        "local_tax": local,
+        "total_tax": total_tax,
+        "estimated_payments": estimated,
+        "tax_owed": np.maximum(0, total_tax - estimated),
+        "total_deductions": total_deductions,
+        "qbi_deduction": qbi,
+        "profit_distributions": np.asarray(
+            columns["profit_distributions"], dtype=np.float64
+        ),
+        "effective_tax_rate": effective * 100.0,
+    }
+
+
+def calculate_matrix(columns):
+    """calculate_columns stacked into a (rows, len(RESULT_KEYS)) matrix."""
+    results = calculate_columns(columns)
+    return np.column_stack([results[key] for key in RESULT_KEYS])
+
+
+def calculate_records(records):
+    """
+    Calculate a list of BusinessInput records in one vectorized pass.
+
+    Args:
+        records (list): BusinessInput records
+
+    Returns:
+        list: One TaxResult per record, in order
+    """
+    return TaxResult.from_matrix(calculate_matrix(BusinessInput.to_columns(records)))
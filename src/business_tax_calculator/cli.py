@@ -0,0 +1,868 @@
+# cli.py
+"""
+Command-line subcommands for the business-tax-calc entry point.
+
+Running business-tax-calc without arguments starts the interactive
+calculator; the subcommands below cover headless and batch use. Each
+handler imports what it needs so unrelated commands stay cheap to start.
+"""
+
+import argparse
+import sys
+from datetime import datetime
+
+from business_tax_calculator.utils.optional import (
+    MissingDependencyError,
+    import_optional,
+)
+
+
+def _enable_timings(args):
+    if args.timings:
+        from business_tax_calculator.utils import timing
+
+        timing.enable()
+
+
+def _print_timings():
+    from business_tax_calculator.utils import timing
+
+    print(f"{'Stage':<24}{'Count':>10}{'Total s':>12}{'Mean ms':>12}")
+    for stage, stats in timing.snapshot().items():
+        print(
+            f"{stage:<24}{stats['count']:>10,}{stats['total_seconds']:>12.3f}"
+            f"{stats['mean_seconds'] * 1000:>12.3f}"
+        )
+
+
+def _cmd_batch(args):
+    import_optional("numpy", "batch")
+    from business_tax_calculator.calculator.batch import run_batch
+    from business_tax_calculator.calculator.jobs import JobError, run_job
+
+    _enable_timings(args)
+
+    if args.rejected and (args.job or args.resume):
+        print(
+            "error: --rejected is for plain runs; a job writes rejected rows "
+            "to rejected/<shard>.csv in its directory",
+            file=sys.stderr,
+        )
+        return 2
+    if args.rejected and args.no_validate:
+        print(
+            "error: --rejected needs validation; it cannot be combined with "
+            "--no-validate",
+            file=sys.stderr,
+        )
+        return 2
+    rollup = None
+    if args.rollup:
+        try:
+            rollup = _make_rollup(args.rollup_by, args.rollup_metrics)
+        except ValueError as exc:
+            print(f"error: {exc}", file=sys.stderr)
+            return 2
+    cache = None
+    if args.cache:
+        from business_tax_calculator.storage.result_cache import ResultCache
+
+        cache = ResultCache(args.cache)
+    profiler = None
+    if args.profile:
+        from business_tax_calculator.utils.profiler import SamplingProfiler
+
+        profiler = SamplingProfiler(args.profile_interval_ms / 1000).start()
+    progress = sink = None
+    if args.progress or args.telemetry:
+        from business_tax_calculator.utils.progress import (
+            BatchProgress,
+            JsonLinesSink,
+            TtyProgress,
+        )
+
+        hooks = [TtyProgress()] if args.progress else []
+        if args.telemetry:
+            sink = JsonLinesSink(args.telemetry)
+            hooks.append(sink)
+        progress = BatchProgress(hooks, label=args.input)
+    job = None
+    try:
+        if args.job or args.resume:
+            job = run_job(
+                [args.input],
+                args.output,
+                cache,
+                args.chunk_size,
+                shard_rows=args.shard_rows,
+                resume=args.resume,
+                dedupe=not args.no_dedupe,
+                input_format=args.input_format,
+                output_format=args.output_format,
+                echo=None if args.progress else print,
+                progress=progress,
+                validate=not args.no_validate,
+                log_rows=args.log_rows,
+                rollup=rollup,
+            )
+            summary = job.batch
+        else:
+            summary = run_batch(
+                args.input,
+                args.output,
+                cache,
+                args.chunk_size,
+                dedupe=not args.no_dedupe,
+                input_format=args.input_format,
+                output_format=args.output_format,
+                progress=progress,
+                validate=not args.no_validate,
+                rejected_path=args.rejected,
+                log_rows=args.log_rows,
+                rollup=rollup,
+            )
+    except (JobError, ValueError) as exc:
+        print(f"error: {exc}", file=sys.stderr)
+        return 2
+    finally:
+        if profiler is not None:
+            profiler.stop()
+            profiler.write(args.profile)
+        if cache is not None:
+            cache.close()
+        if sink is not None:
+            sink.close()
+    print(
+        f"{summary.rows:,} rows, {summary.unique_rows:,} distinct inputs "
+        f"(dedup ratio {summary.dedup_ratio:.1%}); "
+        f"{summary.cache_hits:,} from cache, {summary.computed:,} computed "
+        f"in {summary.elapsed:.2f}s [{summary.rows_per_second:,.0f} rows/s]"
+    )
+    if summary.rejected:
+        if job is not None:
+            where = f"see {args.output}/rejected"
+        elif args.rejected:
+            where = f"written to {args.rejected}"
+        else:
+            where = "pass --rejected PATH to keep them"
+        print(f"{summary.rejected:,} rows rejected by validation ({where})")
+    if summary.diagnostics:
+        print("Diagnostics:")
+        for line in summary.diagnostics.lines():
+            print(f"  {line}")
+    if job is not None:
+        print(
+            f"Shards: {job.completed} calculated, {job.already_done} already done, "
+            f"{job.busy} held by other workers, of {job.shards}"
+        )
+    if rollup is not None:
+        rollup.write_csv(args.rollup)
+        covered = "" if job is None or job.finished else " (finished shards only)"
+        print(
+            f"Rollup of {len(rollup.groups):,} groups written to {args.rollup}{covered}"
+        )
+    if args.timings:
+        _print_timings()
+    if profiler is not None:
+        print(f"Profile written to {args.profile}: {profiler.report()}")
+    return 0
+
+
+def _cmd_job_status(args):
+    import json
+
+    import_optional("numpy", "batch")
+    from business_tax_calculator.calculator.jobs import JobError, job_status
+
+    try:
+        status = job_status(args.directory)
+    except JobError as exc:
+        print(f"error: {exc}", file=sys.stderr)
+        return 2
+    if args.json:
+        print(json.dumps(status, indent=2))
+        return 0
+    print(
+        f"{status['done']}/{status['shards']} shards done "
+        f"({status['rows_done']:,}/{status['rows']:,} rows), "
+        f"{status['claimed']} in progress, {status['pending']} pending; "
+        f"rules version {status['rules_version']}"
+    )
+    if status["rejected"]:
+        print(f"{status['rejected']:,} rows rejected by validation")
+    if status["diagnostics"]:
+        from business_tax_calculator.calculator.diagnostics import Diagnostics
+
+        print("Diagnostics:")
+        for line in Diagnostics.from_dict(status["diagnostics"]).lines():
+            print(f"  {line}")
+    return 0
+
+
+def _make_rollup(by, metrics):
+    from business_tax_calculator.report.rollup import (
+        DEFAULT_BY,
+        DEFAULT_METRICS,
+        Rollup,
+    )
+
+    return Rollup(
+        DEFAULT_BY if by is None else by,
+        DEFAULT_METRICS if metrics is None else metrics,
+    )
+
+
+def _write_rollup(rollup, output, quantiles):
+    from business_tax_calculator.report.rollup import DEFAULT_QUANTILES
+
+    quantiles = DEFAULT_QUANTILES if quantiles is None else quantiles
+    rollup.write_csv(output or sys.stdout, quantiles)
+
+
+def _cmd_rollup(args):
+    import_optional("numpy", "batch")
+    from business_tax_calculator.report.rollup import rollup_results
+
+    try:
+        rollup = _make_rollup(args.by, args.metrics)
+        rollup_results(args.results, rollup)
+    except ValueError as exc:
+        print(f"error: {exc}", file=sys.stderr)
+        return 2
+    _write_rollup(rollup, args.output, args.quantiles)
+    return 0
+
+
+def _cmd_job_rollup(args):
+    import_optional("numpy", "batch")
+    from business_tax_calculator.calculator.jobs import JobError, job_rollup
+
+    try:
+        rollup = job_rollup(args.directory)
+    except JobError as exc:
+        print(f"error: {exc}", file=sys.stderr)
+        return 2
+    _write_rollup(rollup, args.output, args.quantiles)
+    return 0
+
+
+def _cmd_schema(args):
+    import json
+
+    import_optional("numpy", "batch")
+    import_optional("pyarrow", "arrow")
+    from business_tax_calculator.calculator.arrow_io import output_schema
+
+    schema = output_schema()
+    if not args.json:
+        print(schema.to_string(show_schema_metadata=True))
+        return 0
+    document = {
+        "fields": [
+            {"name": f.name, "type": str(f.type), "nullable": f.nullable}
+            for f in schema
+        ],
+        "metadata": {k.decode(): v.decode() for k, v in schema.metadata.items()},
+    }
+    print(json.dumps(document, indent=2))
+    return 0
+
+
+def _cmd_lookup(args):
+    import json
+
+    import_optional("numpy", "batch")
+    from business_tax_calculator.storage.column_store import ColumnStore
+
+    status = 0
+    with ColumnStore(args.store) as store:
+        for client_id, record in zip(args.client_ids, store.get_many(args.client_ids)):
+            if record is None:
+                print(f"error: no client {client_id!r}", file=sys.stderr)
+                status = 1
+                continue
+            print(json.dumps(record))
+    return status
+
+
+def _cmd_reports(args):
+    import_optional("numpy", "batch")
+    from business_tax_calculator.report.html import (
+        DEFAULT_TEMPLATE,
+        generate_reports,
+    )
+
+    template = DEFAULT_TEMPLATE
+    if args.template:
+        with open(args.template, encoding="utf-8") as handle:
+            template = handle.read()
+    try:
+        summary = generate_reports(
+            args.results,
+            args.directory,
+            template,
+            workers=args.workers,
+            resume=args.resume,
+            echo=(lambda line: print(line, file=sys.stderr)) if args.progress else None,
+        )
+    except ValueError as exc:
+        print(f"error: {exc}", file=sys.stderr)
+        return 2
+    print(
+        f"{summary.pages:,} pages written, {summary.skipped:,} already present, "
+        f"in {summary.elapsed:.2f}s [{summary.pages_per_second:,.0f} pages/s]"
+    )
+    return 0
+
+
+def _cmd_store_ingest(args):
+    import_optional("numpy", "batch")
+    from business_tax_calculator.calculator.batch import BatchSummary
+    from business_tax_calculator.calculator.validation import RejectedRowsWriter
+    from business_tax_calculator.storage.scenario_store import ScenarioStore
+
+    summary = BatchSummary()
+    rejected = None
+    if args.rejected and not args.no_validate:
+        rejected = RejectedRowsWriter(args.rejected)
+    try:
+        with ScenarioStore(args.path) as store:
+            info = store.ingest(
+                args.input,
+                args.chunk_size,
+                label=args.label,
+                validate=not args.no_validate,
+                rejected=rejected,
+                summary=summary,
+            )
+    except ValueError as exc:
+        print(f"error: {exc}", file=sys.stderr)
+        return 2
+    finally:
+        if rejected is not None:
+            rejected.close()
+    print(f"Run {info.run_id}: stored {info.rows:,} scenarios from {info.source}")
+    if summary.rejected:
+        if args.rejected:
+            where = f"written to {args.rejected}"
+        else:
+            where = "pass --rejected PATH to keep them"
+        print(f"{summary.rejected:,} rows rejected by validation ({where})")
+    return 0
+
+
+def _cmd_store_runs(args):
+    import_optional("numpy", "batch")
+    from business_tax_calculator.storage.scenario_store import ScenarioStore
+
+    with ScenarioStore(args.path) as store:
+        runs = store.runs()
+    print(
+        f"{'Run':>5}  {'Rows':>12}  {'Created':<20}{'Rules version':<18}Label / source"
+    )
+    for info in runs:
+        print(
+            f"{info.run_id:>5}  {info.rows:>12,}  {_format_time(info.created_at):<20}"
+            f"{info.rules_version:<18}{info.label or info.source}"
+        )
+    return 0
+
+
+def _cmd_store_query(args):
+    import csv
+    import itertools
+    import json
+
+    import_optional("numpy", "batch")
+    from business_tax_calculator.storage.scenario_store import ScenarioStore
+
+    filters = {
+        "entity_type": args.entity_type,
+        "state": args.state,
+        "net_income_above": args.net_income_above,
+        "net_income_below": args.net_income_below,
+        "savings_above": args.savings_above,
+        "run_id": args.run,
+    }
+    with ScenarioStore(args.path) as store:
+        try:
+            if args.count:
+                print(store.count(**filters))
+                return 0
+            rows = store.iter_query(
+                order_by=args.order_by,
+                descending=not args.ascending,
+                limit=args.limit,
+                columns=args.columns,
+                **filters,
+            )
+            first = next(rows, None)
+        except ValueError as exc:
+            print(f"error: {exc}", file=sys.stderr)
+            return 2
+        rows = itertools.chain([first] if first else [], rows)
+        if args.output:
+            from business_tax_calculator.report.export import export_rows
+
+            count = export_rows(rows, args.output, columns=args.columns)
+            print(f"Exported {count:,} scenarios to {args.output}")
+            return 0
+        if args.json:
+            for row in rows:
+                print(json.dumps(row))
+            return 0
+        fields = list(first) if first else args.columns or []
+        writer = csv.DictWriter(sys.stdout, fieldnames=fields)
+        writer.writeheader()
+        writer.writerows(rows)
+    return 0
+
+
+def _cmd_serve(args):
+    from business_tax_calculator.service.daemon import serve
+
+    _enable_timings(args)
+    print(f"Serving calculations on {args.socket} (Ctrl+C to stop)", flush=True)
+    serve(args.socket, args.cache_size)
+    return 0
+
+
+def _cmd_serve_http(args):
+    import_optional("numpy", "batch")
+    from business_tax_calculator.service.http_service import run_http_service
+
+    _enable_timings(args)
+    print(
+        f"Serving HTTP on http://{args.host}:{args.port} (Ctrl+C to stop)", flush=True
+    )
+    run_http_service(
+        args.host,
+        args.port,
+        window=args.window_ms / 1000,
+        max_rows=args.max_rows,
+        max_pending=args.max_pending,
+    )
+    return 0
+
+
+def _field_value(text):
+    field, sep, value = text.partition("=")
+    if not sep or not field:
+        raise argparse.ArgumentTypeError(f"expected FIELD=VALUE, got {text!r}")
+    return field, value
+
+
+def _cmd_calc(args):
+    import json
+
+    from business_tax_calculator.service.client import (
+        CalculatorClient,
+        calculate,
+        default_socket_path,
+    )
+
+    path = args.socket or default_socket_path()
+    client = CalculatorClient(path) if path else None
+    lines = [json.dumps(dict(args.inputs))] if args.inputs else sys.stdin
+    status = 0
+    try:
+        for line in lines:
+            if not line.strip():
+                continue
+            try:
+                result = calculate(json.loads(line), client=client)
+            except ValueError as exc:
+                print(f"error: {exc}", file=sys.stderr)
+                status = 1
+                continue
+            print(json.dumps(result))
+    finally:
+        if client is not None:
+            client.close()
+    return status
+
+
+def _format_time(timestamp):
+    return datetime.fromtimestamp(timestamp).strftime("%Y-%m-%d %H:%M:%S")
+
+
+def _cmd_cache_inspect(args):
+    import_optional("numpy", "batch")
+    from business_tax_calculator.storage.result_cache import ResultCache
+    from business_tax_calculator.utils.rules import rules_version
+
+    current = rules_version()
+    with ResultCache(args.path) as cache:
+        versions = cache.versions()
+    if not versions:
+        print("Cache is empty.")
+        return 0
+    print(
+        f"{'Rules version':<18}{'Entries':>12}  {'First write':<20}{'Last write':<20}"
+    )
+    for info in versions:
+        marker = " (current)" if info.rules_version == current else ""
+        print(
+            f"{info.rules_version:<18}{info.entries:>12,}  "
+            f"{_format_time(info.first_created):<20}"
+            f"{_format_time(info.last_created):<20}{marker}"
+        )
+    return 0
+
+
+def _cmd_cache_gc(args):
+    import_optional("numpy", "batch")
+    from business_tax_calculator.storage.result_cache import ResultCache
+    from business_tax_calculator.utils.rules import rules_version
+
+    keep = set(args.keep or ())
+    keep.add(rules_version())
+    with ResultCache(args.path) as cache:
+        deleted = cache.collect_garbage(keep, vacuum=not args.no_vacuum)
+    print(f"Deleted {deleted:,} entries; kept versions: {', '.join(sorted(keep))}")
+    return 0
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(
+        prog="business-tax-calc",
+        description="Business tax liability calculator. "
+        "Run without arguments for the interactive calculator.",
+    )
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    batch = commands.add_parser(
+        "batch", help="Calculate every row of a CSV, Parquet or Arrow file"
+    )
+    batch.add_argument("input", help="Input file of businesses")
+    batch.add_argument("output", help="Output file of results")
+    batch.add_argument(
+        "--input-format",
+        choices=("csv", "parquet", "arrow"),
+        help="Format of the input file (default: from its extension, "
+        ".parquet/.pq, .arrow/.feather/.ipc, otherwise csv)",
+    )
+    batch.add_argument(
+        "--output-format",
+        choices=("csv", "parquet", "arrow", "store", "xlsx"),
+        help="Format of the output, as for --input-format; 'store' (or a .store "
+        "path) writes a column store directory for 'lookup', 'xlsx' (or .xlsx) "
+        "an Excel sheet",
+    )
+    batch.add_argument("--cache", help="SQLite result cache to reuse across runs")
+    batch.add_argument("--chunk-size", type=int, default=50_000)
+    batch.add_argument(
+        "--progress",
+        action="store_true",
+        help="Show rows done, rows/s, ETA, utilization and errors on stderr",
+    )
+    batch.add_argument(
+        "--telemetry",
+        metavar="PATH",
+        help="Append one JSON line per chunk (and start/finish/error) to PATH",
+    )
+    batch.add_argument(
+        "--job",
+        action="store_true",
+        help="Treat OUTPUT as a job directory: split the input into shards, "
+        "each written to its own file and marked done when complete",
+    )
+    batch.add_argument(
+        "--resume",
+        action="store_true",
+        help="Continue the job in OUTPUT, skipping finished shards; machines "
+        "sharing the directory split the remaining shards (implies --job)",
+    )
+    batch.add_argument(
+        "--shard-rows",
+        type=int,
+        default=500_000,
+        help="Rows per shard of a new job",
+    )
+    batch.add_argument(
+        "--rejected",
+        metavar="PATH",
+        help="CSV file for rows failing validation, with their error codes",
+    )
+    batch.add_argument(
+        "--no-validate",
+        action="store_true",
+        help="Calculate every row without validating its inputs",
+    )
+    batch.add_argument(
+        "--rollup",
+        metavar="PATH",
+        help="Write totals, means and quantiles by group to this CSV file, "
+        "aggregated while the rows are calculated",
+    )
+    batch.add_argument(
+        "--rollup-by",
+        nargs="*",
+        metavar="COLUMN",
+        help="Group columns of --rollup: state, entity_type, filing_status, "
+        "revenue_band (default: state entity_type revenue_band)",
+    )
+    batch.add_argument(
+        "--rollup-metrics",
+        nargs="+",
+        metavar="COLUMN",
+        help="Results aggregated by --rollup, or net_income or s_corp_savings "
+        "(default: total_tax effective_tax_rate s_corp_savings)",
+    )
+    batch.add_argument(
+        "--log-rows",
+        action="store_true",
+        help="Log a warning for every flagged row (debugging; slow on large "
+        "inputs) instead of only the summary",
+    )
+    batch.add_argument(
+        "--no-dedupe",
+        action="store_true",
+        help="Compute every row even when inputs repeat",
+    )
+    batch.add_argument(
+        "--timings", action="store_true", help="Print time spent in each stage"
+    )
+    batch.add_argument(
+        "--profile",
+        metavar="PATH",
+        help="Sample the run and write collapsed stacks for flame graphs",
+    )
+    batch.add_argument(
+        "--profile-interval-ms",
+        type=float,
+        default=1.0,
+        help="Milliseconds between profiler samples",
+    )
+    batch.set_defaults(handler=_cmd_batch)
+
+    schema = commands.add_parser(
+        "schema", help="Print the schema of Parquet and Arrow batch output"
+    )
+    schema.add_argument("--json", action="store_true", help="Print it as JSON")
+    schema.set_defaults(handler=_cmd_schema)
+
+    lookup = commands.add_parser(
+        "lookup", help="Print clients' inputs and results from a column store"
+    )
+    lookup.add_argument("store", help="Column store written by batch")
+    lookup.add_argument("client_ids", nargs="+", metavar="CLIENT_ID")
+    lookup.set_defaults(handler=_cmd_lookup)
+
+    reports = commands.add_parser(
+        "reports", help="Render one HTML tax estimate per client of a batch run"
+    )
+    reports.add_argument(
+        "results",
+        help="Stored batch results: a column store, batch CSV or Parquet/Arrow output",
+    )
+    reports.add_argument("directory", help="Directory the pages are written to")
+    reports.add_argument(
+        "--template", help="HTML template with {{ field }} placeholders"
+    )
+    reports.add_argument(
+        "--workers", type=int, help="Rendering processes (default: CPU count)"
+    )
+    reports.add_argument(
+        "--resume",
+        action="store_true",
+        help="Skip clients whose page already exists, e.g. after an interruption",
+    )
+    reports.add_argument(
+        "--progress", action="store_true", help="Print pages/s as pages are written"
+    )
+    reports.set_defaults(handler=_cmd_reports)
+
+    rollup = commands.add_parser(
+        "rollup", help="Totals, means and quantiles by group of stored batch results"
+    )
+    rollup.add_argument(
+        "results",
+        help="Stored batch results: a column store, batch CSV or Parquet/Arrow output",
+    )
+    rollup.add_argument("--output", metavar="PATH", help="CSV file (default: stdout)")
+    rollup.add_argument(
+        "--by",
+        nargs="*",
+        metavar="COLUMN",
+        help="Group columns: state, entity_type, filing_status, revenue_band "
+        "(default: state entity_type revenue_band; none for the whole book)",
+    )
+    rollup.add_argument(
+        "--metrics",
+        nargs="+",
+        metavar="COLUMN",
+        help="Result columns, net_income or s_corp_savings "
+        "(default: total_tax effective_tax_rate s_corp_savings)",
+    )
+    rollup.add_argument(
+        "--quantiles",
+        nargs="+",
+        type=float,
+        metavar="Q",
+        help="Quantiles to report (default: 0.5 0.9 0.99)",
+    )
+    rollup.set_defaults(handler=_cmd_rollup)
+
+    serve = commands.add_parser(
+        "serve", help="Run a pre-warmed calculation daemon on a Unix socket"
+    )
+    serve.add_argument("--socket", required=True, help="Unix socket path")
+    serve.add_argument(
+        "--cache-size", type=int, default=65_536, help="Results kept in memory"
+    )
+    serve.add_argument(
+        "--timings",
+        action="store_true",
+        help="Record per-stage timings, reported by the 'timings' op",
+    )
+    serve.set_defaults(handler=_cmd_serve)
+
+    serve_http = commands.add_parser(
+        "serve-http",
+        help="Run the JSON HTTP service with micro-batching",
+    )
+    serve_http.add_argument("--host", default="127.0.0.1")
+    serve_http.add_argument("--port", type=int, default=8080)
+    serve_http.add_argument(
+        "--window-ms",
+        type=float,
+        default=1.0,
+        help="How long a request may wait for others to batch with",
+    )
+    serve_http.add_argument(
+        "--max-rows", type=int, default=256, help="Rows that flush a batch early"
+    )
+    serve_http.add_argument(
+        "--max-pending",
+        type=int,
+        default=10_000,
+        help="Queued or in-flight rows before requests get 503",
+    )
+    serve_http.add_argument(
+        "--timings",
+        action="store_true",
+        help="Record per-stage timings, served at /metrics/stages",
+    )
+    serve_http.set_defaults(handler=_cmd_serve_http)
+
+    calc = commands.add_parser(
+        "calc",
+        help="Calculate one business (or JSON lines from stdin), "
+        "using the daemon when one is running",
+    )
+    calc.add_argument(
+        "inputs",
+        nargs="*",
+        type=_field_value,
+        metavar="FIELD=VALUE",
+        help="Input fields, e.g. entity_type=LLC revenue=120000",
+    )
+    calc.add_argument(
+        "--socket",
+        help="Daemon socket (default: $BUSINESS_TAX_CALC_SOCKET); "
+        "falls back to calculating in-process",
+    )
+    calc.set_defaults(handler=_cmd_calc)
+
+    job = commands.add_parser("job", help="Inspect a sharded batch job")
+    job_commands = job.add_subparsers(dest="job_command", required=True)
+    status = job_commands.add_parser("status", help="Print a job's progress")
+    status.add_argument("directory", help="Job directory written by batch --job")
+    status.add_argument("--json", action="store_true", help="Print it as JSON")
+    status.set_defaults(handler=_cmd_job_status)
+    job_rollup = job_commands.add_parser(
+        "rollup", help="Merge the rollups of a job's finished shards"
+    )
+    job_rollup.add_argument("directory", help="Job directory written by batch --job")
+    job_rollup.add_argument(
+        "--output", metavar="PATH", help="CSV file (default: stdout)"
+    )
+    job_rollup.add_argument("--quantiles", nargs="+", type=float, metavar="Q")
+    job_rollup.set_defaults(handler=_cmd_job_rollup)
+
+    cache = commands.add_parser("cache", help="Inspect or clean a result cache")
+    cache_commands = cache.add_subparsers(dest="cache_command", required=True)
+    inspect = cache_commands.add_parser("inspect", help="List cached rule versions")
+    inspect.add_argument("path")
+    inspect.set_defaults(handler=_cmd_cache_inspect)
+    gc = cache_commands.add_parser("gc", help="Delete entries from old rule versions")
+    gc.add_argument("path")
+    gc.add_argument(
+        "--keep",
+        action="append",
+        metavar="VERSION",
+        help="Additional rule version to keep (the current one is always kept)",
+    )
+    gc.add_argument("--no-vacuum", action="store_true")
+    gc.set_defaults(handler=_cmd_cache_gc)
+
+    store = commands.add_parser(
+        "store", help="Load scenarios into a SQLite store and query them"
+    )
+    store_commands = store.add_subparsers(dest="store_command", required=True)
+    ingest = store_commands.add_parser(
+        "ingest", help="Calculate a CSV, Parquet or Arrow file into the store"
+    )
+    ingest.add_argument("path", help="SQLite scenario store")
+    ingest.add_argument("input", help="Input file of businesses")
+    ingest.add_argument("--chunk-size", type=int, default=50_000)
+    ingest.add_argument("--label", help="Name for this run")
+    ingest.add_argument(
+        "--rejected",
+        metavar="PATH",
+        help="CSV file for rows failing validation, with their error codes",
+    )
+    ingest.add_argument(
+        "--no-validate",
+        action="store_true",
+        help="Store every row without validating its inputs",
+    )
+    ingest.set_defaults(handler=_cmd_store_ingest)
+    runs = store_commands.add_parser("runs", help="List ingested runs")
+    runs.add_argument("path")
+    runs.set_defaults(handler=_cmd_store_runs)
+    query = store_commands.add_parser(
+        "query",
+        help="Print matching scenarios as CSV, "
+        "e.g. --savings-above 5000 or --state MD --order-by effective_tax_rate",
+    )
+    query.add_argument("path")
+    query.add_argument("--entity-type")
+    query.add_argument("--state")
+    query.add_argument("--net-income-above", type=float)
+    query.add_argument("--net-income-below", type=float)
+    query.add_argument(
+        "--savings-above",
+        type=float,
+        help="Only scenarios where S-Corp status saves more than this",
+    )
+    query.add_argument("--run", type=int, help="Only this run id")
+    query.add_argument("--order-by", metavar="COLUMN")
+    query.add_argument("--ascending", action="store_true")
+    query.add_argument("--limit", type=int)
+    query.add_argument("--columns", nargs="+", metavar="COLUMN")
+    query.add_argument("--count", action="store_true", help="Print only the count")
+    query.add_argument("--json", action="store_true", help="Print JSON lines")
+    query.add_argument(
+        "--output",
+        metavar="PATH",
+        help="Stream the scenarios to a .csv or .xlsx file instead of printing",
+    )
+    query.set_defaults(handler=_cmd_store_query)
+
+    return parser
+
+
+def main(argv=None):
+    """Parse arguments and run the selected subcommand."""
+    args = build_parser().parse_args(argv)
+    try:
+        return args.handler(args)
+    except MissingDependencyError as exc:
+        print(f"error: {exc}", file=sys.stderr)
+        return 2
+
+
+if __name__ == "__main__":
+    sys.exit(main())
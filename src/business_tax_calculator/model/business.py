@@ -2,6 +2,22 @@ from typing import Dict
 from business_tax_calculator.model.tax_return import TaxReturn
 from business_tax_calculator.model.deduction.deduction_constants import DeductionName
 
+# Text and numeric fields that influence the calculated liabilities.
+# Filing status is supplied separately by the calculator.
+CALCULATION_TEXT_FIELDS = ("entity_type", "state")
+CALCULATION_NUMERIC_FIELDS = (
+    "revenue",
+    "expenses",
+    "reasonable_salary",
+    "retirement_contributions",
+    "health_insurance_premiums",
+    "home_office_deduction",
+    "other_deductions",
+    "local_tax_rate",
+    "estimated_tax_payments",
+    "profit_distributions",
+)
+
 class Business:
     def __init__(self):
         
@@ -130,4 +146,6 @@ class Business:
 
 
     def get_deductions(self) -> Dict[DeductionName, float]:
-        return self.tax_return.deduction_registry.get_available_deductions(self, self.filing_status)
\ No newline at end of file
+        registry = self.tax_return.deduction_registry
+        registry.calculate(self)
+        return registry.get_deduction_values()
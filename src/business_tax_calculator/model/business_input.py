@@ -0,0 +1,99 @@
+from dataclasses import dataclass, fields
+from operator import attrgetter
+
+from business_tax_calculator.model.business import (
+    CALCULATION_NUMERIC_FIELDS,
+    CALCULATION_TEXT_FIELDS,
+    Business,
+)
+from business_tax_calculator.utils.optional import import_optional
+
+# Same order as calculator.batch.INPUT_TEXT_COLUMNS + INPUT_NUMERIC_COLUMNS.
+RECORD_TEXT_FIELDS = ("client_id", "name", "filing_status") + CALCULATION_TEXT_FIELDS
+RECORD_NUMERIC_FIELDS = CALCULATION_NUMERIC_FIELDS
+
+
+@dataclass(frozen=True, slots=True)
+class BusinessInput:
+    """
+    Immutable, slotted calculation inputs for one business.
+
+    A Business carries a full TaxReturn graph and an instance __dict__;
+    a BusinessInput holds only the values the calculation reads, which
+    makes it cheap to keep many of them in memory, hash and share
+    between threads.
+    """
+
+    client_id: str = ""
+    name: str = ""
+    filing_status: str = "Single"
+    entity_type: str = ""
+    state: str = ""
+    revenue: float = 0.0
+    expenses: float = 0.0
+    reasonable_salary: float = 0.0
+    retirement_contributions: float = 0.0
+    health_insurance_premiums: float = 0.0
+    home_office_deduction: float = 0.0
+    other_deductions: float = 0.0
+    local_tax_rate: float = 0.0
+    estimated_tax_payments: float = 0.0
+    profit_distributions: float = 0.0
+
+    @classmethod
+    def from_business(cls, business, client_id=""):
+        """
+        Snapshot the calculation inputs of a Business.
+
+        :param business: The Business to copy
+        :param client_id: Identifier to attach to the record
+        :return: BusinessInput
+        """
+        values = {f: getattr(business, f) for f in RECORD_TEXT_FIELDS[1:]}
+        values.update((f, float(getattr(business, f))) for f in RECORD_NUMERIC_FIELDS)
+        return cls(client_id=client_id, **values)
+
+    def to_business(self):
+        """
+        Build a Business with these inputs for the full calculation path.
+
+        :return: Business
+        """
+        business = Business()
+        for f in RECORD_TEXT_FIELDS[1:] + RECORD_NUMERIC_FIELDS:
+            setattr(business, f, getattr(self, f))
+        return business
+
+    @staticmethod
+    def to_columns(records):
+        """
+        Pack records into the column layout of calculator.batch.rows_to_columns.
+
+        :param records: Sequence of BusinessInput
+        :return: Dict of field name to numpy array
+        """
+        np = import_optional("numpy", "batch")
+        names = [f.name for f in fields(BusinessInput)]
+        if not records:
+            values = [()] * len(names)
+        else:
+            values = zip(*map(attrgetter(*names), records))
+        columns = {}
+        for name, column in zip(names, values):
+            if name in RECORD_NUMERIC_FIELDS:
+                columns[name] = np.array(column, dtype=np.float64)
+            else:
+                columns[name] = np.array(column, dtype=str)
+        return columns
+
+    @classmethod
+    def from_columns(cls, columns):
+        """
+        Unpack columns as produced by to_columns or rows_to_columns.
+
+        :param columns: Dict of field name to numpy array
+        :return: List of BusinessInput
+        """
+        names = [f.name for f in fields(cls) if f.name in columns]
+        values = [columns[name].tolist() for name in names]
+        return [cls(**dict(zip(names, row))) for row in zip(*values)]
@@ -1,8 +1,24 @@
 from abc import ABC, abstractmethod
+from typing import Tuple
 from business_tax_calculator.utils.decorators import classproperty
 from business_tax_calculator.model.deduction.deduction_constants import DeductionName
 
 class BaseDeduction(ABC):
+    """
+    A deduction is a pure expression over named inputs: Business fields
+    (e.g. "revenue") or values derived by the deduction pipeline (e.g.
+    "net_income", "self_employment_tax"). Declaring the inputs lets the
+    registry order every deduction once and evaluate them in a single pass,
+    on one business or on columns of many.
+    """
+
+    # Names of the Business fields and pipeline values compute() reads.
+    inputs: Tuple[str, ...] = ()
+
+    # False for amounts already netted out of net income; they are reported
+    # in the breakdown but do not reduce taxable income a second time.
+    counts_toward_total: bool = True
+
     def __init__(self):
         self._name: DeductionName = None
         self._value: float = 0.0
@@ -12,7 +28,22 @@ class BaseDeduction(ABC):
     def name(cls) -> DeductionName:
         pass
 
-    @property
+    @staticmethod
     @abstractmethod
+    def compute(values, ops):
+        """
+        Evaluate the deduction.
+        :param values: Mapping of input name to a float or numpy array
+        :param ops: SCALAR_OPS for floats, the numpy module for arrays
+        :return: The deduction amount(s)
+        """
+        pass
+
+    @property
     def value(self) -> float:
-        pass
\ No newline at end of file
+        """The amount from the registry's most recent calculation."""
+        return self._value
+
+    @value.setter
+    def value(self, new_value: float):
+        self._value = new_value
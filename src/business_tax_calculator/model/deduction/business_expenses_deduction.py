@@ -3,11 +3,15 @@ from business_tax_calculator.model.deduction.deduction_constants import Deductio
 from business_tax_calculator.utils.decorators import classproperty
 
 class BusinessExpensesDeduction(BaseDeduction):
+    """Ordinary business expenses, already subtracted from net income."""
+
+    inputs = ("expenses",)
+    counts_toward_total = False
 
     @classproperty
     def name(cls) -> DeductionName:
         return DeductionName.BUSINESS_EXPENSES_DEDUCTION
-    
-    @property
-    def value(self) -> float:
-        return 0.0  # Replace with actual calculation logic
\ No newline at end of file
+
+    @staticmethod
+    def compute(values, ops):
+        return values["expenses"] * 1.0
@@ -0,0 +1,163 @@
+"""
+Compiles deductions into an ordered, single-pass evaluation pipeline.
+
+Each step reads named inputs and writes one named value. Inputs are either
+Business fields (the pipeline's leaves) or values written by earlier steps:
+the derived values below or other deductions. Because every step is an
+element-wise expression over an ``ops`` namespace, the same compiled
+pipeline evaluates one business with SCALAR_OPS or columns of many
+businesses with numpy.
+"""
+
+from business_tax_calculator.model.liabilities.medicare_income_tax_liability import (
+    MedicareIncomeTaxLiability,
+)
+from business_tax_calculator.model.liabilities import (
+    social_security_income_tax_liability as social_security,
+)
+from business_tax_calculator.utils.array_ops import SCALAR_OPS
+from business_tax_calculator.utils.constants import (
+    PASS_THROUGH_ENTITY_TYPES,
+    SELF_EMPLOYED_ENTITY_TYPES,
+    TaxRates,
+)
+
+_social_security = social_security.SocialSecurityIncomeTaxLiability()
+_medicare = MedicareIncomeTaxLiability()
+
+
+class DerivedValue:
+    """An intermediate value computed from Business fields for deductions."""
+
+    __slots__ = ("name", "inputs", "compute")
+
+    def __init__(self, name, inputs, compute):
+        self.name = name
+        self.inputs = inputs
+        self.compute = compute
+
+
+def _taxable_compensation(values, ops):
+    return ops.where(
+        values["self_employed"],
+        ops.maximum(0.0, values["net_income"] * TaxRates.EMPLOYER_FICA_TAX_RATE.value),
+        ops.where(
+            values["entity_type"] == "S-Corp", values["reasonable_salary"] * 1.0, 0.0
+        ),
+    )
+
+
+def _self_employment_tax(values, ops):
+    # Preliminary SE tax on compensation, independent of taxable income.
+    compensation = values["taxable_compensation"]
+    return _social_security.evaluate(compensation, ops) + _medicare.evaluate(
+        compensation, ops
+    )
+
+
+DERIVED_VALUES = (
+    DerivedValue(
+        "net_income",
+        ("revenue", "expenses"),
+        lambda values, ops: values["revenue"] - values["expenses"],
+    ),
+    DerivedValue(
+        "self_employed",
+        ("entity_type",),
+        lambda values, ops: ops.isin(values["entity_type"], SELF_EMPLOYED_ENTITY_TYPES),
+    ),
+    DerivedValue(
+        "pass_through",
+        ("entity_type",),
+        lambda values, ops: ops.isin(values["entity_type"], PASS_THROUGH_ENTITY_TYPES),
+    ),
+    DerivedValue(
+        "taxable_compensation",
+        ("self_employed", "net_income", "entity_type", "reasonable_salary"),
+        _taxable_compensation,
+    ),
+    DerivedValue(
+        "self_employment_tax",
+        ("taxable_compensation",),
+        _self_employment_tax,
+    ),
+)
+
+
+class DeductionPipeline:
+    """
+    Dependency-ordered evaluation plan for a set of deduction types.
+
+    Compiling resolves each deduction's declared inputs against the derived
+    values and the other deductions, orders the steps topologically and
+    rejects circular dependencies.
+    """
+
+    def __init__(self, deduction_types, derived_values=DERIVED_VALUES):
+        self.deduction_types = tuple(deduction_types)
+        self.deduction_names = tuple(d.name for d in self.deduction_types)
+        self.by_name = dict(zip(self.deduction_names, self.deduction_types))
+        if len(self.by_name) != len(self.deduction_types):
+            raise ValueError("Deduction names must be unique.")
+        self._total_names = tuple(
+            d.name for d in self.deduction_types if d.counts_toward_total
+        )
+
+        providers = {
+            value.name: (value.inputs, value.compute) for value in derived_values
+        }
+        for deduction in self.deduction_types:
+            providers[deduction.name] = (tuple(deduction.inputs), deduction.compute)
+
+        self.steps = []
+        fields = []
+        state = {}
+
+        def visit(name, path):
+            if state.get(name) == "done":
+                return
+            if state.get(name) == "visiting":
+                cycle = " -> ".join(path[path.index(name) :] + [name])
+                raise ValueError(
+                    f"Circular dependency between deduction inputs: {cycle}"
+                )
+            if name not in providers:
+                if name not in fields:
+                    fields.append(name)
+                state[name] = "done"
+                return
+            state[name] = "visiting"
+            inputs, compute = providers[name]
+            for dependency in inputs:
+                visit(dependency, path + [name])
+            self.steps.append((name, compute))
+            state[name] = "done"
+
+        # Derived values are always evaluated: the calculators read them too.
+        for name in (
+            tuple(value.name for value in derived_values) + self.deduction_names
+        ):
+            visit(name, [])
+        self.fields = tuple(fields)
+
+    def evaluate(self, values, ops=SCALAR_OPS):
+        """
+        Run every step in order, adding derived values, each deduction and
+        'total_deductions' to ``values``.
+
+        :param values: Dict holding at least every name in ``fields``
+        :param ops: SCALAR_OPS for one business, numpy for columns
+        :return: The same dict, filled in
+        """
+        for name, compute in self.steps:
+            values[name] = compute(values, ops)
+        total = 0.0
+        for name in self._total_names:
+            total = total + values[name]
+        values["total_deductions"] = total
+        return values
+
+    def evaluate_business(self, business):
+        """Evaluate the pipeline for one Business object."""
+        values = {field: getattr(business, field) for field in self.fields}
+        return self.evaluate(values, SCALAR_OPS)
@@ -6,34 +6,103 @@ from business_tax_calculator.model.deduction.retirement_contribution_deduction i
 from business_tax_calculator.model.deduction.home_office_deduction import HomeOfficeDeduction
 from business_tax_calculator.model.deduction.other_deduction import OtherDeduction
 from business_tax_calculator.model.deduction.deduction_constants import DeductionName
-from typing import List
+from business_tax_calculator.model.deduction.deduction_pipeline import DeductionPipeline
+from business_tax_calculator.utils.plugins import DEDUCTION_PLUGINS, load_plugins
+from typing import Dict, List
 
 class DeductionRegistry:
-    """Registry that manages available deduction types."""
+    """
+    Registry that manages available deduction types.
+
+    The standard deductions and any installed deduction plugins are
+    compiled once per class into a DeductionPipeline shared by every
+    registry; a registry only compiles its own pipeline after a custom
+    deduction is registered on it. Plugins are imported when the pipeline
+    is first needed, not when the registry is created. Deduction objects
+    are created on demand for callers that ask for them.
+    """
+
+    DEFAULT_DEDUCTION_TYPES = (
+        BusinessExpensesDeduction,
+        SelfEmploymentTaxDeduction,
+        HealthInsuranceDeduction,
+        RetirementContributionDeduction,
+        HomeOfficeDeduction,
+        OtherDeduction,
+    )
+
+    _default_pipeline = None
+    _default_plugins = None
 
     def __init__(self):
-        self._deductions: List[BaseDeduction] = []
-        self._register_default_deductions()
-
-    def _register_default_deductions(self):
-        """Register all standard deduction types."""
-        self.register(BusinessExpensesDeduction())
-        self.register(SelfEmploymentTaxDeduction())
-        self.register(HealthInsuranceDeduction())
-        self.register(RetirementContributionDeduction())
-        self.register(HomeOfficeDeduction())
-        self.register(OtherDeduction())
+        self._custom: Dict[DeductionName, BaseDeduction] = {}
+        self._pipeline = None
+        self._instances = None
+        self._values: Dict[DeductionName, float] = {}
+
+    @classmethod
+    def deduction_types(cls):
+        """The standard deductions followed by installed plugins."""
+        plugins = load_plugins(DEDUCTION_PLUGINS, BaseDeduction)
+        return cls.DEFAULT_DEDUCTION_TYPES + plugins
+
+    @classmethod
+    def default_pipeline(cls) -> DeductionPipeline:
+        """The standard and plugin deductions, compiled once and shared."""
+        plugins = load_plugins(DEDUCTION_PLUGINS, BaseDeduction)
+        if cls._default_pipeline is None or cls._default_plugins is not plugins:
+            types = cls.DEFAULT_DEDUCTION_TYPES + plugins
+            cls._default_pipeline = DeductionPipeline(types)
+            cls._default_plugins = plugins
+        return cls._default_pipeline
+
+    @property
+    def pipeline(self) -> DeductionPipeline:
+        if self._pipeline is not None:
+            return self._pipeline
+        return self.default_pipeline()
 
     def register(self, deduction: BaseDeduction):
         """Register a new deduction type."""
-        self._deductions.append(deduction)
+        self._custom[deduction.name] = deduction
+        self._pipeline = DeductionPipeline(
+            tuple(t for t in self.deduction_types() if t.name not in self._custom)
+            + tuple(type(d) for d in self._custom.values())
+        )
+        self._instances = None
+
+    def calculate(self, business) -> float:
+        """
+        Evaluate every deduction for the business in one pass.
+
+        Returns the total that reduces taxable income.
+        """
+        values = self.pipeline.evaluate_business(business)
+        self._values = {name: values[name] for name in self.pipeline.deduction_names}
+        if self._instances is not None:
+            for name, deduction in self._instances.items():
+                deduction.value = self._values[name]
+        return values["total_deductions"]
+
+    def get_deduction_values(self) -> Dict[DeductionName, float]:
+        """Deduction amounts from the most recent calculate()."""
+        return dict(self._values)
+
+    def _deductions(self) -> Dict[DeductionName, BaseDeduction]:
+        if self._instances is None:
+            self._instances = {}
+            for name, deduction_type in self.pipeline.by_name.items():
+                deduction = self._custom.get(name) or deduction_type()
+                deduction.value = self._values.get(name, 0.0)
+                self._instances[name] = deduction
+        return self._instances
 
     def get_available_deductions(self) -> List[BaseDeduction]:
-        return self._deductions
+        return list(self._deductions().values())
     
     def get_deduction_by_name(self, name: DeductionName) -> BaseDeduction:
         """Get a deduction by its name."""
-        for deduction in self._deductions:
-            if deduction.name == name:
-                return deduction
-        raise ValueError(f"Deduction '{name}' not found in registry.")
\ No newline at end of file
+        try:
+            return self._deductions()[name]
+        except KeyError:
+            raise ValueError(f"Deduction '{name}' not found in registry.") from None
@@ -1,13 +1,22 @@
 from business_tax_calculator.model.deduction.base_deduction import BaseDeduction
 from business_tax_calculator.model.deduction.deduction_constants import DeductionName
 from business_tax_calculator.utils.decorators import classproperty
+from business_tax_calculator.utils.config import HEALTH_INSURANCE_DEDUCTION_RATE
+
 
 class HealthInsuranceDeduction(BaseDeduction):
+    """Self-employed health insurance premiums, limited to net profit."""
+
+    inputs = ("health_insurance_premiums", "net_income", "pass_through")
 
     @classproperty
     def name(cls) -> DeductionName:
         return DeductionName.HEALTH_INSURANCE_DEDUCTION
-        
-    @property
-    def value(self) -> float:
-        return 0.0  # Replace with actual calculation logic
\ No newline at end of file
+
+    @staticmethod
+    def compute(values, ops):
+        amount = ops.minimum(
+            values["health_insurance_premiums"] * HEALTH_INSURANCE_DEDUCTION_RATE,
+            ops.maximum(0.0, values["net_income"]),
+        )
+        return ops.where(values["pass_through"], amount, 0.0)
@@ -1,14 +1,28 @@
 from business_tax_calculator.model.deduction.base_deduction import BaseDeduction
 from business_tax_calculator.model.deduction.deduction_constants import DeductionName
 from business_tax_calculator.utils.decorators import classproperty
+from business_tax_calculator.utils.config import (
+    HOME_OFFICE_DEDUCTION_RATE,
+    HOME_OFFICE_MAX_SQUARE_FEET,
+)
+
 
 class HomeOfficeDeduction(BaseDeduction):
-    """Home office expense deduction."""
+    """Home office expense deduction (simplified method), limited to net profit."""
+
+    inputs = ("home_office_deduction", "net_income", "pass_through")
 
     @classproperty
     def name(cls) -> DeductionName:
         return DeductionName.HOME_OFFICE_DEDUCTION
-        
-    @property
-    def value(self) -> float:
-        return 0.0  # Replace with actual calculation logic
\ No newline at end of file
+
+    @staticmethod
+    def compute(values, ops):
+        amount = ops.minimum(
+            ops.minimum(
+                values["home_office_deduction"],
+                HOME_OFFICE_DEDUCTION_RATE * HOME_OFFICE_MAX_SQUARE_FEET,
+            ),
+            ops.maximum(0.0, values["net_income"]),
+        )
+        return ops.where(values["pass_through"], amount, 0.0)
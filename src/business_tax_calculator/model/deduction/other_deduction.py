@@ -4,11 +4,13 @@ from business_tax_calculator.utils.decorators import classproperty
 
 class OtherDeduction(BaseDeduction):
     """Other miscellaneous deductions."""
-    
+
+    inputs = ("other_deductions",)
+
     @classproperty
     def name(cls) -> DeductionName:
         return DeductionName.OTHER_DEDUCTION
-        
-    @property
-    def value(self) -> float:
-        return 0.0  # Replace with actual calculation logic
\ No newline at end of file
+
+    @staticmethod
+    def compute(values, ops):
+        return values["other_deductions"] * 1.0
@@ -1,16 +1,25 @@
 from business_tax_calculator.model.deduction.base_deduction import BaseDeduction
 from business_tax_calculator.model.deduction.deduction_constants import DeductionName
 from business_tax_calculator.utils.decorators import classproperty
-from typing import Any
+from business_tax_calculator.utils.config import RETIREMENT_CONTRIBUTION_LIMITS
 
 
 class RetirementContributionDeduction(BaseDeduction):
-    """Retirement contribution deduction."""
+    """Retirement contribution deduction, capped at the SEP IRA limit and net profit."""
+
+    inputs = ("retirement_contributions", "net_income", "pass_through")
 
     @classproperty
     def name(cls) -> DeductionName:
         return DeductionName.RETIREMENT_CONTRIBUTION_DEDUCTION
-        
-    @property
-    def value(self) -> float:
-        return 0.0  # Replace with actual calculation logic
\ No newline at end of file
+
+    @staticmethod
+    def compute(values, ops):
+        amount = ops.minimum(
+            ops.minimum(
+                values["retirement_contributions"],
+                RETIREMENT_CONTRIBUTION_LIMITS["SEP IRA"],
+            ),
+            ops.maximum(0.0, values["net_income"]),
+        )
+        return ops.where(values["pass_through"], amount, 0.0)
@@ -1,15 +1,30 @@
 from business_tax_calculator.model.deduction.base_deduction import BaseDeduction
 from business_tax_calculator.model.deduction.deduction_constants import DeductionName
 from business_tax_calculator.utils.decorators import classproperty
-from typing import Any
+from business_tax_calculator.utils.config import SELF_EMPLOYMENT_TAX_DEDUCTION
 
 
 class SelfEmploymentTaxDeduction(BaseDeduction):
+    """
+    Deductible half of self-employment tax for sole proprietors and LLCs.
+
+    SE tax and this deduction are circular if SE tax is taken from taxable
+    income, which in turn depends on this deduction. The pipeline breaks
+    the cycle the way the IRS worksheet does: the SE tax read here is the
+    preliminary tax on taxable compensation (92.35% of net earnings), which
+    depends only on Business fields.
+    """
+
+    inputs = ("self_employment_tax", "self_employed")
 
     @classproperty
     def name(cls) -> DeductionName:
         return DeductionName.SELF_EMPLOYMENT_TAX_DEDUCTION
-        
-    @property
-    def value(self) -> float:
-        return 0.0  # Replace with actual calculation logic
\ No newline at end of file
+
+    @staticmethod
+    def compute(values, ops):
+        return ops.where(
+            values["self_employed"],
+            values["self_employment_tax"] * SELF_EMPLOYMENT_TAX_DEDUCTION,
+            0.0,
+        )
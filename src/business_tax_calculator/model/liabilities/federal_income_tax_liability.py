@@ -1,6 +1,7 @@
 from dataclasses import dataclass
+from business_tax_calculator.utils.array_ops import SCALAR_OPS
 from business_tax_calculator.utils.constants import MarginalTaxBrackets
-from business_tax_calculator.model.liabilities.liability import Liability
+from business_tax_calculator.model.liabilities.liability import Liability, bracket_tax
 
 @dataclass
 class FederalIncomeTaxLiability(Liability):
@@ -13,15 +14,8 @@ class FederalIncomeTaxLiability(Liability):
         :param income: The taxable income
         :return: The federal income tax
         """
-        tax = 0.0
-        brackets = MarginalTaxBrackets.FEDERAL.value
-
-        for lower, upper, rate in brackets:
-            if taxable_income > upper:
-                tax += (upper - lower + 1) * rate
-            else:
-                tax += max(0, taxable_income - lower) * rate
-                break
-
-        self.value = tax
+        self.value = self.evaluate(taxable_income, SCALAR_OPS)
         return self.value
+
+    def evaluate(self, taxable_income, ops):
+        return bracket_tax(taxable_income, MarginalTaxBrackets.FEDERAL.value, ops)
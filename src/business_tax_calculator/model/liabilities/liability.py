@@ -1,5 +1,7 @@
 from abc import ABC, abstractmethod
 
+from business_tax_calculator.utils.array_ops import SCALAR_OPS
+
 class Liability(ABC):
     
     def __init__(self):
@@ -10,10 +12,46 @@ class Liability(ABC):
     def calculate(self, taxable_income: float) -> float:
         pass
 
+    def evaluate(self, taxable_income, ops):
+        """
+        Side-effect free form of calculate(): evaluates a float with
+        SCALAR_OPS or a numpy array of incomes with the numpy module.
+
+        Liabilities defining only calculate() are evaluated through it, one
+        income at a time; override this to vectorize them.
+        """
+        saved = getattr(self, "_value", 0.0)
+        try:
+            if ops is SCALAR_OPS:
+                return self.calculate(taxable_income)
+            return ops.fromiter(
+                (self.calculate(float(income)) for income in taxable_income),
+                dtype=float,
+                count=len(taxable_income),
+            )
+        finally:
+            self._value = saved
+
     @property
     def value(self) -> float:
         return self._value
 
     @value.setter
     def value(self, new_value: float):
-        self._value = new_value
\ No newline at end of file
+        self._value = new_value
+
+
+def bracket_tax(taxable_income, brackets, ops):
+    """
+    Marginal tax over (lower, upper, rate) brackets. Brackets above the
+    income contribute zero, so summing every bracket matches stopping at
+    the first bracket that contains the income.
+    """
+    tax = 0.0
+    for lower, upper, rate in brackets:
+        tax = tax + ops.where(
+            taxable_income > upper,
+            (upper - lower + 1) * rate,
+            ops.maximum(0, taxable_income - lower) * rate,
+        )
+    return tax
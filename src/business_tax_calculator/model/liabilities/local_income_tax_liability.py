@@ -1,4 +1,5 @@
 from dataclasses import dataclass
+from business_tax_calculator.utils.array_ops import SCALAR_OPS
 from business_tax_calculator.model.liabilities.liability import Liability
 
 @dataclass
@@ -9,6 +10,8 @@ class LocalIncomeTaxLiability(Liability):
     rate: float = 0.032  # Default local tax rate, can be parameterized
 
     def calculate(self, taxable_income: float) -> float:
-        tax = taxable_income * self.rate
-        self.value = tax
-        return self.value
\ No newline at end of file
+        self.value = self.evaluate(taxable_income, SCALAR_OPS)
+        return self.value
+
+    def evaluate(self, taxable_income, ops):
+        return taxable_income * self.rate
@@ -1,4 +1,5 @@
 from dataclasses import dataclass
+from business_tax_calculator.utils.array_ops import SCALAR_OPS
 from business_tax_calculator.model.liabilities.liability import Liability
 
 @dataclass
@@ -13,12 +14,15 @@ class MedicareIncomeTaxLiability(Liability):
         :param income: The income subject to Medicare tax
         :return: The Medicare tax
         """
-        if taxable_income <= self.threshold:
-            tax = taxable_income * self.rate
-        else:
-            base_tax = self.threshold * self.rate
-            additional_tax = (taxable_income - self.threshold) * (self.rate + self.additional_rate)
-            tax = base_tax + additional_tax
+        self.value = self.evaluate(taxable_income, SCALAR_OPS)
+        return self.value
 
-        self.value = tax
-        return self.value
\ No newline at end of file
+    def evaluate(self, taxable_income, ops):
+        base_tax = self.threshold * self.rate
+        additional_rate = self.rate + self.additional_rate
+        additional_tax = (taxable_income - self.threshold) * additional_rate
+        return ops.where(
+            taxable_income <= self.threshold,
+            taxable_income * self.rate,
+            base_tax + additional_tax,
+        )
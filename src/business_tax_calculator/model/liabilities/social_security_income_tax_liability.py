@@ -1,9 +1,11 @@
 from dataclasses import dataclass
+from business_tax_calculator.utils.array_ops import SCALAR_OPS
 from business_tax_calculator.model.liabilities.liability import Liability
 
 @dataclass
 class SocialSecurityIncomeTaxLiability(Liability):
     rate: float = 0.124  # Social Security tax rate (12.4%)
+    wage_base: float = 168600  # 2024 cap for Social Security tax
 
     def calculate(self, taxable_income: float) -> float:
         """
@@ -11,8 +13,8 @@ class SocialSecurityIncomeTaxLiability(Liability):
         :param income: The income subject to Social Security tax
         :return: The Social Security tax
         """
-        taxable_income = min(taxable_income, 168600)  # 2024 cap for Social Security tax
-        tax = taxable_income * self.rate
-        
-        self.value = tax
+        self.value = self.evaluate(taxable_income, SCALAR_OPS)
         return self.value
+
+    def evaluate(self, taxable_income, ops):
+        return ops.minimum(taxable_income, self.wage_base) * self.rate
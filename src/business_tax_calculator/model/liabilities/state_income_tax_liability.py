@@ -1,20 +1,14 @@
 from dataclasses import dataclass
+from business_tax_calculator.utils.array_ops import SCALAR_OPS
 from business_tax_calculator.utils.constants import MarginalTaxBrackets
-from business_tax_calculator.model.liabilities.liability import Liability
+from business_tax_calculator.model.liabilities.liability import Liability, bracket_tax
 
 @dataclass
 class StateIncomeTaxLiability(Liability):
 
     def calculate(self, taxable_income: float) -> float:
-        tax = 0.0
-        brackets = MarginalTaxBrackets.STATE.value
-
-        for lower, upper, rate in brackets:
-            if taxable_income > upper:
-                tax += (upper - lower + 1) * rate
-            else:
-                tax += max(0, taxable_income - lower) * rate
-                break
-
-        self.value = tax
+        self.value = self.evaluate(taxable_income, SCALAR_OPS)
         return self.value
+
+    def evaluate(self, taxable_income, ops):
+        return bracket_tax(taxable_income, MarginalTaxBrackets.STATE.value, ops)
@@ -4,8 +4,14 @@ from business_tax_calculator.model.liabilities.local_income_tax_liability import
 from business_tax_calculator.model.liabilities.medicare_income_tax_liability import MedicareIncomeTaxLiability
 from business_tax_calculator.model.liabilities.social_security_income_tax_liability import SocialSecurityIncomeTaxLiability
 from business_tax_calculator.model.liabilities.liability import Liability
+from business_tax_calculator.utils.plugins import LIABILITY_PLUGINS, load_plugins
 
 class TaxLiability(Liability):
+    """
+    Sum of the built-in liabilities and any installed liability plugins
+    (e.g. surtaxes). Plugin liabilities are taxes on taxable income: they
+    are added to income tax and to the total, after the built-in ones.
+    """
     
     def __init__(self):
         
@@ -14,6 +20,17 @@ class TaxLiability(Liability):
         self.local_income_tax_liability = LocalIncomeTaxLiability()
         self.medicare_income_tax_liability = MedicareIncomeTaxLiability()
         self.social_security_income_tax_liability = SocialSecurityIncomeTaxLiability()
+        self._plugin_types = None
+        self._plugin_liabilities = ()
+
+    @property
+    def plugin_liabilities(self):
+        """Instances of the installed liability plugins, imported on first use."""
+        plugin_types = load_plugins(LIABILITY_PLUGINS, Liability)
+        if plugin_types is not self._plugin_types:
+            self._plugin_liabilities = tuple(plugin() for plugin in plugin_types)
+            self._plugin_types = plugin_types
+        return self._plugin_liabilities
         
     def calculate(self, taxable_income: float) -> float:
         
@@ -24,16 +41,33 @@ class TaxLiability(Liability):
         ss_tax = self.social_security_income_tax_liability.calculate(taxable_income)
 
         tax = federal_tax + state_tax + local_tax + medicare_tax + ss_tax
+        for liability in self.plugin_liabilities:
+            tax = tax + liability.calculate(taxable_income)
         self.value = tax
         
         return self.value
     
+    def evaluate(self, taxable_income, ops):
+        tax = (
+            self.federal_income_tax_liability.evaluate(taxable_income, ops) +
+            self.state_income_tax_liability.evaluate(taxable_income, ops) +
+            self.local_income_tax_liability.evaluate(taxable_income, ops) +
+            self.medicare_income_tax_liability.evaluate(taxable_income, ops) +
+            self.social_security_income_tax_liability.evaluate(taxable_income, ops)
+        )
+        for liability in self.plugin_liabilities:
+            tax = tax + liability.evaluate(taxable_income, ops)
+        return tax
+
     def income_tax(self) -> float:
-        return (
+        tax = (
             self.federal_income_tax_liability.value +
             self.state_income_tax_liability.value +
             self.local_income_tax_liability.value
         )
+        for liability in self.plugin_liabilities:
+            tax = tax + liability.value
+        return tax
 
     def self_employment_tax(self) -> float:
         return (
@@ -0,0 +1,139 @@
+from dataclasses import dataclass, field
+from operator import attrgetter
+
+from business_tax_calculator.utils.optional import import_optional
+
+RESULT_KEYS = (
+    "taxable_income",
+    "income_tax",
+    "self_employment_tax",
+    "social_security_tax",
+    "medicare_tax",
+    "state_tax",
+    "local_tax",
+    "total_tax",
+    "estimated_payments",
+    "tax_owed",
+    "total_deductions",
+    "qbi_deduction",
+    "profit_distributions",
+    "effective_tax_rate",
+)
+
+_result_values = attrgetter(*RESULT_KEYS)
+
+
+@dataclass(frozen=True, slots=True)
+class TaxResult:
+    """
+    Immutable calculation result with one slot per RESULT_KEYS entry.
+
+    Results read like the dicts the calculator used to return, so
+    ``result['total_tax']``, ``result.get('qbi_deduction', 0.0)`` and
+    ``dict(result)`` keep working. ``business`` is the calculated Business
+    when the result came from the full path; it is not part of equality.
+    """
+
+    taxable_income: float
+    income_tax: float
+    self_employment_tax: float
+    social_security_tax: float
+    medicare_tax: float
+    state_tax: float
+    local_tax: float
+    total_tax: float
+    estimated_payments: float
+    tax_owed: float
+    total_deductions: float
+    qbi_deduction: float
+    profit_distributions: float
+    effective_tax_rate: float
+    business: object = field(default=None, compare=False, repr=False)
+
+    def keys(self):
+        if self.business is None:
+            return RESULT_KEYS
+        return ("business",) + RESULT_KEYS
+
+    def __iter__(self):
+        return iter(self.keys())
+
+    def __contains__(self, key):
+        return key in self.keys()
+
+    def __getitem__(self, key):
+        """
+        Look a value up by its RESULT_KEYS name.
+
+        :param key: Result name, or 'business'
+        :raises KeyError: If key is not a result name
+        """
+        if key not in self.keys():
+            raise KeyError(key)
+        return getattr(self, key)
+
+    def get(self, key, default=None):
+        if key not in self.keys():
+            return default
+        return getattr(self, key)
+
+    def values(self):
+        return tuple(getattr(self, key) for key in self.keys())
+
+    def items(self):
+        return tuple((key, getattr(self, key)) for key in self.keys())
+
+    def as_tuple(self):
+        """The results in RESULT_KEYS order, without the business."""
+        return _result_values(self)
+
+    def as_dict(self):
+        """The results keyed by RESULT_KEYS, without the business."""
+        return dict(zip(RESULT_KEYS, _result_values(self)))
+
+    @staticmethod
+    def to_matrix(results):
+        """
+        Pack results into one float64 array.
+
+        :param results: Sequence of TaxResult
+        :return: Array of shape (len(results), len(RESULT_KEYS))
+        """
+        np = import_optional("numpy", "batch")
+        matrix = np.array([_result_values(r) for r in results], dtype=np.float64)
+        return matrix.reshape(len(results), len(RESULT_KEYS))
+
+    @staticmethod
+    def to_columns(results):
+        """
+        Pack results into one contiguous float64 array per RESULT_KEYS name.
+
+        :param results: Sequence of TaxResult
+        :return: Dict of result name to array
+        """
+        np = import_optional("numpy", "batch")
+        matrix = np.ascontiguousarray(TaxResult.to_matrix(results).T)
+        return dict(zip(RESULT_KEYS, matrix))
+
+    @classmethod
+    def from_matrix(cls, matrix):
+        """
+        Unpack an array laid out like calculator.vectorized.calculate_matrix.
+
+        :param matrix: Array of shape (n, len(RESULT_KEYS))
+        :return: List of TaxResult
+        """
+        return [cls(*row) for row in matrix.tolist()]
+
+    @classmethod
+    def from_columns(cls, columns):
+        """
+        Unpack per-key arrays such as calculator.vectorized.calculate_columns
+        returns.
+
+        :param columns: Dict of result name to array
+        :return: List of TaxResult
+        """
+        return [
+            cls(*row) for row in zip(*(columns[key].tolist() for key in RESULT_KEYS))
+        ]
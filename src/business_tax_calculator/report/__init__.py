@@ -0,0 +1,4 @@
+"""
+Report package for exporting and rendering calculation results.
+"""
+# This file makes the directory a Python package
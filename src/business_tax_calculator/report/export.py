@@ -0,0 +1,338 @@
+# report/export.py
+"""
+Streaming CSV and Excel export of calculation results.
+
+Rows are written as they arrive and never collected, so peak memory does
+not depend on how many rows are exported:
+
+- CSV is written with csv.writerows a chunk at a time.
+- Excel (.xlsx) is written by a write-only writer that streams the sheet
+  XML straight into the zip archive. Cells hold numbers, not formatted
+  strings: money columns carry a currency number format and rates a
+  percentage one, so the sheet sorts, sums and charts as expected.
+  Strings are stored inline, since a shared-strings table would grow
+  with the row count.
+
+Batch runs write .xlsx through XlsxChunkWriter (see calculator.batch),
+and export_rows() exports any iterable of mappings, e.g. the rows of a
+scenario store query.
+"""
+
+import csv
+import math
+import os
+import zipfile
+from itertools import chain, islice
+from xml.sax.saxutils import escape
+
+DEFAULT_CHUNK_SIZE = 10_000
+
+# Excel caps a worksheet at 1,048,576 rows including the header.
+XLSX_MAX_ROWS = 1_048_576
+
+# Cell styles, indexes into cellXfs of STYLES_XML.
+GENERAL = 0
+CURRENCY = 1
+PERCENT_POINTS = 2  # values already scaled to percent, e.g. 24.5
+PERCENT = 3  # fractions, e.g. 0.03
+HEADER = 4
+
+GENERAL_COLUMNS = ("run_id",)
+
+_XML_DECLARATION = '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>\n'
+_OPENXML = "http://schemas.openxmlformats.org"
+_SPREADSHEETML = f"{_OPENXML}/spreadsheetml/2006/main"
+_RELATIONSHIPS = f"{_OPENXML}/officeDocument/2006/relationships"
+_CONTENT_TYPE = "application/vnd.openxmlformats-officedocument.spreadsheetml"
+
+CONTENT_TYPES_XML = (
+    _XML_DECLARATION
+    + f"""<Types xmlns="{_OPENXML}/package/2006/content-types">
+<Default Extension="rels" \
+ContentType="application/vnd.openxmlformats-package.relationships+xml"/>
+<Default Extension="xml" ContentType="application/xml"/>
+<Override PartName="/xl/workbook.xml" \
+ContentType="{_CONTENT_TYPE}.sheet.main+xml"/>
+<Override PartName="/xl/worksheets/sheet1.xml" \
+ContentType="{_CONTENT_TYPE}.worksheet+xml"/>
+<Override PartName="/xl/styles.xml" \
+ContentType="{_CONTENT_TYPE}.styles+xml"/>
+</Types>"""
+)
+
+ROOT_RELS_XML = (
+    _XML_DECLARATION
+    + f"""<Relationships xmlns="{_OPENXML}/package/2006/relationships">
+<Relationship Id="rId1" Type="{_RELATIONSHIPS}/officeDocument" \
+Target="xl/workbook.xml"/>
+</Relationships>"""
+)
+
+WORKBOOK_RELS_XML = (
+    _XML_DECLARATION
+    + f"""<Relationships xmlns="{_OPENXML}/package/2006/relationships">
+<Relationship Id="rId1" Type="{_RELATIONSHIPS}/worksheet" \
+Target="worksheets/sheet1.xml"/>
+<Relationship Id="rId2" Type="{_RELATIONSHIPS}/styles" Target="styles.xml"/>
+</Relationships>"""
+)
+
+WORKBOOK_XML = (
+    _XML_DECLARATION
+    + f"""<workbook xmlns="{_SPREADSHEETML}" xmlns:r="{_RELATIONSHIPS}">
+<sheets><sheet name="{{name}}" sheetId="1" r:id="rId1"/></sheets>
+</workbook>"""
+)
+
+STYLES_XML = (
+    _XML_DECLARATION
+    + f"""<styleSheet xmlns="{_SPREADSHEETML}">
+<numFmts count="2">
+<numFmt numFmtId="164" formatCode="&quot;$&quot;#,##0.00"/>
+<numFmt numFmtId="165" formatCode="0.00&quot;%&quot;"/>
+</numFmts>
+<fonts count="2">
+<font><sz val="11"/><name val="Calibri"/></font>
+<font><b/><sz val="11"/><name val="Calibri"/></font>
+</fonts>
+<fills count="2">
+<fill><patternFill patternType="none"/></fill>
+<fill><patternFill patternType="gray125"/></fill>
+</fills>
+<borders count="1"><border><left/><right/><top/><bottom/><diagonal/></border></borders>
+<cellStyleXfs count="1">\
+<xf numFmtId="0" fontId="0" fillId="0" borderId="0"/></cellStyleXfs>
+<cellXfs count="5">
+<xf numFmtId="0" fontId="0" fillId="0" borderId="0" xfId="0"/>
+<xf numFmtId="164" fontId="0" fillId="0" borderId="0" xfId="0" applyNumberFormat="1"/>
+<xf numFmtId="165" fontId="0" fillId="0" borderId="0" xfId="0" applyNumberFormat="1"/>
+<xf numFmtId="10" fontId="0" fillId="0" borderId="0" xfId="0" applyNumberFormat="1"/>
+<xf numFmtId="0" fontId="1" fillId="0" borderId="0" xfId="0" applyFont="1"/>
+</cellXfs>
+</styleSheet>"""
+)
+
+SHEET_HEAD = (
+    _XML_DECLARATION
+    + f"""<worksheet xmlns="{_SPREADSHEETML}">
+<sheetViews><sheetView workbookViewId="0">\
+<pane ySplit="1" topLeftCell="A2" state="frozen" activePane="bottomLeft"/>\
+</sheetView></sheetViews>
+<cols><col min="1" max="{{count}}" width="18" customWidth="1"/></cols>
+<sheetData>"""
+)
+
+SHEET_TAIL = "</sheetData>\n</worksheet>"
+
+
+def column_style(name, is_text=False):
+    """Cell style for a column: currency unless it is text, an id or a rate."""
+    if is_text or name in GENERAL_COLUMNS:
+        return GENERAL
+    if name == "effective_tax_rate":
+        return PERCENT_POINTS
+    if name.endswith("_rate"):
+        return PERCENT
+    return CURRENCY
+
+
+def _text_cell(value, style=GENERAL):
+    text = escape(str(value))
+    space = ' xml:space="preserve"' if text != text.strip() else ""
+    styled = f' s="{style}"' if style else ""
+    return f'<c t="inlineStr"{styled}><is><t{space}>{text}</t></is></c>'
+
+
+def _text_cells(values):
+    # Most text columns repeat a handful of values; format each once.
+    formatted = {}
+    cells = []
+    for value in values:
+        cell = formatted.get(value)
+        if cell is None:
+            cell = formatted[value] = _text_cell(value)
+        cells.append(cell)
+    return cells
+
+
+def _number_cells(values, style):
+    prefix = f'<c s="{style}"><v>'
+    cells = []
+    for value in values:
+        # Excel has no NaN or infinity; leave such cells blank.
+        if value is None or not math.isfinite(value):
+            cells.append("<c/>")
+        else:
+            cells.append(f"{prefix}{value!r}</v></c>")
+    return cells
+
+
+class XlsxWriter:
+    """
+    Write-only single-sheet .xlsx writer with constant memory.
+
+    Args:
+        path (str): Destination file
+        columns (tuple): Column names, written as a bold header row
+        text_columns (tuple): Columns written as strings; the rest are
+            numbers styled by column_style()
+        sheet_name (str): Worksheet name
+    """
+
+    def __init__(self, path, columns, text_columns=(), sheet_name="Results"):
+        self.columns = tuple(columns)
+        self.rows = 0
+        text = set(text_columns)
+        self._cells = [
+            (name in text, column_style(name, name in text)) for name in self.columns
+        ]
+        self._zip = zipfile.ZipFile(path, "w", zipfile.ZIP_DEFLATED, allowZip64=True)
+        self._zip.writestr("[Content_Types].xml", CONTENT_TYPES_XML)
+        self._zip.writestr("_rels/.rels", ROOT_RELS_XML)
+        self._zip.writestr("xl/_rels/workbook.xml.rels", WORKBOOK_RELS_XML)
+        self._zip.writestr(
+            "xl/workbook.xml", WORKBOOK_XML.format(name=escape(sheet_name)[:31])
+        )
+        self._zip.writestr("xl/styles.xml", STYLES_XML)
+        # The sheet is the last entry and stays open: zipfile allows one
+        # entry open for writing at a time.
+        self._sheet = self._zip.open("xl/worksheets/sheet1.xml", "w", force_zip64=True)
+        self._write(SHEET_HEAD.format(count=len(self.columns)))
+        header = "".join(_text_cell(name, HEADER) for name in self.columns)
+        self._write(f"<row>{header}</row>")
+
+    def _write(self, text):
+        self._sheet.write(text.encode("utf-8"))
+
+    def write_rows(self, rows, batch_rows=1_000):
+        """Append rows, each a sequence of values in column order."""
+        for batch in _chunks(rows, batch_rows):
+            self.write_columns(list(zip(*batch)))
+
+    def write_columns(self, columns):
+        """
+        Append rows given column by column.
+
+        Cells are formatted a column at a time, which is several times
+        faster than cell by cell; pass a few thousand rows per call to keep
+        the formatted text small.
+
+        Args:
+            columns (list): One sequence of values per column, in order
+        """
+        n = len(columns[0]) if columns else 0
+        if self.rows + n >= XLSX_MAX_ROWS:
+            raise ValueError(
+                f"An .xlsx sheet holds at most {XLSX_MAX_ROWS - 1:,} rows; "
+                "export to CSV instead"
+            )
+        cells = [
+            _text_cells(values) if is_text else _number_cells(values, style)
+            for (is_text, style), values in zip(self._cells, columns)
+        ]
+        self._write("".join(f"<row>{''.join(row)}</row>" for row in zip(*cells)))
+        self.rows += n
+
+    def close(self):
+        if self._zip is None:
+            return
+        self._write(SHEET_TAIL)
+        self._sheet.close()
+        self._zip.close()
+        self._zip = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+class XlsxChunkWriter:
+    """
+    Writes calculated batch chunks to an .xlsx sheet.
+
+    Args:
+        path (str): Destination file
+    """
+
+    def __init__(self, path):
+        from business_tax_calculator.calculator.batch import (
+            CARRIED_NUMERIC_COLUMNS,
+            INPUT_TEXT_COLUMNS,
+        )
+        from business_tax_calculator.calculator.tax_calculator import RESULT_KEYS
+
+        self._text = INPUT_TEXT_COLUMNS
+        self._numeric = CARRIED_NUMERIC_COLUMNS
+        self._writer = XlsxWriter(
+            path, INPUT_TEXT_COLUMNS + CARRIED_NUMERIC_COLUMNS + RESULT_KEYS, self._text
+        )
+
+    def write(self, columns, results, batch_rows=1_000):
+        for start in range(0, len(results), batch_rows):
+            stop = start + batch_rows
+            data = [columns[name][start:stop].tolist() for name in self._text]
+            data += [columns[name][start:stop].tolist() for name in self._numeric]
+            data += results[start:stop].T.tolist()
+            self._writer.write_columns(data)
+
+    def close(self):
+        self._writer.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+def _chunks(iterable, size):
+    iterator = iter(iterable)
+    while True:
+        chunk = list(islice(iterator, size))
+        if not chunk:
+            return
+        yield chunk
+
+
+def export_rows(rows, path, columns=None, chunk_size=DEFAULT_CHUNK_SIZE):
+    """
+    Stream an iterable of mappings to a .csv or .xlsx file.
+
+    Args:
+        rows (iterable): Mappings of column name to value, e.g. dicts or
+            TaxResult records; consumed once, chunk_size at a time
+        path (str): Destination; .xlsx writes Excel, anything else CSV
+        columns (list): Columns to write, defaults to the first row's keys
+        chunk_size (int): Rows held in memory at once
+
+    Returns:
+        int: Number of rows written
+    """
+    chunks = _chunks(rows, chunk_size)
+    first = next(chunks, None)
+    if first is None:
+        first_row, chunks = {}, iter(())
+    else:
+        first_row, chunks = first[0], chain([first], chunks)
+    columns = list(first_row.keys() if columns is None else columns)
+
+    def values(chunk):
+        return ([row[name] for name in columns] for row in chunk)
+
+    count = 0
+    if os.path.splitext(path)[1].lower() == ".xlsx":
+        text = [name for name in columns if isinstance(first_row.get(name), str)]
+        with XlsxWriter(path, columns, text) as writer:
+            for chunk in chunks:
+                writer.write_rows(values(chunk))
+                count += len(chunk)
+        return count
+    with open(path, "w", newline="") as handle:
+        writer = csv.writer(handle)
+        writer.writerow(columns)
+        for chunk in chunks:
+            writer.writerows(values(chunk))
+            count += len(chunk)
+    return count
@@ -0,0 +1,395 @@
+# report/html.py
+"""
+Per-client HTML tax-estimate reports rendered from stored batch results.
+
+Reports never recalculate: they read the results a batch run already
+wrote, from a column store (.store), a batch CSV or a Parquet/Arrow file,
+and lay out the same figures display_results() prints for one business.
+
+Templates are plain HTML with ``{{ field }}`` placeholders, optionally
+filtered as ``{{ field|currency }}``, ``{{ field|percent }}`` or
+``{{ field|raw }}`` (not escaped). compile_template() parses a template
+once into literal text and field lookups, so rendering a page is a single
+join. Fields are the stored input and result columns plus:
+
+    net_income      revenue - expenses
+    details         <tr> rows of the breakdown, already HTML
+    taxes           <tr> rows of the tax breakdown, already HTML
+
+Pages are rendered by a process pool, a few hundred clients per task,
+with at most ``2 * workers`` tasks in flight so memory stays bounded.
+Each page is written to a temporary file and renamed into place, so a
+page that exists is complete; with resume=True, clients whose page
+already exists are skipped and an interrupted run picks up where it
+stopped.
+"""
+
+import csv
+import html
+import os
+import re
+import time
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+from dataclasses import dataclass
+
+from business_tax_calculator.calculator.batch import (
+    CARRIED_NUMERIC_COLUMNS,
+    file_format,
+)
+from business_tax_calculator.calculator.tax_calculator import RESULT_KEYS
+from business_tax_calculator.model.tax_result import TaxResult
+from business_tax_calculator.utils.helpers import format_currency
+from business_tax_calculator.utils.optional import import_optional
+
+DEFAULT_TASK_SIZE = 250
+READ_CHUNK_SIZE = 10_000
+
+DEFAULT_TEMPLATE = """<!DOCTYPE html>
+<html lang="en">
+<head>
+<meta charset="utf-8">
+<title>Tax estimate: {{ name }}</title>
+<style>
+body { font-family: sans-serif; max-width: 40em; margin: 2em auto; }
+table { border-collapse: collapse; width: 100%; margin-bottom: 1.5em; }
+td { padding: 0.25em 0.5em; border-bottom: 1px solid #ddd; }
+td.amount { text-align: right; }
+tr.total td { font-weight: bold; }
+</style>
+</head>
+<body>
+<h1>Tax Liability Estimate</h1>
+<p>{{ name }} &middot; {{ entity_type }} &middot; client {{ client_id }}</p>
+<table>
+{{ details|raw }}
+</table>
+<h2>Tax Breakdown</h2>
+<table>
+{{ taxes|raw }}
+<tr class="total"><td>Total Tax Liability</td>
+<td class="amount">{{ total_tax|currency }}</td></tr>
+<tr><td>Estimated Tax Payments</td>
+<td class="amount">{{ estimated_payments|currency }}</td></tr>
+<tr class="total"><td>Remaining Tax Due</td>
+<td class="amount">{{ tax_owed|currency }}</td></tr>
+<tr><td>Effective Tax Rate</td>
+<td class="amount">{{ effective_tax_rate|percent }}</td></tr>
+</table>
+<p><small>This is an estimate only. Consult with a tax professional for
+accurate tax calculations and advice tailored to your situation.</small></p>
+</body>
+</html>
+"""
+
+FILTERS = {
+    "": lambda value: html.escape(str(value)),
+    "raw": str,
+    "currency": lambda value: html.escape(format_currency(value)),
+    "percent": lambda value: f"{value:.2f}%",
+}
+
+_PLACEHOLDER = re.compile(r"\{\{\s*(\w+)\s*(?:\|\s*(\w+)\s*)?\}\}")
+_UNSAFE = re.compile(r"[^A-Za-z0-9._-]")
+
+
+class CompiledTemplate:
+    """
+    A template split into literal text and (field, filter) lookups.
+
+    Args:
+        literals (list): Text before, between and after the placeholders
+        fields (list): (field name, filter function) per placeholder
+    """
+
+    def __init__(self, literals, fields):
+        self.literals = literals
+        self.fields = fields
+        self.names = tuple(name for name, _ in fields)
+
+    def render(self, context):
+        parts = [self.literals[0]]
+        for (name, apply), literal in zip(self.fields, self.literals[1:]):
+            parts.append(apply(context[name]))
+            parts.append(literal)
+        return "".join(parts)
+
+
+def compile_template(text):
+    """
+    Parse a template once for repeated rendering.
+
+    Raises:
+        ValueError: If a placeholder names an unknown filter
+    """
+    literals, fields, position = [], [], 0
+    for match in _PLACEHOLDER.finditer(text):
+        name, filter_name = match.group(1), match.group(2) or ""
+        if filter_name not in FILTERS:
+            raise ValueError(f"Unknown template filter: {filter_name!r}")
+        literals.append(text[position : match.start()])
+        fields.append((name, FILTERS[filter_name]))
+        position = match.end()
+    literals.append(text[position:])
+    return CompiledTemplate(literals, fields)
+
+
+def _row(label, value):
+    return (
+        f"<tr><td>{html.escape(label)}</td>"
+        f'<td class="amount">{html.escape(value)}</td></tr>'
+    )
+
+
+def report_context(record):
+    """
+    Template fields of one stored record, laid out like display_results().
+
+    Args:
+        record (dict): Stored input and result columns of one client
+    """
+    result = TaxResult(*(record[key] for key in RESULT_KEYS))
+    entity_type = record.get("entity_type", "")
+    revenue = record.get("revenue", 0.0)
+    expenses = record.get("expenses", 0.0)
+    net_income = revenue - expenses
+
+    details = [
+        _row("Revenue", format_currency(revenue)),
+        _row("Expenses", format_currency(expenses)),
+        _row("Net Income (before deductions)", format_currency(net_income)),
+    ]
+    if entity_type == "S-Corp":
+        salary = record.get("reasonable_salary", 0.0)
+        details.append(_row("Owner's Salary", format_currency(salary)))
+        details.append(
+            _row("Profit Distributions", format_currency(result.profit_distributions))
+        )
+    details.append(_row("Total Deductions", format_currency(result.total_deductions)))
+    if result.qbi_deduction > 0:
+        details.append(
+            _row(
+                "Qualified Business Income Deduction",
+                format_currency(result.qbi_deduction),
+            )
+        )
+    details.append(_row("Taxable Income", format_currency(result.taxable_income)))
+
+    taxes = [_row("Federal Income Tax", format_currency(result.income_tax))]
+    if result.self_employment_tax > 0 or entity_type == "S-Corp":
+        if entity_type in ("Sole Proprietorship", "LLC"):
+            label = "Self-Employment Tax"
+        else:
+            label = "Employment Taxes"
+        taxes.append(_row(label, format_currency(result.self_employment_tax)))
+        taxes.append(
+            _row(" - Social Security Tax", format_currency(result.social_security_tax))
+        )
+        taxes.append(_row(" - Medicare Tax", format_currency(result.medicare_tax)))
+    if result.state_tax > 0:
+        taxes.append(
+            _row("Estimated State Income Tax", format_currency(result.state_tax))
+        )
+    if result.local_tax > 0:
+        taxes.append(
+            _row("Estimated Local Income Tax", format_currency(result.local_tax))
+        )
+
+    context = dict(record)
+    context.update(result.as_dict())
+    context["name"] = record.get("name") or record.get("client_id", "")
+    context["net_income"] = net_income
+    context["details"] = "\n".join(details)
+    context["taxes"] = "\n".join(taxes)
+    return context
+
+
+def page_name(client_id, row):
+    """File name of a client's page; row numbers stand in for blank ids."""
+    if not client_id:
+        return f"row-{row}.html"
+    return _UNSAFE.sub("_", client_id) + ".html"
+
+
+def _store_records(path, chunk_size):
+    from business_tax_calculator.storage.column_store import ColumnStore
+
+    with ColumnStore(path) as store:
+        for start in range(0, len(store), chunk_size):
+            data = {}
+            for name, values in store.columns.items():
+                values = values[start : start + chunk_size].tolist()
+                if store.dtypes[name].kind == "S":
+                    values = [value.decode("utf-8") for value in values]
+                data[name] = values
+            yield [dict(zip(data, row)) for row in zip(*data.values())]
+
+
+def _csv_records(path, chunk_size):
+    numeric = set(CARRIED_NUMERIC_COLUMNS + RESULT_KEYS)
+    with open(path, newline="") as handle:
+        reader = csv.reader(handle)
+        header = next(reader, [])
+        missing = [key for key in RESULT_KEYS if key not in header]
+        if missing:
+            raise ValueError(f"{path} holds no batch results: missing {missing}")
+        records = []
+        for values in reader:
+            record = dict(zip(header, values))
+            for name in numeric.intersection(record):
+                record[name] = float(record[name] or 0.0)
+            records.append(record)
+            if len(records) >= chunk_size:
+                yield records
+                records = []
+        if records:
+            yield records
+
+
+def _arrow_records(path, chunk_size, fmt):
+    pa = import_optional("pyarrow", "arrow")
+    if fmt == "parquet":
+        import pyarrow.parquet as pq
+
+        batches = pq.ParquetFile(path).iter_batches(batch_size=chunk_size)
+        yield from (batch.to_pylist() for batch in batches)
+        return
+    with pa.memory_map(path) as source:
+        table = pa.ipc.open_file(source).read_all()
+        for batch in table.to_batches(max_chunksize=chunk_size):
+            yield batch.to_pylist()
+
+
+def read_result_records(path, chunk_size=READ_CHUNK_SIZE):
+    """
+    Yield stored batch results as lists of dicts, one per client.
+
+    Args:
+        path (str): Column store directory, batch CSV output or Parquet /
+            Arrow batch output
+        chunk_size (int): Records per list
+    """
+    fmt = file_format(path)
+    if fmt == "store":
+        return _store_records(path, chunk_size)
+    if fmt == "csv":
+        return _csv_records(path, chunk_size)
+    if fmt in ("parquet", "arrow"):
+        return _arrow_records(path, chunk_size, fmt)
+    raise ValueError(f"Cannot read batch results from {fmt} files")
+
+
+def write_page(directory, name, text):
+    """Write a page atomically: it exists only once it is complete."""
+    path = os.path.join(directory, name)
+    partial = path + ".partial"
+    with open(partial, "w", encoding="utf-8") as handle:
+        handle.write(text)
+    os.replace(partial, path)
+
+
+def render_pages(template, directory, tasks):
+    """Render and write (file name, record) pairs; returns the page count."""
+    for name, record in tasks:
+        write_page(directory, name, template.render(report_context(record)))
+    return len(tasks)
+
+
+_worker_template = None
+
+
+def _init_worker(template_text):
+    global _worker_template
+    _worker_template = compile_template(template_text)
+
+
+def _render_task(directory, tasks):
+    return render_pages(_worker_template, directory, tasks)
+
+
+@dataclass
+class ReportSummary:
+    pages: int = 0
+    skipped: int = 0
+    elapsed: float = 0.0
+
+    @property
+    def pages_per_second(self) -> float:
+        return self.pages / self.elapsed if self.elapsed else 0.0
+
+
+def _tasks(results_path, directory, resume, task_size, summary):
+    existing = set(os.listdir(directory)) if resume else set()
+    task, row = [], 0
+    for records in read_result_records(results_path):
+        for record in records:
+            name = page_name(record.get("client_id", ""), row)
+            row += 1
+            if name in existing:
+                summary.skipped += 1
+                continue
+            task.append((name, record))
+            if len(task) >= task_size:
+                yield task
+                task = []
+    if task:
+        yield task
+
+
+def generate_reports(
+    results_path,
+    directory,
+    template_text=DEFAULT_TEMPLATE,
+    workers=None,
+    resume=False,
+    task_size=DEFAULT_TASK_SIZE,
+    echo=None,
+):
+    """
+    Render one HTML page per client of a stored batch run.
+
+    Args:
+        results_path (str): Stored batch results, see read_result_records()
+        directory (str): Output directory, created if needed
+        template_text (str): Template source, see compile_template()
+        workers (int): Rendering processes, defaults to the CPU count;
+            0 or 1 renders in this process
+        resume (bool): Skip clients whose page already exists
+        task_size (int): Clients rendered per task
+        echo (callable): Called with a progress line as tasks complete
+
+    Returns:
+        ReportSummary: Pages written, pages skipped and elapsed time
+    """
+    # Fail on a bad template before starting any worker.
+    template = compile_template(template_text)
+    os.makedirs(directory, exist_ok=True)
+    if workers is None:
+        workers = os.cpu_count() or 1
+    summary = ReportSummary()
+    start = time.perf_counter()
+
+    def progress(pages):
+        summary.pages += pages
+        if echo is not None:
+            rate = summary.pages / (time.perf_counter() - start)
+            echo(f"{summary.pages:,} pages [{rate:,.0f} pages/s]")
+
+    tasks = _tasks(results_path, directory, resume, task_size, summary)
+    if workers <= 1:
+        for task in tasks:
+            progress(render_pages(template, directory, task))
+    else:
+        with ProcessPoolExecutor(
+            workers, initializer=_init_worker, initargs=(template_text,)
+        ) as pool:
+            pending = set()
+            for task in tasks:
+                if len(pending) >= 2 * workers:
+                    done, pending = wait(pending, return_when=FIRST_COMPLETED)
+                    for future in done:
+                        progress(future.result())
+                pending.add(pool.submit(_render_task, directory, task))
+            for future in wait(pending).done:
+                progress(future.result())
+    summary.elapsed = time.perf_counter() - start
+    return summary
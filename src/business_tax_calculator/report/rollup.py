@@ -0,0 +1,408 @@
+# report/rollup.py
+"""
+Streaming, mergeable portfolio rollups.
+
+A Rollup consumes calculated chunks as a batch run produces them and
+keeps, per group (by default state x entity type x revenue band), one
+QuantileSketch per metric: count, sum, min, max and a quantile sketch.
+Memory depends on the number of groups, never on the number of rows, so
+the whole book is summarised without collecting the results:
+
+    rollup = Rollup()
+    run_batch("clients.csv", "results.csv", rollup=rollup)
+    rollup.write_csv("rollup.csv")
+
+Partial rollups combine with merge() - of parallel workers, or of the
+shards of a job (calculator.jobs keeps one per shard) - and travel as
+plain dicts via as_dict() and from_dict(). Merging is exact for counts,
+sums, minimums and maximums; quantiles keep the sketch's relative
+accuracy however the rows were split.
+
+The sketch buckets values on a logarithmic scale, as DDSketch does: a
+value x falls in bucket ceil(log(|x|) / log(gamma)) with
+gamma = (1 + a) / (1 - a), so every quantile it reports is within a
+relative error a (1% by default) of a value at that rank. Merging adds
+bucket counts.
+"""
+
+import csv
+import math
+
+import numpy as np
+
+from business_tax_calculator.calculator.batch import rows_to_columns
+from business_tax_calculator.calculator.tax_calculator import RESULT_KEYS
+
+DIMENSIONS = ("state", "entity_type", "filing_status", "revenue_band")
+DEFAULT_BY = ("state", "entity_type", "revenue_band")
+METRICS = RESULT_KEYS + ("net_income", "s_corp_savings")
+DEFAULT_METRICS = ("total_tax", "effective_tax_rate", "s_corp_savings")
+DEFAULT_QUANTILES = (0.5, 0.9, 0.99)
+DEFAULT_RELATIVE_ACCURACY = 0.01
+
+# Lower edges of the revenue bands after the first.
+REVENUE_BAND_EDGES = (100_000, 250_000, 500_000, 1_000_000, 5_000_000)
+REVENUE_BANDS = ("<100k", "100k-250k", "250k-500k", "500k-1M", "1M-5M", "5M+")
+
+# Magnitudes below this count as zero.
+_MIN_MAGNITUDE = 1e-9
+
+
+def revenue_band(revenue):
+    """Revenue band label of every value of a revenue column."""
+    index = np.searchsorted(REVENUE_BAND_EDGES, revenue, side="right")
+    return np.array(REVENUE_BANDS)[index]
+
+
+class _Buckets:
+    """Counts of consecutive integer bucket keys from offset."""
+
+    def __init__(self, offset=0, counts=()):
+        self.offset = offset
+        self.counts = np.asarray(counts, dtype=np.int64)
+
+    def _cover(self, low, high):
+        if not len(self.counts):
+            self.offset = low
+            self.counts = np.zeros(high - low + 1, dtype=np.int64)
+            return
+        top = self.offset + len(self.counts) - 1
+        if low < self.offset or high > top:
+            start = min(low, self.offset)
+            counts = np.zeros(max(high, top) - start + 1, dtype=np.int64)
+            counts[
+                self.offset - start : self.offset - start + len(self.counts)
+            ] = self.counts
+            self.offset, self.counts = start, counts
+
+    def add(self, keys):
+        if not len(keys):
+            return
+        self._cover(int(keys.min()), int(keys.max()))
+        self.counts += np.bincount(keys - self.offset, minlength=len(self.counts))
+
+    def merge(self, other):
+        if not len(other.counts):
+            return
+        self._cover(other.offset, other.offset + len(other.counts) - 1)
+        start = other.offset - self.offset
+        self.counts[start : start + len(other.counts)] += other.counts
+
+    def as_list(self):
+        return [self.offset, self.counts.tolist()]
+
+
+class QuantileSketch:
+    """
+    Count, sum, min, max and quantiles of a stream of values.
+
+    Non-finite values are ignored.
+
+    Args:
+        relative_accuracy (float): Relative error bound of quantiles
+    """
+
+    def __init__(self, relative_accuracy=DEFAULT_RELATIVE_ACCURACY):
+        self.relative_accuracy = relative_accuracy
+        self._gamma = (1 + relative_accuracy) / (1 - relative_accuracy)
+        self._log_gamma = math.log(self._gamma)
+        self.count = 0
+        self.sum = 0.0
+        self.min = math.inf
+        self.max = -math.inf
+        self._zeros = 0
+        self._positive = _Buckets()
+        self._negative = _Buckets()
+
+    @property
+    def mean(self):
+        return self.sum / self.count if self.count else math.nan
+
+    def add(self, values):
+        """Add an array of values."""
+        values = np.asarray(values, dtype=np.float64)
+        values = values[np.isfinite(values)]
+        if not len(values):
+            return
+        self.count += len(values)
+        self.sum += float(values.sum())
+        self.min = min(self.min, float(values.min()))
+        self.max = max(self.max, float(values.max()))
+        magnitude = np.abs(values)
+        nonzero = magnitude > _MIN_MAGNITUDE
+        self._zeros += len(values) - int(nonzero.sum())
+        keys = np.ceil(np.log(magnitude[nonzero]) / self._log_gamma).astype(np.int64)
+        positive = values[nonzero] > 0
+        self._positive.add(keys[positive])
+        self._negative.add(keys[~positive])
+
+    def merge(self, other):
+        """Add another sketch's values."""
+        if other.relative_accuracy != self.relative_accuracy:
+            raise ValueError(
+                "Cannot merge sketches of relative accuracy "
+                f"{self.relative_accuracy} and {other.relative_accuracy}"
+            )
+        self.count += other.count
+        self.sum += other.sum
+        self.min = min(self.min, other.min)
+        self.max = max(self.max, other.max)
+        self._zeros += other._zeros
+        self._positive.merge(other._positive)
+        self._negative.merge(other._negative)
+        return self
+
+    def _value(self, key):
+        return 2 * self._gamma**key / (self._gamma + 1)
+
+    def quantile(self, q):
+        """
+        Value at quantile q (0 to 1), NaN if the sketch is empty.
+
+        Exact at q=0 and q=1, within relative_accuracy in between.
+        """
+        if not self.count:
+            return math.nan
+        if q <= 0:
+            return self.min
+        if q >= 1:
+            return self.max
+        rank = q * (self.count - 1)
+        # Ascending order: negatives by falling magnitude, zeros, positives.
+        negative = np.cumsum(self._negative.counts[::-1])
+        below_zero = int(negative[-1]) if len(negative) else 0
+        if rank < below_zero:
+            i = int(np.searchsorted(negative, rank, side="right"))
+            key = self._negative.offset + len(negative) - 1 - i
+            value = -self._value(key)
+        elif rank < below_zero + self._zeros:
+            value = 0.0
+        else:
+            rank -= below_zero + self._zeros
+            positive = np.cumsum(self._positive.counts)
+            i = int(np.searchsorted(positive, rank, side="right"))
+            value = self._value(self._positive.offset + min(i, len(positive) - 1))
+        return min(max(value, self.min), self.max)
+
+    def as_dict(self):
+        return {
+            "relative_accuracy": self.relative_accuracy,
+            "count": self.count,
+            "sum": self.sum,
+            "min": self.min if self.count else None,
+            "max": self.max if self.count else None,
+            "zeros": self._zeros,
+            "positive": self._positive.as_list(),
+            "negative": self._negative.as_list(),
+        }
+
+    @classmethod
+    def from_dict(cls, data):
+        sketch = cls(data["relative_accuracy"])
+        sketch.count = data["count"]
+        sketch.sum = data["sum"]
+        if sketch.count:
+            sketch.min, sketch.max = data["min"], data["max"]
+        sketch._zeros = data["zeros"]
+        sketch._positive = _Buckets(*data["positive"])
+        sketch._negative = _Buckets(*data["negative"])
+        return sketch
+
+
+def metric_columns(columns, results, metrics):
+    """
+    Values of each metric for a calculated chunk.
+
+    s_corp_savings is total tax less the tax as an S-Corp (0 for
+    S-Corps), which calculates the chunk a second time.
+    """
+    values = {}
+    for name in metrics:
+        if name in RESULT_KEYS:
+            values[name] = results[:, RESULT_KEYS.index(name)]
+        elif name == "net_income":
+            values[name] = columns["revenue"] - columns["expenses"]
+        elif name == "s_corp_savings":
+            from business_tax_calculator.storage.scenario_store import (
+                s_corp_total_tax,
+            )
+
+            total_tax = results[:, RESULT_KEYS.index("total_tax")]
+            values[name] = np.where(
+                columns["entity_type"] == "S-Corp",
+                0.0,
+                total_tax - s_corp_total_tax(columns),
+            )
+        else:
+            raise ValueError(f"Unknown rollup metric {name!r}")
+    return values
+
+
+class Rollup:
+    """
+    Per-group aggregates of calculated chunks.
+
+    A Rollup takes chunks like a batch chunk writer, write(columns,
+    results), so it can follow any batch run.
+
+    Args:
+        by (tuple): Group columns, from DIMENSIONS; () rolls up the book
+        metrics (tuple): Aggregated values, from METRICS
+        relative_accuracy (float): Of the quantile sketches
+    """
+
+    def __init__(
+        self,
+        by=DEFAULT_BY,
+        metrics=DEFAULT_METRICS,
+        relative_accuracy=DEFAULT_RELATIVE_ACCURACY,
+    ):
+        for name in by:
+            if name not in DIMENSIONS:
+                raise ValueError(f"Unknown rollup dimension {name!r}")
+        for name in metrics:
+            if name not in METRICS:
+                raise ValueError(f"Unknown rollup metric {name!r}")
+        self.by = tuple(by)
+        self.metrics = tuple(metrics)
+        self.relative_accuracy = relative_accuracy
+        self.groups = {}
+
+    def spec(self):
+        """Arguments that recreate an empty Rollup of the same shape."""
+        return {
+            "by": list(self.by),
+            "metrics": list(self.metrics),
+            "relative_accuracy": self.relative_accuracy,
+        }
+
+    def _group(self, key):
+        group = self.groups.get(key)
+        if group is None:
+            group = {m: QuantileSketch(self.relative_accuracy) for m in self.metrics}
+            self.groups[key] = group
+        return group
+
+    def write(self, columns, results):
+        """Add a calculated chunk."""
+        n = len(results)
+        if not n:
+            return
+        values = metric_columns(columns, results, self.metrics)
+        labels, codes = [], np.zeros(n, dtype=np.int64)
+        for name in self.by:
+            column = (
+                revenue_band(columns["revenue"])
+                if name == "revenue_band"
+                else columns[name]
+            )
+            unique, inverse = np.unique(column, return_inverse=True)
+            labels.append(unique.tolist())
+            codes = codes * len(unique) + inverse.reshape(-1)
+        groups, inverse = np.unique(codes, return_inverse=True)
+        order = np.argsort(inverse, kind="stable")
+        bounds = np.searchsorted(inverse[order], np.arange(len(groups) + 1))
+        for g, code in enumerate(groups.tolist()):
+            key = []
+            for names in reversed(labels):
+                code, i = divmod(code, len(names))
+                key.append(names[i])
+            rows = order[bounds[g] : bounds[g + 1]]
+            group = self._group(tuple(reversed(key)))
+            for name in self.metrics:
+                group[name].add(values[name][rows])
+
+    def close(self):
+        pass
+
+    def merge(self, other):
+        """Add another rollup of the same shape, e.g. a parallel worker's."""
+        if other.spec() != self.spec():
+            raise ValueError("Cannot merge rollups of different shapes")
+        for key, sketches in other.groups.items():
+            group = self._group(key)
+            for name, sketch in sketches.items():
+                group[name].merge(sketch)
+        return self
+
+    def as_dict(self):
+        return {
+            **self.spec(),
+            "groups": [
+                [list(key), {name: s.as_dict() for name, s in sketches.items()}]
+                for key, sketches in sorted(self.groups.items())
+            ],
+        }
+
+    @classmethod
+    def from_dict(cls, data):
+        rollup = cls(data["by"], data["metrics"], data["relative_accuracy"])
+        for key, sketches in data["groups"]:
+            rollup.groups[tuple(key)] = {
+                name: QuantileSketch.from_dict(sketch)
+                for name, sketch in sketches.items()
+            }
+        return rollup
+
+    def header(self, quantiles=DEFAULT_QUANTILES):
+        header = list(self.by) + ["rows"]
+        for name in self.metrics:
+            header += [f"{name}_{stat}" for stat in ("sum", "mean", "min", "max")]
+            header += [f"{name}_p{q * 100:g}" for q in quantiles]
+        return header
+
+    def table(self, quantiles=DEFAULT_QUANTILES):
+        """
+        Final rollup rows, one per group in group order.
+
+        Returns:
+            list: Lists of the group's labels, its row count and, per
+            metric, sum, mean, min, max and the quantiles, matching
+            header()
+        """
+        rows = []
+        for key, sketches in sorted(self.groups.items()):
+            first = sketches[self.metrics[0]] if self.metrics else None
+            row = list(key) + [first.count if first is not None else 0]
+            for name in self.metrics:
+                sketch = sketches[name]
+                row += [sketch.sum, sketch.mean, sketch.min, sketch.max]
+                row += [sketch.quantile(q) for q in quantiles]
+            rows.append(row)
+        return rows
+
+    def write_csv(self, target, quantiles=DEFAULT_QUANTILES):
+        """Write the table to a path or an open text stream."""
+        if isinstance(target, str):
+            with open(target, "w", newline="") as handle:
+                return self.write_csv(handle, quantiles)
+        writer = csv.writer(target)
+        writer.writerow(self.header(quantiles))
+        for row in self.table(quantiles):
+            writer.writerow([round(v, 6) if isinstance(v, float) else v for v in row])
+
+
+def rollup_results(path, rollup=None, chunk_size=50_000):
+    """
+    Roll up stored batch results without recalculating them.
+
+    Args:
+        path (str): Column store, batch CSV output or Parquet / Arrow
+            batch output
+        rollup (Rollup): Rollup to add to, a default one if None
+
+    Returns:
+        Rollup: The rollup
+    """
+    from business_tax_calculator.report.html import read_result_records
+
+    if rollup is None:
+        rollup = Rollup()
+    for records in read_result_records(path, chunk_size):
+        columns = rows_to_columns(records)
+        results = np.array(
+            [[float(record[key]) for key in RESULT_KEYS] for record in records],
+            dtype=np.float64,
+        ).reshape(len(records), len(RESULT_KEYS))
+        rollup.write(columns, results)
+    return rollup
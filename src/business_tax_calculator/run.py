@@ -8,10 +8,13 @@ import os
 # Add the project root directory to the Python path
 sys.path.append(os.path.dirname(os.path.abspath(__file__)))
 
-from business_tax_calculator.calculator.tax_calculator import BusinessTaxCalculator
-
 def main():
     """Main function to run the Business Tax Calculator application."""
+    # Imports are deferred so each mode loads only the modules it uses.
+    if len(sys.argv) > 1:
+        from business_tax_calculator.cli import main as cli_main
+        sys.exit(cli_main(sys.argv[1:]))
+    from business_tax_calculator.calculator.tax_calculator import BusinessTaxCalculator
     calculator = BusinessTaxCalculator()
     calculator.run()
 
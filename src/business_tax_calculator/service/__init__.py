@@ -0,0 +1,4 @@
+"""
+Service package for long-running calculation servers and their clients.
+"""
+# This file makes the directory a Python package
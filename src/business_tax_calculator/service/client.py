@@ -0,0 +1,132 @@
+# service/client.py
+"""
+Thin client for the calculation daemon.
+
+Only the standard library's socket and json modules are imported, so a
+short-lived process forwarding requests starts quickly. When no daemon is
+listening, calculate() falls back to computing in-process.
+"""
+
+import os
+import socket
+
+from business_tax_calculator.service.protocol import SOCKET_ENV, decode, encode
+
+
+class DaemonUnavailable(ConnectionError):
+    """
+    No daemon is listening on the socket, it went away mid-request, or it
+    did not answer within the client's timeout.
+    """
+
+
+class CalculatorClient:
+    """
+    Persistent connection to a calculation daemon.
+
+    The connection is opened on the first request and reused for every
+    following one.
+    """
+
+    def __init__(self, path, timeout=5.0):
+        self.path = path
+        self.timeout = timeout
+        self._socket = None
+        self._reader = None
+
+    def _connect(self):
+        sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        sock.settimeout(self.timeout)
+        try:
+            sock.connect(self.path)
+        except OSError as exc:
+            # Missing socket, refused, or a full backlog timing out.
+            sock.close()
+            raise DaemonUnavailable(f"No daemon listening on {self.path}") from exc
+        self._socket = sock
+        self._reader = sock.makefile("rb")
+
+    def request(self, message):
+        """Send one message and return the decoded response."""
+        if self._socket is None:
+            self._connect()
+        try:
+            self._socket.sendall(encode(message))
+            line = self._reader.readline()
+        except TimeoutError as exc:
+            # A late answer would be read as the next request's response.
+            self.close()
+            raise DaemonUnavailable(
+                f"Daemon on {self.path} did not answer within {self.timeout}s"
+            ) from exc
+        except OSError as exc:
+            self.close()
+            raise DaemonUnavailable(f"Daemon on {self.path} went away") from exc
+        if not line:
+            self.close()
+            raise DaemonUnavailable(f"Daemon on {self.path} closed the connection")
+        return decode(line)
+
+    def calculate(self, inputs):
+        """
+        Calculate one set of inputs on the daemon.
+
+        Raises:
+            ValueError: If the daemon rejected the inputs
+            DaemonUnavailable: If the daemon cannot be reached
+        """
+        response = self.request({"op": "calculate", "inputs": inputs})
+        if not response.get("ok"):
+            raise ValueError(response.get("error", "Calculation failed"))
+        return response["result"]
+
+    def ping(self):
+        return self.request({"op": "ping"})
+
+    def close(self):
+        if self._socket is not None:
+            self._reader.close()
+            self._socket.close()
+            self._socket = None
+            self._reader = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+def default_socket_path():
+    """The daemon socket named by the BUSINESS_TAX_CALC_SOCKET variable."""
+    return os.environ.get(SOCKET_ENV) or None
+
+
+def calculate(inputs, socket_path=None, client=None):
+    """
+    Calculate on the daemon if one is running, otherwise in-process.
+
+    Args:
+        inputs (dict): Input field to value
+        socket_path (str): Daemon socket, defaults to default_socket_path()
+        client (CalculatorClient): Open client to reuse across calls
+
+    Returns:
+        dict: Results keyed by RESULT_KEYS
+    """
+    owned = client is None
+    if owned:
+        socket_path = socket_path or default_socket_path()
+        if socket_path is not None:
+            client = CalculatorClient(socket_path)
+    try:
+        if client is not None:
+            return client.calculate(inputs)
+    except DaemonUnavailable:
+        pass
+    finally:
+        if owned and client is not None:
+            client.close()
+    from business_tax_calculator.service.daemon import calculate_request
+
+    return calculate_request(inputs)
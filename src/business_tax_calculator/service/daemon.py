@@ -0,0 +1,203 @@
+# service/daemon.py
+"""
+Pre-warmed calculation daemon on a Unix domain socket.
+
+The daemon pays interpreter start, imports, plugin loading and pipeline
+compilation once, then answers calculation requests from a shared LRU
+cache. Each connection may send any number of requests, one JSON line
+each; see service/protocol.py.
+"""
+
+import logging
+import math
+import os
+import signal
+import socket
+import socketserver
+
+from business_tax_calculator.calculator.cache import CalculationCache
+from business_tax_calculator.calculator.tax_calculator import (
+    RESULT_KEYS,
+    calculate_business_liabilities,
+)
+from business_tax_calculator.model.business import (
+    CALCULATION_NUMERIC_FIELDS,
+    CALCULATION_TEXT_FIELDS,
+    Business,
+)
+from business_tax_calculator.service.protocol import decode, encode
+from business_tax_calculator.utils import timing
+from business_tax_calculator.utils.rules import rules_version
+
+INPUT_TEXT_FIELDS = ("name", "filing_status") + CALCULATION_TEXT_FIELDS
+INPUT_NUMERIC_FIELDS = CALCULATION_NUMERIC_FIELDS
+INPUT_FIELDS = frozenset(INPUT_TEXT_FIELDS + INPUT_NUMERIC_FIELDS)
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_CACHE_SIZE = 65_536
+
+
+def check_inputs(inputs):
+    """
+    Validate a mapping of input field to value.
+
+    Raises:
+        ValueError: For unknown fields or non-numeric or non-finite amounts
+    """
+    unknown = set(inputs) - INPUT_FIELDS
+    if unknown:
+        raise ValueError(f"Unknown input fields: {', '.join(sorted(unknown))}")
+    for field in INPUT_NUMERIC_FIELDS:
+        if field in inputs:
+            try:
+                value = float(inputs[field])
+            except (TypeError, ValueError):
+                value = None
+            if value is None or not math.isfinite(value):
+                raise ValueError(f"{field} must be a number, got {inputs[field]!r}")
+
+
+def business_from_inputs(inputs):
+    """
+    Build a Business from a validated mapping of input field to value.
+
+    Omitted fields keep the Business defaults.
+
+    Raises:
+        ValueError: For unknown fields or non-numeric or non-finite amounts
+    """
+    check_inputs(inputs)
+    business = Business()
+    for field in INPUT_TEXT_FIELDS:
+        if field in inputs:
+            setattr(business, field, str(inputs[field]))
+    for field in INPUT_NUMERIC_FIELDS:
+        if field in inputs:
+            setattr(business, field, float(inputs[field]))
+    return business
+
+
+def calculate_request(inputs, cache=None):
+    """
+    Calculate one set of inputs.
+
+    Args:
+        inputs (dict): Input field to value
+        cache (CalculationCache): Optional result cache
+
+    Returns:
+        dict: Results keyed by RESULT_KEYS
+    """
+    business = business_from_inputs(inputs)
+    if cache is not None:
+        results = cache.calculate(business)
+    else:
+        results = calculate_business_liabilities(business)
+    return {key: results[key] for key in RESULT_KEYS}
+
+
+def handle_message(message, cache=None):
+    """Answer one decoded request message."""
+    op = message.get("op", "calculate")
+    if op == "calculate":
+        inputs = message.get("inputs", {})
+        if not isinstance(inputs, dict):
+            raise ValueError("inputs must be a JSON object.")
+        return {"ok": True, "result": calculate_request(inputs, cache)}
+    if op == "ping":
+        return {"ok": True, "rules_version": rules_version(), "pid": os.getpid()}
+    if op == "timings":
+        return {
+            "ok": True,
+            "enabled": timing.is_enabled(),
+            "prometheus": timing.prometheus_text(),
+        }
+    raise ValueError(f"Unknown op '{op}'")
+
+
+def warm_up():
+    """Load plugins and compile the deduction pipeline before serving."""
+    calculate_request({"entity_type": "LLC", "revenue": 1.0})
+    rules_version()
+
+
+class _RequestHandler(socketserver.StreamRequestHandler):
+    def handle(self):
+        for line in self.rfile:
+            try:
+                response = handle_message(decode(line), self.server.cache)
+            except ValueError as exc:
+                response = {"ok": False, "error": str(exc)}
+            except Exception:
+                # A failed calculation must not take the connection down.
+                logger.exception("Request failed")
+                response = {"ok": False, "error": "Internal error."}
+            self.wfile.write(encode(response))
+
+
+def _remove_stale_socket(path):
+    if not os.path.exists(path):
+        return
+    probe = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    try:
+        probe.connect(path)
+    except (ConnectionRefusedError, FileNotFoundError):
+        # Left behind by a daemon that did not shut down cleanly.
+        os.unlink(path)
+    else:
+        raise OSError(f"A daemon is already listening on {path}")
+    finally:
+        probe.close()
+
+
+class CalculationDaemon(socketserver.ThreadingUnixStreamServer):
+    """
+    Threaded Unix-socket server answering calculation requests.
+
+    The socket is created readable and writable by the owner only.
+    """
+
+    daemon_threads = True
+
+    def __init__(self, path, cache=None):
+        _remove_stale_socket(path)
+        self.path = path
+        self.cache = (
+            cache if cache is not None else CalculationCache(DEFAULT_CACHE_SIZE)
+        )
+        warm_up()
+        previous = os.umask(0o177)
+        try:
+            super().__init__(path, _RequestHandler)
+        finally:
+            os.umask(previous)
+
+    def server_close(self):
+        super().server_close()
+        try:
+            os.unlink(self.path)
+        except FileNotFoundError:
+            pass
+
+
+def serve(path, cache_size=DEFAULT_CACHE_SIZE):
+    """
+    Serve requests on ``path`` until interrupted.
+
+    Args:
+        path (str): Unix socket path
+        cache_size (int): Results kept in the daemon's LRU cache
+    """
+
+    def _stop(signum, frame):
+        raise KeyboardInterrupt
+
+    signal.signal(signal.SIGTERM, _stop)
+    server = CalculationDaemon(path, CalculationCache(cache_size))
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
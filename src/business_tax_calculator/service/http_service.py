@@ -0,0 +1,389 @@
+# service/http_service.py
+"""
+Asyncio JSON-over-HTTP calculation service with request micro-batching.
+
+Endpoints:
+    POST /calculate        one input object -> one result object
+    POST /calculate/batch  list of input objects -> list of results
+    GET  /metrics          batching counters and p50/p99 latency
+    GET  /metrics/stages   per-stage timings in Prometheus text format
+
+Concurrent /calculate requests are coalesced: rows are queued until the
+batching window elapses or ``max_rows`` are waiting, then evaluated
+together by the vectorized calculation in a worker thread and fanned back
+out to their requests. Requests are rejected with 503 once ``max_pending``
+rows are queued or being calculated.
+"""
+
+import asyncio
+import json
+import logging
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
+from http import HTTPStatus
+
+from business_tax_calculator.calculator.batch import rows_to_columns
+from business_tax_calculator.calculator.tax_calculator import RESULT_KEYS
+from business_tax_calculator.calculator.vectorized import calculate_matrix
+from business_tax_calculator.service.daemon import check_inputs
+from business_tax_calculator.utils import timing
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_WINDOW = 0.001
+DEFAULT_MAX_ROWS = 256
+DEFAULT_MAX_PENDING = 10_000
+MAX_BODY_BYTES = 16 * 1024 * 1024
+
+
+class Overloaded(Exception):
+    """The service already has max_pending rows queued or in flight."""
+
+
+def evaluate_rows(rows):
+    """Calculate a list of input dicts in one vectorized pass."""
+    laps = timing.laps("service")
+    columns = rows_to_columns(rows)
+    laps.lap("columns")
+    matrix = calculate_matrix(columns)
+    laps.lap("calculate")
+    results = [dict(zip(RESULT_KEYS, values)) for values in matrix.tolist()]
+    laps.lap("results")
+    return results
+
+
+class LatencyRecorder:
+    """Request latencies over a sliding window of the most recent requests."""
+
+    def __init__(self, size=10_000):
+        self._samples = deque(maxlen=size)
+        self.count = 0
+
+    def record(self, seconds):
+        self._samples.append(seconds)
+        self.count += 1
+
+    def snapshot(self):
+        samples = sorted(self._samples)
+
+        def percentile(q):
+            if not samples:
+                return 0.0
+            return samples[min(len(samples) - 1, int(q * len(samples)))] * 1000
+
+        return {
+            "count": self.count,
+            "p50_ms": percentile(0.50),
+            "p99_ms": percentile(0.99),
+        }
+
+
+class MicroBatcher:
+    """
+    Coalesce single-row requests into vectorized batches.
+
+    Must be used from the event loop thread; batches run on one worker
+    thread so the loop keeps accepting requests meanwhile.
+    """
+
+    def __init__(
+        self,
+        window=DEFAULT_WINDOW,
+        max_rows=DEFAULT_MAX_ROWS,
+        max_pending=DEFAULT_MAX_PENDING,
+        evaluate=evaluate_rows,
+    ):
+        self.window = window
+        self.max_rows = max_rows
+        self.max_pending = max_pending
+        self._evaluate = evaluate
+        self._executor = ThreadPoolExecutor(
+            max_workers=1, thread_name_prefix="calculate"
+        )
+        self._queued = []
+        self._timer = None
+        self._in_flight = 0
+        self.batches = 0
+        self.rows = 0
+        self.rejected = 0
+
+    @property
+    def backlog(self):
+        """Rows queued or being calculated."""
+        return len(self._queued) + self._in_flight
+
+    def _admit(self, rows):
+        if self.backlog + rows > self.max_pending:
+            self.rejected += 1
+            raise Overloaded(f"{self.backlog} rows already pending")
+
+    def submit(self, inputs):
+        """
+        Queue one row.
+
+        Returns:
+            asyncio.Future: Resolves to the row's result dict
+
+        Raises:
+            Overloaded: If the backlog is full
+        """
+        self._admit(1)
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        self._queued.append((inputs, future))
+        if len(self._queued) >= self.max_rows:
+            self._flush()
+        elif self._timer is None:
+            self._timer = loop.call_later(self.window, self._flush)
+        return future
+
+    async def evaluate(self, rows):
+        """Calculate an already batched list of rows on the worker thread."""
+        self._admit(len(rows))
+        self._in_flight += len(rows)
+        try:
+            loop = asyncio.get_running_loop()
+            results = await loop.run_in_executor(self._executor, self._evaluate, rows)
+        finally:
+            self._in_flight -= len(rows)
+        self.batches += 1
+        self.rows += len(rows)
+        return results
+
+    def _flush(self):
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+        loop = asyncio.get_running_loop()
+        while self._queued:
+            batch = self._queued[: self.max_rows]
+            del self._queued[: self.max_rows]
+            self._in_flight += len(batch)
+            work = loop.run_in_executor(
+                self._executor, self._evaluate, [inputs for inputs, _ in batch]
+            )
+            work.add_done_callback(partial(self._deliver, batch))
+
+    def _deliver(self, batch, work):
+        self._in_flight -= len(batch)
+        if work.exception() is not None:
+            for _, future in batch:
+                if not future.done():
+                    future.set_exception(work.exception())
+            return
+        self.batches += 1
+        self.rows += len(batch)
+        for (_, future), result in zip(batch, work.result()):
+            if not future.done():
+                future.set_result(result)
+
+    def close(self):
+        self._executor.shutdown(wait=False)
+
+
+class _HttpError(Exception):
+    def __init__(self, status, message):
+        super().__init__(message)
+        self.status = status
+
+
+def _parse_json(body):
+    try:
+        return json.loads(body)
+    except ValueError:
+        raise _HttpError(HTTPStatus.BAD_REQUEST, "Request body must be JSON.") from None
+
+
+def _response(status, payload, keep_alive):
+    if isinstance(payload, str):
+        body = payload.encode()
+        content_type = "text/plain; version=0.0.4"
+    else:
+        body = json.dumps(payload, separators=(",", ":")).encode()
+        content_type = "application/json"
+    head = (
+        f"HTTP/1.1 {status.value} {status.phrase}\r\n"
+        f"Content-Type: {content_type}\r\n"
+        f"Content-Length: {len(body)}\r\n"
+        f"Connection: {'keep-alive' if keep_alive else 'close'}\r\n"
+    )
+    if status == HTTPStatus.SERVICE_UNAVAILABLE:
+        head += "Retry-After: 1\r\n"
+    return (head + "\r\n").encode("latin-1") + body
+
+
+class CalculationHttpService:
+    """Minimal HTTP/1.1 server in front of a MicroBatcher."""
+
+    def __init__(
+        self,
+        window=DEFAULT_WINDOW,
+        max_rows=DEFAULT_MAX_ROWS,
+        max_pending=DEFAULT_MAX_PENDING,
+    ):
+        self.batcher = MicroBatcher(window, max_rows, max_pending)
+        self.latency = {
+            "/calculate": LatencyRecorder(),
+            "/calculate/batch": LatencyRecorder(),
+        }
+
+    async def start(self, host="127.0.0.1", port=8080):
+        """Start listening; returns the asyncio server."""
+        return await asyncio.start_server(self._handle_connection, host, port)
+
+    def metrics(self):
+        batcher = self.batcher
+        return {
+            "endpoints": {
+                path: recorder.snapshot() for path, recorder in self.latency.items()
+            },
+            "batches": batcher.batches,
+            "rows": batcher.rows,
+            "mean_batch_rows": batcher.rows / batcher.batches
+            if batcher.batches
+            else 0.0,
+            "backlog": batcher.backlog,
+            "rejected": batcher.rejected,
+        }
+
+    async def _calculate(self, body):
+        inputs = _parse_json(body)
+        if not isinstance(inputs, dict):
+            raise _HttpError(HTTPStatus.BAD_REQUEST, "Expected a JSON object.")
+        check_inputs(inputs)
+        return await self.batcher.submit(inputs)
+
+    async def _calculate_batch(self, body):
+        rows = _parse_json(body)
+        if not isinstance(rows, list) or not all(isinstance(r, dict) for r in rows):
+            raise _HttpError(HTTPStatus.BAD_REQUEST, "Expected a JSON list of objects.")
+        for row in rows:
+            check_inputs(row)
+        if not rows:
+            return []
+        return await self.batcher.evaluate(rows)
+
+    async def _dispatch(self, method, path, body):
+        routes = {
+            ("POST", "/calculate"): self._calculate,
+            ("POST", "/calculate/batch"): self._calculate_batch,
+        }
+        if method == "GET" and path == "/metrics":
+            return HTTPStatus.OK, self.metrics()
+        if method == "GET" and path == "/metrics/stages":
+            return HTTPStatus.OK, timing.prometheus_text()
+        handler = routes.get((method, path))
+        if handler is None:
+            if path in self.latency or path in ("/metrics", "/metrics/stages"):
+                raise _HttpError(HTTPStatus.METHOD_NOT_ALLOWED, "Method not allowed.")
+            raise _HttpError(HTTPStatus.NOT_FOUND, f"No route for {path}")
+        start = time.perf_counter()
+        try:
+            payload = await handler(body)
+        except ValueError as exc:
+            raise _HttpError(HTTPStatus.BAD_REQUEST, str(exc)) from None
+        except Overloaded as exc:
+            raise _HttpError(HTTPStatus.SERVICE_UNAVAILABLE, str(exc)) from None
+        except Exception:
+            logger.exception("%s %s failed", method, path)
+            raise _HttpError(
+                HTTPStatus.INTERNAL_SERVER_ERROR, "Internal server error."
+            ) from None
+        finally:
+            # Rejected and failed requests count towards latency too.
+            self.latency[path].record(time.perf_counter() - start)
+        return HTTPStatus.OK, payload
+
+    async def _handle_connection(self, reader, writer):
+        try:
+            while True:
+                request_line = await reader.readline()
+                if not request_line.strip():
+                    break
+                try:
+                    method, target, version = request_line.decode("latin-1").split()
+                except ValueError:
+                    writer.write(
+                        _response(
+                            HTTPStatus.BAD_REQUEST,
+                            {"error": "Bad request line."},
+                            False,
+                        )
+                    )
+                    break
+                headers = {}
+                while True:
+                    line = await reader.readline()
+                    if line in (b"\r\n", b"\n", b""):
+                        break
+                    name, _, value = line.decode("latin-1").partition(":")
+                    headers[name.strip().lower()] = value.strip()
+                keep_alive = (
+                    version == "HTTP/1.1"
+                    and headers.get("connection", "").lower() != "close"
+                )
+                try:
+                    length = int(headers.get("content-length") or 0)
+                except ValueError:
+                    length = -1
+                if length < 0:
+                    # Without a usable length the body cannot be framed.
+                    writer.write(
+                        _response(
+                            HTTPStatus.BAD_REQUEST,
+                            {"error": "Bad Content-Length."},
+                            False,
+                        )
+                    )
+                    break
+                if length > MAX_BODY_BYTES:
+                    writer.write(
+                        _response(
+                            HTTPStatus.REQUEST_ENTITY_TOO_LARGE,
+                            {"error": "Request body too large."},
+                            False,
+                        )
+                    )
+                    break
+                body = await reader.readexactly(length) if length else b""
+                path = target.split("?", 1)[0]
+                try:
+                    status, payload = await self._dispatch(method, path, body)
+                except _HttpError as exc:
+                    status, payload = exc.status, {"error": str(exc)}
+                writer.write(_response(status, payload, keep_alive))
+                await writer.drain()
+                if not keep_alive:
+                    break
+        except (asyncio.IncompleteReadError, ConnectionError):
+            pass
+        finally:
+            writer.close()
+
+    def close(self):
+        self.batcher.close()
+
+
+def run_http_service(
+    host="127.0.0.1",
+    port=8080,
+    window=DEFAULT_WINDOW,
+    max_rows=DEFAULT_MAX_ROWS,
+    max_pending=DEFAULT_MAX_PENDING,
+):
+    """Serve until interrupted."""
+    service = CalculationHttpService(window, max_rows, max_pending)
+
+    async def main():
+        server = await service.start(host, port)
+        async with server:
+            await server.serve_forever()
+
+    try:
+        asyncio.run(main())
+    except KeyboardInterrupt:
+        pass
+    finally:
+        service.close()
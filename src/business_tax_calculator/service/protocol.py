@@ -0,0 +1,32 @@
+# service/protocol.py
+"""
+Wire format shared by the calculation daemon and its clients.
+
+Messages are JSON objects, one per line, over a Unix stream socket. A
+request is ``{"op": "calculate", "inputs": {...}}`` or ``{"op": "ping"}``;
+every response carries ``"ok"`` plus either the result or an ``"error"``.
+This module stays import-light so thin clients start fast.
+"""
+
+import json
+
+# Environment variable naming the daemon socket when --socket is omitted.
+SOCKET_ENV = "BUSINESS_TAX_CALC_SOCKET"
+
+
+def encode(message):
+    """Serialize one message to a newline-terminated JSON line."""
+    return json.dumps(message, separators=(",", ":")).encode() + b"\n"
+
+
+def decode(line):
+    """
+    Parse one JSON line into a message dict.
+
+    Raises:
+        ValueError: If the line is not a JSON object
+    """
+    message = json.loads(line)
+    if not isinstance(message, dict):
+        raise ValueError("Messages must be JSON objects.")
+    return message
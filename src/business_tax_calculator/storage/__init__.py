@@ -0,0 +1,4 @@
+"""
+Storage package for persisted calculation inputs and results.
+"""
+# This file makes the directory a Python package
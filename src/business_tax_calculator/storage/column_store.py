@@ -0,0 +1,290 @@
+# storage/column_store.py
+"""
+Memory-mapped column store of batch results with lookup by client id.
+
+A store is a directory holding one raw file per column, a sorted client
+id index and a manifest:
+
+    manifest.json        row count, rule version and column dtypes
+    columns/<name>.bin   fixed-width values, one per row in batch order
+    index/keys.bin       client ids, sorted, as fixed-width bytes
+    index/rows.bin       int64 row number of each sorted key
+
+Text columns are fixed-width UTF-8 (numpy "S<width>"), numeric inputs and
+results are float64. Opening a store only maps the files; get() and
+get_many() binary-search the mapped index and read just the pages of the
+rows they return, so looking up one client of a multi-gigabyte store
+costs a few page faults.
+
+The manifest is written last, through a temporary file: a directory
+without one is an unfinished store and is refused by ColumnStore. A
+writer whose run raises deletes its files instead of finishing the store.
+"""
+
+import json
+import os
+
+import numpy as np
+
+from business_tax_calculator.calculator.batch import (
+    CARRIED_NUMERIC_COLUMNS,
+    INPUT_TEXT_COLUMNS,
+)
+from business_tax_calculator.calculator.tax_calculator import RESULT_KEYS
+from business_tax_calculator.utils.rules import rules_version
+
+FORMAT_NAME = "business-tax-column-store"
+FORMAT_VERSION = 1
+MANIFEST = "manifest.json"
+
+# Bytes reserved per text value; longer values are rejected, not cut.
+# Validated batch runs divert such rows to the rejected rows instead.
+DEFAULT_TEXT_WIDTHS = {
+    "client_id": 32,
+    "name": 64,
+    "filing_status": 32,
+    "entity_type": 32,
+    "state": 8,
+}
+
+NUMERIC_COLUMNS = CARRIED_NUMERIC_COLUMNS + RESULT_KEYS
+
+
+def _column_path(path, name):
+    return os.path.join(path, "columns", f"{name}.bin")
+
+
+def _encode(values, width, name):
+    encoded = np.char.encode(np.asarray(values, dtype=str), "utf-8")
+    if encoded.dtype.itemsize > width:
+        longest = max(len(value) for value in encoded.tolist())
+        raise ValueError(
+            f"{name} values of up to {longest} bytes do not fit the column "
+            f"store's {width}-byte {name} column; raise its text width or "
+            "validate the rows"
+        )
+    return encoded.astype(f"S{width}")
+
+
+def _map(path, dtype, rows):
+    # mmap cannot map an empty file.
+    if rows == 0:
+        return np.empty(0, dtype=dtype)
+    return np.memmap(path, dtype=dtype, mode="r", shape=(rows,))
+
+
+class ColumnStoreWriter:
+    """
+    Appends calculated chunks to a new column store.
+
+    Args:
+        path (str): Store directory, created if needed; existing column
+            files in it are replaced
+        version (str): Rule version recorded in the manifest
+        text_widths (dict): Bytes per value of text columns, overriding
+            DEFAULT_TEXT_WIDTHS
+    """
+
+    def __init__(self, path, version=None, text_widths=None):
+        self.path = path
+        self.version = version or rules_version()
+        self.text_widths = {**DEFAULT_TEXT_WIDTHS, **(text_widths or {})}
+        self.rows = 0
+        os.makedirs(os.path.join(path, "columns"), exist_ok=True)
+        os.makedirs(os.path.join(path, "index"), exist_ok=True)
+        manifest = os.path.join(path, MANIFEST)
+        if os.path.exists(manifest):
+            os.remove(manifest)
+        self._files = {
+            name: open(_column_path(path, name), "wb")
+            for name in INPUT_TEXT_COLUMNS + NUMERIC_COLUMNS
+        }
+
+    def write(self, columns, results):
+        for name in INPUT_TEXT_COLUMNS:
+            values = _encode(columns[name], self.text_widths[name], name)
+            self._files[name].write(values.tobytes())
+        for name in CARRIED_NUMERIC_COLUMNS:
+            values = np.asarray(columns[name], dtype=np.float64)
+            self._files[name].write(values.tobytes())
+        by_column = np.ascontiguousarray(results.T, dtype=np.float64)
+        for name, values in zip(RESULT_KEYS, by_column):
+            self._files[name].write(values.tobytes())
+        self.rows += len(results)
+
+    def _write_index(self):
+        dtype = f"S{self.text_widths['client_id']}"
+        ids = _map(_column_path(self.path, "client_id"), dtype, self.rows)
+        # Stable, so the first row of a repeated client id is found first.
+        order = np.argsort(ids, kind="stable")
+        np.asarray(ids)[order].tofile(os.path.join(self.path, "index", "keys.bin"))
+        order.astype(np.int64).tofile(os.path.join(self.path, "index", "rows.bin"))
+
+    def close(self):
+        """Finish the column files, build the index and write the manifest."""
+        if self._files is None:
+            return
+        for handle in self._files.values():
+            handle.close()
+        self._files = None
+        self._write_index()
+        columns = [
+            {"name": name, "dtype": f"S{self.text_widths[name]}"}
+            for name in INPUT_TEXT_COLUMNS
+        ]
+        columns += [{"name": name, "dtype": "<f8"} for name in NUMERIC_COLUMNS]
+        manifest = {
+            "format": FORMAT_NAME,
+            "format_version": FORMAT_VERSION,
+            "rows": self.rows,
+            "rules_version": self.version,
+            "columns": columns,
+        }
+        path = os.path.join(self.path, MANIFEST)
+        partial = path + ".partial"
+        with open(partial, "w") as handle:
+            json.dump(manifest, handle, indent=2)
+            handle.write("\n")
+        os.replace(partial, path)
+
+    def abort(self):
+        """Close and delete the files written so far, leaving no store."""
+        if self._files is None:
+            return
+        for handle in self._files.values():
+            handle.close()
+        self._files = None
+        paths = [
+            _column_path(self.path, name)
+            for name in INPUT_TEXT_COLUMNS + NUMERIC_COLUMNS
+        ]
+        paths += [
+            os.path.join(self.path, "index", name) for name in ("keys.bin", "rows.bin")
+        ]
+        for path in paths:
+            if os.path.exists(path):
+                os.remove(path)
+        # Directories are kept if they hold anything else.
+        for directory in ("columns", "index", ""):
+            try:
+                os.rmdir(os.path.join(self.path, directory))
+            except OSError:
+                pass
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, *exc):
+        if exc_type is None:
+            self.close()
+        else:
+            self.abort()
+
+
+class ColumnStore:
+    """
+    Read-only view of a column store.
+
+    Args:
+        path (str): Store directory written by ColumnStoreWriter
+    """
+
+    def __init__(self, path):
+        manifest_path = os.path.join(path, MANIFEST)
+        if not os.path.exists(manifest_path):
+            raise FileNotFoundError(f"{path} is not a finished column store")
+        with open(manifest_path) as handle:
+            manifest = json.load(handle)
+        if (
+            manifest.get("format") != FORMAT_NAME
+            or manifest.get("format_version") != FORMAT_VERSION
+        ):
+            raise ValueError(f"{path} is not a version {FORMAT_VERSION} column store")
+        self.path = path
+        self.rows = manifest["rows"]
+        self.rules_version = manifest["rules_version"]
+        self.dtypes = {c["name"]: np.dtype(c["dtype"]) for c in manifest["columns"]}
+        self.columns = {
+            name: _map(_column_path(path, name), dtype, self.rows)
+            for name, dtype in self.dtypes.items()
+        }
+        self._keys = _map(
+            os.path.join(path, "index", "keys.bin"),
+            self.dtypes["client_id"],
+            self.rows,
+        )
+        self._rows = _map(os.path.join(path, "index", "rows.bin"), np.int64, self.rows)
+
+    def __len__(self):
+        return self.rows
+
+    def find(self, client_ids):
+        """
+        Row numbers of client ids by binary search over the sorted index.
+
+        Returns:
+            numpy.ndarray: int64 row per id, -1 where the id is absent
+        """
+        width = self.dtypes["client_id"].itemsize
+        encoded = [str(client_id).encode("utf-8") for client_id in client_ids]
+        # Longer ids cannot be stored; keep them from matching a prefix.
+        fits = np.array([len(key) <= width for key in encoded], dtype=bool)
+        keys = np.array(
+            [key if ok else b"" for key, ok in zip(encoded, fits)],
+            dtype=self.dtypes["client_id"],
+        )
+        rows = np.full(len(keys), -1, dtype=np.int64)
+        if not self.rows or not len(keys):
+            return rows
+        slots = np.searchsorted(self._keys, keys)
+        inside = fits & (slots < self.rows)
+        slots = slots[inside]
+        hit = self._keys[slots] == keys[inside]
+        found = np.flatnonzero(inside)[hit]
+        rows[found] = self._rows[slots[hit]]
+        return rows
+
+    def _row(self, row):
+        record = {}
+        for name, values in self.columns.items():
+            value = values[row]
+            if self.dtypes[name].kind == "S":
+                record[name] = value.decode("utf-8")
+            else:
+                record[name] = float(value)
+        return record
+
+    def get(self, client_id):
+        """
+        Inputs and results of one client, keyed by column name.
+
+        Raises:
+            KeyError: If the client id is not in the store
+        """
+        (row,) = self.find([client_id]).tolist()
+        if row < 0:
+            raise KeyError(client_id)
+        return self._row(row)
+
+    def get_many(self, client_ids):
+        """
+        Look up several clients at once.
+
+        Returns:
+            list: One dict per id as returned by get(), None for absent ids
+        """
+        return [
+            self._row(row) if row >= 0 else None
+            for row in self.find(client_ids).tolist()
+        ]
+
+    def close(self):
+        # Dropping the maps lets numpy unmap the files.
+        self.columns = {}
+        self._keys = self._rows = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
@@ -0,0 +1,179 @@
+# storage/result_cache.py
+"""
+Persistent on-disk result cache shared across batch runs.
+
+Results are stored in SQLite keyed by a 128-bit input hash (two signed
+64-bit integers) and the rule version tag. Each value is the packed
+float64 result row, so bulk lookups decode straight into a numpy matrix.
+"""
+
+import sqlite3
+import time
+from dataclasses import dataclass
+
+import numpy as np
+
+from business_tax_calculator.calculator.tax_calculator import RESULT_KEYS
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS results (
+    rules_version TEXT NOT NULL,
+    key_hi INTEGER NOT NULL,
+    key_lo INTEGER NOT NULL,
+    created_at REAL NOT NULL,
+    payload BLOB NOT NULL,
+    PRIMARY KEY (rules_version, key_hi, key_lo)
+) WITHOUT ROWID;
+CREATE TABLE IF NOT EXISTS meta (
+    name TEXT PRIMARY KEY,
+    value TEXT NOT NULL
+);
+"""
+
+_LAYOUT = ",".join(RESULT_KEYS)
+
+# Probe keys are written to a temp table in slices of this many rows so a
+# 10M-row lookup never materializes all parameters at once.
+LOOKUP_SLICE = 250_000
+
+
+@dataclass(frozen=True)
+class VersionInfo:
+    rules_version: str
+    entries: int
+    first_created: float
+    last_created: float
+
+
+def _signed(keys):
+    return np.asarray(keys, dtype=np.uint64).view(np.int64)
+
+
+class ResultCache:
+    """SQLite-backed result cache keyed by input hash and rule version."""
+
+    def __init__(self, path):
+        self.path = path
+        self._conn = sqlite3.connect(path)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute("PRAGMA temp_store=MEMORY")
+        self._conn.executescript(_SCHEMA)
+        self._check_layout()
+
+    def _check_layout(self):
+        row = self._conn.execute(
+            "SELECT value FROM meta WHERE name = 'result_columns'"
+        ).fetchone()
+        if row is not None and row[0] == _LAYOUT:
+            return
+        with self._conn:
+            # Rows packed for a different result layout cannot be decoded.
+            self._conn.execute("DELETE FROM results")
+            self._conn.execute(
+                "INSERT OR REPLACE INTO meta (name, value) "
+                "VALUES ('result_columns', ?)",
+                (_LAYOUT,),
+            )
+
+    def lookup(self, key_hi, key_lo, version):
+        """
+        Bulk lookup of many keys.
+
+        Args:
+            key_hi (numpy.ndarray): uint64 high halves of the row keys
+            key_lo (numpy.ndarray): uint64 low halves of the row keys
+            version (str): Rule version tag
+
+        Returns:
+            tuple: (found mask, float64 matrix with cached rows filled in)
+        """
+        n = len(key_hi)
+        found = np.zeros(n, dtype=bool)
+        results = np.zeros((n, len(RESULT_KEYS)), dtype=np.float64)
+        hi, lo = _signed(key_hi), _signed(key_lo)
+        # Probing in key order walks the primary-key B-tree sequentially,
+        # which is several times faster than random point lookups.
+        order = np.lexsort((lo, hi))
+        conn = self._conn
+        conn.execute(
+            "CREATE TEMP TABLE IF NOT EXISTS probe ("
+            "key_hi INTEGER, key_lo INTEGER, pos INTEGER)"
+        )
+        for start in range(0, n, LOOKUP_SLICE):
+            index = order[start : start + LOOKUP_SLICE]
+            conn.execute("DELETE FROM probe")
+            conn.executemany(
+                "INSERT INTO probe VALUES (?, ?, ?)",
+                zip(hi[index].tolist(), lo[index].tolist(), index.tolist()),
+            )
+            hits = conn.execute(
+                "SELECT p.pos, r.payload FROM probe p JOIN results r "
+                "ON r.rules_version = ? AND r.key_hi = p.key_hi "
+                "AND r.key_lo = p.key_lo",
+                (version,),
+            ).fetchall()
+            if hits:
+                positions = np.fromiter(
+                    (pos for pos, _ in hits), dtype=np.int64, count=len(hits)
+                )
+                payload = b"".join(blob for _, blob in hits)
+                results[positions] = np.frombuffer(payload, dtype=np.float64).reshape(
+                    len(hits), len(RESULT_KEYS)
+                )
+                found[positions] = True
+        conn.execute("DELETE FROM probe")
+        conn.commit()
+        return found, results
+
+    def store(self, key_hi, key_lo, version, results):
+        """Write newly computed result rows in a single transaction."""
+        hi, lo = _signed(key_hi), _signed(key_lo)
+        order = np.lexsort((lo, hi))
+        results = np.ascontiguousarray(results[order], dtype=np.float64)
+        now = time.time()
+        with self._conn:
+            self._conn.executemany(
+                "INSERT OR REPLACE INTO results VALUES (?, ?, ?, ?, ?)",
+                (
+                    (version, h, l, now, row.tobytes())
+                    for h, l, row in zip(
+                        hi[order].tolist(), lo[order].tolist(), results
+                    )
+                ),
+            )
+
+    def versions(self):
+        """Summarize cached entries per rule version, newest first."""
+        rows = self._conn.execute(
+            "SELECT rules_version, COUNT(*), MIN(created_at), MAX(created_at) "
+            "FROM results GROUP BY rules_version ORDER BY MAX(created_at) DESC"
+        ).fetchall()
+        return [VersionInfo(*row) for row in rows]
+
+    def collect_garbage(self, keep_versions, vacuum=True):
+        """
+        Delete entries for every rule version not in keep_versions.
+
+        Returns:
+            int: Number of deleted entries
+        """
+        keep = sorted(set(keep_versions))
+        placeholders = ",".join("?" for _ in keep) or "''"
+        with self._conn:
+            cursor = self._conn.execute(
+                f"DELETE FROM results WHERE rules_version NOT IN ({placeholders})",
+                keep,
+            )
+        if vacuum:
+            self._conn.execute("VACUUM")
+        return cursor.rowcount
+
+    def close(self):
+        self._conn.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
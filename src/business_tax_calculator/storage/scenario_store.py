@@ -0,0 +1,328 @@
+# storage/scenario_store.py
+"""
+SQLite store of calculated scenarios for analytical queries.
+
+Every ingested row keeps its inputs, its results and two comparison
+columns:
+
+    s_corp_total_tax   total tax the same inputs would owe as an S-Corp
+    s_corp_savings     total_tax - s_corp_total_tax, what electing
+                       S-Corp status would save (0 for S-Corps)
+
+Rows are calculated chunk by chunk with the batch engine and inserted
+with executemany, one transaction per chunk, so memory stays bounded by
+the chunk size however large the input. Indexes on entity type, state
+(with effective rate, for per-state rankings), net income and savings
+are built after a bulk load into an empty store rather than maintained
+row by row.
+
+As in batch runs, rows failing calculator.validation checks are left out
+(and handed to a RejectedRowsWriter, if given). A run that fails partway
+is deleted again, so the store only ever holds whole runs.
+
+    with ScenarioStore("scenarios.db") as store:
+        store.ingest("clients.parquet")
+        store.query(savings_above=5000)
+        store.query(state="MD", order_by="effective_tax_rate", limit=100)
+"""
+
+import sqlite3
+import time
+from dataclasses import dataclass
+
+import numpy as np
+
+from business_tax_calculator.calculator.batch import (
+    CARRIED_NUMERIC_COLUMNS,
+    DEFAULT_CHUNK_SIZE,
+    INPUT_TEXT_COLUMNS,
+    calculate_chunk,
+    column_length,
+    compute_columns,
+    read_chunks,
+    take_rows,
+)
+from business_tax_calculator.calculator.tax_calculator import RESULT_KEYS
+from business_tax_calculator.calculator.validation import VALID, validate_columns
+from business_tax_calculator.utils.rules import rules_version
+
+COMPARISON_COLUMNS = ("net_income", "s_corp_total_tax", "s_corp_savings")
+TEXT_COLUMNS = INPUT_TEXT_COLUMNS
+REAL_COLUMNS = CARRIED_NUMERIC_COLUMNS + RESULT_KEYS + COMPARISON_COLUMNS
+SCENARIO_COLUMNS = ("run_id",) + TEXT_COLUMNS + REAL_COLUMNS
+
+_SCHEMA = (
+    """
+CREATE TABLE IF NOT EXISTS runs (
+    run_id INTEGER PRIMARY KEY,
+    label TEXT,
+    source TEXT,
+    rules_version TEXT NOT NULL,
+    created_at REAL NOT NULL,
+    rows INTEGER NOT NULL DEFAULT 0
+);
+CREATE TABLE IF NOT EXISTS scenarios (
+    run_id INTEGER NOT NULL REFERENCES runs (run_id),
+"""
+    + ",\n".join(f"    {name} TEXT NOT NULL" for name in TEXT_COLUMNS)
+    + ",\n"
+    + ",\n".join(f"    {name} REAL NOT NULL" for name in REAL_COLUMNS)
+    + "\n);\n"
+)
+
+INDEXES = {
+    "scenarios_entity_type": "entity_type",
+    "scenarios_state_rate": "state, effective_tax_rate",
+    "scenarios_net_income": "net_income",
+    "scenarios_savings": "s_corp_savings",
+    "scenarios_client": "client_id",
+}
+
+_INSERT = (
+    f"INSERT INTO scenarios ({', '.join(SCENARIO_COLUMNS)}) "
+    f"VALUES ({', '.join('?' for _ in SCENARIO_COLUMNS)})"
+)
+
+
+@dataclass(frozen=True)
+class RunInfo:
+    run_id: int
+    label: str
+    source: str
+    rules_version: str
+    created_at: float
+    rows: int
+
+
+def s_corp_total_tax(columns):
+    """Total tax of every row of a chunk recalculated as an S-Corp."""
+    as_s_corp = dict(columns)
+    as_s_corp["entity_type"] = np.full(len(columns["entity_type"]), "S-Corp")
+    return compute_columns(as_s_corp)[:, RESULT_KEYS.index("total_tax")]
+
+
+def scenario_rows(run_id, columns, results):
+    """Insert parameters for a calculated chunk, one tuple per row."""
+    total_tax = results[:, RESULT_KEYS.index("total_tax")]
+    alternative = s_corp_total_tax(columns)
+    comparison = {
+        "net_income": columns["revenue"] - columns["expenses"],
+        "s_corp_total_tax": alternative,
+        "s_corp_savings": np.where(
+            columns["entity_type"] == "S-Corp", 0.0, total_tax - alternative
+        ),
+    }
+    data = [[run_id] * len(results)]
+    data += [columns[name].tolist() for name in TEXT_COLUMNS]
+    data += [columns[name].tolist() for name in CARRIED_NUMERIC_COLUMNS]
+    data += results.T.tolist()
+    data += [comparison[name].tolist() for name in COMPARISON_COLUMNS]
+    return zip(*data)
+
+
+class ScenarioStore:
+    """SQLite-backed store of calculated scenarios."""
+
+    def __init__(self, path):
+        self.path = path
+        self._conn = sqlite3.connect(path)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        # Index builds sort through temporary files, not memory, so loading
+        # 10M rows stays within a bounded footprint.
+        self._conn.execute("PRAGMA temp_store=FILE")
+        self._conn.executescript(_SCHEMA)
+        self.create_indexes()
+
+    def create_indexes(self):
+        with self._conn:
+            for name, columns in INDEXES.items():
+                self._conn.execute(
+                    f"CREATE INDEX IF NOT EXISTS {name} ON scenarios ({columns})"
+                )
+
+    def _drop_indexes(self):
+        with self._conn:
+            for name in INDEXES:
+                self._conn.execute(f"DROP INDEX IF EXISTS {name}")
+
+    def ingest(
+        self,
+        input_path,
+        chunk_size=DEFAULT_CHUNK_SIZE,
+        label=None,
+        cache=None,
+        validate=True,
+        rejected=None,
+        summary=None,
+    ):
+        """
+        Calculate every row of a CSV, Parquet or Arrow file into the store.
+
+        Args:
+            input_path (str): Batch input file
+            chunk_size (int): Rows calculated and inserted per transaction
+            label (str): Optional name of the run
+            cache (ResultCache): Optional on-disk result cache
+            validate (bool): Store only rows passing validate_columns()
+            rejected (RejectedRowsWriter): Receives the rows that fail
+            summary (BatchSummary): Counts rejected rows, and the dedup and
+                cache counters of calculate_chunk(), if given
+
+        Returns:
+            RunInfo: The new run
+
+        Raises:
+            ValueError: If a row cannot be stored, e.g. a missing amount;
+                nothing of the run is kept
+        """
+        version = rules_version()
+        created = time.time()
+        with self._conn:
+            run_id = self._conn.execute(
+                "INSERT INTO runs (label, source, rules_version, created_at) "
+                "VALUES (?, ?, ?, ?)",
+                (label, str(input_path), version, created),
+            ).lastrowid
+        # Building indexes once after a bulk load is much faster than
+        # updating them on every insert; only worth it into an empty table.
+        bulk = self._conn.execute("SELECT 1 FROM scenarios LIMIT 1").fetchone() is None
+        if bulk:
+            self._drop_indexes()
+        rows = offset = 0
+        try:
+            for columns in read_chunks(input_path, chunk_size):
+                n = column_length(columns)
+                first, offset = offset + 1, offset + n
+                if validate:
+                    codes = validate_columns(columns)
+                    bad = np.flatnonzero(codes != VALID)
+                    if len(bad):
+                        if rejected is not None:
+                            numbers = np.arange(first, offset + 1)[bad]
+                            rejected.write(numbers, take_rows(columns, bad), codes[bad])
+                        if summary is not None:
+                            summary.rejected += len(bad)
+                        columns = take_rows(columns, codes == VALID)
+                    if len(bad) == n:
+                        continue
+                results = calculate_chunk(columns, cache, summary, version)
+                try:
+                    with self._conn:
+                        self._conn.executemany(
+                            _INSERT, scenario_rows(run_id, columns, results)
+                        )
+                except sqlite3.IntegrityError as exc:
+                    raise ValueError(
+                        f"{input_path}: rows {first}-{offset} "
+                        f"could not be stored ({exc}); amounts must be numbers"
+                    ) from exc
+                rows += len(results)
+            with self._conn:
+                self._conn.execute(
+                    "UPDATE runs SET rows = ? WHERE run_id = ?", (rows, run_id)
+                )
+        except BaseException:
+            with self._conn:
+                self._conn.execute("DELETE FROM scenarios WHERE run_id = ?", (run_id,))
+                self._conn.execute("DELETE FROM runs WHERE run_id = ?", (run_id,))
+            raise
+        finally:
+            if bulk:
+                self.create_indexes()
+        return RunInfo(run_id, label, str(input_path), version, created, rows)
+
+    def runs(self):
+        rows = self._conn.execute(
+            "SELECT run_id, label, source, rules_version, created_at, rows "
+            "FROM runs ORDER BY run_id"
+        ).fetchall()
+        return [RunInfo(*row) for row in rows]
+
+    @staticmethod
+    def _where(
+        entity_type=None,
+        state=None,
+        net_income_above=None,
+        net_income_below=None,
+        savings_above=None,
+        run_id=None,
+    ):
+        filters = (
+            ("entity_type", "=", entity_type),
+            ("state", "=", state),
+            ("net_income", ">", net_income_above),
+            ("net_income", "<", net_income_below),
+            ("s_corp_savings", ">", savings_above),
+            ("run_id", "=", run_id),
+        )
+        clauses, params = [], []
+        for column, operator, value in filters:
+            if value is not None:
+                clauses.append(f"{column} {operator} ?")
+                params.append(value)
+        return (" WHERE " + " AND ".join(clauses) if clauses else ""), params
+
+    def iter_query(
+        self, order_by=None, descending=True, limit=None, columns=None, **filters
+    ):
+        """
+        Scenarios matching every given filter, fetched as they are read.
+
+        Args:
+            order_by (str): Column to sort by
+            descending (bool): Sort largest first
+            limit (int): Most rows to return
+            columns (list): Columns to return, defaults to all
+            **filters: Any of entity_type, state, run_id (equal to),
+                net_income_above, net_income_below and savings_above
+                (s_corp_savings strictly above)
+
+        Yields:
+            dict: One per scenario
+        """
+        columns = list(columns or SCENARIO_COLUMNS)
+        for name in columns + ([order_by] if order_by else []):
+            if name not in SCENARIO_COLUMNS:
+                raise ValueError(f"Unknown column: {name!r}")
+        where, params = self._where(**filters)
+        sql = f"SELECT {', '.join(columns)} FROM scenarios{where}"
+        if order_by:
+            sql += f" ORDER BY {order_by} {'DESC' if descending else 'ASC'}"
+        if limit is not None:
+            sql += " LIMIT ?"
+            params.append(int(limit))
+        for row in self._conn.execute(sql, params):
+            yield dict(zip(columns, row))
+
+    def query(
+        self, order_by=None, descending=True, limit=None, columns=None, **filters
+    ):
+        """
+        iter_query() collected into a list.
+
+        Returns:
+            list: One dict per scenario
+        """
+        return list(self.iter_query(order_by, descending, limit, columns, **filters))
+
+    def count(self, **filters):
+        """Number of scenarios matching query() filters."""
+        where, params = self._where(**filters)
+        return self._conn.execute(
+            f"SELECT COUNT(*) FROM scenarios{where}", params
+        ).fetchone()[0]
+
+    def explain(self, sql, params=()):
+        """SQLite's query plan for a statement, e.g. to check index use."""
+        rows = self._conn.execute(f"EXPLAIN QUERY PLAN {sql}", params).fetchall()
+        return [row[-1] for row in rows]
+
+    def close(self):
+        self._conn.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
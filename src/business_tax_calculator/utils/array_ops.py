@@ -0,0 +1,32 @@
+# utils/array_ops.py
+"""
+Element-wise operations shared by the scalar and vectorized calculations.
+
+Deductions and liabilities are written once against an ``ops`` namespace
+exposing ``maximum``, ``minimum``, ``where`` and ``isin``. Passing
+SCALAR_OPS evaluates them on plain floats for a single business; passing
+the numpy module evaluates the same expressions over whole columns.
+"""
+
+
+class ScalarOps:
+    """numpy-compatible subset of element-wise operations on Python scalars."""
+
+    @staticmethod
+    def maximum(a, b):
+        return a if a >= b else b
+
+    @staticmethod
+    def minimum(a, b):
+        return a if a <= b else b
+
+    @staticmethod
+    def where(condition, if_true, if_false):
+        return if_true if condition else if_false
+
+    @staticmethod
+    def isin(value, options):
+        return value in options
+
+
+SCALAR_OPS = ScalarOps()
@@ -65,6 +65,7 @@ HEALTH_INSURANCE_DEDUCTION_RATE = 1.0  # 100% deductible for self-employed
 
 # Home office deduction rate (per square foot)
 HOME_OFFICE_DEDUCTION_RATE = 5  # $5 per square foot, up to 300 square feet
+HOME_OFFICE_MAX_SQUARE_FEET = 300
 
 # Local income tax rates (estimated average by state)
 LOCAL_INCOME_TAX_RATE = 0.032  # 5% default rate - this would vary by location
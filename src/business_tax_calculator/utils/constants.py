@@ -1,6 +1,19 @@
 from enum import Enum
 
 
+# Entity types as entered in the calculator and the Streamlit app
+SELF_EMPLOYED_ENTITY_TYPES = ("Sole Proprietorship", "LLC")
+PASS_THROUGH_ENTITY_TYPES = SELF_EMPLOYED_ENTITY_TYPES + ("S-Corp",)
+ENTITY_TYPES = PASS_THROUGH_ENTITY_TYPES + ("C-Corp",)
+
+# USPS codes of the states, DC and the inhabited territories
+STATE_CODES = tuple(
+    "AL AK AZ AR CA CO CT DE FL GA HI ID IL IN IA KS KY LA ME MD "
+    "MA MI MN MS MO MT NE NV NH NJ NM NY NC ND OH OK OR PA RI SC "
+    "SD TN TX UT VT VA WA WV WI WY DC AS GU MP PR VI".split()
+)
+
+
 class EntityType(Enum):
     SOLE_PROPRIETOR = "Sole Proprietor"
     S_CORP = "S-Corporation"
@@ -0,0 +1,38 @@
+# utils/optional.py
+"""
+Optional dependency handling.
+
+The interactive calculator and the scalar calculation only need the
+standard library. numpy (batch mode), pyarrow (Parquet and Arrow batch
+files) and pandas (legacy reports) are installed through extras and
+imported on first use.
+"""
+
+import importlib
+
+
+class MissingDependencyError(ImportError):
+    """An optional dependency needed by the requested feature is missing."""
+
+
+def import_optional(name, extra):
+    """
+    Import an optional dependency or explain how to install it.
+
+    Args:
+        name (str): Module to import, e.g. "numpy"
+        extra (str): pyproject extra that provides it, e.g. "batch"
+
+    Returns:
+        module: The imported module
+
+    Raises:
+        MissingDependencyError: If the module is not installed
+    """
+    try:
+        return importlib.import_module(name)
+    except ImportError as exc:
+        raise MissingDependencyError(
+            f"{name} is required for this feature. Install it with: "
+            f"pip install 'business-tax-calculator[{extra}]'"
+        ) from exc
@@ -0,0 +1,168 @@
+# utils/plugins.py
+"""
+Entry-point plugins for extra deductions and liabilities.
+
+Separately installed packages advertise components under the entry-point
+groups below, e.g. in their pyproject.toml:
+
+    [project.entry-points."business_tax_calculator.deductions"]
+    equipment = "firm_rules.deductions:EquipmentDeduction"
+
+    [project.entry-points."business_tax_calculator.liabilities"]
+    surtax = "firm_rules.liabilities:MetroSurtaxLiability"
+
+A deduction plugin is a BaseDeduction subclass and a liability plugin a
+Liability subclass, so both run in the scalar and the vectorized
+calculation. A liability defining only calculate() is evaluated one row
+at a time; implementing evaluate() vectorizes it. Deduction inputs must
+be Business calculation fields or pipeline values, which are what the
+caches key on.
+
+Nothing is read at import time. importlib.metadata is imported and asked
+for a group's entry points on first use (the rule version fingerprints
+them), and the first calculation imports every plugin of a group at once:
+the deduction pipeline and the tax liability need all of them.
+"""
+
+import importlib
+import threading
+
+DEDUCTION_PLUGINS = "business_tax_calculator.deductions"
+LIABILITY_PLUGINS = "business_tax_calculator.liabilities"
+PLUGIN_GROUPS = (DEDUCTION_PLUGINS, LIABILITY_PLUGINS)
+
+_lock = threading.Lock()
+_discovered = {}
+_loaded = {}
+
+
+class PluginEntryPoint:
+    """One advertised plugin: ``name = module:attribute`` in a group."""
+
+    __slots__ = ("name", "value", "group", "version")
+
+    def __init__(self, name, value, group, version=""):
+        self.name = name
+        self.value = value
+        self.group = group
+        self.version = version
+
+    def load(self):
+        module_name, _, attribute = self.value.partition(":")
+        target = importlib.import_module(module_name.strip())
+        for part in filter(None, attribute.strip().split(".")):
+            target = getattr(target, part)
+        return target
+
+    def __repr__(self):
+        return f"PluginEntryPoint({self.name!r}, {self.value!r}, {self.group!r})"
+
+
+def _entry_points(group):
+    """Entry points of a group from the installed distributions' metadata."""
+    # Deferred to first use: importing importlib.metadata takes longer than
+    # a whole scalar calculation, so it is kept off the import path.
+    from importlib.metadata import entry_points
+
+    found = []
+    for entry_point in entry_points(group=group):
+        target = entry_point.module
+        if entry_point.attr:
+            target = f"{target}:{entry_point.attr}"
+        dist = getattr(entry_point, "dist", None)
+        version = dist.version if dist is not None else ""
+        found.append(PluginEntryPoint(entry_point.name, target, group, version))
+    return found
+
+
+def discover(group):
+    """
+    Entry points advertised for a group, sorted by name. Nothing is imported.
+
+    Args:
+        group (str): DEDUCTION_PLUGINS or LIABILITY_PLUGINS
+
+    Returns:
+        tuple: PluginEntryPoint objects
+    """
+    found = _discovered.get(group)
+    if found is None:
+        with _lock:
+            found = _discovered.get(group)
+            if found is None:
+                found = tuple(sorted(_entry_points(group), key=lambda ep: ep.name))
+                _discovered[group] = found
+    return found
+
+
+def load_plugins(group, base=None):
+    """
+    Import every plugin of a group, once.
+
+    Loading is lazy per group, not per plugin: the first call imports all
+    of the group's entry points, since every caller needs all of them.
+
+    Args:
+        group (str): DEDUCTION_PLUGINS or LIABILITY_PLUGINS
+        base (type): Class every plugin must subclass
+
+    Returns:
+        tuple: The loaded plugin classes, in entry-point name order
+    """
+    loaded = _loaded.get(group)
+    if loaded is not None:
+        return loaded
+    entry_points = discover(group)
+    with _lock:
+        loaded = _loaded.get(group)
+        if loaded is None:
+            plugins = []
+            for entry_point in entry_points:
+                try:
+                    plugin = entry_point.load()
+                except Exception as exc:
+                    raise ImportError(
+                        f"Could not load {group} plugin '{entry_point.name}' "
+                        f"({entry_point.value}): {exc}"
+                    ) from exc
+                if base is not None and not (
+                    isinstance(plugin, type) and issubclass(plugin, base)
+                ):
+                    raise TypeError(
+                        f"{group} plugin '{entry_point.name}' must be a "
+                        f"{base.__name__} subclass."
+                    )
+                plugins.append(plugin)
+            loaded = tuple(plugins)
+            _loaded[group] = loaded
+    return loaded
+
+
+def plugin_fingerprint():
+    """
+    Identify the installed plugins without importing them, for the rule
+    table: installing, removing or upgrading a plugin changes results.
+
+    Returns:
+        tuple: (group, name, target, distribution version) per plugin
+    """
+    fingerprint = []
+    for group in PLUGIN_GROUPS:
+        for entry_point in discover(group):
+            fingerprint.append(
+                (group, entry_point.name, entry_point.value, entry_point.version)
+            )
+    return tuple(fingerprint)
+
+
+def reset_plugins():
+    """
+    Forget discovered and loaded plugins, e.g. after installing one at
+    runtime, and recompute the rule version.
+    """
+    from business_tax_calculator.utils.rules import notify_rules_changed
+
+    with _lock:
+        _discovered.clear()
+        _loaded.clear()
+    notify_rules_changed()
@@ -0,0 +1,210 @@
+# utils/profiler.py
+"""
+Built-in sampling profiler writing collapsed stacks.
+
+A background thread periodically captures the stack of the profiled
+thread with sys._current_frames() and counts identical stacks. The
+result is written in the collapsed ("folded") format read by
+flamegraph.pl, inferno and speedscope: one line per distinct stack,
+frames root first separated by ';', followed by the sample count.
+
+    with profile("out.folded", interval=0.001) as profiler:
+        run_batch(...)
+    print(profiler.report())
+
+Taking a sample holds the GIL, so it pauses the profiled thread. The
+sampler times itself and backs off (doubling its interval) whenever the
+time spent sampling exceeds ``max_overhead`` of the elapsed time; the
+report states the overhead actually incurred.
+"""
+
+import os
+import sys
+import threading
+import time
+from collections import Counter
+from contextlib import contextmanager
+
+PACKAGE = "business_tax_calculator"
+
+# Areas of the package that time is attributed to, most specific first.
+AREAS = (
+    ("model/liabilities", f"{PACKAGE}.model.liabilities"),
+    ("model/deduction", f"{PACKAGE}.model.deduction"),
+    ("calculator", f"{PACKAGE}.calculator"),
+    ("legacy", f"{PACKAGE}.legacy"),
+    ("other package code", PACKAGE),
+)
+OUTSIDE = "outside the package"
+
+DEFAULT_INTERVAL = 0.001
+DEFAULT_MAX_OVERHEAD = 0.05
+MAX_STACK_DEPTH = 256
+
+
+def _module_name(frame):
+    name = frame.f_globals.get("__name__")
+    if name:
+        return name
+    return os.path.splitext(os.path.basename(frame.f_code.co_filename))[0]
+
+
+def frame_label(frame):
+    """``module:function``, with the package prefix dropped for our modules."""
+    module = _module_name(frame)
+    if module.startswith(PACKAGE + "."):
+        module = module[len(PACKAGE) + 1 :]
+    # Spaces and semicolons are separators in the collapsed format.
+    return f"{module}:{frame.f_code.co_name}".replace(" ", "_").replace(";", ":")
+
+
+def area_of(modules):
+    """
+    Area the innermost package frame of a stack belongs to.
+
+    Args:
+        modules (tuple): Module names of the stack, root first
+    """
+    for module in reversed(modules):
+        for area, prefix in AREAS:
+            if module == prefix or module.startswith(prefix + "."):
+                return area
+    return OUTSIDE
+
+
+class SamplingProfiler:
+    """
+    Samples one thread's stack at a fixed interval.
+
+    Args:
+        interval (float): Seconds between samples
+        max_overhead (float): Largest fraction of elapsed time the sampler
+            may spend taking samples before it lengthens its interval
+        thread_id (int): Thread to sample, defaults to the one calling start()
+    """
+
+    def __init__(
+        self,
+        interval=DEFAULT_INTERVAL,
+        max_overhead=DEFAULT_MAX_OVERHEAD,
+        thread_id=None,
+    ):
+        if interval <= 0:
+            raise ValueError("interval must be positive")
+        self.interval = interval
+        self.max_overhead = max_overhead
+        self.thread_id = thread_id
+        self.stacks = Counter()
+        self.areas = Counter()
+        self.samples = 0
+        self.sampling_seconds = 0.0
+        self.elapsed = 0.0
+        self.final_interval = interval
+        self._stop = threading.Event()
+        self._thread = None
+        self._switch_interval = None
+        self._started = None
+
+    def start(self):
+        if self._thread is not None:
+            raise RuntimeError("profiler already started")
+        if self.thread_id is None:
+            self.thread_id = threading.get_ident()
+        # The sampler can only run when the profiled thread hands over the
+        # GIL; make it do so at least once per sampling interval.
+        self._switch_interval = sys.getswitchinterval()
+        sys.setswitchinterval(min(self._switch_interval, self.interval))
+        self._started = time.perf_counter()
+        self._thread = threading.Thread(
+            target=self._run, name="sampling-profiler", daemon=True
+        )
+        self._thread.start()
+        return self
+
+    def stop(self):
+        if self._thread is None:
+            return self
+        self._stop.set()
+        self._thread.join()
+        self._thread = None
+        self.elapsed = time.perf_counter() - self._started
+        sys.setswitchinterval(self._switch_interval)
+        return self
+
+    def _sample(self):
+        frame = sys._current_frames().get(self.thread_id)
+        if frame is None:
+            return
+        labels = []
+        modules = []
+        while frame is not None and len(labels) < MAX_STACK_DEPTH:
+            labels.append(frame_label(frame))
+            modules.append(_module_name(frame))
+            frame = frame.f_back
+        labels.reverse()
+        modules.reverse()
+        self.stacks[";".join(labels)] += 1
+        self.areas[area_of(modules)] += 1
+        self.samples += 1
+
+    def _run(self):
+        interval = self.interval
+        clock = time.perf_counter
+        while not self._stop.wait(interval):
+            start = clock()
+            self._sample()
+            self.sampling_seconds += clock() - start
+            elapsed = start - self._started
+            if elapsed > 0 and self.sampling_seconds > self.max_overhead * elapsed:
+                interval *= 2
+        self.final_interval = interval
+
+    @property
+    def overhead(self):
+        """Fraction of the elapsed time spent taking samples."""
+        return self.sampling_seconds / self.elapsed if self.elapsed else 0.0
+
+    def folded(self):
+        """Collapsed-stack lines, heaviest stack first."""
+        return [f"{stack} {count}" for stack, count in self.stacks.most_common()]
+
+    def write(self, path):
+        with open(path, "w") as handle:
+            for line in self.folded():
+                handle.write(line + "\n")
+
+    def report(self):
+        """Human-readable summary of sampling overhead and time by area."""
+        lines = [
+            f"{self.samples:,} samples over {self.elapsed:.2f}s "
+            f"(interval {self.interval * 1000:g}ms, "
+            f"ended at {self.final_interval * 1000:g}ms); "
+            f"sampling overhead {self.overhead:.1%} "
+            f"(bound {self.max_overhead:.0%})"
+        ]
+        for area, count in self.areas.most_common():
+            share = count / self.samples if self.samples else 0.0
+            lines.append(f"  {area:<20}{share:>7.1%}")
+        return "\n".join(lines)
+
+
+@contextmanager
+def profile(path=None, interval=DEFAULT_INTERVAL, max_overhead=DEFAULT_MAX_OVERHEAD):
+    """
+    Profile the body of a with block.
+
+    Args:
+        path (str): Where to write the collapsed stacks, if anywhere
+        interval (float): Seconds between samples
+        max_overhead (float): Overhead bound, see SamplingProfiler
+
+    Yields:
+        SamplingProfiler: Stopped, with its results, once the block exits
+    """
+    profiler = SamplingProfiler(interval, max_overhead).start()
+    try:
+        yield profiler
+    finally:
+        profiler.stop()
+        if path is not None:
+            profiler.write(path)
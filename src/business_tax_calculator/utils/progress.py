@@ -0,0 +1,246 @@
+# utils/progress.py
+"""
+Progress and throughput telemetry for batch runs.
+
+Batch loops report through a BatchProgress, once per chunk and never per
+row, so a hook costs one call per tens of thousands of rows:
+
+    progress = BatchProgress([TtyProgress(), JsonLinesSink("run.jsonl")])
+    run_batch("clients.csv", "results.csv", progress=progress)
+
+Every report becomes a ProgressEvent passed to each hook, which is any
+callable taking the event. Events are
+
+    start    before the first chunk
+    chunk    after each chunk is calculated and written
+    shard    after a shard of a sharded job is marked done
+    finish   after the last chunk
+    error    when the run stops on an exception (then re-raised)
+
+and carry the running totals an operator needs: rows done, rows in total
+(when known, else None), rows per second, ETA, errors so far and the
+worker's utilization, the fraction of its wall time spent calculating
+rather than reading and writing. Events name their worker as host:pid,
+so the JSON lines of several machines working one job can be told apart.
+"""
+
+import json
+import os
+import socket
+import sys
+import time
+from dataclasses import asdict, dataclass
+
+
+@dataclass(frozen=True)
+class ProgressEvent:
+    kind: str
+    worker: str
+    label: str
+    time: float
+    elapsed: float
+    rows: int
+    rows_total: int = None
+    errors: int = 0
+    chunks: int = 0
+    chunk_rows: int = 0
+    read_seconds: float = 0.0
+    compute_seconds: float = 0.0
+    write_seconds: float = 0.0
+    rows_per_second: float = 0.0
+    eta_seconds: float = None
+    utilization: float = 0.0
+    message: str = ""
+
+    def as_dict(self):
+        return asdict(self)
+
+
+def worker_name():
+    return f"{socket.gethostname()}:{os.getpid()}"
+
+
+class BatchProgress:
+    """
+    Running totals of one batch run, reported to hooks as ProgressEvents.
+
+    Args:
+        hooks (list): Callables taking a ProgressEvent
+        rows_total (int): Rows the run will process, if known
+        label (str): Name of the run in events, e.g. the input path
+    """
+
+    def __init__(self, hooks=(), rows_total=None, label=""):
+        self.hooks = list(hooks)
+        self.rows_total = rows_total
+        self.label = label
+        self.worker = worker_name()
+        self.rows = 0
+        self.errors = 0
+        self.chunks = 0
+        self.compute_seconds = 0.0
+        self._start = None
+
+    def _emit(self, kind, **fields):
+        now = time.perf_counter()
+        if self._start is None:
+            self._start = now
+        elapsed = now - self._start
+        rate = self.rows / elapsed if elapsed else 0.0
+        eta = None
+        if self.rows_total is not None and rate:
+            eta = max(0.0, self.rows_total - self.rows) / rate
+        fields.setdefault("label", self.label)
+        event = ProgressEvent(
+            kind=kind,
+            worker=self.worker,
+            time=time.time(),
+            elapsed=elapsed,
+            rows=self.rows,
+            rows_total=self.rows_total,
+            errors=self.errors,
+            chunks=self.chunks,
+            rows_per_second=rate,
+            eta_seconds=eta,
+            utilization=self.compute_seconds / elapsed if elapsed else 0.0,
+            **fields,
+        )
+        for hook in self.hooks:
+            hook(event)
+        return event
+
+    def start(self):
+        self._start = time.perf_counter()
+        return self._emit("start")
+
+    def chunk(self, rows, read=0.0, compute=0.0, write=0.0, errors=0):
+        """
+        Account for one finished chunk.
+
+        Args:
+            rows (int): Rows in the chunk
+            read, compute, write (float): Seconds spent on each stage
+            errors (int): Rows of the chunk that failed
+        """
+        self.rows += rows
+        self.errors += errors
+        self.chunks += 1
+        self.compute_seconds += compute
+        return self._emit(
+            "chunk",
+            chunk_rows=rows,
+            read_seconds=read,
+            compute_seconds=compute,
+            write_seconds=write,
+        )
+
+    def shard(self, shard_id, rows):
+        return self._emit("shard", label=shard_id, chunk_rows=rows)
+
+    def finish(self):
+        return self._emit("finish")
+
+    def error(self, exc):
+        return self._emit("error", message=f"{type(exc).__name__}: {exc}")
+
+
+def _duration(seconds):
+    seconds = int(seconds)
+    hours, seconds = divmod(seconds, 3600)
+    minutes, seconds = divmod(seconds, 60)
+    if hours:
+        return f"{hours}:{minutes:02d}:{seconds:02d}"
+    return f"{minutes}:{seconds:02d}"
+
+
+def format_event(event):
+    """One-line human summary of an event."""
+    if event.rows_total:
+        done = f"{event.rows:,}/{event.rows_total:,} rows"
+        done += f" {min(event.rows / event.rows_total, 1.0):6.1%}"
+    else:
+        done = f"{event.rows:,} rows"
+    parts = [done, f"{event.rows_per_second:,.0f} rows/s"]
+    if event.eta_seconds is not None and event.kind != "finish":
+        parts.append(f"ETA {_duration(event.eta_seconds)}")
+    parts.append(f"util {event.utilization:.0%}")
+    parts.append(f"errors {event.errors:,}")
+    if event.kind == "finish":
+        parts.append(f"done in {_duration(event.elapsed)}")
+    return "  ".join(parts)
+
+
+class TtyProgress:
+    """
+    Progress line on a terminal, redrawn at most every interval seconds.
+
+    On a stream that is not a terminal, e.g. a log file, a full line is
+    written every log_interval seconds instead.
+
+    Args:
+        stream: Where to write, defaults to sys.stderr
+        interval (float): Seconds between redraws on a terminal
+        log_interval (float): Seconds between lines otherwise
+    """
+
+    def __init__(self, stream=None, interval=0.5, log_interval=10.0):
+        self.stream = stream or sys.stderr
+        self.tty = hasattr(self.stream, "isatty") and self.stream.isatty()
+        self.interval = interval if self.tty else log_interval
+        self._last = None
+        self._width = 0
+
+    def _write(self, line, final=False):
+        if self.tty:
+            padding = " " * max(0, self._width - len(line))
+            self._width = len(line)
+            self.stream.write(f"\r{line}{padding}" + ("\n" if final else ""))
+        else:
+            self.stream.write(line + "\n")
+        self.stream.flush()
+
+    def __call__(self, event):
+        if event.kind == "error":
+            self._write(format_event(event), final=True)
+            self.stream.write(f"error: {event.message}\n")
+            return
+        if event.kind == "finish":
+            self._write(format_event(event), final=True)
+            return
+        if event.kind != "chunk":
+            return
+        now = time.monotonic()
+        if self._last is None or now - self._last >= self.interval:
+            self._last = now
+            self._write(format_event(event))
+
+
+class JsonLinesSink:
+    """
+    Appends every event as one JSON object per line, for log shippers.
+
+    Args:
+        target (str or file): Path to append to, or an open text stream
+    """
+
+    def __init__(self, target):
+        if isinstance(target, (str, os.PathLike)):
+            self._handle = open(target, "a")
+            self._owned = True
+        else:
+            self._handle = target
+            self._owned = False
+
+    def __call__(self, event):
+        self._handle.write(json.dumps(event.as_dict()) + "\n")
+        self._handle.flush()
+
+    def close(self):
+        if self._owned:
+            self._handle.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
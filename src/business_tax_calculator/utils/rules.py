@@ -0,0 +1,125 @@
+# utils/rules.py
+"""
+Rule-table versioning for cached calculation results.
+
+Every cache in front of the calculator keys its entries on a version tag
+derived from the rate constants that feed the calculation, so results
+computed under an older rule table are never served after the constants
+change.
+"""
+
+import hashlib
+import threading
+import weakref
+
+from business_tax_calculator.calculator.deduction_calculator import (
+    QBI_INCOME_THRESHOLDS,
+)
+from business_tax_calculator.model.liabilities.local_income_tax_liability import (
+    LocalIncomeTaxLiability,
+)
+from business_tax_calculator.model.liabilities.medicare_income_tax_liability import (
+    MedicareIncomeTaxLiability,
+)
+from business_tax_calculator.model.liabilities import (
+    social_security_income_tax_liability as social_security,
+)
+from business_tax_calculator.utils.config import (
+    HEALTH_INSURANCE_DEDUCTION_RATE,
+    HOME_OFFICE_DEDUCTION_RATE,
+    HOME_OFFICE_MAX_SQUARE_FEET,
+    RETIREMENT_CONTRIBUTION_LIMITS,
+    SELF_EMPLOYMENT_TAX_DEDUCTION,
+)
+from business_tax_calculator.utils.constants import MarginalTaxBrackets, TaxRates
+from business_tax_calculator.utils.plugins import plugin_fingerprint
+
+# Bump whenever the calculation logic changes in a way the rate constants
+# do not capture, so persisted results from older code are not reused.
+ENGINE_REVISION = 2
+
+_lock = threading.Lock()
+_version = None
+_listeners = []
+
+
+def rule_table():
+    """
+    Collect every rate constant used by the calculation into one mapping,
+    plus the identity of installed deduction and liability plugins.
+
+    Returns:
+        dict: Constant name mapped to its current value
+    """
+    social_security_tax = social_security.SocialSecurityIncomeTaxLiability
+    return {
+        "engine_revision": ENGINE_REVISION,
+        "federal_brackets": MarginalTaxBrackets.FEDERAL.value,
+        "state_brackets": MarginalTaxBrackets.STATE.value,
+        "social_security_rate": social_security_tax.rate,
+        "social_security_wage_base": social_security_tax.wage_base,
+        "medicare_rate": MedicareIncomeTaxLiability.rate,
+        "medicare_additional_rate": MedicareIncomeTaxLiability.additional_rate,
+        "medicare_threshold": MedicareIncomeTaxLiability.threshold,
+        "local_rate": LocalIncomeTaxLiability.rate,
+        "qbi_thresholds": QBI_INCOME_THRESHOLDS,
+        "self_employment_earnings_factor": TaxRates.EMPLOYER_FICA_TAX_RATE.value,
+        "self_employment_tax_deduction": SELF_EMPLOYMENT_TAX_DEDUCTION,
+        "health_insurance_deduction_rate": HEALTH_INSURANCE_DEDUCTION_RATE,
+        "home_office_deduction_rate": HOME_OFFICE_DEDUCTION_RATE,
+        "home_office_max_square_feet": HOME_OFFICE_MAX_SQUARE_FEET,
+        "retirement_contribution_limit": RETIREMENT_CONTRIBUTION_LIMITS["SEP IRA"],
+        "plugins": plugin_fingerprint(),
+    }
+
+
+def rules_version():
+    """
+    Return a short, stable tag identifying the current rule table.
+
+    Returns:
+        str: Hex digest of the canonical rule table
+    """
+    global _version
+    with _lock:
+        if _version is None:
+            canonical = repr(sorted(rule_table().items()))
+            _version = hashlib.blake2b(canonical.encode(), digest_size=8).hexdigest()
+        return _version
+
+
+def on_rules_changed(listener):
+    """
+    Register a callback invoked with the new version tag after a rule change.
+    Bound methods are held weakly so a registered cache can still be
+    garbage collected.
+
+    Args:
+        listener (callable): Function taking the new version tag
+    """
+    if hasattr(listener, "__self__"):
+        ref = weakref.WeakMethod(listener)
+    else:
+        ref = lambda: listener  # noqa: E731
+    with _lock:
+        _listeners.append(ref)
+
+
+def notify_rules_changed():
+    """
+    Recompute the version tag after rate constants were edited at runtime
+    and notify every registered listener.
+
+    Returns:
+        str: The new version tag
+    """
+    global _version
+    with _lock:
+        _version = None
+        _listeners[:] = [ref for ref in _listeners if ref() is not None]
+        listeners = [ref() for ref in _listeners]
+    version = rules_version()
+    for listener in listeners:
+        if listener is not None:
+            listener(version)
+    return version
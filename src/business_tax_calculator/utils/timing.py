@@ -0,0 +1,200 @@
+# utils/timing.py
+"""
+Opt-in per-stage timing for the calculation pipeline and batch runs.
+
+Instrumented code asks for a lap recorder once and marks the end of each
+stage:
+
+    laps = timing.laps("calculate")
+    ...deductions...
+    laps.lap("deductions")
+
+While timing is disabled (the default) laps() returns a shared recorder
+whose lap() does nothing, so the cost is one no-op call per stage. Once
+enabled, every lap adds the time since the previous one to the stage's
+count, total and latency histogram. snapshot() returns the collected
+figures and prometheus_text() renders them in the Prometheus text
+exposition format.
+"""
+
+import threading
+import time
+from bisect import bisect_left
+
+# Histogram bucket upper bounds in seconds.
+BUCKETS = (
+    1e-6,
+    2.5e-6,
+    5e-6,
+    1e-5,
+    2.5e-5,
+    5e-5,
+    1e-4,
+    2.5e-4,
+    5e-4,
+    1e-3,
+    2.5e-3,
+    5e-3,
+    1e-2,
+    2.5e-2,
+    5e-2,
+    0.1,
+    0.25,
+    0.5,
+    1.0,
+    2.5,
+    5.0,
+    10.0,
+)
+
+METRIC_NAME = "business_tax_stage_seconds"
+
+_lock = threading.Lock()
+_stages = {}
+_enabled = False
+
+
+class StageStats:
+    """Count, total and bucketed latencies of one stage."""
+
+    __slots__ = ("count", "total", "buckets")
+
+    def __init__(self):
+        self.count = 0
+        self.total = 0.0
+        # One counter per bucket plus the overflow above the last bound.
+        self.buckets = [0] * (len(BUCKETS) + 1)
+
+    def add(self, seconds):
+        self.count += 1
+        self.total += seconds
+        self.buckets[bisect_left(BUCKETS, seconds)] += 1
+
+    def as_dict(self):
+        return {
+            "count": self.count,
+            "total_seconds": self.total,
+            "mean_seconds": self.total / self.count if self.count else 0.0,
+            "buckets": dict(zip(BUCKETS + (float("inf"),), self.buckets)),
+        }
+
+
+def record(stage, seconds):
+    """Add one observation of ``stage``, whether or not timing is enabled."""
+    with _lock:
+        stats = _stages.get(stage)
+        if stats is None:
+            stats = _stages[stage] = StageStats()
+        stats.add(seconds)
+
+
+class Laps:
+    """Records the time between consecutive lap() calls as named stages."""
+
+    __slots__ = ("prefix", "last")
+
+    def __init__(self, prefix):
+        self.prefix = prefix
+        self.last = time.perf_counter()
+
+    def lap(self, stage):
+        now = time.perf_counter()
+        record(f"{self.prefix}.{stage}", now - self.last)
+        self.last = now
+
+    def restart(self):
+        """Start the next stage now, e.g. after waiting on something untimed."""
+        self.last = time.perf_counter()
+
+
+class _NullLaps:
+    __slots__ = ()
+
+    def lap(self, stage):
+        pass
+
+    def restart(self):
+        pass
+
+
+_NULL_LAPS = _NullLaps()
+
+
+def laps(prefix):
+    """
+    Lap recorder for the stages of one pass through ``prefix``.
+
+    Args:
+        prefix (str): Stage name prefix, e.g. "calculate" or "batch"
+
+    Returns:
+        Laps: A live recorder when timing is enabled, a no-op one otherwise
+    """
+    if _enabled:
+        return Laps(prefix)
+    return _NULL_LAPS
+
+
+def enable():
+    global _enabled
+    _enabled = True
+
+
+def disable():
+    global _enabled
+    _enabled = False
+
+
+def is_enabled():
+    return _enabled
+
+
+def reset():
+    """Forget every recorded observation."""
+    with _lock:
+        _stages.clear()
+
+
+def snapshot():
+    """
+    Copy of the figures recorded so far.
+
+    Returns:
+        dict: Stage name to count, total_seconds, mean_seconds and
+        buckets (upper bound in seconds to observations in that bucket)
+    """
+    with _lock:
+        return {stage: stats.as_dict() for stage, stats in sorted(_stages.items())}
+
+
+def _format_bound(bound):
+    return "+Inf" if bound == float("inf") else repr(bound)
+
+
+def prometheus_text(stages=None):
+    """
+    Render stage figures in the Prometheus text exposition format.
+
+    Args:
+        stages (dict): Output of snapshot(), defaults to a fresh one
+
+    Returns:
+        str: One cumulative histogram per stage
+    """
+    if stages is None:
+        stages = snapshot()
+    lines = [
+        f"# HELP {METRIC_NAME} Time spent in calculation and batch stages.",
+        f"# TYPE {METRIC_NAME} histogram",
+    ]
+    for stage, stats in stages.items():
+        cumulative = 0
+        for bound, count in stats["buckets"].items():
+            cumulative += count
+            lines.append(
+                f'{METRIC_NAME}_bucket{{stage="{stage}",le="{_format_bound(bound)}"}}'
+                f" {cumulative}"
+            )
+        lines.append(f'{METRIC_NAME}_sum{{stage="{stage}"}} {stats["total_seconds"]!r}')
+        lines.append(f'{METRIC_NAME}_count{{stage="{stage}"}} {stats["count"]}')
+    return "\n".join(lines) + "\n"
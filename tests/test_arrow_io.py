@@ -0,0 +1,159 @@
+import sys
+import os
+
+sys.path.insert(
+    0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "src"))
+)
+
+import csv
+import json
+
+import numpy as np
+import pyarrow as pa
+import pyarrow.feather as feather
+import pyarrow.parquet as pq
+from business_tax_calculator.calculator.arrow_io import (
+    ARROW_OUTPUT_COLUMNS,
+    batch_to_columns,
+    output_schema,
+)
+from business_tax_calculator.calculator.batch import (
+    file_format,
+    rows_to_columns,
+    run_batch,
+)
+from business_tax_calculator.calculator.tax_calculator import RESULT_KEYS
+from business_tax_calculator.cli import main as cli_main
+from business_tax_calculator.utils.rules import rules_version
+
+ROWS = [
+    {"client_id": "A1", "entity_type": "Sole Proprietorship", "revenue": 120000.0},
+    {
+        "client_id": "A2",
+        "entity_type": "S-Corp",
+        "revenue": 250000.0,
+        "expenses": 60000.0,
+        "reasonable_salary": 90000.0,
+    },
+    {
+        "client_id": "A3",
+        "entity_type": "LLC",
+        "revenue": 80000.0,
+        "expenses": 20000.0,
+        "filing_status": "Married Filing Jointly",
+        "state": "CA",
+    },
+]
+
+
+def input_table(rows):
+    fields = sorted({key for row in rows for key in row})
+    return pa.table({field: [row.get(field) for row in rows] for field in fields})
+
+
+def csv_results(tmp_path, rows):
+    source, target = tmp_path / "in.csv", tmp_path / "out.csv"
+    fields = sorted({key for row in rows for key in row})
+    with open(source, "w", newline="") as handle:
+        writer = csv.DictWriter(handle, fieldnames=fields)
+        writer.writeheader()
+        writer.writerows(rows)
+    run_batch(str(source), str(target))
+    with open(target, newline="") as handle:
+        reader = csv.reader(handle)
+        header = next(reader)
+        first = header.index(RESULT_KEYS[0])
+        return [[float(v) for v in row[first:]] for row in reader]
+
+
+def test_formats_follow_extensions():
+    assert file_format("a.parquet") == "parquet"
+    assert file_format("a.FEATHER") == "arrow"
+    assert file_format("a.txt") == "csv"
+    assert file_format("a.txt", "arrow") == "arrow"
+
+
+def test_parquet_and_arrow_results_match_csv(tmp_path):
+    pq.write_table(input_table(ROWS), tmp_path / "in.parquet")
+    feather.write_feather(input_table(ROWS), tmp_path / "in.feather")
+    expected = csv_results(tmp_path, ROWS)
+
+    for source, target in (("in.parquet", "out.parquet"), ("in.feather", "out.arrow")):
+        summary = run_batch(str(tmp_path / source), str(tmp_path / target))
+        assert summary.rows == 3
+        read = feather.read_table if target.endswith(".arrow") else pq.read_table
+        table = read(tmp_path / target)
+        assert table.schema.equals(output_schema())
+        assert table.column("client_id").to_pylist() == ["A1", "A2", "A3"]
+        assert table.column("filing_status")[0].as_py() == "Single"
+        results = np.column_stack([table.column(k).to_numpy() for k in RESULT_KEYS])
+        assert results.tolist() == expected
+
+
+def test_published_schema():
+    schema = output_schema()
+    assert schema.names == list(ARROW_OUTPUT_COLUMNS)
+    assert len(set(schema.names)) == len(schema.names)
+    assert schema.names[-len(RESULT_KEYS) :] == list(RESULT_KEYS)
+    assert all(schema.field(k).type == pa.float64() for k in RESULT_KEYS)
+    metadata = schema.metadata
+    assert (
+        metadata[b"business_tax_calculator.rules_version"] == rules_version().encode()
+    )
+
+
+def test_nulls_casts_and_dictionaries_match_rows_to_columns():
+    batch = pa.record_batch(
+        {
+            "client_id": pa.array([1, 2, None]),
+            "filing_status": pa.array(
+                ["Married Filing Jointly", None, ""]
+            ).dictionary_encode(),
+            "entity_type": ["LLC", "S-Corp", "LLC"],
+            "revenue": pa.array([100000, 200000, 50000], type=pa.int64()),
+            "expenses": pa.array([1000.5, None, 3.0]),
+        }
+    )
+    columns = batch_to_columns(batch)
+    expected = rows_to_columns(
+        [
+            {
+                "client_id": "1",
+                "filing_status": "Married Filing Jointly",
+                "entity_type": "LLC",
+                "revenue": 100000,
+                "expenses": 1000.5,
+            },
+            {"client_id": "2", "entity_type": "S-Corp", "revenue": 200000},
+            {"entity_type": "LLC", "revenue": 50000, "expenses": 3.0},
+        ]
+    )
+    assert set(columns) == set(expected)
+    for name, values in expected.items():
+        assert columns[name].tolist() == values.tolist(), name
+
+
+def test_float_columns_are_not_copied():
+    revenue = pa.array([1.0, 2.0, 3.0])
+    columns = batch_to_columns(pa.record_batch({"revenue": revenue}))
+    assert columns["revenue"].ctypes.data == revenue.buffers()[1].address
+
+
+def test_large_arrow_batches_are_split_into_chunks(tmp_path):
+    rows = [dict(ROWS[i % 3], client_id=f"C{i}") for i in range(25)]
+    feather.write_feather(input_table(rows), tmp_path / "in.arrow", chunksize=10)
+    seen = []
+    run_batch(str(tmp_path / "in.arrow"), str(tmp_path / "out.parquet"), chunk_size=4)
+    parquet = pq.ParquetFile(tmp_path / "out.parquet")
+    for i in range(parquet.num_row_groups):
+        seen.append(parquet.metadata.row_group(i).num_rows)
+    assert seen == [4, 4, 2, 4, 4, 2, 4, 1]
+    ids = parquet.read(columns=["client_id"]).column(0).to_pylist()
+    assert ids == [f"C{i}" for i in range(25)]
+
+
+def test_schema_command(capsys):
+    assert cli_main(["schema", "--json"]) == 0
+    document = json.loads(capsys.readouterr().out)
+    assert [f["name"] for f in document["fields"]] == list(ARROW_OUTPUT_COLUMNS)
+    assert document["metadata"]["business_tax_calculator.schema_version"] == "1"
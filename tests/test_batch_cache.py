@@ -0,0 +1,102 @@
+import sys
+import os
+
+sys.path.insert(
+    0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "src"))
+)
+
+import csv
+
+import numpy as np
+import pytest
+from business_tax_calculator.calculator.batch import (
+    KEY_NUMERIC_FIELDS,
+    KEY_TEXT_FIELDS,
+    calculate_chunk,
+    rows_to_columns,
+    run_batch,
+)
+from business_tax_calculator.calculator.hashing import row_keys
+from business_tax_calculator.calculator.tax_calculator import (
+    RESULT_KEYS,
+    calculate_business_liabilities,
+)
+from business_tax_calculator.cli import main as cli_main
+from business_tax_calculator.model.business import Business
+from business_tax_calculator.storage.result_cache import ResultCache
+from business_tax_calculator.utils.rules import rules_version
+
+ROWS = [
+    {
+        "client_id": "A1",
+        "entity_type": "Sole Proprietorship",
+        "revenue": "120000",
+        "expenses": "30000",
+    },
+    {
+        "client_id": "A2",
+        "entity_type": "S-Corp",
+        "revenue": "250000",
+        "expenses": "60000",
+        "reasonable_salary": "90000",
+    },
+    {
+        "client_id": "A3",
+        "entity_type": "LLC",
+        "revenue": "80000",
+        "expenses": "20000",
+        "filing_status": "Married Filing Jointly",
+    },
+]
+
+
+def write_input(path, rows):
+    fields = sorted({key for row in rows for key in row})
+    with open(path, "w", newline="") as handle:
+        writer = csv.DictWriter(handle, fieldnames=fields)
+        writer.writeheader()
+        writer.writerows(rows)
+
+
+def test_chunk_matches_scalar_calculation():
+    results = calculate_chunk(rows_to_columns(ROWS))
+    business = Business()
+    business.set_entity_type("S-Corp")
+    business.set_revenue(250000)
+    business.set_expenses(60000)
+    business.set_reasonable_salary(90000)
+    expected = calculate_business_liabilities(business, "Single")
+    total = RESULT_KEYS.index("total_tax")
+    assert results[1, total] == pytest.approx(expected["total_tax"])
+
+
+def test_rerun_is_served_from_cache(tmp_path):
+    source = tmp_path / "in.csv"
+    write_input(source, ROWS)
+    with ResultCache(str(tmp_path / "cache.db")) as cache:
+        first = run_batch(str(source), str(tmp_path / "out1.csv"), cache)
+        second = run_batch(str(source), str(tmp_path / "out2.csv"), cache)
+    assert (first.cache_hits, first.computed) == (0, 3)
+    assert (second.cache_hits, second.computed) == (3, 0)
+    assert (tmp_path / "out1.csv").read_text() == (tmp_path / "out2.csv").read_text()
+
+
+def test_changed_row_is_recomputed(tmp_path):
+    columns = rows_to_columns(ROWS)
+    with ResultCache(str(tmp_path / "cache.db")) as cache:
+        calculate_chunk(columns, cache)
+        columns["expenses"] = columns["expenses"] + np.array([0.0, 0.0, 1.0])
+        version = rules_version()
+        keys = row_keys(columns, KEY_TEXT_FIELDS, KEY_NUMERIC_FIELDS, version)
+        found, _ = cache.lookup(*keys, version)
+    assert found.tolist() == [True, True, False]
+
+
+def test_gc_drops_old_versions(tmp_path):
+    path = str(tmp_path / "cache.db")
+    with ResultCache(path) as cache:
+        calculate_chunk(rows_to_columns(ROWS), cache, version="old")
+        calculate_chunk(rows_to_columns(ROWS), cache)
+    assert cli_main(["cache", "gc", path]) == 0
+    with ResultCache(path) as cache:
+        assert [info.rules_version for info in cache.versions()] == [rules_version()]
@@ -0,0 +1,53 @@
+import sys
+import os
+
+sys.path.insert(
+    0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "src"))
+)
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+import json
+
+from benchmarks.harness import compare, main, metric, run_benchmarks
+
+
+def results(**values):
+    metrics = {}
+    for name, (value, better) in values.items():
+        metrics[name] = metric(value, "x", better)
+    return {"metadata": {}, "quick": True, "metrics": metrics}
+
+
+def test_compare_flags_changes_beyond_threshold():
+    baseline = results(
+        latency=(10.0, "lower"), throughput=(100.0, "higher"), gone=(1.0, "lower")
+    )
+    current = results(
+        latency=(12.0, "lower"), throughput=(130.0, "higher"), added=(1.0, "lower")
+    )
+    statuses = {row[0]: row[4] for row in compare(baseline, current, 0.15)}
+    assert statuses == {
+        "latency": "regression",
+        "throughput": "improvement",
+        "gone": "missing",
+        "added": "new",
+    }
+    statuses = {row[0]: row[4] for row in compare(baseline, current, 0.5)}
+    assert statuses["latency"] == statuses["throughput"] == "ok"
+
+
+def test_compare_command_exit_status(tmp_path, capsys):
+    baseline, current = tmp_path / "base.json", tmp_path / "current.json"
+    baseline.write_text(json.dumps(results(throughput=(100.0, "higher"))))
+    current.write_text(json.dumps(results(throughput=(50.0, "higher"))))
+    assert main(["compare", str(baseline), str(current)]) == 1
+    assert main(["compare", str(baseline), str(baseline)]) == 0
+    assert "regression" in capsys.readouterr().out
+
+
+def test_run_writes_metrics_with_metadata():
+    document = run_benchmarks(["scenarios"], quick=True)
+    assert document["metadata"]["python"]
+    assert document["metrics"]
+    for name, value in document["metrics"].items():
+        assert name.startswith("scenarios.") and value["value"] > 0
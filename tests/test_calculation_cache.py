@@ -0,0 +1,105 @@
+import sys
+import os
+
+sys.path.insert(
+    0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "src"))
+)
+
+import threading
+
+import pytest
+from business_tax_calculator.calculator.cache import CalculationCache
+from business_tax_calculator.calculator.tax_calculator import (
+    BusinessTaxCalculator,
+    calculate_business_liabilities,
+)
+from business_tax_calculator.model.business import Business
+from business_tax_calculator.utils.rules import notify_rules_changed
+
+
+def make_business(revenue=150000, expenses=40000):
+    business = Business()
+    business.set_entity_type("Sole Proprietorship")
+    business.set_revenue(revenue)
+    business.set_expenses(expenses)
+    return business
+
+
+def test_cache_hit_matches_direct_calculation():
+    cache = CalculationCache(maxsize=8)
+    first = cache.calculate(make_business(), "Single")
+    second = cache.calculate(make_business(150000.0, 40000.0), "Single")
+    expected = calculate_business_liabilities(make_business(), "Single")
+    assert second["total_tax"] == pytest.approx(expected["total_tax"])
+    assert first["total_tax"] == second["total_tax"]
+    stats = cache.stats()
+    assert (stats.hits, stats.misses) == (1, 1)
+
+
+def test_cache_returns_callers_business():
+    cache = CalculationCache(maxsize=8)
+    cache.calculate(make_business(), "Single")
+    business = make_business()
+    assert cache.calculate(business, "Single")["business"] is business
+
+
+def test_cache_evicts_least_recently_used():
+    cache = CalculationCache(maxsize=2)
+    for revenue in (100000, 200000, 300000):
+        cache.calculate(make_business(revenue), "Single")
+    assert len(cache) == 2
+    assert cache.stats().evictions == 1
+
+
+def test_cache_ttl_expires_entries():
+    cache = CalculationCache(maxsize=8, ttl=0)
+    cache.calculate(make_business(), "Single")
+    cache.calculate(make_business(), "Single")
+    stats = cache.stats()
+    assert stats.hits == 0
+    assert stats.expirations == 1
+
+
+def test_rule_change_invalidates_cache():
+    cache = CalculationCache(maxsize=8)
+    cache.calculate(make_business(), "Single")
+    notify_rules_changed()
+    assert len(cache) == 0
+
+
+def test_calculator_uses_cache_concurrently():
+    cache = CalculationCache(maxsize=4)
+    errors = []
+
+    def worker():
+        try:
+            for _ in range(50):
+                calc = BusinessTaxCalculator(cache=cache)
+                calc.business = make_business()
+                assert calc.calculate_liabilities()["total_tax"] > 0
+        except Exception as exc:  # pragma: no cover - surfaced below
+            errors.append(exc)
+
+    threads = [threading.Thread(target=worker) for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert not errors
+    assert cache.stats().hits + cache.stats().misses == 400
+
+
+def test_cache_keeps_recency_order_through_evictions():
+    cache = CalculationCache(maxsize=3)
+    # A hit makes its key the most recently used one.
+    for revenue in (100000, 200000, 100000, 300000):
+        cache.calculate(make_business(revenue), "Single")
+    cache.calculate(make_business(200000), "Single")
+    cache.calculate(make_business(400000), "Single")
+    assert cache.stats().evictions == 1
+    hits = cache.stats().hits
+    for revenue in (200000, 300000, 400000):
+        cache.calculate(make_business(revenue), "Single")
+    assert cache.stats().hits == hits + 3
+    cache.calculate(make_business(100000), "Single")
+    assert cache.stats().misses == 5 and len(cache) == 3
@@ -0,0 +1,147 @@
+import sys
+import os
+
+sys.path.insert(
+    0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "src"))
+)
+
+import csv
+import json
+
+import numpy as np
+import pytest
+from business_tax_calculator.calculator.batch import rows_to_columns, run_batch
+from business_tax_calculator.calculator.tax_calculator import RESULT_KEYS
+from business_tax_calculator.cli import main as cli_main
+from business_tax_calculator.storage.column_store import (
+    ColumnStore,
+    ColumnStoreWriter,
+)
+from business_tax_calculator.utils.rules import rules_version
+
+ROWS = [
+    {"client_id": f"C{i:03d}", "entity_type": "LLC", "revenue": str(50_000 + 997 * i)}
+    for i in range(40)
+]
+
+
+def write_input(path, rows):
+    with open(path, "w", newline="") as handle:
+        writer = csv.DictWriter(
+            handle, fieldnames=["client_id", "entity_type", "revenue"]
+        )
+        writer.writeheader()
+        writer.writerows(rows)
+
+
+@pytest.fixture
+def store_path(tmp_path):
+    source = tmp_path / "in.csv"
+    # Shuffled, so the index order differs from the row order.
+    write_input(source, [ROWS[(i * 7) % 40] for i in range(40)])
+    path = str(tmp_path / "results.store")
+    run_batch(str(source), path, chunk_size=16)
+    run_batch(str(source), str(tmp_path / "out.csv"), chunk_size=16)
+    return path
+
+
+def csv_output(tmp_path):
+    with open(tmp_path / "out.csv", newline="") as handle:
+        reader = csv.reader(handle)
+        header = next(reader)
+        return {row[0]: dict(zip(header, row)) for row in reader}
+
+
+def test_get_matches_csv_output(store_path, tmp_path):
+    expected = csv_output(tmp_path)
+    with ColumnStore(store_path) as store:
+        assert len(store) == 40
+        assert store.rules_version == rules_version()
+        for client_id, row in expected.items():
+            record = store.get(client_id)
+            assert record["client_id"] == client_id
+            assert record["entity_type"] == "LLC"
+            assert record["filing_status"] == "Single"
+            for key in RESULT_KEYS:
+                assert record[key] == float(row[key])
+
+
+def test_get_many_and_missing_ids(store_path):
+    with ColumnStore(store_path) as store:
+        records = store.get_many(["C039", "missing", "C000", "C0", "C039" + "x" * 40])
+        assert [r and r["client_id"] for r in records] == [
+            "C039",
+            None,
+            "C000",
+            None,
+            None,
+        ]
+        with pytest.raises(KeyError):
+            store.get("C040")
+
+
+def test_repeated_ids_return_the_first_row(tmp_path):
+    columns = rows_to_columns(
+        [
+            {"client_id": "A", "entity_type": "LLC", "revenue": "1000"},
+            {"client_id": "B", "entity_type": "LLC", "revenue": "2000"},
+            {"client_id": "A", "entity_type": "LLC", "revenue": "3000"},
+        ]
+    )
+    path = str(tmp_path / "dup.store")
+    with ColumnStoreWriter(path) as writer:
+        writer.write(columns, np.zeros((3, len(RESULT_KEYS))))
+    with ColumnStore(path) as store:
+        assert store.get("A")["revenue"] == 1000.0
+
+
+def test_text_longer_than_its_width_is_rejected(tmp_path):
+    columns = rows_to_columns([{"client_id": "X" * 33}])
+    writer = ColumnStoreWriter(str(tmp_path / "s.store"))
+    with pytest.raises(ValueError, match="client_id"):
+        writer.write(columns, np.zeros((1, len(RESULT_KEYS))))
+
+
+def test_batch_rejects_rows_too_wide_for_the_store(tmp_path):
+    source = tmp_path / "in.csv"
+    rows = ROWS[:5] + [dict(ROWS[5], client_id="X" * 33)] + ROWS[6:10]
+    write_input(source, rows)
+    path, rejected = str(tmp_path / "s.store"), str(tmp_path / "rejected.csv")
+    summary = run_batch(str(source), path, chunk_size=4, rejected_path=rejected)
+    assert (summary.rows, summary.rejected) == (9, 1)
+    with open(rejected, newline="") as handle:
+        (row,) = list(csv.DictReader(handle))
+    assert (row["row"], row["errors"]) == ("6", "text_too_long")
+    with ColumnStore(path) as store:
+        assert len(store) == 9 and store.get("C009")["revenue"] == 50_000 + 997 * 9
+    # CSV output keeps any width.
+    assert run_batch(str(source), str(tmp_path / "out.csv")).rejected == 0
+
+
+def test_unfinished_and_empty_stores(tmp_path):
+    path = str(tmp_path / "s.store")
+    writer = ColumnStoreWriter(path)
+    with pytest.raises(FileNotFoundError):
+        ColumnStore(path)
+    writer.close()
+    with ColumnStore(path) as store:
+        assert len(store) == 0
+        assert store.get_many(["A"]) == [None]
+
+
+def test_failed_run_leaves_no_store(store_path):
+    columns = rows_to_columns(ROWS[:3])
+    with pytest.raises(RuntimeError):
+        with ColumnStoreWriter(store_path) as writer:
+            writer.write(columns, np.zeros((3, len(RESULT_KEYS))))
+            raise RuntimeError("calculation failed")
+    assert not os.path.exists(store_path)
+    with pytest.raises(FileNotFoundError):
+        ColumnStore(store_path)
+
+
+def test_lookup_command(store_path, capsys):
+    assert cli_main(["lookup", store_path, "C005", "C006"]) == 0
+    lines = capsys.readouterr().out.splitlines()
+    assert [json.loads(line)["client_id"] for line in lines] == ["C005", "C006"]
+    assert cli_main(["lookup", store_path, "nobody"]) == 1
@@ -0,0 +1,127 @@
+import sys
+import os
+
+sys.path.insert(
+    0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "src"))
+)
+
+import json
+import socket
+import threading
+import time
+
+import pytest
+from business_tax_calculator.cli import main
+from business_tax_calculator.service.client import (
+    CalculatorClient,
+    DaemonUnavailable,
+    calculate,
+)
+from business_tax_calculator.service import daemon as daemon_module
+from business_tax_calculator.service.daemon import (
+    CalculationDaemon,
+    calculate_request,
+)
+
+INPUTS = {"entity_type": "LLC", "revenue": 120000, "expenses": 30000}
+
+# Median round trip over a warm connection.
+LATENCY_BUDGET_MS = 1.0
+
+
+@pytest.fixture
+def daemon(tmp_path):
+    path = str(tmp_path / "calc.sock")
+    server = CalculationDaemon(path)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield path
+    server.shutdown()
+    server.server_close()
+
+
+def test_daemon_matches_in_process_calculation(daemon):
+    with CalculatorClient(daemon) as client:
+        assert client.ping()["ok"]
+        assert client.calculate(INPUTS) == calculate_request(INPUTS)
+        with pytest.raises(ValueError, match="Unknown input fields: bogus"):
+            client.calculate(dict(INPUTS, bogus=1))
+        for amount in ("nan", float("inf"), "-inf"):
+            with pytest.raises(ValueError, match="revenue must be a number"):
+                client.calculate(dict(INPUTS, revenue=amount))
+        # The connection survives a rejected request.
+        assert client.calculate(INPUTS)["total_tax"] > 0
+
+
+def test_unexpected_errors_are_answered(daemon, monkeypatch):
+    def broken(inputs, cache=None):
+        raise RuntimeError("bug")
+
+    with CalculatorClient(daemon) as client:
+        monkeypatch.setattr(daemon_module, "calculate_request", broken)
+        with pytest.raises(ValueError, match="Internal error"):
+            client.calculate(INPUTS)
+        monkeypatch.undo()
+        # The same connection keeps serving.
+        assert client.calculate(INPUTS) == calculate_request(INPUTS)
+
+
+def test_round_trip_latency(daemon):
+    with CalculatorClient(daemon) as client:
+        client.calculate(INPUTS)
+        timings = []
+        for i in range(500):
+            start = time.perf_counter()
+            client.calculate(dict(INPUTS, revenue=100000 + i % 50))
+            timings.append(time.perf_counter() - start)
+    median_ms = sorted(timings)[len(timings) // 2] * 1000
+    assert median_ms < LATENCY_BUDGET_MS
+
+
+def test_falls_back_to_in_process_without_daemon(tmp_path):
+    path = str(tmp_path / "missing.sock")
+    with pytest.raises(DaemonUnavailable):
+        CalculatorClient(path).calculate(INPUTS)
+    assert calculate(INPUTS, socket_path=path) == calculate_request(INPUTS)
+
+
+def test_hung_daemon_times_out_and_falls_back(tmp_path):
+    path = str(tmp_path / "hung.sock")
+    listener = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    listener.bind(path)
+    listener.listen(1)
+    try:
+        with pytest.raises(DaemonUnavailable, match="did not answer"):
+            CalculatorClient(path, timeout=0.1).calculate(INPUTS)
+        client = CalculatorClient(path, timeout=0.1)
+        assert calculate(INPUTS, client=client) == calculate_request(INPUTS)
+    finally:
+        listener.close()
+
+
+def test_cli_calc_uses_daemon(daemon, capsys):
+    assert (
+        main(
+            [
+                "calc",
+                "--socket",
+                daemon,
+                "entity_type=LLC",
+                "revenue=120000",
+                "expenses=30000",
+            ]
+        )
+        == 0
+    )
+    assert json.loads(capsys.readouterr().out) == calculate_request(INPUTS)
+
+
+def test_stale_socket_is_replaced(tmp_path):
+    path = str(tmp_path / "calc.sock")
+    open(path, "w").close()
+    server = CalculationDaemon(path)
+    try:
+        assert os.stat(path).st_mode & 0o777 == 0o600
+    finally:
+        server.server_close()
+    assert not os.path.exists(path)
@@ -0,0 +1,109 @@
+import sys
+import os
+
+sys.path.insert(
+    0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "src"))
+)
+
+import numpy as np
+import pytest
+from business_tax_calculator.calculator.batch import (
+    business_from_columns,
+    rows_to_columns,
+)
+from business_tax_calculator.calculator.tax_calculator import (
+    RESULT_KEYS,
+    calculate_business_liabilities,
+)
+from business_tax_calculator.calculator.vectorized import calculate_matrix
+from business_tax_calculator.model.business import Business
+from business_tax_calculator.model.deduction.base_deduction import BaseDeduction
+from business_tax_calculator.model.deduction.deduction_constants import DeductionName
+from business_tax_calculator.model.deduction.deduction_pipeline import (
+    DeductionPipeline,
+)
+from business_tax_calculator.model.deduction.deduction_registry import (
+    DeductionRegistry,
+)
+from business_tax_calculator.model.liabilities.medicare_income_tax_liability import (
+    MedicareIncomeTaxLiability,
+)
+from business_tax_calculator.model.liabilities import (
+    social_security_income_tax_liability as social_security,
+)
+
+ENTITY_TYPES = ["Sole Proprietorship", "LLC", "S-Corp", "C-Corp"]
+FILING_STATUSES = ["Single", "Married Filing Jointly", "Head of Household"]
+
+
+def random_rows(n, seed=7):
+    rng = np.random.default_rng(seed)
+    rows = []
+    for i in range(n):
+        revenue = float(rng.integers(0, 900_000))
+        rows.append(
+            {
+                "client_id": f"C{i}",
+                "entity_type": ENTITY_TYPES[i % 4],
+                "filing_status": FILING_STATUSES[i % 3],
+                "revenue": revenue,
+                "expenses": float(rng.integers(0, 600_000)),
+                "reasonable_salary": float(rng.integers(0, 200_000)),
+                "retirement_contributions": float(rng.integers(0, 90_000)),
+                "health_insurance_premiums": float(rng.integers(0, 30_000)),
+                "home_office_deduction": float(rng.integers(0, 3_000)),
+                "other_deductions": float(rng.integers(0, 20_000)),
+                "estimated_tax_payments": float(rng.integers(0, 50_000)),
+            }
+        )
+    return rows
+
+
+def test_vectorized_matches_scalar_calculation():
+    columns = rows_to_columns(random_rows(400))
+    matrix = calculate_matrix(columns)
+    for i in range(len(matrix)):
+        expected = calculate_business_liabilities(business_from_columns(columns, i))
+        assert matrix[i].tolist() == [expected[key] for key in RESULT_KEYS]
+
+
+def test_self_employment_deduction_is_half_of_preliminary_se_tax():
+    business = Business()
+    business.set_entity_type("Sole Proprietorship")
+    business.set_revenue(150000)
+    business.set_expenses(50000)
+    values = business.get_deductions()
+
+    compensation = 100000 * 0.9235
+    se_tax = social_security.SocialSecurityIncomeTaxLiability().calculate(
+        compensation
+    ) + MedicareIncomeTaxLiability().calculate(compensation)
+    assert values[DeductionName.SELF_EMPLOYMENT_TAX_DEDUCTION] == pytest.approx(
+        se_tax / 2
+    )
+    assert values[DeductionName.BUSINESS_EXPENSES_DEDUCTION] == 50000
+
+
+def test_registry_lookup_and_shared_pipeline():
+    first, second = DeductionRegistry(), DeductionRegistry()
+    assert first.pipeline is second.pipeline
+
+    deduction = first.get_deduction_by_name(DeductionName.OTHER_DEDUCTION)
+    assert deduction.name == DeductionName.OTHER_DEDUCTION
+    with pytest.raises(ValueError):
+        first.get_deduction_by_name("missing")
+
+
+def test_pipeline_rejects_circular_inputs():
+    class First(BaseDeduction):
+        name = "first"
+        inputs = ("second",)
+        compute = staticmethod(lambda values, ops: values["second"])
+
+    class Second(BaseDeduction):
+        name = "second"
+        inputs = ("first",)
+        compute = staticmethod(lambda values, ops: values["first"])
+
+    with pytest.raises(ValueError, match="Circular"):
+        DeductionPipeline((First, Second))
@@ -0,0 +1,60 @@
+import sys
+import os
+
+sys.path.insert(
+    0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "src"))
+)
+
+import numpy as np
+import pytest
+from business_tax_calculator.calculator.batch import (
+    KEY_NUMERIC_FIELDS,
+    KEY_TEXT_FIELDS,
+    BatchSummary,
+    calculate_chunk,
+    rows_to_columns,
+)
+from business_tax_calculator.calculator.dedup import dedupe_columns
+
+TEMPLATE = {
+    "entity_type": "Sole Proprietorship",
+    "revenue": "100000",
+    "expenses": "40000",
+}
+
+
+def make_rows():
+    rows = []
+    for i in range(12):
+        row = dict(TEMPLATE, client_id=f"C{i}")
+        if i % 3 == 0:
+            row["revenue"] = str(100000 + i)
+        rows.append(row)
+    return rows
+
+
+def test_dedupe_groups_identical_inputs():
+    columns = rows_to_columns(make_rows())
+    first_index, inverse = dedupe_columns(columns, KEY_TEXT_FIELDS, KEY_NUMERIC_FIELDS)
+    assert len(inverse) == 12
+    assert len(first_index) == 4
+    revenue = columns["revenue"]
+    assert np.array_equal(revenue[first_index][inverse], revenue)
+
+
+def test_client_id_does_not_split_groups():
+    columns = rows_to_columns(
+        [dict(TEMPLATE, client_id="X"), dict(TEMPLATE, client_id="Y")]
+    )
+    first_index, _ = dedupe_columns(columns, KEY_TEXT_FIELDS, KEY_NUMERIC_FIELDS)
+    assert len(first_index) == 1
+
+
+def test_deduped_results_match_full_compute():
+    columns = rows_to_columns(make_rows())
+    summary = BatchSummary()
+    deduped = calculate_chunk(columns, summary=summary)
+    full = calculate_chunk(columns, dedupe=False)
+    assert np.array_equal(deduped, full)
+    assert summary.computed == 4
+    assert summary.dedup_ratio == pytest.approx(8 / 12)
@@ -0,0 +1,111 @@
+import sys
+import os
+
+sys.path.insert(
+    0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "src"))
+)
+
+import csv
+import logging
+
+import numpy as np
+import pytest
+from business_tax_calculator.calculator.batch import run_batch
+from business_tax_calculator.calculator.diagnostics import Diagnostics
+from business_tax_calculator.calculator.jobs import job_status, run_job
+from business_tax_calculator.cli import main as cli_main
+
+FIELDS = ["client_id", "entity_type", "revenue", "expenses", "reasonable_salary"]
+
+
+def make_rows(n=40):
+    rows = []
+    for i in range(n):
+        row = ["C%d" % i, "LLC", "100000", "20000", "0"]
+        if i % 4 == 1:
+            row[3] = "150000"  # expenses exceed revenue
+        elif i % 4 == 2:
+            row[1] = "S-Corp"  # without salary
+        elif i == 3:
+            row[2] = "-5"  # rejected
+        rows.append(row)
+    return rows
+
+
+@pytest.fixture
+def source(tmp_path):
+    path = tmp_path / "in.csv"
+    with open(path, "w", newline="") as handle:
+        writer = csv.writer(handle)
+        writer.writerow(FIELDS)
+        writer.writerows(make_rows())
+    return str(path)
+
+
+def test_counts_and_bounded_examples():
+    diagnostics = Diagnostics(sample_size=3)
+    assert not diagnostics
+    ids = np.array(["a", "b", "c", "d"])
+    diagnostics.add("negative_net_revenue", np.array([1, 2, 3, 4]), ids)
+    diagnostics.add("negative_net_revenue", np.array([9]), np.array(["e"]))
+    diagnostics.add("non_finite_result", np.array([], dtype=int), ids[:0])
+    assert diagnostics.counts == {"negative_net_revenue": 5}
+    assert diagnostics.samples["negative_net_revenue"] == [(1, "a"), (2, "b"), (3, "c")]
+    (line,) = diagnostics.lines()
+    assert line.startswith("negative_net_revenue: 5 rows (expenses exceed revenue)")
+    assert line.endswith("row 1 (a), row 2 (b), row 3 (c), ...")
+
+
+def test_merge_and_round_trip():
+    first, second = Diagnostics(sample_size=2), Diagnostics(sample_size=2)
+    first.add("negative_net_revenue", np.array([1]), np.array(["a"]))
+    second.add("negative_net_revenue", np.array([7, 8]), np.array(["x", "y"]))
+    second.add("unknown_state", np.array([9]), np.array(["z"]))
+    merged = first.merge(Diagnostics.from_dict(second.as_dict()))
+    assert merged.counts == {"negative_net_revenue": 3, "unknown_state": 1}
+    assert merged.samples["negative_net_revenue"] == [(1, "a"), (7, "x")]
+    assert merged.lines()[1] == "unknown_state: 1 rows (unknown state); e.g. row 9 (z)"
+
+
+def test_batch_counts_warnings_without_logging(source, tmp_path, caplog):
+    with caplog.at_level(logging.WARNING):
+        summary = run_batch(source, str(tmp_path / "out.csv"), chunk_size=7)
+    assert caplog.records == []
+    assert summary.diagnostics.counts == {
+        "negative_net_revenue": 10,
+        "s_corp_without_salary": 10,
+        "negative_amount": 1,
+    }
+    assert summary.diagnostics.samples["negative_net_revenue"] == [
+        (2, "C1"),
+        (6, "C5"),
+        (10, "C9"),
+        (14, "C13"),
+        (18, "C17"),
+    ]
+    assert summary.diagnostics.samples["negative_amount"] == [(4, "C3")]
+
+
+def test_per_row_logging_is_opt_in(source, tmp_path, caplog):
+    with caplog.at_level(logging.WARNING):
+        run_batch(source, str(tmp_path / "out.csv"), log_rows=True)
+    messages = [record.getMessage() for record in caplog.records]
+    assert len(messages) == 21
+    assert "row 2 (C1): expenses exceed revenue" in messages
+
+
+def test_job_merges_shard_diagnostics(source, tmp_path, capsys):
+    job = str(tmp_path / "run.job")
+    summary = run_job([source], job, shard_rows=15, chunk_size=4)
+    assert summary.batch.diagnostics.counts["s_corp_without_salary"] == 10
+    status = job_status(job)
+    assert status["diagnostics"]["negative_net_revenue"]["rows"] == 10
+    assert cli_main(["job", "status", job]) == 0
+    assert "s_corp_without_salary: 10 rows" in capsys.readouterr().out
+
+
+def test_batch_prints_one_summary(source, tmp_path, capsys):
+    assert cli_main(["batch", source, str(tmp_path / "out.csv")]) == 0
+    out = capsys.readouterr().out
+    assert "Diagnostics:" in out
+    assert out.count("negative_net_revenue") == 1
@@ -0,0 +1,154 @@
+import sys
+import os
+
+sys.path.insert(
+    0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "src"))
+)
+
+import csv
+import tracemalloc
+import zipfile
+import xml.etree.ElementTree as ET
+
+import pytest
+from business_tax_calculator.calculator.batch import (
+    calculate_chunk,
+    rows_to_columns,
+    run_batch,
+)
+from business_tax_calculator.calculator.tax_calculator import RESULT_KEYS
+from business_tax_calculator.cli import main as cli_main
+from business_tax_calculator.report.export import (
+    CURRENCY,
+    HEADER,
+    PERCENT,
+    PERCENT_POINTS,
+    XlsxChunkWriter,
+    XlsxWriter,
+    export_rows,
+)
+
+NS = {"x": "http://schemas.openxmlformats.org/spreadsheetml/2006/main"}
+
+ROWS = [
+    {"client_id": f"C{i:03d}", "entity_type": "LLC", "revenue": str(50_000 + 997 * i)}
+    for i in range(30)
+]
+
+
+def write_input(path, rows):
+    with open(path, "w", newline="") as handle:
+        writer = csv.DictWriter(
+            handle, fieldnames=["client_id", "entity_type", "revenue"]
+        )
+        writer.writeheader()
+        writer.writerows(rows)
+
+
+def read_sheet(path):
+    """Rows of the first sheet as lists of (value, style) pairs."""
+    with zipfile.ZipFile(path) as archive:
+        assert archive.testzip() is None
+        root = ET.fromstring(archive.read("xl/worksheets/sheet1.xml"))
+    rows = []
+    for row in root.iterfind("x:sheetData/x:row", NS):
+        cells = []
+        for cell in row.iterfind("x:c", NS):
+            style = int(cell.get("s", 0))
+            if cell.get("t") == "inlineStr":
+                cells.append((cell.find("x:is/x:t", NS).text or "", style))
+            elif cell.find("x:v", NS) is not None:
+                cells.append((float(cell.find("x:v", NS).text), style))
+            else:
+                cells.append((None, style))
+        rows.append(cells)
+    return rows
+
+
+def test_xlsx_cells_are_typed_and_styled(tmp_path):
+    path = tmp_path / "out.xlsx"
+    columns = ("name", "total_tax", "effective_tax_rate", "local_tax_rate")
+    with XlsxWriter(str(path), columns, text_columns=("name",)) as writer:
+        writer.write_rows(
+            [
+                ("Smith & <Sons>", 1234.5, 24.5, 0.03),
+                (" padded ", float("nan"), 0.0, 0.0),
+            ]
+        )
+    header, first, second = read_sheet(path)
+    assert header == [(name, HEADER) for name in columns]
+    assert first == [
+        ("Smith & <Sons>", 0),
+        (1234.5, CURRENCY),
+        (24.5, PERCENT_POINTS),
+        (0.03, PERCENT),
+    ]
+    assert second[0] == (" padded ", 0)
+    # NaN has no Excel representation and is left blank.
+    assert second[1] == (None, 0)
+
+
+def test_batch_xlsx_output_matches_csv(tmp_path):
+    source = tmp_path / "in.csv"
+    write_input(source, ROWS)
+    run_batch(str(source), str(tmp_path / "out.xlsx"), chunk_size=7)
+    run_batch(str(source), str(tmp_path / "out.csv"), chunk_size=7)
+    header, *rows = read_sheet(tmp_path / "out.xlsx")
+    names = [name for name, _ in header]
+    assert names[-len(RESULT_KEYS) :] == list(RESULT_KEYS)
+    with open(tmp_path / "out.csv", newline="") as handle:
+        expected = {row["client_id"]: row for row in csv.DictReader(handle)}
+    assert len(rows) == len(expected)
+    for row in rows:
+        values = dict(zip(names, (value for value, _ in row)))
+        want = expected[values["client_id"]]
+        for key in RESULT_KEYS:
+            assert values[key] == pytest.approx(float(want[key]))
+
+
+def test_xlsx_peak_memory_does_not_grow_with_rows(tmp_path):
+    columns = rows_to_columns(ROWS * 100)
+    results = calculate_chunk(columns)
+
+    def peak(chunks):
+        tracemalloc.start()
+        try:
+            with XlsxChunkWriter(str(tmp_path / f"{chunks}.xlsx")) as writer:
+                for _ in range(chunks):
+                    writer.write(columns, results)
+            return tracemalloc.get_traced_memory()[1]
+        finally:
+            tracemalloc.stop()
+
+    small, large = peak(2), peak(20)
+    assert large < small * 1.5
+
+
+def test_export_rows_csv_and_xlsx(tmp_path):
+    rows = ({"client_id": f"C{i}", "total_tax": i * 1.5} for i in range(25))
+    assert export_rows(rows, str(tmp_path / "out.csv"), chunk_size=4) == 25
+    with open(tmp_path / "out.csv", newline="") as handle:
+        exported = list(csv.DictReader(handle))
+    assert exported[-1] == {"client_id": "C24", "total_tax": "36.0"}
+
+    rows = ({"client_id": f"C{i}", "total_tax": i * 1.5} for i in range(25))
+    assert export_rows(rows, str(tmp_path / "out.xlsx"), chunk_size=4) == 25
+    sheet = read_sheet(tmp_path / "out.xlsx")
+    assert len(sheet) == 26
+    assert sheet[-1] == [("C24", 0), (36.0, CURRENCY)]
+
+    assert export_rows(iter(()), str(tmp_path / "empty.csv"), ["client_id"]) == 0
+
+
+def test_store_query_output(tmp_path, capsys):
+    source = tmp_path / "in.csv"
+    write_input(source, ROWS)
+    path = str(tmp_path / "scenarios.db")
+    assert cli_main(["store", "ingest", path, str(source)]) == 0
+    output = str(tmp_path / "llc.xlsx")
+    args = ["store", "query", path, "--entity-type", "LLC", "--output", output]
+    assert cli_main(args + ["--columns", "client_id", "total_tax"]) == 0
+    assert "Exported 30 scenarios" in capsys.readouterr().out
+    header, *rows = read_sheet(output)
+    assert [name for name, _ in header] == ["client_id", "total_tax"]
+    assert len(rows) == 30
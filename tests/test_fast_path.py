@@ -0,0 +1,53 @@
+import sys
+import os
+
+sys.path.insert(
+    0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "src"))
+)
+
+import numpy as np
+from business_tax_calculator.calculator.fast_path import calculate_fast
+from business_tax_calculator.calculator.tax_calculator import (
+    RESULT_KEYS,
+    calculate_business_liabilities,
+)
+from business_tax_calculator.model.business import Business
+from business_tax_calculator.model.tax_result import TaxResult
+
+# Latency is tracked by the benchmark suite (scalar.calculate_fast.p99_us),
+# not asserted here where wall-clock timings are at the mercy of the host.
+ENTITY_TYPES = ["Sole Proprietorship", "LLC", "S-Corp", "C-Corp"]
+FILING_STATUSES = ["Single", "Married Filing Jointly", "Head of Household"]
+
+
+def random_inputs(n, seed=11):
+    rng = np.random.default_rng(seed)
+    for i in range(n):
+        yield {
+            "entity_type": ENTITY_TYPES[i % 4],
+            "filing_status": FILING_STATUSES[i % 3],
+            "revenue": float(rng.integers(0, 2_000_000)),
+            "expenses": float(rng.integers(0, 900_000)),
+            "reasonable_salary": float(rng.integers(0, 250_000)),
+            "retirement_contributions": float(rng.integers(0, 90_000)),
+            "health_insurance_premiums": float(rng.integers(0, 30_000)),
+            "home_office_deduction": float(rng.integers(0, 3_000)),
+            "other_deductions": float(rng.integers(0, 20_000)),
+            "estimated_tax_payments": float(rng.integers(0, 90_000)),
+        }
+
+
+def test_fast_path_matches_full_calculation():
+    for inputs in random_inputs(1000):
+        business = Business()
+        for field, value in inputs.items():
+            setattr(business, field, value)
+        expected = calculate_business_liabilities(business)
+        result = calculate_fast(**inputs)
+        assert isinstance(result, TaxResult)
+        assert result.as_dict() == {key: expected[key] for key in RESULT_KEYS}
+
+
+def test_fast_path_result_has_no_instance_dict():
+    result = calculate_fast("LLC", 120000.0, 30000.0)
+    assert not hasattr(result, "__dict__")
@@ -0,0 +1,48 @@
+import sys
+import os
+
+sys.path.insert(
+    0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "src"))
+)
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+import numpy as np
+from benchmarks.fuzz import (
+    edge_incomes,
+    full_engine,
+    generate_columns,
+    run_fuzz,
+)
+from business_tax_calculator.calculator.tax_calculator import RESULT_KEYS
+from business_tax_calculator.calculator.vectorized import calculate_columns
+
+
+def test_engines_agree_on_random_inputs():
+    report = run_fuzz(3000, seed=11, chunk_size=1000)
+    assert report.rows == 3000
+    assert report.ok, report.summary()
+    assert set(report.throughput()) == {"vectorized", "full", "fast"}
+
+
+def test_generated_inputs_hit_the_edges():
+    columns = generate_columns(4000, np.random.default_rng(3))
+    taxable = calculate_columns(columns)["taxable_income"]
+    positive_edges = [edge for edge in edge_incomes() if edge > 0]
+    assert np.isin(taxable, positive_edges).sum() > 100
+    assert 168_600.0 in positive_edges and 200_000.0 in positive_edges
+
+
+def test_mismatches_are_minimized():
+    total = RESULT_KEYS.index("total_tax")
+
+    def broken(inputs):
+        results = list(full_engine(inputs))
+        if inputs["entity_type"] == "LLC" and inputs["revenue"] > 100_000:
+            results[total] += 1.0
+        return tuple(results)
+
+    report = run_fuzz(2000, seed=5, engines={"broken": broken}, max_reproducers=1)
+    assert not report.ok and report.mismatches["broken"] > 0
+    (reproducer,) = report.reproducers
+    assert reproducer["differs"] == ["total_tax"]
+    assert set(reproducer["inputs"]) == {"entity_type", "revenue"}
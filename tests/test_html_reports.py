@@ -0,0 +1,138 @@
+import sys
+import os
+
+sys.path.insert(
+    0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "src"))
+)
+
+import csv
+
+import pytest
+from business_tax_calculator.calculator import tax_calculator, vectorized
+from business_tax_calculator.calculator.batch import run_batch
+from business_tax_calculator.cli import main as cli_main
+from business_tax_calculator.report.html import (
+    compile_template,
+    generate_reports,
+    page_name,
+    read_result_records,
+)
+
+ROWS = [
+    {
+        "client_id": "A-1",
+        "name": "Acme & Co",
+        "entity_type": "LLC",
+        "revenue": "180000",
+    },
+    {"client_id": "B/2", "name": "", "entity_type": "S-Corp", "revenue": "400000"},
+    {"client_id": "", "name": "Nameless", "entity_type": "C-Corp", "revenue": "90000"},
+] + [
+    {"client_id": f"C{i}", "name": "", "entity_type": "LLC", "revenue": str(i * 1000)}
+    for i in range(20)
+]
+
+TEMPLATE = "<h1>{{ name }}</h1><p>{{ total_tax|currency }} {{ tax_owed|raw }}</p>"
+
+
+def write_input(path, rows):
+    with open(path, "w", newline="") as handle:
+        writer = csv.DictWriter(
+            handle, fieldnames=["client_id", "name", "entity_type", "revenue"]
+        )
+        writer.writeheader()
+        writer.writerows(rows)
+
+
+@pytest.fixture
+def results(tmp_path):
+    source = tmp_path / "in.csv"
+    write_input(source, ROWS)
+    run_batch(str(source), str(tmp_path / "out.csv"))
+    run_batch(str(source), str(tmp_path / "out.store"))
+    return tmp_path
+
+
+def test_compile_template_escapes_and_filters():
+    template = compile_template(TEMPLATE)
+    page = template.render({"name": "<b>", "total_tax": 1234.5, "tax_owed": 0.25})
+    assert page == "<h1>&lt;b&gt;</h1><p>$1,234.50 0.25</p>"
+    with pytest.raises(ValueError, match="filter"):
+        compile_template("{{ total_tax|upper }}")
+
+
+def test_page_names():
+    assert page_name("A-1", 0) == "A-1.html"
+    assert page_name("B/2", 1) == "B_2.html"
+    assert page_name("", 7) == "row-7.html"
+
+
+def test_store_and_csv_results_agree(results):
+    (from_csv,) = read_result_records(str(results / "out.csv"))
+    (from_store,) = read_result_records(str(results / "out.store"))
+    assert len(from_csv) == len(from_store) == len(ROWS)
+    for a, b in zip(from_csv, from_store):
+        assert a["client_id"] == b["client_id"]
+        assert a["total_tax"] == pytest.approx(b["total_tax"])
+
+
+def test_reports_render_stored_results_without_calculating(results, monkeypatch):
+    def fail(*args, **kwargs):
+        raise AssertionError("reports must not recalculate")
+
+    monkeypatch.setattr(vectorized, "calculate_matrix", fail)
+    monkeypatch.setattr(tax_calculator, "calculate_business_liabilities", fail)
+    pages = results / "pages"
+    summary = generate_reports(str(results / "out.store"), str(pages), workers=1)
+    assert summary.pages == len(ROWS) and summary.skipped == 0
+    assert summary.pages_per_second > 0
+    assert len(os.listdir(pages)) == len(ROWS)
+
+    (records,) = read_result_records(str(results / "out.csv"))
+    page = (pages / "A-1.html").read_text()
+    assert "Acme &amp; Co" in page
+    assert f"${records[0]['total_tax']:,.2f}" in page
+    assert "Self-Employment Tax" in page
+    s_corp = (pages / "B_2.html").read_text()
+    assert "Owner&#x27;s Salary" in s_corp and "Employment Taxes" in s_corp
+    assert "Nameless" in (pages / "row-2.html").read_text()
+
+
+def test_resume_skips_finished_pages(results):
+    pages = results / "pages"
+    template = "{{ client_id }}"
+    generate_reports(str(results / "out.csv"), str(pages), template, workers=1)
+    # An interrupted run leaves finished pages and at most partial files.
+    os.remove(pages / "C5.html")
+    os.remove(pages / "C6.html")
+    (pages / "C6.html.partial").write_text("half")
+    (pages / "C7.html").write_text("kept")
+
+    summary = generate_reports(
+        str(results / "out.csv"), str(pages), template, workers=1, resume=True
+    )
+    assert (summary.pages, summary.skipped) == (2, len(ROWS) - 2)
+    assert (pages / "C6.html").read_text() == "C6"
+    assert (pages / "C7.html").read_text() == "kept"
+    assert not (pages / "C6.html.partial").exists()
+
+
+def test_process_pool_bounded_tasks(results):
+    pages = results / "pages"
+    summary = generate_reports(
+        str(results / "out.store"), str(pages), TEMPLATE, workers=2, task_size=3
+    )
+    assert summary.pages == len(ROWS)
+    assert (pages / "C3.html").read_text().startswith("<h1>C3</h1>")
+
+
+def test_reports_command(results, capsys):
+    pages = str(results / "pages")
+    template = results / "page.html"
+    template.write_text("{{ client_id }}: {{ effective_tax_rate|percent }}")
+    args = ["reports", str(results / "out.store"), pages, "--workers", "1"]
+    assert cli_main(args + ["--template", str(template)]) == 0
+    assert f"{len(ROWS)} pages written" in capsys.readouterr().out
+    assert cli_main(args + ["--resume"]) == 0
+    assert f"0 pages written, {len(ROWS)} already present" in capsys.readouterr().out
+    assert open(os.path.join(pages, "C1.html")).read().endswith("%")
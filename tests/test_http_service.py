@@ -0,0 +1,139 @@
+import sys
+import os
+
+sys.path.insert(
+    0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "src"))
+)
+
+import asyncio
+import json
+
+import pytest
+from business_tax_calculator.service.daemon import calculate_request
+from business_tax_calculator.service.http_service import (
+    CalculationHttpService,
+    MicroBatcher,
+    Overloaded,
+)
+
+
+async def http(port, method, path, payload=None):
+    reader, writer = await asyncio.open_connection("127.0.0.1", port)
+    body = b"" if payload is None else json.dumps(payload).encode()
+    writer.write(
+        f"{method} {path} HTTP/1.1\r\nHost: test\r\nConnection: close\r\n"
+        f"Content-Length: {len(body)}\r\n\r\n".encode() + body
+    )
+    await writer.drain()
+    response = await reader.read()
+    writer.close()
+    head, _, body = response.partition(b"\r\n\r\n")
+    status = int(head.split()[1])
+    return status, json.loads(body)
+
+
+def rows(n):
+    return [
+        {"entity_type": "LLC", "revenue": 100000 + 1000 * i, "expenses": 20000}
+        for i in range(n)
+    ]
+
+
+async def with_service(scenario, **options):
+    service = CalculationHttpService(**options)
+    server = await service.start(port=0)
+    port = server.sockets[0].getsockname()[1]
+    try:
+        async with server:
+            return await scenario(service, port)
+    finally:
+        service.close()
+
+
+def test_concurrent_requests_are_coalesced():
+    async def scenario(service, port):
+        inputs = rows(40)
+        responses = await asyncio.gather(
+            *(http(port, "POST", "/calculate", row) for row in inputs)
+        )
+        for row, (status, result) in zip(inputs, responses):
+            assert status == 200
+            assert result == calculate_request(row)
+        status, metrics = await http(port, "GET", "/metrics")
+        assert status == 200
+        assert metrics["rows"] == 40
+        assert metrics["batches"] < 40
+        assert metrics["endpoints"]["/calculate"]["count"] == 40
+        assert metrics["endpoints"]["/calculate"]["p99_ms"] > 0
+
+    asyncio.run(with_service(scenario, window=0.02))
+
+
+def test_batch_endpoint_and_errors():
+    async def scenario(service, port):
+        inputs = rows(5)
+        status, results = await http(port, "POST", "/calculate/batch", inputs)
+        assert status == 200
+        assert results == [calculate_request(row) for row in inputs]
+
+        status, error = await http(port, "POST", "/calculate", {"bogus": 1})
+        assert status == 400 and "bogus" in error["error"]
+        for amount in (float("nan"), float("inf"), "-inf"):
+            row = dict(inputs[0], revenue=amount)
+            status, error = await http(port, "POST", "/calculate", row)
+            assert status == 400 and "revenue" in error["error"]
+            status, error = await http(port, "POST", "/calculate/batch", [row])
+            assert status == 400 and "revenue" in error["error"]
+        # Rejected requests are timed along with the successful ones.
+        status, metrics = await http(port, "GET", "/metrics")
+        assert metrics["endpoints"]["/calculate"]["count"] == 4
+        assert metrics["endpoints"]["/calculate/batch"]["count"] == 4
+        assert (await http(port, "GET", "/calculate"))[0] == 405
+        assert (await http(port, "GET", "/nowhere"))[0] == 404
+
+    asyncio.run(with_service(scenario))
+
+
+async def raw(port, head):
+    reader, writer = await asyncio.open_connection("127.0.0.1", port)
+    writer.write(head)
+    await writer.drain()
+    response = await reader.read()
+    writer.close()
+    head, _, body = response.partition(b"\r\n\r\n")
+    return int(head.split()[1]), json.loads(body)
+
+
+def test_bad_content_length_and_internal_errors(monkeypatch):
+    async def scenario(service, port):
+        for length in ("abc", "-5"):
+            head = f"POST /calculate HTTP/1.1\r\nContent-Length: {length}\r\n\r\n"
+            status, error = await raw(port, head.encode())
+            assert status == 400 and "Content-Length" in error["error"]
+
+        async def broken(body):
+            raise RuntimeError("bug")
+
+        monkeypatch.setattr(service, "_calculate", broken)
+        status, error = await http(port, "POST", "/calculate", rows(1)[0])
+        assert status == 500 and error == {"error": "Internal server error."}
+
+    asyncio.run(with_service(scenario))
+
+
+def test_backpressure_rejects_when_backlog_is_full():
+    async def scenario():
+        batcher = MicroBatcher(window=10, max_rows=100, max_pending=3)
+        try:
+            futures = [batcher.submit(row) for row in rows(3)]
+            with pytest.raises(Overloaded):
+                batcher.submit(rows(1)[0])
+            with pytest.raises(Overloaded):
+                await batcher.evaluate(rows(1))
+            batcher._flush()
+            await asyncio.gather(*futures)
+            assert batcher.backlog == 0 and batcher.rejected == 2
+        finally:
+            batcher.close()
+
+    asyncio.run(scenario())
@@ -0,0 +1,64 @@
+import sys
+import os
+
+sys.path.insert(
+    0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "src"))
+)
+
+import json
+import subprocess
+
+SRC = os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "src"))
+
+# Cumulative cold import time of the package on the scalar path. Importing
+# numpy or pandas alone blows through this.
+IMPORT_BUDGET_MS = 150
+
+HEAVY_MODULES = ("numpy", "pandas")
+
+SCALAR_PATH = """
+import json, sys
+import business_tax_calculator
+from business_tax_calculator import Business, calculate_business_liabilities
+business = Business()
+business.set_entity_type("LLC")
+business.set_revenue(120000)
+business.set_expenses(30000)
+calculate_business_liabilities(business)
+json.dump(sorted(sys.modules), sys.stdout)
+"""
+
+
+def run_cold(code):
+    env = dict(os.environ, PYTHONPATH=SRC)
+    return subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", code],
+        capture_output=True,
+        text=True,
+        env=env,
+        check=True,
+    )
+
+
+def package_import_ms(stderr):
+    """Sum cumulative time of top-level business_tax_calculator imports."""
+    total_us = 0
+    for line in stderr.splitlines():
+        if not line.startswith("import time:"):
+            continue
+        _, cumulative, name = line.split("|")
+        if name.startswith(" business_tax_calculator"):
+            total_us += int(cumulative)
+    return total_us / 1000
+
+
+def test_scalar_path_loads_no_heavy_modules():
+    modules = json.loads(run_cold(SCALAR_PATH).stdout)
+    for heavy in HEAVY_MODULES:
+        assert heavy not in modules
+    assert not [m for m in modules if m.startswith("business_tax_calculator.legacy")]
+
+
+def test_cold_import_within_budget():
+    best = min(package_import_ms(run_cold(SCALAR_PATH).stderr) for _ in range(3))
+    assert best <= IMPORT_BUDGET_MS, f"cold import took {best:.1f}ms"
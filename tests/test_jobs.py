@@ -0,0 +1,232 @@
+import sys
+import os
+
+sys.path.insert(
+    0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "src"))
+)
+
+import csv
+import json
+import socket
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import pytest
+from business_tax_calculator.calculator import batch, jobs
+from business_tax_calculator.calculator.batch import run_batch
+from business_tax_calculator.calculator.jobs import (
+    JobError,
+    ShardClaim,
+    create_job,
+    job_status,
+    plan_shards,
+    run_job,
+)
+from business_tax_calculator.cli import main as cli_main
+
+ROWS = [
+    {
+        "client_id": f"C{i:03d}",
+        # Quoted newlines must not split a record across shards.
+        "name": f"Client\n{i}" if i % 7 == 0 else f"Client {i}",
+        "entity_type": ("LLC", "S-Corp", "C-Corp")[i % 3],
+        "revenue": str(40_000 + 1_234 * i),
+    }
+    for i in range(50)
+]
+
+
+def write_input(path, rows=ROWS):
+    with open(path, "w", newline="") as handle:
+        writer = csv.DictWriter(handle, fieldnames=list(rows[0]))
+        writer.writeheader()
+        writer.writerows(rows)
+
+
+def read_rows(paths):
+    rows = []
+    for path in paths:
+        with open(path, newline="") as handle:
+            reader = csv.reader(handle)
+            next(reader)
+            rows.extend(reader)
+    return rows
+
+
+@pytest.fixture
+def source(tmp_path):
+    path = tmp_path / "in.csv"
+    write_input(path)
+    return str(path)
+
+
+def test_csv_shards_cover_every_record_once(source):
+    shards = plan_shards(source, shard_rows=8)
+    assert [rows for _, rows in shards] == [8] * 6 + [2]
+    for (_, stop), (start, _) in zip(
+        (r for r, _ in shards), (r for r, _ in shards[1:])
+    ):
+        assert stop == start
+
+
+def test_job_outputs_match_a_plain_batch_run(source, tmp_path):
+    job = str(tmp_path / "run.job")
+    summary = run_job([source], job, chunk_size=3, shard_rows=8)
+    assert (summary.shards, summary.completed, summary.batch.rows) == (7, 7, 50)
+    assert summary.finished
+    run_batch(source, str(tmp_path / "out.csv"))
+    status = job_status(job)
+    assert status["done"] == 7 and status["rows_done"] == 50
+    assert read_rows(status["outputs"]) == read_rows([tmp_path / "out.csv"])
+
+
+def test_resume_skips_completed_shards(source, tmp_path, monkeypatch):
+    job = str(tmp_path / "run.job")
+    real = batch.calculate_chunk
+    calls = []
+
+    def dies_in_third_shard(columns, *args):
+        calls.append(len(columns["client_id"]))
+        if len(calls) == 3:
+            raise KeyboardInterrupt
+        return real(columns, *args)
+
+    monkeypatch.setattr(batch, "calculate_chunk", dies_in_third_shard)
+    with pytest.raises(KeyboardInterrupt):
+        run_job([source], job, shard_rows=20)
+    monkeypatch.setattr(batch, "calculate_chunk", real)
+
+    with pytest.raises(JobError, match="resume"):
+        run_job([source], job, shard_rows=20)
+    summary = run_job([source], job, resume=True)
+    assert (summary.completed, summary.already_done) == (1, 2)
+    assert summary.batch.rows == 10
+    assert sorted(os.listdir(os.path.join(job, "shards"))) == [
+        "shard-00000.csv",
+        "shard-00001.csv",
+        "shard-00002.csv",
+    ]
+    assert os.listdir(os.path.join(job, "claims")) == []
+    assert len(read_rows(job_status(job)["outputs"])) == 50
+
+
+def test_resume_refuses_changed_inputs_and_rules(source, tmp_path, monkeypatch):
+    job = str(tmp_path / "run.job")
+    create_job(job, [source], shard_rows=20)
+    write_input(source, ROWS[:10])
+    with pytest.raises(JobError, match="changed"):
+        run_job([source], job, resume=True)
+
+    write_input(source)
+    other = str(tmp_path / "other.job")
+    create_job(other, [source], shard_rows=20)
+    monkeypatch.setattr(jobs, "rules_version", lambda: "not-the-same")
+    with pytest.raises(JobError, match="Rate tables changed"):
+        run_job([source], other, resume=True)
+
+
+def test_parquet_shards_follow_row_groups(tmp_path):
+    pa = pytest.importorskip("pyarrow")
+    pq = pytest.importorskip("pyarrow.parquet")
+    table = pa.table(
+        {
+            "client_id": [row["client_id"] for row in ROWS],
+            "entity_type": [row["entity_type"] for row in ROWS],
+            "revenue": [float(row["revenue"]) for row in ROWS],
+        }
+    )
+    source = str(tmp_path / "in.parquet")
+    pq.write_table(table, source, row_group_size=10)
+    assert [rows for _, rows in plan_shards(source, shard_rows=15)] == [20, 20, 10]
+
+    job = str(tmp_path / "run.job")
+    summary = run_job([source], job, shard_rows=15, chunk_size=4)
+    assert (summary.shards, summary.batch.rows) == (3, 50)
+    outputs = job_status(job)["outputs"]
+    assert all(path.endswith(".parquet") for path in outputs)
+    ids = [pq.read_table(path)["client_id"].to_pylist() for path in outputs]
+    assert sum(ids, []) == table["client_id"].to_pylist()
+
+
+def test_claims_are_exclusive_until_stale(tmp_path):
+    path = str(tmp_path / "shard.claim")
+    claim = ShardClaim.acquire(path)
+    assert claim is not None
+    # Held by this live process.
+    assert ShardClaim.acquire(path) is None
+
+    # Another machine's claim is honoured until its lease runs out.
+    with open(path, "w") as handle:
+        json.dump({"owner": "elsewhere:1"}, handle)
+    assert ShardClaim.acquire(path, lease_seconds=60) is None
+    old = time.time() - 120
+    os.utime(path, (old, old))
+    assert ShardClaim.acquire(path, lease_seconds=60) is not None
+
+    # A claim of an exited process on this host is stale at once.
+    with open(path, "w") as handle:
+        json.dump({"owner": f"{socket.gethostname()}:999999999"}, handle)
+    assert ShardClaim.acquire(path) is not None
+
+
+def test_stale_claim_taken_over_during_the_check_is_kept(tmp_path, monkeypatch):
+    path = str(tmp_path / "shard.claim")
+    with open(path, "w") as handle:
+        json.dump({"owner": "elsewhere:1", "claimed_at": 0}, handle)
+    old = time.time() - 120
+    os.utime(path, (old, old))
+
+    # Worker B judges the claim stale; before it renames it, worker A
+    # judges the same and replaces it with a fresh claim of its own.
+    check = ShardClaim._stale
+    other = []
+
+    def interleaved(path, lease_seconds):
+        stale = check(path, lease_seconds)
+        if not other:
+            other.append(None)
+            other[0] = ShardClaim.acquire(path, lease_seconds)
+        return stale
+
+    monkeypatch.setattr(ShardClaim, "_stale", staticmethod(interleaved))
+    assert ShardClaim.acquire(path, lease_seconds=60) is None
+    assert other[0] is not None
+    with open(path) as handle:
+        assert json.load(handle)["owner"] == f"{socket.gethostname()}:{os.getpid()}"
+    assert os.listdir(tmp_path) == ["shard.claim"]
+
+
+def test_busy_shards_are_left_to_their_owner(source, tmp_path):
+    job = str(tmp_path / "run.job")
+    create_job(job, [source], shard_rows=20)
+    with open(os.path.join(job, "claims", "shard-00001.claim"), "w") as handle:
+        json.dump({"owner": "elsewhere:1"}, handle)
+    summary = run_job([source], job, resume=True)
+    assert (summary.completed, summary.busy, summary.finished) == (2, 1, False)
+    assert job_status(job)["claimed"] == 1
+
+
+def _work(job):
+    return run_job([], job, resume=True, chunk_size=5).completed
+
+
+def test_workers_split_shards_without_a_coordinator(source, tmp_path):
+    job = str(tmp_path / "run.job")
+    create_job(job, [source], shard_rows=5)
+    with ProcessPoolExecutor(2) as pool:
+        completed = list(pool.map(_work, [job, job]))
+    assert sum(completed) == 10
+    assert len(read_rows(job_status(job)["outputs"])) == 50
+
+
+def test_batch_job_commands(source, tmp_path, capsys):
+    job = str(tmp_path / "run.job")
+    args = ["batch", source, job, "--shard-rows", "20"]
+    assert cli_main(args + ["--job"]) == 0
+    assert "3 calculated" in capsys.readouterr().out
+    assert cli_main(args + ["--job"]) == 2
+    assert "--resume" in capsys.readouterr().err
+    assert cli_main(args + ["--resume"]) == 0
+    assert "0 calculated, 3 already done" in capsys.readouterr().out
+    assert cli_main(["job", "status", job]) == 0
+    assert "3/3 shards done (50/50 rows)" in capsys.readouterr().out
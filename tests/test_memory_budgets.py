@@ -0,0 +1,32 @@
+import sys
+import os
+
+sys.path.insert(
+    0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "src"))
+)
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from benchmarks.memory import (
+    batch_footprints,
+    check_budgets,
+    load_budgets,
+    object_footprints,
+)
+
+
+def test_object_footprints_within_budget():
+    measured = object_footprints()
+    assert not check_budgets(measured, load_budgets())
+    # The slotted input record is what makes large in-process caches viable.
+    assert measured["business_input_bytes"] * 5 < measured["business_bytes"]
+
+
+def test_batch_footprints_within_budget():
+    measured = batch_footprints(rows=4000, chunk_size=1000)
+    assert not check_budgets(measured, load_budgets())
+
+
+def test_check_budgets_reports_overruns():
+    assert check_budgets({"a": 10, "b": 30}, {"a": 20, "b": 20, "c": 1}) == [
+        "b: 30 > 20"
+    ]
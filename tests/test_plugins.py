@@ -0,0 +1,180 @@
+import sys
+import os
+
+sys.path.insert(
+    0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "src"))
+)
+
+import pytest
+from business_tax_calculator.calculator.batch import (
+    business_from_columns,
+    rows_to_columns,
+)
+from business_tax_calculator.calculator.fast_path import calculate_fast
+from business_tax_calculator.calculator.tax_calculator import (
+    RESULT_KEYS,
+    calculate_business_liabilities,
+)
+from business_tax_calculator.calculator.vectorized import calculate_matrix
+from business_tax_calculator.model.deduction.deduction_registry import (
+    DeductionRegistry,
+)
+from business_tax_calculator.utils import plugins
+from business_tax_calculator.utils.plugins import PluginEntryPoint
+from business_tax_calculator.utils.rules import rules_version
+
+PLUGIN_SOURCE = """
+from business_tax_calculator.model.deduction.base_deduction import BaseDeduction
+from business_tax_calculator.model.liabilities.liability import Liability
+
+
+class EquipmentDeduction(BaseDeduction):
+    name = "Equipment Deduction"
+    inputs = ("other_deductions", "pass_through")
+
+    @staticmethod
+    def compute(values, ops):
+        return ops.where(values["pass_through"], values["other_deductions"] * 0.5, 0.0)
+
+
+class MetroSurtax(Liability):
+    def calculate(self, taxable_income):
+        self.value = self.evaluate(taxable_income, None)
+        return self.value
+
+    def evaluate(self, taxable_income, ops):
+        return taxable_income * 0.01
+
+
+class TransitLevy(Liability):
+    # Only calculate(): evaluated one income at a time.
+    def calculate(self, taxable_income):
+        self.value = 250.0 if taxable_income > 100_000 else 0.0
+        return self.value
+"""
+
+MODULE = "firm_rules_plugin"
+
+
+@pytest.fixture
+def installed_plugins(tmp_path, monkeypatch):
+    (tmp_path / f"{MODULE}.py").write_text(PLUGIN_SOURCE)
+    monkeypatch.syspath_prepend(str(tmp_path))
+    advertised = {
+        plugins.DEDUCTION_PLUGINS: [
+            PluginEntryPoint(
+                "equipment", f"{MODULE}:EquipmentDeduction", plugins.DEDUCTION_PLUGINS
+            )
+        ],
+        plugins.LIABILITY_PLUGINS: [
+            PluginEntryPoint(
+                "metro", f"{MODULE}:MetroSurtax", plugins.LIABILITY_PLUGINS
+            ),
+            PluginEntryPoint(
+                "transit", f"{MODULE}:TransitLevy", plugins.LIABILITY_PLUGINS
+            ),
+        ],
+    }
+    monkeypatch.setattr(plugins, "_entry_points", lambda group: advertised[group])
+    plugins.reset_plugins()
+    yield
+    monkeypatch.undo()
+    plugins.reset_plugins()
+    sys.modules.pop(MODULE, None)
+
+
+ROWS = [
+    {
+        "entity_type": "LLC",
+        "revenue": 200000,
+        "expenses": 50000,
+        "other_deductions": 4000,
+    },
+    {
+        "entity_type": "C-Corp",
+        "revenue": 90000,
+        "expenses": 10000,
+        "other_deductions": 2000,
+    },
+]
+
+
+def test_plugins_are_imported_only_when_calculating(installed_plugins):
+    registry = DeductionRegistry()
+    rules_version()
+    assert MODULE not in sys.modules
+
+    columns = rows_to_columns(ROWS)
+    business = business_from_columns(columns, 0)
+    result = calculate_business_liabilities(business)
+    assert MODULE in sys.modules
+
+    values = business.tax_return.deduction_registry.get_deduction_values()
+    assert values["Equipment Deduction"] == 2000
+    surtax = business.tax_return.tax_liability.plugin_liabilities[0].value
+    assert surtax == pytest.approx(result["taxable_income"] * 0.01)
+    assert registry.get_deduction_by_name("Equipment Deduction").name == (
+        "Equipment Deduction"
+    )
+
+
+def test_plugins_run_in_vectorized_pipeline(installed_plugins):
+    columns = rows_to_columns(ROWS)
+    matrix = calculate_matrix(columns)
+    for i in range(len(ROWS)):
+        expected = calculate_business_liabilities(business_from_columns(columns, i))
+        assert matrix[i].tolist() == [expected[key] for key in RESULT_KEYS]
+
+
+def test_calculate_only_liability_runs_everywhere(installed_plugins):
+    columns = rows_to_columns(ROWS)
+    matrix = calculate_matrix(columns)
+    for i, row in enumerate(ROWS):
+        business = business_from_columns(columns, i)
+        expected = calculate_business_liabilities(business)
+        (levy,) = business.tax_return.tax_liability.plugin_liabilities[1:]
+        assert levy.value == (250.0 if expected["taxable_income"] > 100_000 else 0.0)
+        assert matrix[i].tolist() == [expected[key] for key in RESULT_KEYS]
+        fast = calculate_fast(**row)
+        assert fast.as_dict() == {key: expected[key] for key in RESULT_KEYS}
+
+
+def test_plugins_change_rules_version(tmp_path, monkeypatch):
+    before = rules_version()
+    monkeypatch.setattr(
+        plugins,
+        "_entry_points",
+        lambda group: [PluginEntryPoint("x", "missing_module:X", group)],
+    )
+    plugins.reset_plugins()
+    try:
+        assert rules_version() != before
+        with pytest.raises(ImportError, match="missing_module"):
+            DeductionRegistry.default_pipeline()
+    finally:
+        monkeypatch.undo()
+        plugins.reset_plugins()
+    assert rules_version() == before
+
+
+def test_discovers_entry_points_from_installed_metadata(tmp_path, monkeypatch):
+    dist_info = tmp_path / "firm_rules-1.2.0.dist-info"
+    dist_info.mkdir()
+    (dist_info / "METADATA").write_text("Name: firm-rules\nVersion: 1.2.0\n")
+    (dist_info / "entry_points.txt").write_text(
+        "[console_scripts]\n"
+        "firm = firm_rules.cli:main\n"
+        "\n"
+        "[business_tax_calculator.deductions]\n"
+        "equipment = firm_rules.deductions:EquipmentDeduction [extra]\n"
+    )
+    monkeypatch.syspath_prepend(str(tmp_path))
+    plugins.reset_plugins()
+    try:
+        (entry_point,) = plugins.discover(plugins.DEDUCTION_PLUGINS)
+        assert entry_point.name == "equipment"
+        assert entry_point.value == "firm_rules.deductions:EquipmentDeduction"
+        assert entry_point.version == "1.2.0"
+    finally:
+        monkeypatch.undo()
+        plugins.reset_plugins()
@@ -0,0 +1,79 @@
+import sys
+import os
+
+sys.path.insert(
+    0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "src"))
+)
+
+import re
+import time
+
+from business_tax_calculator.calculator.tax_calculator import (
+    calculate_business_liabilities,
+)
+from business_tax_calculator.cli import main
+from business_tax_calculator.model.business import Business
+from business_tax_calculator.utils.profiler import SamplingProfiler, area_of, profile
+
+FOLDED_LINE = re.compile(r"^\S+ \d+$")
+
+
+def busy(seconds):
+    business = Business()
+    business.set_entity_type("S-Corp")
+    business.set_revenue(250000)
+    business.set_reasonable_salary(90000)
+    deadline = time.perf_counter() + seconds
+    while time.perf_counter() < deadline:
+        calculate_business_liabilities(business)
+
+
+def test_profile_writes_collapsed_stacks(tmp_path):
+    path = tmp_path / "out.folded"
+    with profile(str(path), interval=0.001) as profiler:
+        busy(0.3)
+    lines = path.read_text().splitlines()
+    assert lines and all(FOLDED_LINE.match(line) for line in lines)
+    assert sum(int(line.rsplit(" ", 1)[1]) for line in lines) == profiler.samples
+    assert any(
+        "calculator.tax_calculator:calculate_business_liabilities" in line
+        for line in lines
+    )
+    assert profiler.areas["calculator"] + profiler.areas["model/liabilities"] > 0
+    assert "sampling overhead" in profiler.report()
+
+
+def test_sampler_backs_off_to_respect_overhead_bound():
+    profiler = SamplingProfiler(interval=0.0001, max_overhead=0.001).start()
+    busy(0.3)
+    profiler.stop()
+    assert profiler.final_interval > profiler.interval
+
+
+def test_area_attribution_uses_innermost_package_frame():
+    pkg = "business_tax_calculator"
+    stack = ("runpy", f"{pkg}.calculator.vectorized", f"{pkg}.model.liabilities.x")
+    assert area_of(stack) == "model/liabilities"
+    assert area_of(stack[:2] + ("numpy.core",)) == "calculator"
+    assert area_of(("runpy", "numpy")) == "outside the package"
+
+
+def test_batch_profile_flag(tmp_path, capsys):
+    source = tmp_path / "in.csv"
+    rows = "\n".join(f"c{i},LLC,{100000 + i},20000" for i in range(2000))
+    source.write_text("client_id,entity_type,revenue,expenses\n" + rows + "\n")
+    folded = tmp_path / "out.folded"
+    status = main(
+        [
+            "batch",
+            str(source),
+            str(tmp_path / "out.csv"),
+            "--profile",
+            str(folded),
+            "--profile-interval-ms",
+            "0.5",
+        ]
+    )
+    assert status == 0
+    assert folded.exists()
+    assert "sampling overhead" in capsys.readouterr().out
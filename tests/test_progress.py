@@ -0,0 +1,166 @@
+import sys
+import os
+
+sys.path.insert(
+    0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "src"))
+)
+
+import csv
+import io
+import json
+
+import numpy as np
+import pytest
+from business_tax_calculator.calculator import batch
+from business_tax_calculator.calculator.batch import (
+    estimate_rows,
+    failed_rows,
+    run_batch,
+)
+from business_tax_calculator.calculator.jobs import run_job
+from business_tax_calculator.cli import main as cli_main
+from business_tax_calculator.utils.progress import (
+    BatchProgress,
+    JsonLinesSink,
+    TtyProgress,
+    format_event,
+)
+
+ROWS = [
+    {"client_id": f"C{i}", "entity_type": "LLC", "revenue": str(30_000 + 500 * i)}
+    for i in range(45)
+]
+
+
+@pytest.fixture
+def source(tmp_path):
+    path = tmp_path / "in.csv"
+    with open(path, "w", newline="") as handle:
+        writer = csv.DictWriter(handle, fieldnames=list(ROWS[0]))
+        writer.writeheader()
+        writer.writerows(ROWS)
+    return str(path)
+
+
+def test_batch_reports_once_per_chunk(source, tmp_path):
+    events = []
+    progress = BatchProgress([events.append], label="nightly")
+    run_batch(source, str(tmp_path / "out.csv"), chunk_size=10, progress=progress)
+    assert [e.kind for e in events] == ["start"] + ["chunk"] * 5 + ["finish"]
+    chunks = [e for e in events if e.kind == "chunk"]
+    assert [e.chunk_rows for e in chunks] == [10, 10, 10, 10, 5]
+    assert [e.rows for e in chunks] == [10, 20, 30, 40, 45]
+    assert all(e.rows_total == 45 for e in events)
+    assert chunks[-1].eta_seconds == 0.0
+    assert all(0.0 <= e.utilization <= 1.0 for e in events)
+    assert {e.label for e in events} == {"nightly"}
+    assert events[-1].errors == 0
+
+
+def test_errors_count_rows_with_non_finite_results(source, tmp_path, monkeypatch):
+    real = batch.calculate_chunk
+
+    def one_bad_row_per_chunk(*args):
+        results = real(*args)
+        results[0, 0] = np.nan
+        return results
+
+    monkeypatch.setattr(batch, "calculate_chunk", one_bad_row_per_chunk)
+    events = []
+    run_batch(
+        source,
+        str(tmp_path / "out.csv"),
+        chunk_size=20,
+        progress=BatchProgress([events.append]),
+    )
+    assert events[-1].errors == 3
+    assert failed_rows(np.array([[1.0, np.inf], [1.0, 2.0]])) == 1
+
+
+def test_error_event_before_the_exception(source, tmp_path, monkeypatch):
+    def fail(*args):
+        raise RuntimeError("disk full")
+
+    monkeypatch.setattr(batch, "calculate_chunk", fail)
+    events = []
+    with pytest.raises(RuntimeError):
+        run_batch(
+            source, str(tmp_path / "out.csv"), progress=BatchProgress([events.append])
+        )
+    assert events[-1].kind == "error"
+    assert events[-1].message == "RuntimeError: disk full"
+
+
+def test_job_reports_chunks_and_shards(source, tmp_path):
+    events = []
+    run_job(
+        [source],
+        str(tmp_path / "run.job"),
+        chunk_size=10,
+        shard_rows=20,
+        progress=BatchProgress([events.append]),
+    )
+    kinds = [e.kind for e in events]
+    assert kinds.count("shard") == 3 and kinds.count("chunk") == 5
+    assert events[-1].kind == "finish" and events[-1].rows == 45
+    assert events[0].rows_total == 45
+
+
+def test_estimate_rows(source, tmp_path):
+    assert estimate_rows(source) == 45
+    big = tmp_path / "big.csv"
+    line = b"C1,LLC,30000\n"
+    big.write_bytes(b"client_id,entity_type,revenue\n" + line * 200_000)
+    assert estimate_rows(str(big)) == pytest.approx(200_000, rel=0.01)
+
+
+class FakeTty(io.StringIO):
+    def isatty(self):
+        return True
+
+
+def test_tty_renderer_redraws_one_line(source, tmp_path):
+    stream = FakeTty()
+    progress = BatchProgress([TtyProgress(stream, interval=0)])
+    run_batch(source, str(tmp_path / "out.csv"), chunk_size=10, progress=progress)
+    text = stream.getvalue()
+    assert text.count("\r") == 6 and text.endswith("\n") and text.count("\n") == 1
+    assert "45/45 rows" in text and "rows/s" in text and "errors 0" in text
+
+    log = io.StringIO()
+    progress = BatchProgress([TtyProgress(log, log_interval=3600)])
+    run_batch(source, str(tmp_path / "out.csv"), chunk_size=10, progress=progress)
+    # Not a terminal: the first chunk and the final summary, one line each.
+    assert log.getvalue().count("\n") == 2 and "\r" not in log.getvalue()
+
+
+def test_format_event_without_total():
+    events = []
+    progress = BatchProgress([events.append])
+    progress.start()
+    progress.chunk(1_000, compute=0.0)
+    line = format_event(events[-1])
+    assert line.startswith("1,000 rows") and "ETA" not in line
+
+
+def test_json_lines_sink(source, tmp_path):
+    path = tmp_path / "telemetry.jsonl"
+    with JsonLinesSink(str(path)) as sink:
+        run_batch(
+            source,
+            str(tmp_path / "out.csv"),
+            chunk_size=20,
+            progress=BatchProgress([sink]),
+        )
+    lines = [json.loads(line) for line in path.read_text().splitlines()]
+    assert [line["kind"] for line in lines] == ["start"] + ["chunk"] * 3 + ["finish"]
+    assert lines[-1]["rows"] == 45 and ":" in lines[-1]["worker"]
+
+
+def test_batch_progress_options(source, tmp_path, capsys):
+    telemetry = tmp_path / "telemetry.jsonl"
+    args = ["batch", source, str(tmp_path / "out.csv"), "--chunk-size", "15"]
+    assert cli_main(args + ["--progress", "--telemetry", str(telemetry)]) == 0
+    assert "45/45 rows" in capsys.readouterr().err
+    kinds = [json.loads(line)["kind"] for line in telemetry.read_text().splitlines()]
+    assert kinds == ["start", "chunk", "chunk", "chunk", "finish"]
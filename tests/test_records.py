@@ -0,0 +1,120 @@
+import sys
+import os
+
+sys.path.insert(
+    0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "src"))
+)
+
+import dataclasses
+import gc
+import tracemalloc
+
+import pytest
+from business_tax_calculator.calculator.batch import rows_to_columns
+from business_tax_calculator.calculator.cache import CalculationCache
+from business_tax_calculator.calculator.tax_calculator import (
+    RESULT_KEYS,
+    calculate_business_liabilities,
+)
+from business_tax_calculator.calculator.vectorized import (
+    calculate_columns,
+    calculate_records,
+)
+from business_tax_calculator.model.business import Business
+from business_tax_calculator.model.business_input import BusinessInput
+from business_tax_calculator.model.tax_result import TaxResult
+
+RECORDS = [
+    BusinessInput(
+        client_id=f"c{i}",
+        entity_type=("LLC", "S-Corp", "C-Corp", "Sole Proprietorship")[i % 4],
+        state="CA",
+        revenue=90000.0 + 1500 * i,
+        expenses=15000.0 + 100 * i,
+        reasonable_salary=40000.0 if i % 4 == 1 else 0.0,
+        estimated_tax_payments=1000.0 * (i % 3),
+    )
+    for i in range(40)
+]
+
+
+def retained_bytes(build, n=1000):
+    """Average bytes still allocated per item after build(i) for n items."""
+    gc.collect()
+    tracemalloc.start()
+    kept = [build(i) for i in range(n)]
+    gc.collect()
+    current, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del kept
+    return current / n
+
+
+def make_business(i):
+    business = Business()
+    business.set_entity_type("LLC")
+    business.set_revenue(100000.0 + i)
+    business.set_expenses(20000.0)
+    return business
+
+
+def test_result_keeps_dict_access():
+    result = calculate_business_liabilities(make_business(0))
+    assert isinstance(result, TaxResult)
+    assert result["total_tax"] == result.total_tax
+    assert result["business"].revenue == 100000.0
+    assert result.get("missing", 1.5) == 1.5
+    assert set(dict(result)) == set(RESULT_KEYS) | {"business"}
+    assert list(result.as_dict()) == list(RESULT_KEYS)
+    with pytest.raises(KeyError):
+        result["missing"]
+    with pytest.raises(dataclasses.FrozenInstanceError):
+        result.total_tax = 0.0
+
+
+def test_records_round_trip_through_columns():
+    columns = BusinessInput.to_columns(RECORDS)
+    assert columns.keys() == rows_to_columns([]).keys()
+    assert BusinessInput.from_columns(columns) == RECORDS
+
+    results = calculate_records(RECORDS)
+    assert TaxResult.from_columns(calculate_columns(columns)) == results
+    assert TaxResult.from_matrix(TaxResult.to_matrix(results)) == results
+    packed = TaxResult.to_columns(results)
+    assert packed["total_tax"].flags.c_contiguous
+    assert TaxResult.from_columns(packed) == results
+
+
+def test_records_match_full_path():
+    for record, result in zip(RECORDS, calculate_records(RECORDS)):
+        business = record.to_business()
+        expected = calculate_business_liabilities(business)
+        assert result == expected
+        assert BusinessInput.from_business(business, record.client_id) == record
+
+
+def test_records_are_much_smaller_than_business():
+    business = retained_bytes(make_business)
+    record = retained_bytes(
+        lambda i: BusinessInput(entity_type="LLC", revenue=100000.0 + i)
+    )
+    assert record * 5 < business
+
+
+def test_cache_entries_are_packed():
+    cache = CalculationCache(maxsize=10)
+    first = cache.calculate(make_business(0))
+    second = cache.calculate(make_business(0))
+    assert second == first and second["business"] is not first["business"]
+    (stored,) = cache._entries.values()
+    assert isinstance(stored, bytes)
+
+    def as_dicts(business, filing_status=None):
+        return dict(calculate_business_liabilities(business, filing_status))
+
+    def fill(cache):
+        return retained_bytes(lambda i: cache.calculate(make_business(i)) and None)
+
+    assert fill(CalculationCache(maxsize=2000)) * 2.5 < fill(
+        CalculationCache(maxsize=2000, calculate=as_dicts)
+    )
@@ -0,0 +1,179 @@
+import sys
+import os
+
+sys.path.insert(
+    0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "src"))
+)
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+import csv
+import json
+
+import numpy as np
+import pytest
+from benchmarks.suite import make_columns, write_input_csv
+from business_tax_calculator.calculator.batch import calculate_chunk, run_batch
+from business_tax_calculator.calculator.jobs import JobError, job_rollup, run_job
+from business_tax_calculator.calculator.tax_calculator import RESULT_KEYS
+from business_tax_calculator.cli import main as cli_main
+from business_tax_calculator.report.rollup import (
+    QuantileSketch,
+    Rollup,
+    revenue_band,
+    rollup_results,
+)
+
+
+@pytest.fixture
+def source(tmp_path):
+    path = str(tmp_path / "in.csv")
+    write_input_csv(path, make_columns(300, seed=3))
+    return path
+
+
+def test_sketch_quantiles_within_relative_accuracy():
+    rng = np.random.default_rng(0)
+    values = np.concatenate(
+        [rng.lognormal(10, 1.5, 20_000), -rng.lognormal(5, 1, 3_000), np.zeros(500)]
+    )
+    sketch = QuantileSketch(relative_accuracy=0.01)
+    sketch.add(values)
+    sketch.add(np.array([np.nan, np.inf]))
+    assert sketch.count == len(values)
+    assert sketch.sum == pytest.approx(values.sum())
+    assert (sketch.quantile(0), sketch.quantile(1)) == (values.min(), values.max())
+    for q in (0.01, 0.1, 0.12, 0.5, 0.9, 0.99):
+        exact = np.quantile(values, q, method="lower")
+        assert sketch.quantile(q) == pytest.approx(exact, rel=0.0101, abs=1e-9)
+    assert np.isnan(QuantileSketch().quantile(0.5))
+
+
+def test_merged_sketches_equal_one_sketch():
+    values = np.random.default_rng(1).normal(1_000, 800, 10_000)
+    whole, parts = QuantileSketch(), [QuantileSketch() for _ in range(3)]
+    whole.add(values)
+    for part, chunk in zip(parts, np.array_split(values, 3)):
+        part.add(chunk)
+    merged = QuantileSketch.from_dict(json.loads(json.dumps(parts[0].as_dict())))
+    merged.merge(parts[1]).merge(parts[2])
+    assert merged.count == whole.count and merged.sum == pytest.approx(whole.sum)
+    for q in (0.05, 0.5, 0.95):
+        assert merged.quantile(q) == whole.quantile(q)
+    with pytest.raises(ValueError):
+        merged.merge(QuantileSketch(relative_accuracy=0.05))
+
+
+def test_groups_match_a_direct_aggregation():
+    columns = make_columns(2_000, seed=5)
+    results = calculate_chunk(columns)
+    rollup = Rollup(by=("entity_type", "revenue_band"), metrics=("total_tax",))
+    for start in range(0, 2_000, 300):
+        part = {name: values[start : start + 300] for name, values in columns.items()}
+        rollup.write(part, results[start : start + 300])
+
+    bands = revenue_band(columns["revenue"])
+    tax = results[:, RESULT_KEYS.index("total_tax")]
+    header = rollup.header(quantiles=(0.5,))
+    rows = rollup.table(quantiles=(0.5,))
+    assert header[:3] == ["entity_type", "revenue_band", "rows"]
+    assert sum(row[2] for row in rows) == 2_000
+    for row in rows:
+        mask = (columns["entity_type"] == row[0]) & (bands == row[1])
+        assert row[2] == mask.sum()
+        total, mean, low, high, median = row[3:]
+        assert total == pytest.approx(tax[mask].sum())
+        assert mean == pytest.approx(tax[mask].mean())
+        assert (low, high) == (tax[mask].min(), tax[mask].max())
+        exact = np.quantile(tax[mask], 0.5, method="lower")
+        assert median == pytest.approx(exact, rel=0.0101)
+
+
+def test_s_corp_savings_and_whole_book():
+    columns = make_columns(500, seed=2)
+    rollup = Rollup(by=(), metrics=("s_corp_savings", "net_income"))
+    rollup.write(columns, calculate_chunk(columns))
+    ((key, sketches),) = rollup.groups.items()
+    assert key == () and sketches["net_income"].count == 500
+    assert sketches["net_income"].sum == pytest.approx(
+        (columns["revenue"] - columns["expenses"]).sum()
+    )
+    with pytest.raises(ValueError, match="metric"):
+        Rollup(metrics=("nope",))
+
+
+def test_batch_rollup_matches_stored_results(source, tmp_path):
+    streamed = Rollup()
+    run_batch(source, str(tmp_path / "out.csv"), chunk_size=70, rollup=streamed)
+    assert sum(s["total_tax"].count for s in streamed.groups.values()) == 300
+    # The output file holds results rounded to cents.
+    stored = rollup_results(str(tmp_path / "out.csv"))
+    assert stored.groups.keys() == streamed.groups.keys()
+    for key, sketches in stored.groups.items():
+        for name, sketch in sketches.items():
+            expected = streamed.groups[key][name]
+            assert sketch.count == expected.count
+            assert sketch.sum == pytest.approx(expected.sum, abs=0.01 * sketch.count)
+            assert sketch.quantile(0.5) == pytest.approx(
+                expected.quantile(0.5), rel=0.021, abs=0.01
+            )
+
+
+def test_job_merges_shard_rollups(source, tmp_path):
+    plain = Rollup()
+    run_batch(source, str(tmp_path / "out.csv"), rollup=plain)
+    job = str(tmp_path / "run.job")
+    rollup = Rollup()
+    summary = run_job([source], job, shard_rows=80, chunk_size=30, rollup=rollup)
+    assert summary.shards == 4
+    assert len(os.listdir(os.path.join(job, "rollups"))) == 4
+    assert rollup.groups.keys() == plain.groups.keys()
+    for (key, merged), (_, whole) in zip(
+        sorted(rollup.groups.items()), sorted(plain.groups.items())
+    ):
+        for name in rollup.metrics:
+            assert merged[name].count == whole[name].count
+            assert merged[name].sum == pytest.approx(whole[name].sum)
+            assert merged[name].quantile(0.9) == whole[name].quantile(0.9)
+    assert job_rollup(job).as_dict() == rollup.as_dict()
+
+    with pytest.raises(JobError, match="rollup"):
+        run_job([source], job, resume=True, rollup=Rollup(by=("state",)))
+    other = str(tmp_path / "plain.job")
+    run_job([source], other)
+    with pytest.raises(JobError, match="no rollup"):
+        job_rollup(other)
+
+
+def read_table(path):
+    with open(path, newline="") as handle:
+        return list(csv.DictReader(handle))
+
+
+def test_rollup_commands(source, tmp_path, capsys):
+    out, table = str(tmp_path / "out.csv"), str(tmp_path / "rollup.csv")
+    args = ["batch", source, out, "--rollup", table, "--rollup-by", "entity_type"]
+    assert cli_main(args) == 0
+    assert f"Rollup of 4 groups written to {table}" in capsys.readouterr().out
+    rows = read_table(table)
+    assert [row["entity_type"] for row in rows] == [
+        "C-Corp",
+        "LLC",
+        "S-Corp",
+        "Sole Proprietorship",
+    ]
+    assert sum(int(row["rows"]) for row in rows) == 300
+    assert "total_tax_p99" in rows[0] and "s_corp_savings_mean" in rows[0]
+
+    assert cli_main(["rollup", out, "--by", "--quantiles", "0.5"]) == 0
+    (row,) = list(csv.DictReader(capsys.readouterr().out.splitlines()))
+    assert int(row["rows"]) == 300 and "total_tax_p50" in row
+
+    assert cli_main(["rollup", out, "--by", "county"]) == 2
+    assert "county" in capsys.readouterr().err
+
+    job = str(tmp_path / "run.job")
+    args = ["batch", source, job, "--job", "--shard-rows", "100"]
+    assert cli_main(args + ["--rollup", str(tmp_path / "job.csv")]) == 0
+    capsys.readouterr()
+    assert cli_main(["job", "rollup", job, "--output", table]) == 0
+    assert read_table(table) == read_table(tmp_path / "job.csv")
@@ -0,0 +1,179 @@
+import sys
+import os
+
+sys.path.insert(
+    0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "src"))
+)
+
+import csv
+
+import pytest
+from business_tax_calculator.calculator.tax_calculator import (
+    calculate_business_liabilities,
+)
+from business_tax_calculator.calculator.batch import BatchSummary
+from business_tax_calculator.calculator.validation import RejectedRowsWriter
+from business_tax_calculator.cli import main as cli_main
+from business_tax_calculator.model.business import Business
+from business_tax_calculator.storage.scenario_store import INDEXES, ScenarioStore
+
+ROWS = [
+    {"client_id": "A", "entity_type": "LLC", "state": "MD", "revenue": "180000"},
+    {"client_id": "B", "entity_type": "Sole Proprietorship", "revenue": "60000"},
+    {"client_id": "C", "entity_type": "S-Corp", "state": "MD", "revenue": "400000"},
+    {"client_id": "D", "entity_type": "C-Corp", "state": "MD", "revenue": "90000"},
+    {"client_id": "E", "entity_type": "C-Corp", "revenue": "900000"},
+]
+
+
+def write_input(path, rows):
+    fields = ["client_id", "entity_type", "state", "revenue"]
+    with open(path, "w", newline="") as handle:
+        writer = csv.DictWriter(handle, fieldnames=fields)
+        writer.writeheader()
+        writer.writerows(rows)
+
+
+def total_tax(row, entity_type=None):
+    business = Business()
+    business.set_entity_type(entity_type or row["entity_type"])
+    business.set_state(row.get("state", ""))
+    business.set_revenue(float(row["revenue"]))
+    return calculate_business_liabilities(business)["total_tax"]
+
+
+@pytest.fixture
+def store(tmp_path):
+    source = tmp_path / "in.csv"
+    write_input(source, ROWS)
+    with ScenarioStore(str(tmp_path / "scenarios.db")) as store:
+        store.ingest(str(source), chunk_size=2, label="nightly")
+        yield store
+
+
+def test_ingest_stores_results_and_s_corp_savings(store):
+    (run,) = store.runs()
+    assert (run.run_id, run.label, run.rows) == (1, "nightly", 5)
+    rows = {row["client_id"]: row for row in store.query()}
+    assert set(rows) == {"A", "B", "C", "D", "E"}
+    for source in ROWS:
+        row = rows[source["client_id"]]
+        assert row["total_tax"] == pytest.approx(total_tax(source))
+        assert row["net_income"] == float(source["revenue"])
+        savings = total_tax(source) - total_tax(source, "S-Corp")
+        if source["entity_type"] == "S-Corp":
+            savings = 0.0
+        assert row["s_corp_savings"] == pytest.approx(savings)
+
+
+def test_queries(store):
+    expected = sorted(
+        r["client_id"]
+        for r in ROWS
+        if r["entity_type"] != "S-Corp" and total_tax(r) - total_tax(r, "S-Corp") > 5000
+    )
+    assert expected == ["D", "E"]
+    found = store.query(savings_above=5000, columns=["client_id"])
+    assert sorted(r["client_id"] for r in found) == expected
+    assert store.count(savings_above=5000) == len(expected)
+
+    top = store.query(state="MD", order_by="effective_tax_rate", limit=2)
+    rates = [r["effective_tax_rate"] for r in top]
+    assert len(top) == 2 and rates == sorted(rates, reverse=True)
+    assert {r["state"] for r in top} == {"MD"}
+    assert store.count(entity_type="C-Corp", net_income_above=100000) == 1
+
+    with pytest.raises(ValueError):
+        store.query(order_by="total_tax; DROP TABLE scenarios")
+
+
+def test_indexes_serve_the_filters(store):
+    names = {
+        row[0]
+        for row in store._conn.execute(
+            "SELECT name FROM sqlite_master WHERE type = 'index'"
+        )
+    }
+    assert set(INDEXES) <= names
+    plan = store.explain(
+        "SELECT client_id FROM scenarios WHERE state = ? "
+        "ORDER BY effective_tax_rate DESC LIMIT 100",
+        ("MD",),
+    )
+    assert any("scenarios_state_rate" in step for step in plan)
+
+
+def test_second_run_appends(store, tmp_path):
+    source = tmp_path / "more.csv"
+    write_input(source, ROWS[:2])
+    info = store.ingest(str(source))
+    assert info.run_id == 2 and info.rows == 2
+    assert store.count() == 7
+    assert store.count(run_id=2) == 2
+
+
+def test_failed_run_is_removed(store, tmp_path, capsys):
+    source = tmp_path / "bad.csv"
+    write_input(source, ROWS[:3] + [dict(ROWS[3], revenue="n/a")])
+    with pytest.raises(ValueError, match="rows 3-4 could not be stored"):
+        store.ingest(str(source), chunk_size=2, validate=False)
+    assert [run.run_id for run in store.runs()] == [1]
+    assert store.count() == 5
+    assert store.ingest(str(tmp_path / "in.csv")).rows == 5
+    path = str(tmp_path / "cli.db")
+    assert cli_main(["store", "ingest", path, str(source), "--no-validate"]) == 2
+    assert "could not be stored" in capsys.readouterr().err
+
+
+def test_invalid_rows_are_skipped(store, tmp_path, capsys):
+    source = tmp_path / "mixed.csv"
+    bad = [dict(ROWS[1], revenue="n/a"), dict(ROWS[2], state="ZZ")]
+    write_input(source, ROWS[:1] + bad + ROWS[3:])
+    summary = BatchSummary()
+    with RejectedRowsWriter(str(tmp_path / "rejected.csv")) as rejected:
+        info = store.ingest(
+            str(source), chunk_size=2, rejected=rejected, summary=summary
+        )
+    assert (info.rows, summary.rejected, rejected.rows) == (3, 2, 2)
+    stored = [row["client_id"] for row in store.query(run_id=info.run_id)]
+    assert sorted(stored) == ["A", "D", "E"]
+    with open(tmp_path / "rejected.csv", newline="") as handle:
+        rows = list(csv.DictReader(handle))
+    assert [(row["row"], row["errors"]) for row in rows] == [
+        ("2", "not_a_number"),
+        ("3", "unknown_state"),
+    ]
+
+    path, rejected = str(tmp_path / "cli.db"), str(tmp_path / "cli-rejected.csv")
+    assert cli_main(["store", "ingest", path, str(source)]) == 0
+    assert "2 rows rejected by validation (pass --rejected" in capsys.readouterr().out
+    assert cli_main(["store", "ingest", path, str(source), "--rejected", rejected]) == 0
+    assert "stored 3 scenarios" in capsys.readouterr().out
+
+
+def test_store_commands(tmp_path, capsys):
+    source = tmp_path / "in.csv"
+    write_input(source, ROWS)
+    path = str(tmp_path / "cli.db")
+    assert cli_main(["store", "ingest", path, str(source)]) == 0
+    capsys.readouterr()
+    args = ["store", "query", path, "--state", "MD", "--order-by", "revenue"]
+    assert cli_main(args + ["--columns", "client_id", "revenue", "--limit", "2"]) == 0
+    lines = capsys.readouterr().out.splitlines()
+    assert lines == ["client_id,revenue", "C,400000.0", "A,180000.0"]
+    assert cli_main(["store", "query", path, "--entity-type", "C-Corp", "--count"]) == 0
+    assert capsys.readouterr().out.strip() == "2"
+
+
+def test_store_query_errors(tmp_path, capsys, monkeypatch):
+    path = str(tmp_path / "cli.db")
+    ScenarioStore(path).close()
+    assert cli_main(["store", "query", path, "--order-by", "bogus"]) == 2
+    assert "error: Unknown column: 'bogus'" in capsys.readouterr().err
+
+    def bad_filter(self, **filters):
+        raise ValueError("bad filter")
+
+    monkeypatch.setattr(ScenarioStore, "count", bad_filter)
+    assert cli_main(["store", "query", path, "--count"]) == 2
+    assert capsys.readouterr().err.strip() == "error: bad filter"
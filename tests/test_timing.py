@@ -0,0 +1,94 @@
+import sys
+import os
+
+sys.path.insert(
+    0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "src"))
+)
+
+import csv
+
+import pytest
+from business_tax_calculator.calculator.batch import run_batch
+from business_tax_calculator.calculator.tax_calculator import (
+    calculate_business_liabilities,
+)
+from business_tax_calculator.model.business import Business
+from business_tax_calculator.utils import timing
+
+
+@pytest.fixture
+def timings():
+    timing.reset()
+    timing.enable()
+    try:
+        yield timing
+    finally:
+        timing.disable()
+        timing.reset()
+
+
+def make_business():
+    business = Business()
+    business.set_entity_type("LLC")
+    business.set_revenue(120000)
+    business.set_expenses(30000)
+    return business
+
+
+def test_disabled_timing_records_nothing():
+    timing.reset()
+    assert not timing.is_enabled()
+    calculate_business_liabilities(make_business())
+    assert timing.snapshot() == {}
+
+
+def test_calculation_stages_are_recorded(timings):
+    for _ in range(3):
+        calculate_business_liabilities(make_business())
+    stages = timings.snapshot()
+    for stage in ("deductions", "qbi", "liabilities", "assembly"):
+        stats = stages[f"calculate.{stage}"]
+        assert stats["count"] == 3
+        assert sum(stats["buckets"].values()) == 3
+        assert stats["total_seconds"] > 0
+
+
+def test_batch_stages_are_recorded(timings, tmp_path):
+    source = tmp_path / "in.csv"
+    with open(source, "w", newline="") as handle:
+        writer = csv.writer(handle)
+        writer.writerow(["client_id", "entity_type", "revenue", "expenses"])
+        for i in range(25):
+            writer.writerow([f"c{i}", "LLC", 100000 + i, 20000])
+    run_batch(str(source), str(tmp_path / "out.csv"), chunk_size=10)
+    stages = timings.snapshot()
+    for stage in ("batch.read", "batch.compute", "batch.write", "chunk.calculate"):
+        assert stages[stage]["count"] == 3
+
+
+def test_prometheus_text_is_cumulative():
+    stages = {
+        "calculate.qbi": {
+            "count": 3,
+            "total_seconds": 0.5,
+            "buckets": {0.001: 1, 1.0: 2, float("inf"): 0},
+        }
+    }
+    lines = timing.prometheus_text(stages).splitlines()
+    assert lines[1] == "# TYPE business_tax_stage_seconds histogram"
+    assert lines[2:] == [
+        'business_tax_stage_seconds_bucket{stage="calculate.qbi",le="0.001"} 1',
+        'business_tax_stage_seconds_bucket{stage="calculate.qbi",le="1.0"} 3',
+        'business_tax_stage_seconds_bucket{stage="calculate.qbi",le="+Inf"} 3',
+        'business_tax_stage_seconds_sum{stage="calculate.qbi"} 0.5',
+        'business_tax_stage_seconds_count{stage="calculate.qbi"} 3',
+    ]
+
+
+def test_daemon_reports_timings(timings):
+    from business_tax_calculator.service.daemon import handle_message
+
+    handle_message({"op": "calculate", "inputs": {"entity_type": "LLC"}})
+    response = handle_message({"op": "timings"})
+    assert response["enabled"]
+    assert 'stage="calculate.qbi"' in response["prometheus"]
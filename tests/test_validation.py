@@ -0,0 +1,183 @@
+import sys
+import os
+
+sys.path.insert(
+    0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "src"))
+)
+
+import csv
+
+import numpy as np
+import pytest
+from business_tax_calculator.calculator.batch import rows_to_columns, run_batch
+from business_tax_calculator.calculator.jobs import job_status, run_job
+from business_tax_calculator.calculator.validation import (
+    NEGATIVE_AMOUNT,
+    NOT_A_NUMBER,
+    SALARY_ABOVE_NET_REVENUE,
+    UNKNOWN_ENTITY_TYPE,
+    UNKNOWN_FILING_STATUS,
+    UNKNOWN_STATE,
+    VALID,
+    describe,
+    validate_columns,
+)
+from business_tax_calculator.cli import main as cli_main
+from business_tax_calculator.utils.progress import BatchProgress
+
+GOOD = {
+    "client_id": "C0",
+    "entity_type": "S-Corp",
+    "filing_status": "Single",
+    "state": "CA",
+    "revenue": "200000",
+    "expenses": "50000",
+    "reasonable_salary": "80000",
+}
+
+# Row number (1-based, header excluded) -> (changes, expected code)
+BAD = {
+    2: ({"expenses": "-10"}, NEGATIVE_AMOUNT),
+    4: ({"revenue": "abc"}, NOT_A_NUMBER),
+    5: ({"other_deductions": "nan"}, NOT_A_NUMBER),
+    7: ({"state": "ZZ"}, UNKNOWN_STATE),
+    8: ({"entity_type": "Trust"}, UNKNOWN_ENTITY_TYPE),
+    10: ({"filing_status": "Widowed"}, UNKNOWN_FILING_STATUS),
+    11: ({"reasonable_salary": "160000"}, SALARY_ABOVE_NET_REVENUE),
+    12: (
+        {"expenses": "-10", "state": "ZZ"},
+        NEGATIVE_AMOUNT | UNKNOWN_STATE,
+    ),
+}
+FIELDS = list(GOOD) + ["other_deductions"]
+
+
+def make_rows(n=14):
+    rows = []
+    for number in range(1, n + 1):
+        row = dict(GOOD, client_id=f"C{number}", other_deductions="")
+        row.update(BAD.get(number, ({}, None))[0])
+        rows.append(row)
+    return rows
+
+
+def write_rows(path, rows):
+    with open(path, "w", newline="") as handle:
+        writer = csv.DictWriter(handle, fieldnames=FIELDS)
+        writer.writeheader()
+        writer.writerows(rows)
+
+
+def read_csv(path):
+    with open(path, newline="") as handle:
+        return list(csv.DictReader(handle))
+
+
+@pytest.fixture
+def source(tmp_path):
+    path = tmp_path / "in.csv"
+    write_rows(path, make_rows())
+    return str(path)
+
+
+def test_each_check_sets_its_flag():
+    codes = validate_columns(rows_to_columns(make_rows()))
+    assert codes.dtype == np.uint8
+    for number, code in enumerate(codes.tolist(), 1):
+        assert code == BAD.get(number, (None, VALID))[1], number
+    assert describe(NEGATIVE_AMOUNT | UNKNOWN_STATE) == "negative_amount|unknown_state"
+    assert describe(VALID) == ""
+
+
+def test_blank_state_and_salary_of_other_entities_pass():
+    rows = [
+        dict(GOOD, state=""),
+        dict(GOOD, entity_type="LLC", reasonable_salary="999999"),
+    ]
+    assert validate_columns(rows_to_columns(rows)).tolist() == [VALID, VALID]
+
+
+def test_rejected_rows_are_diverted(source, tmp_path):
+    rejected = tmp_path / "rejected.csv"
+    events = []
+    summary = run_batch(
+        source,
+        str(tmp_path / "out.csv"),
+        chunk_size=4,
+        rejected_path=str(rejected),
+        progress=BatchProgress([events.append]),
+    )
+    assert (summary.rows, summary.rejected) == (6, 8)
+    assert events[-1].rows == 14 and events[-1].errors == 8
+
+    rows = read_csv(rejected)
+    assert [int(row["row"]) for row in rows] == sorted(BAD)
+    assert [int(row["error_code"]) for row in rows] == [
+        code for _, (_, code) in sorted(BAD.items())
+    ]
+    assert rows[-1]["errors"] == "negative_amount|unknown_state"
+    assert rows[0]["client_id"] == "C2" and float(rows[0]["expenses"]) == -10
+
+    # The valid rows come out exactly as a run over only those rows.
+    valid = [row for i, row in enumerate(make_rows(), 1) if i not in BAD]
+    write_rows(tmp_path / "valid.csv", valid)
+    run_batch(str(tmp_path / "valid.csv"), str(tmp_path / "expected.csv"))
+    assert read_csv(tmp_path / "out.csv") == read_csv(tmp_path / "expected.csv")
+
+
+def test_clean_runs_leave_no_rejected_file(tmp_path):
+    path = tmp_path / "in.csv"
+    write_rows(path, [dict(GOOD, other_deductions="")] * 3)
+    rejected = tmp_path / "rejected.csv"
+    summary = run_batch(
+        str(path), str(tmp_path / "out.csv"), rejected_path=str(rejected)
+    )
+    assert summary.rejected == 0 and not rejected.exists()
+
+
+def test_validation_can_be_switched_off(source, tmp_path):
+    summary = run_batch(source, str(tmp_path / "out.csv"), validate=False)
+    assert (summary.rows, summary.rejected) == (14, 0)
+
+
+def test_job_shards_number_rejected_rows_by_input(source, tmp_path):
+    job = str(tmp_path / "run.job")
+    summary = run_job([source], job, shard_rows=5, chunk_size=2)
+    assert summary.batch.rejected == 8
+    status = job_status(job)
+    assert status["rejected"] == 8
+    rows = sum((read_csv(path) for path in status["rejected_files"]), [])
+    assert [int(row["row"]) for row in rows] == sorted(BAD)
+
+
+def test_batch_rejected_option(source, tmp_path, capsys):
+    args = ["batch", source, str(tmp_path / "out.csv")]
+    assert cli_main(args) == 0
+    assert "8 rows rejected by validation (pass --rejected" in capsys.readouterr().out
+    rejected = str(tmp_path / "rejected.csv")
+    assert cli_main(args + ["--rejected", rejected]) == 0
+    assert f"written to {rejected}" in capsys.readouterr().out
+    assert len(read_csv(rejected)) == 8
+    job = ["batch", source, str(tmp_path / "run.job"), "--job"]
+    assert cli_main(job + ["--rejected", rejected]) == 2
+    assert cli_main(args + ["--rejected", rejected, "--no-validate"]) == 2
+    assert "cannot be combined with --no-validate" in capsys.readouterr().err
+
+
+def test_batch_input_errors_are_reported(tmp_path, capsys):
+    source = tmp_path / "in.xlsx"
+    source.write_bytes(b"")
+    assert cli_main(["batch", str(source), str(tmp_path / "out.csv")]) == 2
+    error = capsys.readouterr().err.strip()
+    assert error == "error: xlsx files are written by batch runs, not read"
+
+
+def test_parquet_defaults_pass_validation(tmp_path):
+    pa = pytest.importorskip("pyarrow")
+    pq = pytest.importorskip("pyarrow.parquet")
+    source = str(tmp_path / "in.parquet")
+    # No filing_status column: it defaults to Single, as in CSV inputs.
+    table = pa.table({"entity_type": ["LLC"], "revenue": [50_000.0]})
+    pq.write_table(table, source)
+    summary = run_batch(source, str(tmp_path / "out.parquet"))
+    assert (summary.rows, summary.rejected) == (1, 0)